@@ -1,6 +1,7 @@
 CREATE TABLE alarms (
 	id SERIAL NOT NULL, 
 	item_id INTEGER NOT NULL, 
+	owner_id BIGINT, 
 	trigger_at TIMESTAMP WITH TIME ZONE NOT NULL, 
 	is_sent BOOLEAN, 
 	created_at TIMESTAMP WITH TIME ZONE, 
@@ -92,13 +93,16 @@ CREATE TABLE calendar_items (
 	project_id INTEGER, 
 	area_id INTEGER, 
 	status calendaritemstatus, 
+	gcal_link_id INTEGER, 
+	gcal_event_id VARCHAR(1024), 
 	created_at TIMESTAMP WITH TIME ZONE, 
 	updated_at TIMESTAMP WITH TIME ZONE, 
 	PRIMARY KEY (id), 
 	CONSTRAINT ck_calendar_items_single_container CHECK ((project_id IS NOT NULL) <> (area_id IS NOT NULL)), 
 	FOREIGN KEY(owner_id) REFERENCES users_tg (telegram_id), 
 	FOREIGN KEY(project_id) REFERENCES projects (id), 
-	FOREIGN KEY(area_id) REFERENCES areas (id)
+	FOREIGN KEY(area_id) REFERENCES areas (id), 
+	FOREIGN KEY(gcal_link_id) REFERENCES gcal_links (id) ON DELETE CASCADE
 );
 
 CREATE TABLE channels (
@@ -137,6 +141,18 @@ CREATE TABLE crm_accounts (
 	FOREIGN KEY(project_id) REFERENCES projects (id) ON DELETE SET NULL
 );
 
+CREATE TABLE crm_deal_stage_events (
+	id BIGSERIAL NOT NULL, 
+	deal_id BIGINT NOT NULL, 
+	pipeline_id BIGINT, 
+	from_stage_id BIGINT, 
+	to_stage_id BIGINT NOT NULL, 
+	value NUMERIC(14, 2), 
+	occurred_at TIMESTAMP WITH TIME ZONE NOT NULL, 
+	PRIMARY KEY (id), 
+	FOREIGN KEY(deal_id) REFERENCES crm_deals (id) ON DELETE CASCADE
+);
+
 CREATE TABLE crm_deals (
 	id BIGSERIAL NOT NULL, 
 	account_id BIGINT, 
@@ -158,6 +174,7 @@ CREATE TABLE crm_deals (
 	updated_at TIMESTAMP WITH TIME ZONE, 
 	closed_at TIMESTAMP WITH TIME ZONE, 
 	close_forecast_at TIMESTAMP WITH TIME ZONE, 
+	stage_entered_at TIMESTAMP WITH TIME ZONE, 
 	metadata JSON NOT NULL, 
 	PRIMARY KEY (id), 
 	FOREIGN KEY(account_id) REFERENCES crm_accounts (id) ON DELETE CASCADE, 
@@ -259,6 +276,48 @@ CREATE TABLE crm_products (
 	FOREIGN KEY(project_id) REFERENCES projects (id) ON DELETE SET NULL
 );
 
+CREATE TABLE crm_revenue_daily (
+	day DATE NOT NULL, 
+	product_id BIGINT NOT NULL, 
+	tariff_id BIGINT NOT NULL, 
+	currency VARCHAR(3) NOT NULL, 
+	active_count INTEGER NOT NULL, 
+	mrr NUMERIC(16, 2) NOT NULL, 
+	new_count INTEGER NOT NULL, 
+	churned_count INTEGER NOT NULL, 
+	churned_mrr NUMERIC(16, 2) NOT NULL, 
+	PRIMARY KEY (day, product_id, tariff_id, currency)
+);
+
+CREATE TABLE crm_revenue_totals (
+	product_id BIGINT NOT NULL, 
+	tariff_id BIGINT NOT NULL, 
+	currency VARCHAR(3) NOT NULL, 
+	active_count INTEGER NOT NULL, 
+	mrr NUMERIC(16, 2) NOT NULL, 
+	PRIMARY KEY (product_id, tariff_id, currency)
+);
+
+CREATE TABLE crm_stage_rollups (
+	stage_id BIGSERIAL NOT NULL, 
+	pipeline_id BIGINT, 
+	deals_count INTEGER NOT NULL, 
+	deals_value NUMERIC(16, 2) NOT NULL, 
+	entered_count INTEGER NOT NULL, 
+	exited_count INTEGER NOT NULL, 
+	exited_seconds BIGINT NOT NULL, 
+	PRIMARY KEY (stage_id)
+);
+
+CREATE TABLE crm_stage_transitions (
+	from_stage_id BIGINT NOT NULL, 
+	to_stage_id BIGINT NOT NULL, 
+	pipeline_id BIGINT, 
+	transitions INTEGER NOT NULL, 
+	seconds BIGINT NOT NULL, 
+	PRIMARY KEY (from_stage_id, to_stage_id)
+);
+
 CREATE TABLE crm_subscription_events (
 	id BIGSERIAL NOT NULL, 
 	subscription_id BIGINT, 
@@ -346,6 +405,14 @@ CREATE TABLE daily_logs (
 	FOREIGN KEY(daily_id) REFERENCES dailies (id) ON DELETE CASCADE
 );
 
+CREATE TABLE daily_occurrences (
+	daily_id INTEGER NOT NULL, 
+	occurs_on DATE NOT NULL, 
+	owner_id BIGINT NOT NULL, 
+	PRIMARY KEY (daily_id, occurs_on), 
+	FOREIGN KEY(daily_id) REFERENCES dailies (id) ON DELETE CASCADE
+);
+
 CREATE TABLE diagnostic_clients (
 	id SERIAL NOT NULL, 
 	user_id INTEGER NOT NULL, 
@@ -391,6 +458,23 @@ CREATE TABLE diagnostic_templates (
 	UNIQUE (slug)
 );
 
+CREATE TABLE email_outbox (
+	id SERIAL NOT NULL, 
+	to_address VARCHAR(255) NOT NULL, 
+	subject VARCHAR(255) NOT NULL, 
+	body TEXT NOT NULL, 
+	kind VARCHAR(32) NOT NULL, 
+	dedupe_key VARCHAR(255), 
+	status VARCHAR(16) NOT NULL, 
+	attempts INTEGER NOT NULL, 
+	next_attempt_at TIMESTAMP WITH TIME ZONE NOT NULL, 
+	last_error TEXT, 
+	created_at TIMESTAMP WITH TIME ZONE, 
+	sent_at TIMESTAMP WITH TIME ZONE, 
+	PRIMARY KEY (id), 
+	UNIQUE (dedupe_key)
+);
+
 CREATE TABLE entity_profile_grants (
 	id SERIAL NOT NULL, 
 	profile_id INTEGER NOT NULL, 
@@ -405,6 +489,15 @@ CREATE TABLE entity_profile_grants (
 	FOREIGN KEY(created_by) REFERENCES users_web (id)
 );
 
+CREATE TABLE entity_profile_visibility (
+	profile_id INTEGER NOT NULL, 
+	audience_type VARCHAR(32) NOT NULL, 
+	subject_id BIGINT NOT NULL, 
+	expires_at TIMESTAMP WITH TIME ZONE, 
+	PRIMARY KEY (profile_id, audience_type, subject_id), 
+	FOREIGN KEY(profile_id) REFERENCES entity_profiles (id) ON DELETE CASCADE
+);
+
 CREATE TABLE entity_profiles (
 	id SERIAL NOT NULL, 
 	entity_type VARCHAR(32) NOT NULL, 
@@ -428,9 +521,17 @@ CREATE TABLE entity_profiles (
 CREATE TABLE gcal_links (
 	id SERIAL NOT NULL, 
 	owner_id BIGINT, 
+	user_id VARCHAR(64), 
 	calendar_id VARCHAR(255) NOT NULL, 
-	access_token VARCHAR(255), 
-	refresh_token VARCHAR(255), 
+	access_token TEXT, 
+	refresh_token TEXT, 
+	scope TEXT, 
+	token_expiry TIMESTAMP WITH TIME ZONE, 
+	sync_token TEXT, 
+	last_synced_at TIMESTAMP WITH TIME ZONE, 
+	resource_id TEXT, 
+	channel_id TEXT, 
+	channel_expiry TIMESTAMP WITH TIME ZONE, 
 	created_at TIMESTAMP WITH TIME ZONE, 
 	updated_at TIMESTAMP WITH TIME ZONE, 
 	PRIMARY KEY (id), 
@@ -451,6 +552,32 @@ CREATE TABLE group_activity_daily (
 	FOREIGN KEY(user_id) REFERENCES users_tg (telegram_id)
 );
 
+CREATE TABLE group_prune_jobs (
+	id BIGSERIAL NOT NULL, 
+	group_id BIGINT NOT NULL, 
+	product_id INTEGER NOT NULL, 
+	initiator_web_id INTEGER, 
+	initiator_tg_id BIGINT, 
+	reason VARCHAR(255), 
+	status VARCHAR(16) NOT NULL, 
+	total INTEGER NOT NULL, 
+	processed INTEGER NOT NULL, 
+	removed INTEGER NOT NULL, 
+	failed INTEGER NOT NULL, 
+	cursor BIGINT NOT NULL, 
+	attempts INTEGER NOT NULL, 
+	next_attempt_at TIMESTAMP WITH TIME ZONE, 
+	error TEXT, 
+	created_at TIMESTAMP WITH TIME ZONE, 
+	started_at TIMESTAMP WITH TIME ZONE, 
+	finished_at TIMESTAMP WITH TIME ZONE, 
+	updated_at TIMESTAMP WITH TIME ZONE, 
+	PRIMARY KEY (id), 
+	FOREIGN KEY(group_id) REFERENCES groups (telegram_id), 
+	FOREIGN KEY(product_id) REFERENCES products (id), 
+	FOREIGN KEY(initiator_web_id) REFERENCES users_web (id)
+);
+
 CREATE TABLE group_removal_log (
 	id BIGSERIAL NOT NULL, 
 	group_id BIGINT NOT NULL, 
@@ -713,6 +840,17 @@ CREATE TABLE projects (
 	FOREIGN KEY(owner_id) REFERENCES users_tg (telegram_id)
 );
 
+CREATE TABLE repair_ledger (
+	name VARCHAR(64) NOT NULL, 
+	version INTEGER NOT NULL, 
+	status VARCHAR(16) NOT NULL, 
+	details TEXT, 
+	error TEXT, 
+	duration_ms INTEGER, 
+	finished_at TIMESTAMP WITH TIME ZONE, 
+	PRIMARY KEY (name)
+);
+
 CREATE TABLE resources (
 	id SERIAL NOT NULL, 
 	owner_id BIGINT, 
@@ -999,14 +1137,65 @@ CREATE TABLE users_web_tg (
 	FOREIGN KEY(tg_user_id) REFERENCES users_tg (id)
 );
 
+CREATE TABLE worker_heartbeats (
+	name VARCHAR(64) NOT NULL, 
+	host VARCHAR(255), 
+	pid INTEGER, 
+	interval_seconds FLOAT NOT NULL, 
+	last_seen_at TIMESTAMP WITH TIME ZONE NOT NULL, 
+	PRIMARY KEY (name)
+);
+
+CREATE INDEX ix_alarms_owner_trigger ON alarms (owner_id, trigger_at);
+
+CREATE INDEX ix_calendar_events_owner_start ON calendar_events (owner_id, start_at) INCLUDE (title, end_at);
+
 CREATE INDEX idx_calendar_items_owner_area ON calendar_items (owner_id, area_id);
 
 CREATE INDEX idx_calendar_items_owner_project ON calendar_items (owner_id, project_id);
 
+CREATE INDEX ix_calendar_items_owner_start ON calendar_items (owner_id, start_at) INCLUDE (title, end_at, status, area_id, project_id);
+
+CREATE UNIQUE INDEX ux_calendar_items_gcal_event ON calendar_items (gcal_link_id, gcal_event_id);
+
+CREATE INDEX idx_crm_accounts_email ON crm_accounts (lower(email));
+
+CREATE INDEX idx_crm_accounts_phone ON crm_accounts (phone);
+
+CREATE INDEX ix_crm_accounts_web_user ON crm_accounts (web_user_id);
+
+CREATE INDEX ix_crm_deal_stage_events_deal ON crm_deal_stage_events (deal_id, occurred_at);
+
+CREATE INDEX ix_crm_revenue_daily_product_day ON crm_revenue_daily (product_id, day);
+
+CREATE INDEX ix_crm_stage_rollups_pipeline ON crm_stage_rollups (pipeline_id);
+
+CREATE INDEX ix_crm_stage_transitions_pipeline ON crm_stage_transitions (pipeline_id);
+
 CREATE INDEX idx_dailies_owner_area ON dailies (owner_id, area_id);
 
 CREATE INDEX idx_dailies_owner_project ON dailies (owner_id, project_id);
 
+CREATE INDEX ix_daily_occurrences_owner_day ON daily_occurrences (owner_id, occurs_on);
+
+CREATE INDEX ix_diagnostic_clients_created ON diagnostic_clients (created_at DESC, id DESC);
+
+CREATE INDEX ix_diagnostic_clients_specialist_created ON diagnostic_clients (specialist_id, created_at DESC, id DESC);
+
+CREATE INDEX ix_diagnostic_results_client ON diagnostic_results (client_id, submitted_at DESC);
+
+CREATE INDEX ix_email_outbox_due ON email_outbox (status, next_attempt_at);
+
+CREATE INDEX ix_entity_profile_visibility_audience ON entity_profile_visibility (audience_type, subject_id);
+
+CREATE INDEX ix_gcal_links_user_id ON gcal_links (user_id);
+
+CREATE INDEX ix_group_prune_jobs_group ON group_prune_jobs (group_id, created_at);
+
+CREATE INDEX ix_group_prune_jobs_status ON group_prune_jobs (status, id);
+
+CREATE UNIQUE INDEX ux_group_prune_jobs_active ON group_prune_jobs (group_id, product_id) WHERE status IN ('queued', 'running');
+
 CREATE INDEX ix_group_removal_group_created ON group_removal_log (group_id, created_at);
 
 CREATE INDEX ix_group_removal_product ON group_removal_log (product_id);
@@ -1015,6 +1204,12 @@ CREATE INDEX idx_habits_owner_area ON habits (owner_id, area_id);
 
 CREATE INDEX idx_habits_owner_project ON habits (owner_id, project_id);
 
+CREATE INDEX ix_links_source ON links (source_type, source_id);
+
+CREATE INDEX ix_links_target ON links (target_type, target_id);
+
+CREATE UNIQUE INDEX ux_links_edge ON links (source_type, source_id, target_type, target_id, link_type);
+
 CREATE INDEX ix_nav_sidebar_layouts_owner ON nav_sidebar_layouts (owner_id);
 
 CREATE INDEX idx_notes_owner_area ON notes (owner_id, area_id);
@@ -1037,6 +1232,12 @@ CREATE INDEX idx_time_entries_owner_area ON time_entries (owner_id, area_id);
 
 CREATE INDEX idx_time_entries_owner_project ON time_entries (owner_id, project_id);
 
+CREATE INDEX ix_user_group_group_joined ON user_group (group_id, joined_at);
+
 CREATE INDEX ix_users_favorites_owner_position ON users_favorites (owner_id, position);
 
+CREATE INDEX ix_users_web_email_ci ON users_web (lower(email));
+
+CREATE INDEX ix_users_web_phone ON users_web (phone);
+
 CREATE UNIQUE INDEX ix_users_web_username_ci ON users_web (lower(username));
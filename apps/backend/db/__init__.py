@@ -2,48 +2,39 @@ from __future__ import annotations
 
 import builtins
 import logging
-import os
 import sys
+from typing import Any
 
-import bcrypt as _bcrypt
-from aiogram import Bot, Dispatcher
-from aiogram.fsm.storage.memory import MemoryStorage
 from dotenv import load_dotenv
 
-from .engine import engine, async_session, init_models, Base
-from .legacy import DBConfig, validate_config, get_raw_connection
+from .engine import Base, async_session, engine, init_models
+from .legacy import DBConfig, get_raw_connection, validate_config
+from .passwords import BcryptHasher, PasswordHasherBusy
 
 logger = logging.getLogger(__name__)
 load_dotenv()
 
-TG_BOT_TOKEN = os.getenv("TG_BOT_TOKEN") or ("123456:" + "A" * 35)
-try:
-    bot = Bot(token=TG_BOT_TOKEN)
-except Exception:
-    TG_BOT_TOKEN = "123456:" + "A" * 35
-    bot = Bot(token=TG_BOT_TOKEN)
-storage = MemoryStorage()
-dp = Dispatcher(storage=storage)
 
-# Expose module as ``db``
-builtins.db = sys.modules[__name__]
+_TELEGRAM_ATTRS = {"bot", "dp", "storage", "TG_BOT_TOKEN"}
+
 
+def __getattr__(name: str) -> Any:
+    # aiogram is only imported by code that actually needs the bot
+    if name in _TELEGRAM_ATTRS:
+        from . import telegram
 
-class _BcryptWrapper:
-    """Lightweight wrapper providing Flask-Bcrypt like helpers."""
+        value = getattr(telegram, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-    @staticmethod
-    def generate_password_hash(password: str) -> str:
-        return _bcrypt.hashpw(password.encode(), _bcrypt.gensalt()).decode()
 
-    @staticmethod
-    def check_password_hash(hashed: str, password: str) -> bool:
-        if not hashed:
-            return False
-        return _bcrypt.checkpw(password.encode(), hashed.encode())
+# Expose module as ``db``
+builtins.db = sys.modules[__name__]
 
 
-bcrypt = _BcryptWrapper()
+# Password hashing runs in a bounded thread pool (see ``passwords.py``)
+bcrypt = BcryptHasher()
 
 __all__ = [
     "engine",
@@ -56,4 +47,5 @@ __all__ = [
     "bot",
     "dp",
     "bcrypt",
+    "PasswordHasherBusy",
 ]
@@ -0,0 +1,15 @@
+-- Range-bounded agenda queries: (owner_id, start_at) covering indexes and
+-- an owner column on alarms so owner listings skip calendar_items/areas.
+
+CREATE INDEX IF NOT EXISTS ix_calendar_events_owner_start
+    ON calendar_events(owner_id, start_at) INCLUDE (title, end_at);
+CREATE INDEX IF NOT EXISTS ix_calendar_items_owner_start
+    ON calendar_items(owner_id, start_at)
+    INCLUDE (title, end_at, status, area_id, project_id);
+
+ALTER TABLE alarms ADD COLUMN IF NOT EXISTS owner_id BIGINT;
+UPDATE alarms AS a SET owner_id = i.owner_id
+  FROM calendar_items AS i
+ WHERE i.id = a.item_id AND a.owner_id IS NULL;
+CREATE INDEX IF NOT EXISTS ix_alarms_owner_trigger
+    ON alarms(owner_id, trigger_at);
@@ -0,0 +1,65 @@
+-- Incremental CRM analytics: deal stage log and funnel/revenue rollups.
+-- After deploying run scripts/rebuild_crm_analytics.py once to seed rollups.
+
+ALTER TABLE crm_deals ADD COLUMN IF NOT EXISTS stage_entered_at TIMESTAMPTZ;
+UPDATE crm_deals SET stage_entered_at = coalesce(opened_at, now())
+ WHERE stage_entered_at IS NULL;
+
+CREATE TABLE IF NOT EXISTS crm_deal_stage_events (
+    id BIGSERIAL PRIMARY KEY,
+    deal_id BIGINT NOT NULL REFERENCES crm_deals(id) ON DELETE CASCADE,
+    pipeline_id BIGINT,
+    from_stage_id BIGINT,
+    to_stage_id BIGINT NOT NULL,
+    value NUMERIC(14, 2),
+    occurred_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+CREATE INDEX IF NOT EXISTS ix_crm_deal_stage_events_deal
+    ON crm_deal_stage_events(deal_id, occurred_at);
+
+CREATE TABLE IF NOT EXISTS crm_stage_rollups (
+    stage_id BIGINT PRIMARY KEY,
+    pipeline_id BIGINT,
+    deals_count INTEGER NOT NULL DEFAULT 0,
+    deals_value NUMERIC(16, 2) NOT NULL DEFAULT 0,
+    entered_count INTEGER NOT NULL DEFAULT 0,
+    exited_count INTEGER NOT NULL DEFAULT 0,
+    exited_seconds BIGINT NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS ix_crm_stage_rollups_pipeline
+    ON crm_stage_rollups(pipeline_id);
+
+CREATE TABLE IF NOT EXISTS crm_stage_transitions (
+    from_stage_id BIGINT NOT NULL,
+    to_stage_id BIGINT NOT NULL,
+    pipeline_id BIGINT,
+    transitions INTEGER NOT NULL DEFAULT 0,
+    seconds BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (from_stage_id, to_stage_id)
+);
+CREATE INDEX IF NOT EXISTS ix_crm_stage_transitions_pipeline
+    ON crm_stage_transitions(pipeline_id);
+
+CREATE TABLE IF NOT EXISTS crm_revenue_totals (
+    product_id BIGINT NOT NULL,
+    tariff_id BIGINT NOT NULL,
+    currency VARCHAR(3) NOT NULL,
+    active_count INTEGER NOT NULL DEFAULT 0,
+    mrr NUMERIC(16, 2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (product_id, tariff_id, currency)
+);
+
+CREATE TABLE IF NOT EXISTS crm_revenue_daily (
+    day DATE NOT NULL,
+    product_id BIGINT NOT NULL,
+    tariff_id BIGINT NOT NULL,
+    currency VARCHAR(3) NOT NULL,
+    active_count INTEGER NOT NULL DEFAULT 0,
+    mrr NUMERIC(16, 2) NOT NULL DEFAULT 0,
+    new_count INTEGER NOT NULL DEFAULT 0,
+    churned_count INTEGER NOT NULL DEFAULT 0,
+    churned_mrr NUMERIC(16, 2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, product_id, tariff_id, currency)
+);
+CREATE INDEX IF NOT EXISTS ix_crm_revenue_daily_product_day
+    ON crm_revenue_daily(product_id, day);
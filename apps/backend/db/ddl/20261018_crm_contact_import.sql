@@ -0,0 +1,5 @@
+-- Set-based contact resolution for CRM bulk imports (and ensure_web_contact)
+
+CREATE INDEX IF NOT EXISTS ix_users_web_email_ci ON users_web(lower(email));
+CREATE INDEX IF NOT EXISTS ix_users_web_phone ON users_web(phone);
+CREATE INDEX IF NOT EXISTS ix_crm_accounts_web_user ON crm_accounts(web_user_id);
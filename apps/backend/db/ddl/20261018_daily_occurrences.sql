@@ -0,0 +1,11 @@
+-- Materialised expansion of dailies.rrule for index lookups of due dailies.
+-- After deploying run scripts/refresh_daily_occurrences.py once to backfill.
+
+CREATE TABLE IF NOT EXISTS daily_occurrences (
+    daily_id INTEGER NOT NULL REFERENCES dailies(id) ON DELETE CASCADE,
+    occurs_on DATE NOT NULL,
+    owner_id BIGINT NOT NULL,
+    PRIMARY KEY (daily_id, occurs_on)
+);
+CREATE INDEX IF NOT EXISTS ix_daily_occurrences_owner_day
+    ON daily_occurrences(owner_id, occurs_on);
@@ -0,0 +1,12 @@
+-- Keyset listing of diagnostic clients ordered by (created_at, id) DESC
+
+UPDATE diagnostic_clients
+   SET created_at = coalesce(last_result_at, updated_at, now())
+ WHERE created_at IS NULL;
+
+CREATE INDEX IF NOT EXISTS ix_diagnostic_clients_specialist_created
+    ON diagnostic_clients(specialist_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS ix_diagnostic_clients_created
+    ON diagnostic_clients(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS ix_diagnostic_results_client
+    ON diagnostic_results(client_id, submitted_at DESC);
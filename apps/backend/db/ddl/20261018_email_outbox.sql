@@ -0,0 +1,19 @@
+-- Outbox for transactional e-mail (magic links, restore); sent by EmailOutboxWorker
+
+CREATE TABLE IF NOT EXISTS email_outbox (
+    id SERIAL PRIMARY KEY,
+    to_address VARCHAR(255) NOT NULL,
+    subject VARCHAR(255) NOT NULL,
+    body TEXT NOT NULL,
+    kind VARCHAR(32) NOT NULL DEFAULT 'generic',
+    dedupe_key VARCHAR(255) UNIQUE,
+    status VARCHAR(16) NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    last_error TEXT,
+    created_at TIMESTAMPTZ DEFAULT now(),
+    sent_at TIMESTAMPTZ
+);
+
+CREATE INDEX IF NOT EXISTS ix_email_outbox_due
+    ON email_outbox(status, next_attempt_at);
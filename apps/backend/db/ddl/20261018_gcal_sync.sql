@@ -0,0 +1,22 @@
+-- Google Calendar sync state on gcal_links and imported events keyed by
+-- (gcal_link_id, gcal_event_id) in calendar_items.
+
+ALTER TABLE gcal_links
+    ADD COLUMN IF NOT EXISTS user_id VARCHAR(64),
+    ADD COLUMN IF NOT EXISTS scope TEXT,
+    ADD COLUMN IF NOT EXISTS token_expiry TIMESTAMPTZ,
+    ADD COLUMN IF NOT EXISTS sync_token TEXT,
+    ADD COLUMN IF NOT EXISTS last_synced_at TIMESTAMPTZ,
+    ADD COLUMN IF NOT EXISTS resource_id TEXT,
+    ADD COLUMN IF NOT EXISTS channel_id TEXT,
+    ADD COLUMN IF NOT EXISTS channel_expiry TIMESTAMPTZ;
+ALTER TABLE gcal_links
+    ALTER COLUMN access_token TYPE TEXT,
+    ALTER COLUMN refresh_token TYPE TEXT;
+CREATE INDEX IF NOT EXISTS ix_gcal_links_user_id ON gcal_links(user_id);
+
+ALTER TABLE calendar_items
+    ADD COLUMN IF NOT EXISTS gcal_link_id INTEGER REFERENCES gcal_links(id) ON DELETE CASCADE,
+    ADD COLUMN IF NOT EXISTS gcal_event_id VARCHAR(1024);
+CREATE UNIQUE INDEX IF NOT EXISTS ux_calendar_items_gcal_event
+    ON calendar_items(gcal_link_id, gcal_event_id);
@@ -0,0 +1,32 @@
+-- Background prune jobs for groups; executed by GroupPruneWorker
+
+CREATE TABLE IF NOT EXISTS group_prune_jobs (
+    id BIGSERIAL PRIMARY KEY,
+    group_id BIGINT NOT NULL REFERENCES groups(telegram_id) ON DELETE CASCADE,
+    product_id INTEGER NOT NULL REFERENCES products(id),
+    initiator_web_id INTEGER REFERENCES users_web(id),
+    initiator_tg_id BIGINT,
+    reason VARCHAR(255),
+    status VARCHAR(16) NOT NULL DEFAULT 'queued',
+    total INTEGER NOT NULL DEFAULT 0,
+    processed INTEGER NOT NULL DEFAULT 0,
+    removed INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    cursor BIGINT NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at TIMESTAMPTZ,
+    error TEXT,
+    created_at TIMESTAMPTZ DEFAULT now(),
+    started_at TIMESTAMPTZ,
+    finished_at TIMESTAMPTZ,
+    updated_at TIMESTAMPTZ DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS ix_group_prune_jobs_status
+    ON group_prune_jobs(status, id);
+CREATE INDEX IF NOT EXISTS ix_group_prune_jobs_group
+    ON group_prune_jobs(group_id, created_at);
+-- At most one queued/running job per group and product
+CREATE UNIQUE INDEX IF NOT EXISTS ux_group_prune_jobs_active
+    ON group_prune_jobs(group_id, product_id)
+    WHERE status IN ('queued', 'running');
@@ -0,0 +1,4 @@
+-- Roster pages of one group are keyed by join time; the PK leads with user_id
+
+CREATE INDEX IF NOT EXISTS ix_user_group_group_joined
+    ON user_group(group_id, joined_at);
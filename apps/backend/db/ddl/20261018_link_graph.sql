@@ -0,0 +1,16 @@
+-- Link graph: hop lookups in both directions and one row per edge
+
+CREATE INDEX IF NOT EXISTS ix_links_source ON links(source_type, source_id);
+CREATE INDEX IF NOT EXISTS ix_links_target ON links(target_type, target_id);
+
+DELETE FROM links AS l
+ USING links AS d
+ WHERE d.source_type = l.source_type
+   AND d.source_id = l.source_id
+   AND d.target_type = l.target_type
+   AND d.target_id = l.target_id
+   AND d.link_type = l.link_type
+   AND d.id < l.id;
+
+CREATE UNIQUE INDEX IF NOT EXISTS ux_links_edge
+    ON links(source_type, source_id, target_type, target_id, link_type);
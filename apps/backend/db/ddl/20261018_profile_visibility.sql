@@ -0,0 +1,22 @@
+-- Materialized catalog visibility of entity profiles (see ProfileService)
+
+CREATE TABLE IF NOT EXISTS entity_profile_visibility (
+    profile_id INTEGER NOT NULL REFERENCES entity_profiles(id) ON DELETE CASCADE,
+    audience_type VARCHAR(32) NOT NULL,
+    subject_id BIGINT NOT NULL DEFAULT 0,
+    expires_at TIMESTAMPTZ,
+    PRIMARY KEY (profile_id, audience_type, subject_id)
+);
+
+CREATE INDEX IF NOT EXISTS ix_entity_profile_visibility_audience
+    ON entity_profile_visibility(audience_type, subject_id);
+
+-- Substring search of the catalog: lower(col) LIKE '%term%'
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS ix_entity_profiles_display_name_trgm
+    ON entity_profiles USING gin (lower(display_name) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS ix_entity_profiles_slug_trgm
+    ON entity_profiles USING gin (lower(slug) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS ix_entity_profiles_summary_trgm
+    ON entity_profiles USING gin (lower(coalesce(summary, '')) gin_trgm_ops);
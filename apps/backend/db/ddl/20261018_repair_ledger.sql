@@ -0,0 +1,11 @@
+-- Completed repair/backfill steps; run_repair skips steps recorded as done
+
+CREATE TABLE IF NOT EXISTS repair_ledger (
+    name VARCHAR(64) PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 1,
+    status VARCHAR(16) NOT NULL,
+    details TEXT,
+    error TEXT,
+    duration_ms INTEGER,
+    finished_at TIMESTAMPTZ DEFAULT now()
+);
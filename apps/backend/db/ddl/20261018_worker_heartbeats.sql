@@ -0,0 +1,9 @@
+-- Heartbeats of background workers; read by the web health monitor
+
+CREATE TABLE IF NOT EXISTS worker_heartbeats (
+    name VARCHAR(64) PRIMARY KEY,
+    host VARCHAR(255),
+    pid INTEGER,
+    interval_seconds DOUBLE PRECISION NOT NULL DEFAULT 60,
+    last_seen_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
@@ -0,0 +1,160 @@
+"""Bcrypt password hashing offloaded to a bounded thread pool.
+
+``bcrypt`` releases the GIL while hashing, so a small dedicated
+``ThreadPoolExecutor`` keeps the event loop free during logins.  The pool
+is capped (``BCRYPT_WORKERS`` running + ``BCRYPT_MAX_QUEUE`` waiting);
+excess requests and jobs that waited longer than ``BCRYPT_QUEUE_TIMEOUT``
+fail fast with :class:`PasswordHasherBusy` instead of piling up behind a
+credential-stuffing burst.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+import bcrypt as _bcrypt
+
+from backend.metrics import (
+    PASSWORD_HASH_INFLIGHT,
+    PASSWORD_HASH_LATENCY,
+    PASSWORD_HASH_QUEUE_WAIT,
+    PASSWORD_HASH_REJECTED,
+)
+
+T = TypeVar("T")
+
+
+class PasswordHasherBusy(RuntimeError):
+    """Hashing pool is saturated or the job waited too long in the queue."""
+
+    # Seconds web handlers put into ``Retry-After`` of their 503 response.
+    retry_after = 5
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def hash_rounds(hashed: str) -> int | None:
+    """Return the cost factor encoded in a ``$2b$<cost>$...`` hash."""
+
+    parts = (hashed or "").split("$")
+    if len(parts) < 4:
+        return None
+    try:
+        return int(parts[2])
+    except ValueError:
+        return None
+
+
+class BcryptHasher:
+    """Flask-Bcrypt like helpers plus async variants running in a pool."""
+
+    def __init__(
+        self,
+        *,
+        rounds: int | None = None,
+        workers: int | None = None,
+        max_queue: int | None = None,
+        queue_timeout: float | None = None,
+    ) -> None:
+        self.rounds = rounds or _env_int("BCRYPT_ROUNDS", 12)
+        self.workers = workers or _env_int(
+            "BCRYPT_WORKERS", min(4, os.cpu_count() or 1)
+        )
+        self.max_queue = (
+            max_queue if max_queue is not None else _env_int("BCRYPT_MAX_QUEUE", 64)
+        )
+        self.queue_timeout = (
+            queue_timeout
+            if queue_timeout is not None
+            else float(os.getenv("BCRYPT_QUEUE_TIMEOUT", "2.0"))
+        )
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    # --- synchronous helpers (scripts, tests, worker threads) ---
+    def generate_password_hash(self, password: str) -> str:
+        return _bcrypt.hashpw(password.encode(), _bcrypt.gensalt(self.rounds)).decode()
+
+    def check_password_hash(self, hashed: str, password: str) -> bool:
+        if not hashed:
+            return False
+        return _bcrypt.checkpw(password.encode(), hashed.encode())
+
+    def needs_rehash(self, hashed: str | None) -> bool:
+        """``True`` when ``hashed`` was produced with a different cost factor."""
+
+        if not hashed:
+            return False
+        rounds = hash_rounds(hashed)
+        return rounds is not None and rounds != self.rounds
+
+    # --- pooled async API ---
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    async def hash(self, password: str) -> str:
+        return await self.run_in_pool("hash", self.generate_password_hash, password)
+
+    async def verify(self, hashed: str, password: str) -> bool:
+        return await self.run_in_pool("verify", self.check_password_hash, hashed, password)
+
+    async def run_in_pool(self, op: str, fn: Callable[..., T], *args) -> T:
+        """Run ``fn(*args)`` in the hashing pool, enforcing cap and queue timeout."""
+
+        with self._lock:
+            if self._pending >= self.workers + self.max_queue:
+                PASSWORD_HASH_REJECTED.labels(op, "saturated").inc()
+                raise PasswordHasherBusy("password hashing pool is saturated")
+            self._pending += 1
+            PASSWORD_HASH_INFLIGHT.set(self._pending)
+        submitted = time.monotonic()
+
+        def job() -> T:
+            waited = time.monotonic() - submitted
+            PASSWORD_HASH_QUEUE_WAIT.observe(waited)
+            if waited > self.queue_timeout:
+                raise PasswordHasherBusy("password hashing queue timeout")
+            started = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                PASSWORD_HASH_LATENCY.labels(op).observe(time.perf_counter() - started)
+
+        try:
+            return await asyncio.wrap_future(self._get_executor().submit(job))
+        except PasswordHasherBusy:
+            PASSWORD_HASH_REJECTED.labels(op, "timeout").inc()
+            raise
+        finally:
+            with self._lock:
+                self._pending -= 1
+                PASSWORD_HASH_INFLIGHT.set(self._pending)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers, thread_name_prefix="bcrypt"
+                    )
+        return self._executor
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+__all__ = ["BcryptHasher", "PasswordHasherBusy", "hash_rounds"]
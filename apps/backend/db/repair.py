@@ -2,7 +2,10 @@ from __future__ import annotations
 
 import json
 import logging
-import uuid
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator
 
 import sqlalchemy as sa
 from sqlalchemy import insert
@@ -81,248 +84,258 @@ def ensure_user_settings_table(conn: Connection) -> bool:
     return True
 
 
-def _get_default_area(conn: Connection, owner_id: uuid.UUID | int | None):
-    if owner_id is None or not _table_exists(conn, "areas"):
-        return None
-    row = conn.execute(
-        sa.text(
-            "SELECT id FROM areas WHERE owner_id=:o AND title=:t LIMIT 1"
-        ),
-        {"o": owner_id, "t": DEFAULT_AREA_TITLE},
-    ).fetchone()
-    return row[0] if row else None
+@dataclass
+class RepairContext:
+    """How a step walks large tables.
+
+    Steps touch rows in primary-key chunks of ``chunk_size``; after each chunk
+    ``checkpoint`` commits (when ``commit`` is set), reports progress and
+    sleeps ``throttle`` seconds so an online backfill leaves room for traffic.
+    """
+
+    chunk_size: int = 5000
+    throttle: float = 0.0
+    commit: bool = False
+    progress: Callable[[str, int, int], None] | None = None
+
+    def checkpoint(self, conn: Connection, step: str, done: int, total: int) -> None:
+        if self.commit:
+            conn.commit()
+        if self.progress is not None:
+            self.progress(step, done, total)
+        if self.throttle:
+            time.sleep(self.throttle)
 
 
-def ensure_default_areas(conn: Connection) -> int:
+def _columns(conn: Connection, table: str) -> dict[str, Any]:
+    try:
+        return {c["name"]: c["type"] for c in sa.inspect(conn).get_columns(table)}
+    except Exception:
+        return {}
+
+
+def _id_ranges(conn: Connection, table: str, chunk_size: int) -> Iterator[tuple[str, dict, int]]:
+    """Yield ``(predicate, params, rows)`` covering ``table`` by primary key."""
+
+    lo = None
+    while True:
+        if lo is None:
+            sql, params = f"SELECT id FROM {table} ORDER BY id LIMIT :n", {"n": chunk_size}
+        else:
+            sql = f"SELECT id FROM {table} WHERE id > :lo ORDER BY id LIMIT :n"
+            params = {"lo": lo, "n": chunk_size}
+        hi, rows = conn.execute(
+            sa.text(f"SELECT max(id), count(*) FROM ({sql}) AS chunk"), params
+        ).one()
+        if not rows:
+            return
+        if lo is None:
+            yield "t.id <= :hi", {"hi": hi}, rows
+        else:
+            yield "t.id > :lo AND t.id <= :hi", {"lo": lo, "hi": hi}, rows
+        if rows < chunk_size:
+            return
+        lo = hi
+
+
+def _chunked(
+    conn: Connection,
+    table: str,
+    statements: list[tuple[str, dict]],
+    ctx: RepairContext | None,
+    step: str,
+) -> list[int]:
+    """Run set-based ``statements`` (aliased ``t``, with a ``{range}`` slot)
+    chunk by chunk; return the affected row count of each statement."""
+
+    ctx = ctx or RepairContext()
+    totals = [0] * len(statements)
+    total = conn.execute(sa.text(f"SELECT count(*) FROM {table}")).scalar() or 0
+    done = 0
+    for predicate, params, rows in _id_ranges(conn, table, ctx.chunk_size):
+        for i, (sql, extra) in enumerate(statements):
+            res = conn.execute(sa.text(sql.replace("{range}", predicate)), {**extra, **params})
+            totals[i] += max(res.rowcount or 0, 0)
+        done += rows
+        ctx.checkpoint(conn, step, done, total)
+    return totals
+
+
+def ensure_default_areas(conn: Connection, ctx: RepairContext | None = None) -> int:
     """Ensure each owner has a default 'Входящие' area."""
-    owners: set[uuid.UUID | int] = set()
+    if not _table_exists(conn, "areas"):
+        return 0
     tables = ["areas", "projects", "calendar_items", "resources", "tasks", "time_entries"]
-    for table_name in tables:
-        if not _table_exists(conn, table_name):
-            continue
-        try:
-            owner_column = sa.column("owner_id")
-            pseudo_table = sa.table(table_name, owner_column)
-            stmt = sa.select(sa.distinct(pseudo_table.c.owner_id))
-            rows = conn.execute(stmt).fetchall()
-            owners.update(r[0] for r in rows if r[0] is not None)
-        except Exception:
-            continue
-    created = 0
-    for owner_id in owners:
-        if _get_default_area(conn, owner_id) is None:
-            conn.execute(
-                sa.text(
-                    "INSERT INTO areas (id, owner_id, title) VALUES (:i, :o, :t)"
-                ),
-                {
-                    "i": str(uuid.uuid4()),
-                    "o": owner_id,
-                    "t": DEFAULT_AREA_TITLE,
-                },
-            )
-            created += 1
+    sources = [
+        f"SELECT owner_id FROM {name}"
+        for name in tables
+        if _table_exists(conn, name) and "owner_id" in _columns(conn, name)
+    ]
+    columns = _columns(conn, "areas")
+    values: dict[str, str] = {"owner_id": "o.owner_id", "title": ":t"}
+    # Same defaults as the ORM model, for the columns this schema has
+    for name, expr in (
+        ("name", ":t"),
+        ("color", "'#F1F5F9'"),
+        ("mp_path", "''"),
+        ("depth", "0"),
+        ("slug", "''"),
+    ):
+        if name in columns:
+            values[name] = expr
+    if "id" in columns and not isinstance(columns["id"], sa.Integer):
+        values["id"] = "gen_random_uuid()"  # legacy UUID-keyed areas
+    res = conn.execute(
+        sa.text(
+            f"""
+            INSERT INTO areas ({", ".join(values)})
+            SELECT {", ".join(values.values())}
+            FROM (SELECT DISTINCT owner_id FROM ({" UNION ".join(sources)}) AS s) AS o
+            WHERE o.owner_id IS NOT NULL
+              AND NOT EXISTS (
+                  SELECT 1 FROM areas AS a WHERE a.owner_id = o.owner_id AND a.title = :t
+              )
+            """
+        ),
+        {"t": DEFAULT_AREA_TITLE},
+    )
+    created = max(res.rowcount or 0, 0)
     logger.info("ensure_default_areas: created=%s", created)
     return created
 
 
-def backfill_notes_area(conn: Connection) -> int:
+def _inherit_area(
+    conn: Connection,
+    table: str,
+    ctx: RepairContext | None,
+    *,
+    step: str,
+    from_project: bool = True,
+    where: str = "TRUE",
+) -> int:
+    """Set ``area_id`` from the row's project, else the owner's default area."""
+
+    statements: list[tuple[str, dict]] = []
+    if from_project and _table_exists(conn, "projects"):
+        statements.append(
+            (
+                f"UPDATE {table} AS t SET area_id = p.area_id FROM projects AS p "
+                "WHERE t.project_id = p.id AND p.area_id IS NOT NULL "
+                f"AND t.area_id IS DISTINCT FROM p.area_id AND {where} AND {{range}}",
+                {},
+            )
+        )
+    if _table_exists(conn, "areas"):
+        no_project = "AND t.project_id IS NULL " if from_project else ""
+        statements.append(
+            (
+                f"UPDATE {table} AS t SET area_id = a.id FROM areas AS a "
+                f"WHERE t.area_id IS NULL {no_project}"
+                "AND a.owner_id = t.owner_id AND a.title = :title "
+                f"AND {where} AND {{range}}",
+                {"title": DEFAULT_AREA_TITLE},
+            )
+        )
+    if not statements:
+        return 0
+    return sum(_chunked(conn, table, statements, ctx, step))
+
+
+def _set_area_not_null(conn: Connection, table: str) -> None:
+    missing = conn.execute(
+        sa.text(f"SELECT count(*) FROM {table} WHERE area_id IS NULL")
+    ).scalar()
+    if missing:
+        logger.warning("%s: %s rows still missing area", table, missing)
+        return
+    try:
+        with conn.begin_nested():
+            conn.execute(sa.text(f"ALTER TABLE {table} ALTER COLUMN area_id SET NOT NULL"))
+    except Exception as exc:  # pragma: no cover - log and continue
+        logger.warning("%s area not null failed: %s", table, exc)
+
+
+def backfill_notes_area(conn: Connection, ctx: RepairContext | None = None) -> int:
     """Assign default area to notes missing one."""
     if not _table_exists(conn, "notes"):
         return 0
-    rows = conn.execute(
-        sa.text("SELECT id, owner_id FROM notes WHERE area_id IS NULL")
-    ).fetchall()
-    updated = 0
-    for note_id, owner_id in rows:
-        area_id = _get_default_area(conn, owner_id)
-        if area_id is None:
-            continue
-        conn.execute(
-            sa.text("UPDATE notes SET area_id=:a WHERE id=:n"),
-            {"a": area_id, "n": note_id},
-        )
-        updated += 1
+    updated = _inherit_area(conn, "notes", ctx, step="notes_area", from_project=False)
     logger.info("backfill_notes_area: updated=%s", updated)
     return updated
 
 
-def backfill_projects_area(conn: Connection) -> int:
+def backfill_projects_area(conn: Connection, ctx: RepairContext | None = None) -> int:
     """Assign default area to projects without one."""
     if not _table_exists(conn, "projects"):
         return 0
-    rows = conn.execute(
-        sa.text("SELECT id, owner_id FROM projects WHERE area_id IS NULL")
-    ).fetchall()
-    updated = 0
-    for proj_id, owner_id in rows:
-        area_id = _get_default_area(conn, owner_id)
-        if area_id is None:
-            continue
-        conn.execute(
-            sa.text("UPDATE projects SET area_id=:a WHERE id=:i"),
-            {"a": area_id, "i": proj_id},
-        )
-        updated += 1
+    updated = _inherit_area(conn, "projects", ctx, step="projects_area", from_project=False)
     logger.info("backfill_projects_area: updated=%s", updated)
     return updated
 
 
-def backfill_habits_area(conn: Connection) -> int:
+def backfill_habits_area(conn: Connection, ctx: RepairContext | None = None) -> int:
     """Assign area to habits using project inheritance or default area."""
     if not _table_exists(conn, "habits"):
         return 0
-    try:
-        rows = conn.execute(
-            sa.text(
-                "SELECT id, owner_id, project_id, area_id FROM habits"
-            )
-        ).fetchall()
-    except Exception:
-        rows = []
-    updated = 0
-    for hid, owner_id, project_id, area_id in rows:
-        target_area = area_id
-        if project_id:
-            target_area = conn.execute(
-                sa.text("SELECT area_id FROM projects WHERE id=:p"),
-                {"p": project_id},
-            ).scalar()
-        elif area_id is None:
-            logger.warning("habit %s missing area and project", hid)
-            target_area = _get_default_area(conn, owner_id)
-        if target_area and target_area != area_id:
-            conn.execute(
-                sa.text("UPDATE habits SET area_id=:a WHERE id=:i"),
-                {"a": target_area, "i": hid},
-            )
-            updated += 1
-    try:
-        conn.execute(sa.text("ALTER TABLE habits ALTER COLUMN area_id SET NOT NULL"))
-    except Exception as exc:  # pragma: no cover - log and continue
-        logger.warning("habits area not null failed: %s", exc)
+    updated = _inherit_area(conn, "habits", ctx, step="habits_area")
+    _set_area_not_null(conn, "habits")
     logger.info("backfill_habits_area: updated=%s", updated)
     return updated
 
 
-def backfill_dailies_area(conn: Connection) -> int:
+def backfill_dailies_area(conn: Connection, ctx: RepairContext | None = None) -> int:
     """Assign area to dailies using project inheritance or default area."""
     if not _table_exists(conn, "dailies"):
         return 0
-    try:
-        rows = conn.execute(
-            sa.text("SELECT id, owner_id, project_id, area_id FROM dailies")
-        ).fetchall()
-    except Exception:
-        rows = []
-    updated = 0
-    for did, owner_id, project_id, area_id in rows:
-        target_area = area_id
-        if project_id:
-            target_area = conn.execute(
-                sa.text("SELECT area_id FROM projects WHERE id=:p"),
-                {"p": project_id},
-            ).scalar()
-        elif area_id is None:
-            logger.warning("daily %s missing area and project", did)
-            target_area = _get_default_area(conn, owner_id)
-        if target_area and target_area != area_id:
-            conn.execute(
-                sa.text("UPDATE dailies SET area_id=:a WHERE id=:i"),
-                {"a": target_area, "i": did},
-            )
-            updated += 1
-    try:
-        conn.execute(sa.text("ALTER TABLE dailies ALTER COLUMN area_id SET NOT NULL"))
-    except Exception as exc:  # pragma: no cover
-        logger.warning("dailies area not null failed: %s", exc)
+    updated = _inherit_area(conn, "dailies", ctx, step="dailies_area")
+    _set_area_not_null(conn, "dailies")
     logger.info("backfill_dailies_area: updated=%s", updated)
     return updated
 
 
-def backfill_rewards_area(conn: Connection) -> int:
+def backfill_rewards_area(conn: Connection, ctx: RepairContext | None = None) -> int:
     """Assign area to rewards using project inheritance or default area."""
     if not _table_exists(conn, "rewards"):
         return 0
-    try:
-        rows = conn.execute(
-            sa.text("SELECT id, owner_id, project_id, area_id FROM rewards")
-        ).fetchall()
-    except Exception:
-        rows = []
-    updated = 0
-    for rid, owner_id, project_id, area_id in rows:
-        target_area = area_id
-        if project_id:
-            target_area = conn.execute(
-                sa.text("SELECT area_id FROM projects WHERE id=:p"),
-                {"p": project_id},
-            ).scalar()
-        elif area_id is None:
-            logger.warning("reward %s missing area and project", rid)
-            target_area = _get_default_area(conn, owner_id)
-        if target_area and target_area != area_id:
-            conn.execute(
-                sa.text("UPDATE rewards SET area_id=:a WHERE id=:i"),
-                {"a": target_area, "i": rid},
-            )
-            updated += 1
-    try:
-        conn.execute(sa.text("ALTER TABLE rewards ALTER COLUMN area_id SET NOT NULL"))
-    except Exception as exc:  # pragma: no cover
-        logger.warning("rewards area not null failed: %s", exc)
+    updated = _inherit_area(conn, "rewards", ctx, step="rewards_area")
+    _set_area_not_null(conn, "rewards")
     logger.info("backfill_rewards_area: updated=%s", updated)
     return updated
 
 
-def backfill_habits_antifarm(conn: Connection) -> dict[str, int]:
+def backfill_habits_antifarm(
+    conn: Connection, ctx: RepairContext | None = None
+) -> dict[str, int]:
     """Fill new anti-farm columns with sensible defaults and audit logs."""
     updated_limit = 0
     updated_cd = 0
     updated_val = 0
     if _table_exists(conn, "habits"):
-        try:
-            res = conn.execute(
-                sa.text(
-                    "UPDATE habits SET daily_limit=:dl WHERE daily_limit IS NULL"
-                ),
-                {"dl": 10},
-            )
-            updated_limit = res.rowcount or 0
-        except Exception:
-            pass
-        try:
-            res = conn.execute(
-                sa.text(
-                    "UPDATE habits SET cooldown_sec=:cd WHERE cooldown_sec IS NULL"
-                ),
-                {"cd": 60},
-            )
-            updated_cd = res.rowcount or 0
-        except Exception:
-            pass
+        updated_limit, updated_cd = _chunked(
+            conn,
+            "habits",
+            [
+                ("UPDATE habits AS t SET daily_limit = :dl WHERE t.daily_limit IS NULL AND {range}", {"dl": 10}),
+                ("UPDATE habits AS t SET cooldown_sec = :cd WHERE t.cooldown_sec IS NULL AND {range}", {"cd": 60}),
+            ],
+            ctx,
+            "habits_antifarm",
+        )
 
     if _table_exists(conn, "habit_logs") and _table_exists(conn, "habits"):
-        try:
-            rows = conn.execute(
-                sa.text(
-                    """
-                    SELECT hl.id, h.val FROM habit_logs hl
-                    JOIN habits h ON hl.habit_id = h.id
-                    WHERE hl.val_after IS NULL
-                    """
-                )
-            ).fetchall()
-            for log_id, val in rows:
-                conn.execute(
-                    sa.text(
-                        "UPDATE habit_logs SET val_after=:v WHERE id=:i"
-                    ),
-                    {"v": val, "i": log_id},
+        (updated_val,) = _chunked(
+            conn,
+            "habit_logs",
+            [
+                (
+                    "UPDATE habit_logs AS t SET val_after = h.val FROM habits AS h "
+                    "WHERE t.habit_id = h.id AND t.val_after IS NULL AND {range}",
+                    {},
                 )
-            updated_val = len(rows)
-        except Exception:
-            pass
+            ],
+            ctx,
+            "habits_antifarm",
+        )
 
     return {
         "limits": updated_limit,
@@ -331,7 +344,7 @@ def backfill_habits_antifarm(conn: Connection) -> dict[str, int]:
     }
 
 
-def backfill_user_stats(conn: Connection) -> int:
+def backfill_user_stats(conn: Connection, ctx: RepairContext | None = None) -> int:
     """Ensure every user has a corresponding user_stats row."""
     if not _table_exists(conn, "users_web"):
         return 0
@@ -354,147 +367,108 @@ def backfill_user_stats(conn: Connection) -> int:
             )
         except Exception:
             return 0
-    dialect = conn.dialect.name
-    rows = conn.execute(sa.text("SELECT id FROM users_web")).fetchall()
-    created = 0
-    for (uid,) in rows:
-        if dialect == "postgresql":
-            stmt = sa.text(
-                "INSERT INTO user_stats (owner_id) VALUES (:o) ON CONFLICT (owner_id) DO NOTHING"
-            )
-        else:
-            stmt = sa.text(
-                "INSERT OR IGNORE INTO user_stats (owner_id) VALUES (:o)"
-            )
-        res = conn.execute(stmt, {"o": uid})
-        if res.rowcount:
-            created += 1
+    if conn.dialect.name == "postgresql":
+        sql = (
+            "INSERT INTO user_stats (owner_id) SELECT t.id FROM users_web AS t "
+            "WHERE {range} ON CONFLICT (owner_id) DO NOTHING"
+        )
+    else:
+        sql = "INSERT OR IGNORE INTO user_stats (owner_id) SELECT t.id FROM users_web AS t WHERE {range}"
+    (created,) = _chunked(conn, "users_web", [(sql, {})], ctx, "user_stats")
     logger.info("backfill_user_stats: created=%s", created)
     return created
-def backfill_profile_visibility(conn: Connection) -> dict[str, int]:
+
+
+# Visibility each user profile should have: an explicit privacy setting wins,
+# otherwise the widest existing grant, otherwise private.
+_PROFILE_VISIBILITY_CTE = """
+WITH settings AS (
+    SELECT t.id AS profile_id, u.id AS user_id,
+           CASE WHEN json_typeof(u.privacy_settings::json) = 'object'
+                THEN u.privacy_settings::jsonb ELSE '{}'::jsonb END AS privacy,
+           CASE WHEN json_typeof(t.profile_meta::json) = 'object'
+                THEN t.profile_meta::jsonb ELSE '{}'::jsonb END AS meta
+    FROM entity_profiles AS t
+    JOIN users_web AS u ON t.entity_type = 'user' AND u.id = t.entity_id
+    WHERE {range}
+),
+vis AS (
+    SELECT s.*,
+           CASE
+               WHEN lower(coalesce(s.privacy->>'profile_visibility', ''))
+                    IN ('private', 'authenticated', 'public')
+                   THEN lower(s.privacy->>'profile_visibility')
+               WHEN EXISTS (
+                   SELECT 1 FROM entity_profile_grants AS g
+                   WHERE g.profile_id = s.profile_id AND g.audience_type = 'public'
+               ) THEN 'public'
+               WHEN EXISTS (
+                   SELECT 1 FROM entity_profile_grants AS g
+                   WHERE g.profile_id = s.profile_id AND g.audience_type = 'authenticated'
+               ) THEN 'authenticated'
+               ELSE 'private'
+           END AS visibility
+    FROM settings AS s
+)
+"""
+
+_PROFILE_VISIBILITY_STATEMENTS = [
+    # grants_added
+    """
+    INSERT INTO entity_profile_grants (profile_id, audience_type)
+    SELECT v.profile_id, aud.audience_type
+    FROM vis AS v
+    JOIN (VALUES ('public'), ('authenticated')) AS aud(audience_type)
+      ON aud.audience_type = 'authenticated' AND v.visibility IN ('public', 'authenticated')
+      OR aud.audience_type = 'public' AND v.visibility = 'public'
+    WHERE NOT EXISTS (
+        SELECT 1 FROM entity_profile_grants AS g
+        WHERE g.profile_id = v.profile_id AND g.audience_type = aud.audience_type
+    )
+    ON CONFLICT DO NOTHING
+    """,
+    # grants_removed
+    """
+    DELETE FROM entity_profile_grants AS g
+    USING vis AS v
+    WHERE g.profile_id = v.profile_id
+      AND (g.audience_type = 'public' AND v.visibility <> 'public'
+           OR g.audience_type = 'authenticated' AND v.visibility = 'private')
+    """,
+    # privacy_updated
+    """
+    UPDATE users_web AS u
+    SET privacy_settings = (v.privacy || jsonb_build_object('profile_visibility', v.visibility))::json
+    FROM vis AS v
+    WHERE u.id = v.user_id
+      AND v.privacy->>'profile_visibility' IS DISTINCT FROM v.visibility
+    """,
+    # meta_updated
+    """
+    UPDATE entity_profiles AS p
+    SET profile_meta = (
+        v.meta || jsonb_build_object('visibility', v.visibility, 'profile_visibility', v.visibility)
+    )::json
+    FROM vis AS v
+    WHERE p.id = v.profile_id
+      AND (v.meta->>'visibility' IS DISTINCT FROM v.visibility
+           OR v.meta->>'profile_visibility' IS DISTINCT FROM v.visibility)
+    """,
+]
+
+
+def backfill_profile_visibility(
+    conn: Connection, ctx: RepairContext | None = None
+) -> dict[str, int]:
     """Ensure user profiles have coherent visibility grants and metadata."""
 
     if not _table_exists(conn, "entity_profiles") or not _table_exists(conn, "users_web"):
         return {"grants_added": 0, "privacy_updated": 0}
 
-    result = conn.execute(
-        sa.text(
-            """
-            SELECT p.id, p.entity_id, p.profile_meta, u.privacy_settings
-            FROM entity_profiles AS p
-            JOIN users_web AS u ON p.entity_type = 'user' AND u.id = p.entity_id
-            """
-        )
-    ).fetchall()
-
-    grants_added = 0
-    grants_removed = 0
-    privacy_updates = 0
-    meta_updates = 0
-
-    for profile_id, user_id, raw_meta, raw_privacy in result:
-        grants_rows = conn.execute(
-            sa.text(
-                "SELECT audience_type FROM entity_profile_grants WHERE profile_id = :pid"
-            ),
-            {"pid": profile_id},
-        ).fetchall()
-        grant_set = {row[0] for row in grants_rows}
-
-        if isinstance(raw_meta, dict):
-            meta = dict(raw_meta)
-        elif isinstance(raw_meta, str) and raw_meta:
-            try:
-                meta = json.loads(raw_meta)
-            except json.JSONDecodeError:
-                meta = {}
-        else:
-            meta = {}
-
-        if isinstance(raw_privacy, dict):
-            privacy = dict(raw_privacy)
-        elif isinstance(raw_privacy, str) and raw_privacy:
-            try:
-                privacy = json.loads(raw_privacy)
-            except json.JSONDecodeError:
-                privacy = {}
-        else:
-            privacy = {}
-
-        existing_visibility = str(privacy.get("profile_visibility") or "").lower()
-        if existing_visibility == "private":
-            desired_visibility = "private"
-        elif existing_visibility in {"authenticated", "public"}:
-            desired_visibility = existing_visibility
-        elif "public" in grant_set:
-            desired_visibility = "public"
-        elif "authenticated" in grant_set:
-            desired_visibility = "authenticated"
-        else:
-            desired_visibility = "private"
-
-        if desired_visibility == "public":
-            if "public" not in grant_set:
-                conn.execute(
-                    sa.text(
-                        "INSERT INTO entity_profile_grants (profile_id, audience_type) VALUES (:pid, 'public') ON CONFLICT DO NOTHING"
-                    ),
-                    {"pid": profile_id},
-                )
-                grants_added += 1
-            if "authenticated" not in grant_set:
-                conn.execute(
-                    sa.text(
-                        "INSERT INTO entity_profile_grants (profile_id, audience_type) VALUES (:pid, 'authenticated') ON CONFLICT DO NOTHING"
-                    ),
-                    {"pid": profile_id},
-                )
-                grants_added += 1
-        elif desired_visibility == "authenticated" and "authenticated" not in grant_set:
-            conn.execute(
-                sa.text(
-                    "INSERT INTO entity_profile_grants (profile_id, audience_type) VALUES (:pid, 'authenticated') ON CONFLICT DO NOTHING"
-                ),
-                {"pid": profile_id},
-            )
-            grants_added += 1
-        if desired_visibility != "public" and "public" in grant_set:
-            conn.execute(
-                sa.text("DELETE FROM entity_profile_grants WHERE profile_id=:pid AND audience_type='public'"),
-                {"pid": profile_id},
-            )
-            grants_removed += 1
-            grant_set.discard("public")
-        if desired_visibility not in {"public", "authenticated"} and "authenticated" in grant_set:
-            conn.execute(
-                sa.text("DELETE FROM entity_profile_grants WHERE profile_id=:pid AND audience_type='authenticated'"),
-                {"pid": profile_id},
-            )
-            grants_removed += 1
-            grant_set.discard("authenticated")
-        if desired_visibility and privacy.get("profile_visibility") != desired_visibility:
-            privacy["profile_visibility"] = desired_visibility
-            conn.execute(
-                sa.text("UPDATE users_web SET privacy_settings=:val WHERE id=:uid"),
-                {"val": json.dumps(privacy), "uid": user_id},
-            )
-            privacy_updates += 1
-
-        if desired_visibility:
-            updated = False
-            if meta.get("visibility") != desired_visibility:
-                meta["visibility"] = desired_visibility
-                updated = True
-            if meta.get("profile_visibility") != desired_visibility:
-                meta["profile_visibility"] = desired_visibility
-                updated = True
-            if updated:
-                conn.execute(
-                    sa.text("UPDATE entity_profiles SET profile_meta=:val WHERE id=:pid"),
-                    {"val": json.dumps(meta), "pid": profile_id},
-                )
-                meta_updates += 1
-
+    statements = [(_PROFILE_VISIBILITY_CTE + sql, {}) for sql in _PROFILE_VISIBILITY_STATEMENTS]
+    grants_added, grants_removed, privacy_updates, meta_updates = _chunked(
+        conn, "entity_profiles", statements, ctx, "profile_visibility"
+    )
     return {
         "grants_added": grants_added,
         "grants_removed": grants_removed,
@@ -503,60 +477,31 @@ def backfill_profile_visibility(conn: Connection) -> dict[str, int]:
     }
 
 
+def backfill_profile_visibility_index(
+    conn: Connection, ctx: RepairContext | None = None
+) -> int:
+    """Rebuild ``entity_profile_visibility`` (raw SQL above bypasses the ORM hook)."""
+
+    from backend.services.profile_service import VISIBILITY_INDEX_STATEMENTS
 
+    statements = [(sql, {}) for sql in VISIBILITY_INDEX_STATEMENTS]
+    _, indexed = _chunked(conn, "entity_profiles", statements, ctx, "profile_visibility_index")
+    return indexed
 
-def backfill_tasks_resources(conn: Connection) -> dict[str, int]:
+
+def backfill_tasks_resources(
+    conn: Connection, ctx: RepairContext | None = None
+) -> dict[str, int]:
     """Ensure tasks/resources inherit area from project or default area."""
     updated_ci = 0
     updated_res = 0
 
     if _table_exists(conn, "calendar_items"):
-        try:
-            rows = conn.execute(
-                sa.text(
-                    "SELECT id, owner_id, project_id, area_id FROM calendar_items WHERE kind='task'"
-                )
-            ).fetchall()
-        except Exception:
-            rows = []
-        for cid, owner_id, project_id, area_id in rows:
-            target_area = None
-            if project_id:
-                target_area = conn.execute(
-                    sa.text("SELECT area_id FROM projects WHERE id=:p"),
-                    {"p": project_id},
-                ).scalar()
-            elif area_id is None:
-                target_area = _get_default_area(conn, owner_id)
-            if target_area and target_area != area_id:
-                conn.execute(
-                    sa.text("UPDATE calendar_items SET area_id=:a WHERE id=:i"),
-                    {"a": target_area, "i": cid},
-                )
-                updated_ci += 1
-
+        updated_ci = _inherit_area(
+            conn, "calendar_items", ctx, step="tasks_resources", where="t.kind = 'task'"
+        )
     if _table_exists(conn, "resources"):
-        try:
-            rows = conn.execute(
-                sa.text("SELECT id, owner_id, project_id, area_id FROM resources")
-            ).fetchall()
-        except Exception:
-            rows = []
-        for rid, owner_id, project_id, area_id in rows:
-            target_area = None
-            if project_id:
-                target_area = conn.execute(
-                    sa.text("SELECT area_id FROM projects WHERE id=:p"),
-                    {"p": project_id},
-                ).scalar()
-            elif area_id is None:
-                target_area = _get_default_area(conn, owner_id)
-            if target_area and target_area != area_id:
-                conn.execute(
-                    sa.text("UPDATE resources SET area_id=:a WHERE id=:i"),
-                    {"a": target_area, "i": rid},
-                )
-                updated_res += 1
+        updated_res = _inherit_area(conn, "resources", ctx, step="tasks_resources")
 
     logger.info(
         "backfill_tasks_resources: calendar_items=%s resources=%s", updated_ci, updated_res
@@ -564,74 +509,46 @@ def backfill_tasks_resources(conn: Connection) -> dict[str, int]:
     return {"calendar_items": updated_ci, "resources": updated_res}
 
 
-def backfill_time_entries(conn: Connection) -> dict[str, int]:
-    """Denormalize project/area ids on time entries and create quick tasks."""
-    if not _table_exists(conn, "time_entries"):
-        return {"updated": 0, "created_tasks": 0}
-    try:
-        rows = conn.execute(
-            sa.text("SELECT id, user_id, task_id FROM time_entries")
-        ).fetchall()
-    except Exception:
-        rows = []
+def backfill_time_entries(
+    conn: Connection, ctx: RepairContext | None = None
+) -> dict[str, int]:
+    """Denormalize project/area ids on time entries from their tasks.
 
-    updated = 0
-    created = 0
-    for entry_id, user_id, task_id in rows:
-        if task_id:
-            proj_area = conn.execute(
-                sa.text(
-                    "SELECT project_id, area_id FROM tasks WHERE id=:t"
-                ),
-                {"t": task_id},
-            ).fetchone()
-            if proj_area:
-                project_id, area_id = proj_area
-                conn.execute(
-                    sa.text(
-                        "UPDATE time_entries SET project_id=:p, area_id=:a WHERE id=:i"
-                    ),
-                    {"p": project_id, "a": area_id, "i": entry_id},
-                )
-                updated += 1
-        else:
-            area_id = _get_default_area(conn, user_id)
-            new_task_id = str(uuid.uuid4())
-            try:
-                conn.execute(
-                    sa.text(
-                        "INSERT INTO calendar_items (id, owner_id, kind, area_id) "
-                        "VALUES (:i, :o, 'task', :a)"
-                    ),
-                    {"i": new_task_id, "o": user_id, "a": area_id},
-                )
-            except Exception:
-                pass
-            try:
-                conn.execute(
-                    sa.text(
-                        "INSERT INTO tasks (id, status, created_at, updated_at) "
-                        "VALUES (:i, 'open', now(), now())"
-                    ),
-                    {"i": new_task_id},
-                )
-            except Exception:
-                pass
-            conn.execute(
-                sa.text(
-                    "UPDATE time_entries SET task_id=:t, project_id=NULL, area_id=:a WHERE id=:i"
-                ),
-                {"t": new_task_id, "a": area_id, "i": entry_id},
+    Entries without a task get the owner's default area.
+    """
+    if not _table_exists(conn, "time_entries"):
+        return {"updated": 0, "default_area": 0}
+    owner = "user_id" if "user_id" in _columns(conn, "time_entries") else "owner_id"
+    statements: list[tuple[str, dict]] = []
+    if _table_exists(conn, "tasks"):
+        statements.append(
+            (
+                "UPDATE time_entries AS t SET project_id = k.project_id, area_id = k.area_id "
+                "FROM tasks AS k WHERE t.task_id = k.id "
+                "AND (t.project_id IS DISTINCT FROM k.project_id "
+                "OR t.area_id IS DISTINCT FROM k.area_id) AND {range}",
+                {},
             )
-            created += 1
-
+        )
+    if _table_exists(conn, "areas"):
+        statements.append(
+            (
+                "UPDATE time_entries AS t SET area_id = a.id FROM areas AS a "
+                f"WHERE t.task_id IS NULL AND t.area_id IS NULL AND a.owner_id = t.{owner} "
+                "AND a.title = :title AND {range}",
+                {"title": DEFAULT_AREA_TITLE},
+            )
+        )
+    counts = _chunked(conn, "time_entries", statements, ctx, "time_entries")
+    updated = counts[0] if _table_exists(conn, "tasks") else 0
+    default_area = counts[-1] if _table_exists(conn, "areas") else 0
     logger.info(
-        "backfill_time_entries: updated=%s created_tasks=%s", updated, created
+        "backfill_time_entries: updated=%s default_area=%s", updated, default_area
     )
-    return {"updated": updated, "created_tasks": created}
+    return {"updated": updated, "default_area": default_area}
 
 
-def _migrate_favorites(conn: Connection) -> None:
+def _migrate_favorites(conn: Connection, ctx: RepairContext | None = None) -> None:
     """Backfill favorites from legacy ``users_favorites`` table."""
     if not _table_exists(conn, "users_favorites"):
         return
@@ -656,57 +573,210 @@ def _migrate_favorites(conn: Connection) -> None:
         sa.column("key", sa.String),
         sa.column("value", sa.JSON),
     )
-    for user_id, items in by_user.items():
-        value = {"v": 1, "items": items}
-        if conn.dialect.name == "postgresql":
-            stmt = pg_insert(user_settings).values(
-                user_id=user_id, key="favorites", value=value
-            ).on_conflict_do_nothing(index_elements=["user_id", "key"])
-        else:
-            stmt = insert(user_settings).values(
-                user_id=user_id, key="favorites", value=value
-            )
-        try:
-            conn.execute(stmt)
-        except Exception as exc:  # pragma: no cover - log and continue
-            logger.warning("favorites backfill failed for %s: %s", user_id, exc)
+    values = [
+        {"user_id": user_id, "key": "favorites", "value": {"v": 1, "items": items}}
+        for user_id, items in by_user.items()
+    ]
+    if conn.dialect.name == "postgresql":
+        stmt = pg_insert(user_settings).values(values).on_conflict_do_nothing(
+            index_elements=["user_id", "key"]
+        )
+    else:
+        stmt = insert(user_settings).values(values)
+    try:
+        conn.execute(stmt)
+    except Exception as exc:  # pragma: no cover - log and continue
+        logger.warning("favorites backfill failed: %s", exc)
+
+
+# --- ledger --------------------------------------------------------------------
 
 
-def run_repair(conn: Connection) -> dict[str, object]:
-    """Perform backfill and repair tasks.
+@dataclass(frozen=True)
+class RepairStep:
+    """An idempotent repair step recorded in ``repair_ledger`` once done.
 
-    Each step commits independently so that a failure does not abort the
-    entire sequence.
+    ``requires`` lists tables that must exist: while one is missing the step
+    is skipped without being recorded, so it runs once the table appears.
+    Bump ``version`` to make a changed step run again.
     """
 
-    stats: dict[str, object] = {}
+    name: str
+    fn: Callable[..., Any]
+    requires: tuple[str, ...] = ()
+    version: int = 1
+
+
+REPAIR_STEPS: list[RepairStep] = [
+    RepairStep("user_settings_created", lambda conn, ctx: ensure_user_settings_table(conn), ("users_web",)),
+    RepairStep("default_areas", ensure_default_areas, ("areas",)),
+    RepairStep("notes_area", backfill_notes_area, ("notes", "areas")),
+    RepairStep("projects_area", backfill_projects_area, ("projects", "areas")),
+    RepairStep("habits_area", backfill_habits_area, ("habits",)),
+    RepairStep("dailies_area", backfill_dailies_area, ("dailies",)),
+    RepairStep("rewards_area", backfill_rewards_area, ("rewards",)),
+    RepairStep("habits_antifarm", backfill_habits_antifarm, ("habits",)),
+    RepairStep("user_stats", backfill_user_stats, ("users_web",)),
+    RepairStep(
+        "profile_visibility",
+        backfill_profile_visibility,
+        ("entity_profiles", "entity_profile_grants", "users_web"),
+    ),
+    RepairStep(
+        "profile_visibility_index",
+        backfill_profile_visibility_index,
+        ("entity_profiles", "entity_profile_grants", "entity_profile_visibility"),
+    ),
+    RepairStep("tasks_resources", backfill_tasks_resources, ("projects",)),
+    RepairStep("time_entries", backfill_time_entries, ("time_entries",)),
+    RepairStep("migrate_favorites", _migrate_favorites, ("users_favorites", "user_settings")),
+]
+
+
+# Held while steps run, so a boot never races an online backfill from the CLI
+REPAIR_LOCK_KEY = 0x5EED1DC
+
+
+def _try_lock(conn: Connection) -> bool:
+    if conn.dialect.name != "postgresql":
+        return True
+    return bool(
+        conn.execute(sa.text("SELECT pg_try_advisory_lock(:k)"), {"k": REPAIR_LOCK_KEY}).scalar()
+    )
 
-    def _step(name: str, fn) -> None:
-        nonlocal stats
-        try:
-            res = fn(conn)
-            conn.commit()
+
+def _unlock(conn: Connection) -> None:
+    if conn.dialect.name != "postgresql":
+        return
+    try:
+        conn.execute(sa.text("SELECT pg_advisory_unlock(:k)"), {"k": REPAIR_LOCK_KEY})
+        conn.commit()
+    except Exception:  # pragma: no cover - connection is going away anyway
+        pass
+
+
+def ensure_ledger_table(conn: Connection) -> None:
+    conn.execute(
+        sa.text(
+            """
+            CREATE TABLE IF NOT EXISTS repair_ledger (
+                name VARCHAR(64) PRIMARY KEY,
+                version INTEGER NOT NULL DEFAULT 1,
+                status VARCHAR(16) NOT NULL,
+                details TEXT,
+                error TEXT,
+                duration_ms INTEGER,
+                finished_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+            )
+            """
+        )
+    )
+
+
+def ledger_state(conn: Connection) -> dict[str, dict[str, Any]]:
+    """Return ledger rows keyed by step name."""
+
+    rows = conn.execute(
+        sa.text(
+            "SELECT name, version, status, details, error, duration_ms, finished_at "
+            "FROM repair_ledger"
+        )
+    ).mappings()
+    return {row["name"]: dict(row) for row in rows}
+
+
+def _record(
+    conn: Connection,
+    step: RepairStep,
+    status: str,
+    *,
+    details: Any = None,
+    error: str | None = None,
+    duration: float = 0.0,
+) -> None:
+    conn.execute(
+        sa.text(
+            """
+            INSERT INTO repair_ledger (name, version, status, details, error, duration_ms, finished_at)
+            VALUES (:name, :version, :status, :details, :error, :ms, CURRENT_TIMESTAMP)
+            ON CONFLICT (name) DO UPDATE SET
+                version = excluded.version,
+                status = excluded.status,
+                details = excluded.details,
+                error = excluded.error,
+                duration_ms = excluded.duration_ms,
+                finished_at = excluded.finished_at
+            """
+        ),
+        {
+            "name": step.name,
+            "version": step.version,
+            "status": status,
+            "details": json.dumps(details, ensure_ascii=False, default=str),
+            "error": error,
+            "ms": int(duration * 1000),
+        },
+    )
+    conn.commit()
+
+
+def run_repair(
+    conn: Connection,
+    *,
+    steps: list[str] | None = None,
+    force: bool = False,
+    ctx: RepairContext | None = None,
+) -> dict[str, object]:
+    """Run pending repair steps and record them in ``repair_ledger``.
+
+    Steps already completed (at their current version) are skipped unless
+    ``force`` is set.  Each step commits per chunk and independently, so a
+    failure does not abort the entire sequence.
+    """
+
+    ctx = ctx or RepairContext(
+        chunk_size=int(os.getenv("DB_REPAIR_CHUNK", "5000")), commit=True
+    )
+    if not _try_lock(conn):
+        logger.info("repair: another process is running repair steps, skipped")
+        return {}
+    try:
+        ensure_ledger_table(conn)
+        conn.commit()
+        state = ledger_state(conn)
+        stats: dict[str, object] = {}
+        skipped = 0
+        for step in REPAIR_STEPS:
+            if steps is not None and step.name not in steps:
+                continue
+            row = state.get(step.name)
+            if row and row["status"] == "done" and row["version"] >= step.version and not force:
+                skipped += 1
+                continue
+            if not all(_table_exists(conn, table) for table in step.requires):
+                continue
+            started = time.perf_counter()
+            try:
+                res = step.fn(conn, ctx)
+                conn.commit()
+            except Exception as exc:  # pragma: no cover - log and continue
+                conn.rollback()
+                logger.warning("repair step %s failed: %s", step.name, exc)
+                _record(
+                    conn, step, "failed", error=str(exc), duration=time.perf_counter() - started
+                )
+                continue
             if isinstance(res, dict):
-                stats.update({f"{name}_{k}": v for k, v in res.items()})
+                stats.update({f"{step.name}_{k}": v for k, v in res.items()})
             else:
-                stats[name] = res
-        except Exception as exc:  # pragma: no cover - log and continue
-            conn.rollback()
-            logger.warning("repair step %s failed: %s", name, exc)
-
-    _step("user_settings_created", ensure_user_settings_table)
-    _step("default_areas", ensure_default_areas)
-    _step("notes_area", backfill_notes_area)
-    _step("projects_area", backfill_projects_area)
-    _step("habits_area", backfill_habits_area)
-    _step("dailies_area", backfill_dailies_area)
-    _step("rewards_area", backfill_rewards_area)
-    _step("habits_antifarm", backfill_habits_antifarm)
-    _step("user_stats", backfill_user_stats)
-    _step("profile_visibility", backfill_profile_visibility)
-    _step("tasks_resources", backfill_tasks_resources)
-    _step("time_entries", backfill_time_entries)
-    _step("migrate_favorites", _migrate_favorites)
-
-    logger.info("repair summary: %s", json.dumps(stats, ensure_ascii=False))
+                stats[step.name] = res
+            _record(conn, step, "done", details=res, duration=time.perf_counter() - started)
+    finally:
+        _unlock(conn)
+
+    logger.info(
+        "repair summary (skipped %s completed steps): %s",
+        skipped,
+        json.dumps(stats, ensure_ascii=False),
+    )
     return stats
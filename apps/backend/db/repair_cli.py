@@ -0,0 +1,100 @@
+"""Run repair/backfill steps online.
+
+    python -m backend.db.repair_cli status
+    python -m backend.db.repair_cli run --step time_entries --chunk 1000 --sleep 0.2
+    python -m backend.db.repair_cli run --force --step profile_visibility
+
+Steps run in primary-key chunks, each committed separately, with an optional
+pause between chunks so a backfill can run next to live traffic.  Completed
+steps are recorded in ``repair_ledger`` and skipped by the boot-time repair.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+
+import sqlalchemy as sa
+
+from .legacy import validate_config
+from .repair import (
+    REPAIR_STEPS,
+    RepairContext,
+    ensure_ledger_table,
+    ledger_state,
+    run_repair,
+)
+
+
+def _sync_url() -> str:
+    url = validate_config()
+    return url.replace("+asyncpg", "+psycopg").replace("postgresql://", "postgresql+psycopg://", 1)
+
+
+class _Progress:
+    def __init__(self, stream=sys.stderr) -> None:
+        self.stream = stream
+        self.started: dict[str, float] = {}
+
+    def __call__(self, step: str, done: int, total: int) -> None:
+        started = self.started.setdefault(step, time.monotonic())
+        elapsed = max(time.monotonic() - started, 1e-6)
+        pct = 100.0 * done / total if total else 100.0
+        self.stream.write(
+            f"\r{step}: {done}/{total} rows ({pct:5.1f}%), {done / elapsed:,.0f} rows/s"
+        )
+        if done >= total:
+            self.stream.write("\n")
+        self.stream.flush()
+
+
+def _status(conn: sa.Connection) -> None:
+    ensure_ledger_table(conn)
+    conn.commit()
+    state = ledger_state(conn)
+    for step in REPAIR_STEPS:
+        row = state.get(step.name)
+        if row is None:
+            print(f"{step.name:24} pending")
+            continue
+        status = row["status"]
+        if status == "done" and row["version"] < step.version:
+            status = "outdated"
+        print(
+            f"{step.name:24} {status:8} v{row['version']} "
+            f"{row['duration_ms'] or 0} ms  {row['finished_at']}  {row['error'] or ''}".rstrip()
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="DB repair/backfill runner")
+    sub = parser.add_subparsers(dest="cmd")
+    sub.add_parser("status")
+    run = sub.add_parser("run")
+    run.add_argument("--step", action="append", choices=[s.name for s in REPAIR_STEPS])
+    run.add_argument("--force", action="store_true", help="re-run completed steps")
+    run.add_argument("--chunk", type=int, default=1000, help="rows per transaction")
+    run.add_argument("--sleep", type=float, default=0.1, help="pause between chunks, s")
+    args = parser.parse_args()
+    if args.cmd not in {"status", "run"}:
+        parser.print_help()
+        return
+    engine = sa.create_engine(_sync_url())
+    try:
+        with engine.connect() as conn:
+            if args.cmd == "status":
+                _status(conn)
+                return
+            ctx = RepairContext(
+                chunk_size=args.chunk, throttle=args.sleep, commit=True, progress=_Progress()
+            )
+            stats = run_repair(conn, steps=args.step, force=args.force, ctx=ctx)
+            for key, value in stats.items():
+                print(f"{key}: {value}")
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+"""aiogram ``Bot``/``Dispatcher`` shared by the bot process.
+
+Kept out of ``backend.db`` so that importing the DB layer (web, workers,
+scripts) does not load aiogram; ``backend.db.bot``/``backend.db.dp`` resolve
+here on first access.
+"""
+
+from __future__ import annotations
+
+import os
+
+from aiogram import Bot, Dispatcher
+from aiogram.fsm.storage.memory import MemoryStorage
+
+TG_BOT_TOKEN = os.getenv("TG_BOT_TOKEN") or ("123456:" + "A" * 35)
+try:
+    bot = Bot(token=TG_BOT_TOKEN)
+except Exception:
+    TG_BOT_TOKEN = "123456:" + "A" * 35
+    bot = Bot(token=TG_BOT_TOKEN)
+storage = MemoryStorage()
+dp = Dispatcher(storage=storage)
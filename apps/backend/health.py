@@ -0,0 +1,360 @@
+"""Health and readiness snapshot.
+
+Version info is resolved once (build-time file, env or a single
+``git rev-parse``).  Component probes run in the background, each on its own
+interval, and publish into :data:`monitor`; ``/healthz`` and ``/readyz``
+only read the cached, already-serialised snapshot.
+
+Background workers report liveness with :class:`Heartbeat`, which upserts a
+row into ``worker_heartbeats`` so the monitor can see workers running in
+another process.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import shutil
+import socket
+import subprocess
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from backend import db
+from backend.models import (
+    EmailOutbox,
+    NotificationTrigger,
+    TaskReminder,
+    WorkerHeartbeat,
+)
+from backend.utils import utcnow, utcnow_aware
+
+logger = logging.getLogger(__name__)
+
+ROOT = Path(__file__).resolve().parents[2]
+
+ProbeFn = Callable[[], Awaitable[dict[str, Any]]]
+
+
+# --- version -----------------------------------------------------------------
+
+
+def _resolve_git_sha() -> str:
+    git = shutil.which("git")
+    if git is None:
+        return "unknown"
+    timeout = int(os.getenv("GIT_SHA_TIMEOUT", "5"))
+    try:
+        sha_bytes = subprocess.check_output(
+            [git, "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            timeout=timeout,
+            stderr=subprocess.DEVNULL,
+        )
+        return sha_bytes.decode().strip() or "unknown"
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired, OSError) as exc:
+        logger.warning("Failed to resolve git SHA: %s", exc)
+        return "unknown"
+
+
+@lru_cache(maxsize=1)
+def build_info() -> dict[str, Any]:
+    """Return ``{"version": ...}`` resolved once per process.
+
+    Order: ``BUILD_INFO_PATH`` JSON file (written at build time), the
+    ``APP_VERSION``/``GIT_SHA`` env vars, then ``git rev-parse``.
+    """
+
+    path = Path(os.getenv("BUILD_INFO_PATH", str(ROOT / "BUILD_INFO.json")))
+    if path.is_file():
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            if isinstance(data, dict) and data.get("version"):
+                data["version"] = str(data["version"])
+                return data
+        except (OSError, ValueError) as exc:
+            logger.warning("Failed to read %s: %s", path, exc)
+    version = os.getenv("APP_VERSION") or os.getenv("GIT_SHA")
+    if version:
+        return {"version": version}
+    return {"version": _resolve_git_sha()}
+
+
+# --- heartbeats ----------------------------------------------------------------
+
+
+class Heartbeat:
+    """Throttled upsert of a worker's liveness into ``worker_heartbeats``."""
+
+    def __init__(self, name: str, interval: float) -> None:
+        self.name = name
+        self.interval = interval
+        self._last = 0.0
+
+    async def beat(self) -> None:
+        now = time.monotonic()
+        if self._last and now - self._last < min(self.interval, 60.0) / 2:
+            return
+        self._last = now
+        stmt = pg_insert(WorkerHeartbeat).values(
+            name=self.name,
+            host=socket.gethostname(),
+            pid=os.getpid(),
+            interval_seconds=self.interval,
+            last_seen_at=utcnow_aware(),
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[WorkerHeartbeat.name],
+            set_={
+                "host": stmt.excluded.host,
+                "pid": stmt.excluded.pid,
+                "interval_seconds": stmt.excluded.interval_seconds,
+                "last_seen_at": stmt.excluded.last_seen_at,
+            },
+        )
+        try:
+            async with db.async_session() as session:
+                await session.execute(stmt)
+                await session.commit()
+        except Exception as exc:  # pragma: no cover - heartbeat must not kill a worker
+            logger.warning("heartbeat %s failed: %s", self.name, exc)
+
+
+# --- monitor -------------------------------------------------------------------
+
+
+@dataclass
+class _Probe:
+    name: str
+    fn: ProbeFn
+    interval: float
+    critical: bool
+    timeout: float
+    result: dict[str, Any] = field(default_factory=dict)
+    checked_at: float = 0.0
+
+
+class HealthMonitor:
+    """Run probes in the background and keep a serialised snapshot."""
+
+    def __init__(self, *, stale_factor: float = 3.0) -> None:
+        self.stale_factor = stale_factor
+        self._probes: dict[str, _Probe] = {}
+        self._tasks: list[asyncio.Task] = []
+        self._body = b""
+        self._ok = False
+        self._fresh_until = 0.0
+
+    @property
+    def started(self) -> bool:
+        return bool(self._tasks)
+
+    def register(
+        self,
+        name: str,
+        fn: ProbeFn,
+        *,
+        interval: float,
+        critical: bool = True,
+        timeout: float = 2.0,
+    ) -> None:
+        self._probes[name] = _Probe(name, fn, interval, critical, timeout)
+
+    async def run_probe(self, name: str) -> dict[str, Any]:
+        probe = self._probes[name]
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(probe.fn(), timeout=probe.timeout)
+        except asyncio.TimeoutError:
+            result = {"ok": False, "error": "timeout"}
+        except Exception as exc:
+            result = {"ok": False, "error": type(exc).__name__}
+        result.setdefault("ok", True)
+        result["seconds"] = round(time.perf_counter() - started, 6)
+        result["critical"] = probe.critical
+        probe.result = result
+        probe.checked_at = time.monotonic()
+        self._publish()
+        return result
+
+    async def refresh(self) -> None:
+        """Run every probe once (used before ``start`` and in tests)."""
+
+        await asyncio.gather(*(self.run_probe(name) for name in self._probes))
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        for probe in self._probes.values():
+            self._tasks.append(
+                asyncio.create_task(self._loop(probe), name=f"health:{probe.name}")
+            )
+
+    async def stop(self) -> None:
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _loop(self, probe: _Probe) -> None:
+        while True:
+            await self.run_probe(probe.name)
+            await asyncio.sleep(probe.interval)
+
+    def _publish(self) -> None:
+        now = time.monotonic()
+        components: dict[str, Any] = {}
+        ok = bool(self._probes)
+        fresh_until = float("inf")
+        for probe in self._probes.values():
+            result = dict(probe.result) if probe.checked_at else {"ok": False, "pending": True}
+            deadline = probe.checked_at + probe.interval * self.stale_factor + probe.timeout
+            if probe.checked_at and now > deadline:
+                result["ok"] = False
+                result["stale"] = True
+            if probe.checked_at:
+                result["age"] = round(now - probe.checked_at, 3)
+            components[probe.name] = result
+            if probe.critical:
+                ok = ok and result["ok"]
+                if probe.checked_at and not result.get("stale"):
+                    fresh_until = min(fresh_until, deadline)
+        self._ok = ok
+        self._fresh_until = fresh_until
+        payload = {"ok": ok, "version": build_info()["version"], **components}
+        self._body = json.dumps(payload, separators=(",", ":"), default=str).encode()
+
+    def snapshot(self) -> tuple[bool, bytes]:
+        """Return ``(ok, json_body)``; re-evaluates only once a probe is overdue."""
+
+        if time.monotonic() > self._fresh_until:
+            self._publish()
+        return self._ok, self._body
+
+
+# --- default probes ------------------------------------------------------------
+
+
+def _pool_stats() -> dict[str, Any]:
+    engine = db.engine
+    pool = getattr(engine, "sync_engine", engine).pool
+    try:
+        size = pool.size()
+        checked_out = pool.checkedout()
+        capacity = size + max(getattr(pool, "_max_overflow", 0), 0)
+    except AttributeError:  # NullPool/StaticPool: nothing to saturate
+        return {}
+    return {
+        "size": size,
+        "checked_out": checked_out,
+        "overflow": pool.overflow(),
+        "saturation": round(checked_out / capacity, 3) if capacity else 0.0,
+    }
+
+
+async def probe_database() -> dict[str, Any]:
+    pool = _pool_stats()  # before we take a connection ourselves
+    started = time.perf_counter()
+    async with db.engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+    max_saturation = float(os.getenv("HEALTH_POOL_MAX_SATURATION", "0.95"))
+    return {
+        "ok": pool.get("saturation", 0.0) < max_saturation,
+        "query_seconds": round(time.perf_counter() - started, 6),
+        "pool": pool,
+    }
+
+
+async def probe_workers() -> dict[str, Any]:
+    async with db.async_session() as session:
+        rows = (await session.execute(select(WorkerHeartbeat))).scalars().all()
+    # last_seen_at is timestamptz and comes back tz-aware
+    now = utcnow_aware()
+    workers: dict[str, Any] = {}
+    for row in rows:
+        age = (now - row.last_seen_at).total_seconds()
+        workers[row.name] = {
+            "age": round(age, 1),
+            "ok": age <= row.interval_seconds * 3 + 30,
+            "host": row.host,
+            "pid": row.pid,
+        }
+    return {"ok": all(w["ok"] for w in workers.values()), "workers": workers}
+
+
+async def probe_delivery_queue() -> dict[str, Any]:
+    now = utcnow()
+    async with db.async_session() as session:
+        triggers = await session.scalar(
+            select(func.count())
+            .select_from(NotificationTrigger)
+            .where(NotificationTrigger.next_fire_at <= now)
+        )
+        reminders = await session.scalar(
+            select(func.count())
+            .select_from(TaskReminder)
+            .where(TaskReminder.is_active.is_(True), TaskReminder.trigger_at <= now)
+        )
+        emails = await session.scalar(
+            select(func.count())
+            .select_from(EmailOutbox)
+            .where(EmailOutbox.status == "pending", EmailOutbox.next_attempt_at <= now)
+        )
+    depth = {"triggers": triggers or 0, "reminders": reminders or 0, "emails": emails or 0}
+    max_depth = int(os.getenv("HEALTH_QUEUE_MAX_DEPTH", "1000"))
+    return {"ok": max(depth.values()) < max_depth, "depth": depth}
+
+
+class LoopLagProbe:
+    """Measure event-loop lag as oversleep of a short ``asyncio.sleep``."""
+
+    def __init__(self, sample: float = 0.1, max_lag: float = 0.5) -> None:
+        self.sample = sample
+        self.max_lag = max_lag
+
+    async def __call__(self) -> dict[str, Any]:
+        started = time.perf_counter()
+        await asyncio.sleep(self.sample)
+        lag = max(time.perf_counter() - started - self.sample, 0.0)
+        return {"ok": lag < self.max_lag, "lag": round(lag, 6)}
+
+
+def register_default_probes(target: HealthMonitor | None = None) -> HealthMonitor:
+    target = target or monitor
+    if target._probes:
+        return target
+    interval = float(os.getenv("HEALTH_PROBE_INTERVAL", "5"))
+    target.register("db", probe_database, interval=interval)
+    target.register(
+        "event_loop",
+        LoopLagProbe(max_lag=float(os.getenv("HEALTH_LOOP_MAX_LAG", "0.5"))),
+        interval=1.0,
+    )
+    # Singleton workers and queues are reported but do not take a web
+    # worker out of rotation.
+    target.register("workers", probe_workers, interval=interval * 3, critical=False)
+    target.register(
+        "delivery_queue", probe_delivery_queue, interval=interval * 3, critical=False
+    )
+    return target
+
+
+monitor = HealthMonitor()
+
+
+__all__ = [
+    "Heartbeat",
+    "HealthMonitor",
+    "LoopLagProbe",
+    "build_info",
+    "monitor",
+    "register_default_probes",
+]
@@ -1,15 +1,55 @@
-"""Structured logging utilities."""
+"""Structured logging utilities.
+
+``setup_logging`` installs a ``QueueHandler`` on the root logger: callers
+merge the message arguments and enqueue the ``LogRecord`` (plus the
+request/owner context captured at call time), while a ``QueueListener``
+thread does PII scrubbing, JSON encoding and stream I/O off the event loop.
+Entry points call it explicitly; importing a module never configures
+logging.  High-volume loggers can be
+sampled via ``LOG_SAMPLING`` (``"web=0.1"``); warnings and errors are never
+sampled out.  Values in ``extra`` may be zero-argument callables, evaluated
+only when the record is actually formatted.
+"""
+import atexit
+import copy
 import json
 import logging
+import logging.handlers
+import os
+import queue
+import random
 import re
+import sys
 from datetime import datetime, timezone
 from typing import Any, Dict
 import contextvars
 
+try:  # pragma: no cover - optional speed-up
+    import orjson as _orjson
+except ImportError:  # pragma: no cover
+    _orjson = None
+
 request_id_var: contextvars.ContextVar[str | None] = contextvars.ContextVar("request_id", default=None)
 owner_id_var: contextvars.ContextVar[str | None] = contextvars.ContextVar("owner_id", default=None)
 
 PII_RE = re.compile(r"([A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+|\+?\d[\d -]{7,}\d)")
+_scrub_sub = PII_RE.sub
+# Cheap pre-check: PII needs an "@" or at least two digits in a row.
+_MAYBE_PII = re.compile(r"@|\d\d").search
+
+
+def scrub(text: str) -> str:
+    """Replace e-mails and phone numbers; skips the regex for plain text."""
+
+    if not _MAYBE_PII(text):
+        return text
+    return _scrub_sub("[scrubbed]", text)
+
+
+def _dumps(data: Dict[str, Any]) -> str:
+    if _orjson is not None:
+        return _orjson.dumps(data, default=str).decode()
+    return json.dumps(data, ensure_ascii=False, default=str)
 
 
 class JsonFormatter(logging.Formatter):
@@ -17,27 +57,143 @@ class JsonFormatter(logging.Formatter):
 
     def format(self, record: logging.LogRecord) -> str:  # noqa: D401
         data: Dict[str, Any] = {
-            "ts": datetime.now(timezone.utc).isoformat(),
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
             "level": record.levelname,
             "logger": record.name,
-            "message": PII_RE.sub("[scrubbed]", record.getMessage()),
+            "message": scrub(record.getMessage()),
         }
-        req_id = request_id_var.get()
+        # Context captured by ContextQueueHandler, otherwise read it here
+        req_id = getattr(record, "request_id", None) or request_id_var.get()
         if req_id:
             data["request_id"] = req_id
-        owner_id = owner_id_var.get()
+        owner_id = getattr(record, "owner_id", None) or owner_id_var.get()
         if owner_id:
             data["owner_id"] = owner_id
         if hasattr(record, "extra") and isinstance(record.extra, dict):
             for k, v in record.extra.items():
+                if callable(v):
+                    try:
+                        v = v()
+                    except Exception as exc:  # pragma: no cover - defensive
+                        v = f"<extra failed: {exc!r}>"
                 if isinstance(v, str):
-                    v = PII_RE.sub("[scrubbed]", v)
+                    v = scrub(v)
                 data[k] = v
-        return json.dumps(data, ensure_ascii=False)
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        return _dumps(data)
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only a fraction of records below WARNING for selected loggers."""
+
+    def __init__(self, rates: Dict[str, float]) -> None:
+        super().__init__()
+        self.rates = rates
+
+    @classmethod
+    def parse(cls, spec: str) -> "SamplingFilter":
+        rates: Dict[str, float] = {}
+        for part in (spec or "").split(","):
+            name, _, rate = part.partition("=")
+            if name.strip() and rate.strip():
+                rates[name.strip()] = max(0.0, min(1.0, float(rate)))
+        return cls(rates)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rates.get(record.name)
+        if rate is None:
+            return True
+        return rate >= 1.0 or random.random() < rate
+
+
+class ContextQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that defers formatting and I/O to the listener thread."""
+
+    dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # ``msg % args`` runs here, like in the stock handler: the arguments
+        # may be mutable or ORM objects that must not be read from another
+        # thread later.  Scrubbing, JSON encoding and tracebacks stay in the
+        # listener; context variables are only visible from the caller.
+        message = record.getMessage()
+        record = copy.copy(record)
+        record.message = record.msg = message
+        record.args = None
+        record.request_id = request_id_var.get()
+        record.owner_id = owner_id_var.get()
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_listener: logging.handlers.QueueListener | None = None
+
+
+def _build_output_handler(fmt: str | None) -> logging.Handler:
+    handler = logging.StreamHandler(sys.stderr)
+    if (fmt or os.getenv("LOG_FORMAT", "json")).lower() == "text":
+        handler.setFormatter(
+            logging.Formatter(
+                "[%(asctime)s] [%(levelname)s] %(message)s", "%Y-%m-%d %H:%M:%S"
+            )
+        )
+    else:
+        handler.setFormatter(JsonFormatter())
+    return handler
+
+
+def setup_logging(level: str | int | None = None, *, fmt: str | None = None) -> None:
+    """Configure the root logger with the queue-based pipeline.
+
+    ``fmt`` is ``"json"`` or ``"text"`` and defaults to ``LOG_FORMAT``.  Safe
+    to call repeatedly: only the first call installs handlers.
+    """
+    global _listener
+    if _listener is not None:
+        return
+    root = logging.getLogger()
+    log_queue: queue.Queue[logging.LogRecord] = queue.Queue(
+        maxsize=int(os.getenv("LOG_QUEUE_SIZE", "100000"))
+    )
+    handler = ContextQueueHandler(log_queue)
+    handler.addFilter(SamplingFilter.parse(os.getenv("LOG_SAMPLING", "")))
+    _listener = logging.handlers.QueueListener(
+        log_queue, _build_output_handler(fmt), respect_handler_level=True
+    )
+    _listener.start()
+    atexit.register(shutdown_logging)
+    root.addHandler(handler)
+    root.setLevel(level or os.getenv("LOG_LEVEL", "INFO").upper())
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is None:
+        return
+    listener, _listener = _listener, None
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, ContextQueueHandler):
+            root.removeHandler(handler)
+    listener.stop()
 
 
-def setup_logging() -> None:
-    """Configure root logger with JSON formatter."""
-    handler = logging.StreamHandler()
-    handler.setFormatter(JsonFormatter())
-    logging.basicConfig(level=logging.INFO, handlers=[handler])
+__all__ = [
+    "JsonFormatter",
+    "SamplingFilter",
+    "ContextQueueHandler",
+    "request_id_var",
+    "owner_id_var",
+    "scrub",
+    "setup_logging",
+    "shutdown_logging",
+]
@@ -1,5 +1,11 @@
 """Prometheus metrics helpers."""
-from prometheus_client import Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
+from prometheus_client import (
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    CONTENT_TYPE_LATEST,
+)
 
 REQUEST_COUNT = Counter(
     "http_requests_total",
@@ -12,6 +18,53 @@ REQUEST_LATENCY = Histogram(
     ["method", "route"],
 )
 
+# Telegram bot webhook ingestion
+BOT_UPDATE_QUEUE_DEPTH = Gauge(
+    "bot_update_queue_depth",
+    "Pending webhook updates per chat shard",
+    ["shard"],
+)
+BOT_UPDATE_LAG = Histogram(
+    "bot_update_queue_lag_seconds",
+    "Time a webhook update waited in its shard queue",
+    buckets=(0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+BOT_UPDATES_REJECTED = Counter(
+    "bot_updates_rejected_total",
+    "Webhook updates rejected because the shard queue was full",
+)
+BOT_UPDATES_FAILED = Counter(
+    "bot_updates_failed_total",
+    "Webhook updates whose handler raised",
+)
+
+# Password hashing pool
+PASSWORD_HASH_LATENCY = Histogram(
+    "password_hash_duration_seconds",
+    "Time spent in bcrypt per operation",
+    ["op"],
+    buckets=(0.01, 0.05, 0.1, 0.2, 0.3, 0.5, 1, 2),
+)
+PASSWORD_HASH_QUEUE_WAIT = Histogram(
+    "password_hash_queue_wait_seconds",
+    "Time a hashing job waited for a free worker",
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 5),
+)
+PASSWORD_HASH_INFLIGHT = Gauge(
+    "password_hash_inflight",
+    "Hashing jobs running or queued",
+)
+PASSWORD_HASH_REJECTED = Counter(
+    "password_hash_rejected_total",
+    "Hashing jobs rejected by the pool",
+    ["op", "reason"],
+)
+
+AUTH_EVENTS_DROPPED = Counter(
+    "auth_events_dropped_total",
+    "Auth log events dropped because the writer queue was full",
+)
+
 
 def metrics_response() -> tuple[bytes, str]:
     """Return metrics for exposure."""
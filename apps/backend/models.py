@@ -26,9 +26,10 @@ from sqlalchemy import (
     UniqueConstraint,
     CheckConstraint,
     Index,
+    event,
     func,
 )
-from sqlalchemy.orm import relationship, backref
+from sqlalchemy.orm import Session, relationship, backref
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID, ARRAY
 
 from backend.base import Base
@@ -180,6 +181,8 @@ class WebUser(Base):
 
     __table_args__ = (
         Index("ix_users_web_username_ci", func.lower(username), unique=True),
+        Index("ix_users_web_email_ci", func.lower(email)),
+        Index("ix_users_web_phone", phone),
         CheckConstraint(
             "username IS NOT NULL OR email IS NOT NULL OR phone IS NOT NULL",
             name="users_web_contact_present",
@@ -274,6 +277,8 @@ class EntityProfile(Base):
         lazy="selectin",
     )
 
+    # Catalog search also has pg_trgm indexes, created in
+    # ddl/20261018_profile_visibility.sql only (the extension may be missing).
     __table_args__ = (
         UniqueConstraint("entity_type", "entity_id", name="uq_entity_profiles_entity"),
         UniqueConstraint("entity_type", "slug", name="uq_entity_profiles_slug"),
@@ -405,6 +410,12 @@ class CRMAccount(Base):
     created_at = Column(DateTime(timezone=True), default=utcnow)
     updated_at = Column(DateTime(timezone=True), default=utcnow, onupdate=utcnow)
 
+    __table_args__ = (
+        Index("idx_crm_accounts_email", func.lower(email)),
+        Index("idx_crm_accounts_phone", phone),
+        Index("ix_crm_accounts_web_user", web_user_id),
+    )
+
     web_user = relationship("WebUser")
 
 
@@ -431,6 +442,7 @@ class CRMDeal(Base):
     updated_at = Column(DateTime(timezone=True), default=utcnow, onupdate=utcnow)
     closed_at = Column(DateTime(timezone=True))
     close_forecast_at = Column(DateTime(timezone=True))
+    stage_entered_at = Column(DateTime(timezone=True), default=utcnow)
     context = Column("metadata", JSON, default=dict, nullable=False)
 
     account = relationship("CRMAccount")
@@ -501,6 +513,88 @@ class CRMSubscriptionEvent(Base):
     subscription = relationship("CRMSubscription", back_populates="events")
 
 
+class CRMDealStageEvent(Base):
+    """A deal entering a pipeline stage; raw input of the funnel rollups."""
+
+    __tablename__ = "crm_deal_stage_events"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    deal_id = Column(
+        BigInteger, ForeignKey("crm_deals.id", ondelete="CASCADE"), nullable=False
+    )
+    pipeline_id = Column(BigInteger)
+    from_stage_id = Column(BigInteger)
+    to_stage_id = Column(BigInteger, nullable=False)
+    value = Column(Numeric(14, 2))
+    occurred_at = Column(DateTime(timezone=True), nullable=False, default=utcnow)
+
+    __table_args__ = (
+        Index("ix_crm_deal_stage_events_deal", "deal_id", "occurred_at"),
+    )
+
+
+class CRMStageRollup(Base):
+    """Funnel totals per stage, maintained by ``CRMAnalyticsService``."""
+
+    __tablename__ = "crm_stage_rollups"
+
+    stage_id = Column(BigInteger, primary_key=True)
+    pipeline_id = Column(BigInteger)
+    deals_count = Column(Integer, nullable=False, default=0)
+    deals_value = Column(Numeric(16, 2), nullable=False, default=0)
+    entered_count = Column(Integer, nullable=False, default=0)
+    exited_count = Column(Integer, nullable=False, default=0)
+    exited_seconds = Column(BigInteger, nullable=False, default=0)
+
+    __table_args__ = (Index("ix_crm_stage_rollups_pipeline", "pipeline_id"),)
+
+
+class CRMStageTransitionRollup(Base):
+    """Deals moved from one stage to another and the time they spent before."""
+
+    __tablename__ = "crm_stage_transitions"
+
+    from_stage_id = Column(BigInteger, primary_key=True)
+    to_stage_id = Column(BigInteger, primary_key=True)
+    pipeline_id = Column(BigInteger)
+    transitions = Column(Integer, nullable=False, default=0)
+    seconds = Column(BigInteger, nullable=False, default=0)
+
+    __table_args__ = (Index("ix_crm_stage_transitions_pipeline", "pipeline_id"),)
+
+
+class CRMRevenueTotal(Base):
+    """Current active subscriptions and MRR per product/tariff (0 = none)."""
+
+    __tablename__ = "crm_revenue_totals"
+
+    product_id = Column(BigInteger, primary_key=True)
+    tariff_id = Column(BigInteger, primary_key=True)
+    currency = Column(String(3), primary_key=True)
+    active_count = Column(Integer, nullable=False, default=0)
+    mrr = Column(Numeric(16, 2), nullable=False, default=0)
+
+
+class CRMRevenueDaily(Base):
+    """End-of-day MRR snapshot and new/churned subscriptions of that day."""
+
+    __tablename__ = "crm_revenue_daily"
+
+    day = Column(Date, primary_key=True)
+    product_id = Column(BigInteger, primary_key=True)
+    tariff_id = Column(BigInteger, primary_key=True)
+    currency = Column(String(3), primary_key=True)
+    active_count = Column(Integer, nullable=False, default=0)
+    mrr = Column(Numeric(16, 2), nullable=False, default=0)
+    new_count = Column(Integer, nullable=False, default=0)
+    churned_count = Column(Integer, nullable=False, default=0)
+    churned_mrr = Column(Numeric(16, 2), nullable=False, default=0)
+
+    __table_args__ = (
+        Index("ix_crm_revenue_daily_product_day", "product_id", "day"),
+    )
+
+
 class EntityProfileGrant(Base):
     """Audience grants defining who may view a profile and which sections are visible."""
 
@@ -522,6 +616,54 @@ class EntityProfileGrant(Base):
     profile = relationship("EntityProfile", back_populates="grants")
     created_by_user = relationship("WebUser", foreign_keys=[created_by])
 
+
+class EntityProfileVisibility(Base):
+    """Audiences that may list a profile in catalogs.
+
+    Derived from grants and ``profile_meta`` (see ``refresh_visibility`` in
+    ``profile_service``) on every flush touching a profile or grant; never written directly.  General
+    audiences (``public``/``authenticated``) use ``subject_id = 0``; ``owner``
+    rows carry the Telegram owner of resource profiles.
+    """
+
+    __tablename__ = "entity_profile_visibility"
+
+    profile_id = Column(
+        Integer,
+        ForeignKey("entity_profiles.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    audience_type = Column(String(32), primary_key=True)
+    subject_id = Column(BigInteger, primary_key=True, default=0)
+    expires_at = Column(DateTime(timezone=True))
+
+    __table_args__ = (
+        Index("ix_entity_profile_visibility_audience", "audience_type", "subject_id"),
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _refresh_profile_visibility(session, flush_context):
+    # Registered with the models rather than in ``profile_service`` (imported
+    # lazily by routes) so that any ORM write to a profile or grant re-derives
+    # that profile's visibility rows in the same transaction.
+    profile_ids = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, EntityProfile):
+            key = "id"
+        elif isinstance(obj, EntityProfileGrant):
+            key = "profile_id"
+        else:
+            continue
+        value = sa.inspect(obj).dict.get(key)
+        if value is not None:
+            profile_ids.add(value)
+    if profile_ids:
+        from backend.services.profile_service import refresh_visibility
+
+        refresh_visibility(session.connection(), profile_ids)
+
+
 class WebTgLink(Base):
     """Link between web users and their Telegram accounts."""
 
@@ -659,6 +801,11 @@ class UserGroup(Base):  # Связь пользователь-группа (мн
     crm_tags = Column(JSON, default=list)
     crm_metadata = Column(JSON, default=dict)
 
+    __table_args__ = (
+        # Roster pages of one group (the PK leads with user_id).
+        Index("ix_user_group_group_joined", "group_id", "joined_at"),
+    )
+
 
 class Product(Base):
     """Продукт, который может быть привязан к участнику."""
@@ -763,6 +910,49 @@ class GroupRemovalLog(Base):
     )
 
 
+class GroupPruneJob(Base):
+    """Фоновая чистка группы от участников без оплаченного продукта."""
+
+    __tablename__ = "group_prune_jobs"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    group_id = Column(
+        BigInteger, ForeignKey("groups.telegram_id"), nullable=False
+    )
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
+    initiator_web_id = Column(Integer, ForeignKey("users_web.id"))
+    initiator_tg_id = Column(BigInteger)
+    reason = Column(String(255))
+    # queued → running → done | failed | cancelled
+    status = Column(String(16), nullable=False, default="queued")
+    total = Column(Integer, nullable=False, default=0)
+    processed = Column(Integer, nullable=False, default=0)
+    removed = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    # Последний обработанный user_id: кандидаты идут по возрастанию id
+    cursor = Column(BigInteger, nullable=False, default=0)
+    # Подряд неудачных пакетов; после лимита задача помечается failed
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime(timezone=True))
+    error = Column(Text)
+    created_at = Column(DateTime(timezone=True), default=utcnow)
+    started_at = Column(DateTime(timezone=True))
+    finished_at = Column(DateTime(timezone=True))
+    updated_at = Column(DateTime(timezone=True), default=utcnow, onupdate=utcnow)
+
+    __table_args__ = (
+        Index("ix_group_prune_jobs_status", "status", "id"),
+        Index("ix_group_prune_jobs_group", "group_id", "created_at"),
+        Index(
+            "ux_group_prune_jobs_active",
+            "group_id",
+            "product_id",
+            unique=True,
+            postgresql_where=sa.text("status IN ('queued', 'running')"),
+        ),
+    )
+
+
 # ---------------------------------------------------------------------------
 # Task model
 # ---------------------------------------------------------------------------
@@ -972,6 +1162,15 @@ class CalendarEvent(Base):
     updated_at = Column(
         DateTime(timezone=True), default=utcnow, onupdate=utcnow
     )
+
+    __table_args__ = (
+        Index(
+            "ix_calendar_events_owner_start",
+            owner_id,
+            start_at,
+            postgresql_include=["title", "end_at"],
+        ),
+    )
  
  
 # ---------------------------------------------------------------------------
@@ -1227,6 +1426,18 @@ class DailyLog(Base):
     __table_args__ = (UniqueConstraint("daily_id", "date", name="ux_daily_date"),)
 
 
+class DailyOccurrence(Base):
+    """One day on which a daily is due, expanded from ``dailies.rrule``."""
+
+    __tablename__ = "daily_occurrences"
+
+    daily_id = Column(Integer, ForeignKey("dailies.id", ondelete="CASCADE"), primary_key=True)
+    occurs_on = Column(Date, primary_key=True)
+    owner_id = Column(BigInteger, nullable=False)
+
+    __table_args__ = (Index("ix_daily_occurrences_owner_day", owner_id, occurs_on),)
+
+
 class Reward(Base):
     __tablename__ = "rewards"
 
@@ -1490,12 +1701,22 @@ class Link(Base):
     link_type = Column(Enum(LinkType))
     weight = Column(Float, default=1.0)
     decay = Column(Float, default=1.0)
-    created_at = Column(DateTime, default=utcnow)
-
-
     created_at = Column(DateTime(timezone=True), default=utcnow)
     updated_at = Column(DateTime(timezone=True), default=utcnow, onupdate=utcnow)
 
+    __table_args__ = (
+        Index("ix_links_source", source_type, source_id),
+        Index("ix_links_target", target_type, target_id),
+        Index(
+            "ux_links_edge",
+            source_type,
+            source_id,
+            target_type,
+            target_id,
+            link_type,
+            unique=True,
+        ),
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -1595,6 +1816,17 @@ class DiagnosticClient(Base):
         order_by="DiagnosticResult.submitted_at.desc()",
     )
 
+    __table_args__ = (
+        # Keyset pages of client listings, newest first.
+        Index(
+            "ix_diagnostic_clients_specialist_created",
+            "specialist_id",
+            sa.desc("created_at"),
+            sa.desc("id"),
+        ),
+        Index("ix_diagnostic_clients_created", sa.desc("created_at"), sa.desc("id")),
+    )
+
 
 class DiagnosticResult(Base):
     __tablename__ = "diagnostic_results"
@@ -1635,6 +1867,11 @@ class DiagnosticResult(Base):
     specialist = relationship("WebUser", foreign_keys=[specialist_id])
     template = relationship("DiagnosticTemplate", back_populates="results")
 
+    __table_args__ = (
+        # Latest result and result count per client in listings.
+        Index("ix_diagnostic_results_client", "client_id", sa.desc("submitted_at")),
+    )
+
 
 # ---------------------------------------------------------------------------
 # Модели для логгера
@@ -1693,6 +1930,9 @@ class CalendarItem(Base):
     project_id = Column(Integer, ForeignKey("projects.id"))
     area_id = Column(Integer, ForeignKey("areas.id"))
     status = Column(Enum(CalendarItemStatus), default=CalendarItemStatus.planned)
+    # Set for items imported from Google Calendar (see ``sync_gcal``).
+    gcal_link_id = Column(Integer, ForeignKey("gcal_links.id", ondelete="CASCADE"))
+    gcal_event_id = Column(String(1024))
     created_at = Column(DateTime(timezone=True), default=utcnow)
     updated_at = Column(DateTime(timezone=True), default=utcnow, onupdate=utcnow)
     alarms = relationship(
@@ -1706,6 +1946,13 @@ class CalendarItem(Base):
         ),
         Index("idx_calendar_items_owner_project", owner_id, project_id),
         Index("idx_calendar_items_owner_area", owner_id, area_id),
+        Index(
+            "ix_calendar_items_owner_start",
+            owner_id,
+            start_at,
+            postgresql_include=["title", "end_at", "status", "area_id", "project_id"],
+        ),
+        Index("ux_calendar_items_gcal_event", gcal_link_id, gcal_event_id, unique=True),
     )
 
 
@@ -1716,11 +1963,15 @@ class Alarm(Base):
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     item_id = Column(Integer, ForeignKey("calendar_items.id"), nullable=False)
+    # Copy of ``calendar_items.owner_id`` so owner listings skip the join.
+    owner_id = Column(BigInteger)
     trigger_at = Column(DateTime(timezone=True), nullable=False)
     is_sent = Column(Boolean, default=False)
     created_at = Column(DateTime(timezone=True), default=utcnow)
     updated_at = Column(DateTime(timezone=True), default=utcnow, onupdate=utcnow)
 
+    __table_args__ = (Index("ix_alarms_owner_trigger", owner_id, trigger_at),)
+
 
 class NotificationChannelKind(PyEnum):
     """Supported notification channel types."""
@@ -1782,6 +2033,55 @@ class NotificationDelivery(Base):
     sent_at = Column(DateTime(timezone=True), default=utcnow)
 
 
+class EmailOutbox(Base):
+    """Исходящее письмо, которое отправляет фоновый воркер."""
+
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        Index("ix_email_outbox_due", "status", "next_attempt_at"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    to_address = Column(String(255), nullable=False)
+    subject = Column(String(255), nullable=False)
+    body = Column(Text, nullable=False)
+    kind = Column(String(32), nullable=False, default="generic")
+    # kind:address:window — повторный запрос в том же окне не создаёт письмо
+    dedupe_key = Column(String(255), unique=True)
+    status = Column(String(16), nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False, default=utcnow)
+    last_error = Column(Text)
+    created_at = Column(DateTime(timezone=True), default=utcnow)
+    sent_at = Column(DateTime(timezone=True))
+
+
+class WorkerHeartbeat(Base):
+    """Последний сигнал жизни фонового воркера (читает health-монитор)."""
+
+    __tablename__ = "worker_heartbeats"
+
+    name = Column(String(64), primary_key=True)
+    host = Column(String(255))
+    pid = Column(Integer)
+    interval_seconds = Column(Float, nullable=False, default=60.0)
+    last_seen_at = Column(DateTime(timezone=True), nullable=False, default=utcnow)
+
+
+class RepairLedgerEntry(Base):
+    """Выполненный шаг ремонта/бэкфилла (``backend.db.repair``)."""
+
+    __tablename__ = "repair_ledger"
+
+    name = Column(String(64), primary_key=True)
+    version = Column(Integer, nullable=False, default=1)
+    status = Column(String(16), nullable=False)
+    details = Column(Text)
+    error = Column(Text)
+    duration_ms = Column(Integer)
+    finished_at = Column(DateTime(timezone=True), default=utcnow)
+
+
 class GCalLink(Base):
     """Link to an external Google Calendar."""
 
@@ -1789,8 +2089,17 @@ class GCalLink(Base):
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     owner_id = Column(BigInteger, ForeignKey("users_tg.telegram_id"))
+    # Web user who connected the calendar (integration routes key on it).
+    user_id = Column(String(64), index=True)
     calendar_id = Column(String(255), nullable=False)
-    access_token = Column(String(255))
-    refresh_token = Column(String(255))
+    access_token = Column(Text)
+    refresh_token = Column(Text)
+    scope = Column(Text)
+    token_expiry = Column(DateTime(timezone=True))
+    sync_token = Column(Text)
+    last_synced_at = Column(DateTime(timezone=True))
+    resource_id = Column(Text)
+    channel_id = Column(Text)
+    channel_expiry = Column(DateTime(timezone=True))
     created_at = Column(DateTime(timezone=True), default=utcnow)
     updated_at = Column(DateTime(timezone=True), default=utcnow, onupdate=utcnow)
@@ -1,49 +1,53 @@
-"""Service exports for easy access."""
-
-from .note_service import NoteService
-from .task_service import TaskService
-from .telegram_user_service import TelegramUserService
-from .crm_service import CRMService
-from .group_moderation_service import GroupModerationService
-from .time_service import TimeService
-from .task_notification_service import TaskNotificationService
-from .task_reminder_worker import TaskReminderWorker
-from .web_user_service import WebUserService
-from .favorite_service import FavoriteService
-from .habits import HabitsService, DailiesService, HabitsCronService, UserStatsService
-from .profile_service import ProfileService
-from .dashboard_service import build_dashboard_overview
-from .diagnostics_service import DiagnosticsService
-from .sync_gcal import (
-    generate_auth_url,
-    exchange_code,
-    save_link as save_gcal_link,
-    initial as gcal_initial,
-    incremental as gcal_incremental,
-)
-
-__all__ = [
-    "NoteService",
-    "TaskService",
-    "TelegramUserService",
-    "CRMService",
-    "GroupModerationService",
-    "TimeService",
-    "TaskNotificationService",
-    "TaskReminderWorker",
-    "WebUserService",
-    "FavoriteService",
-    "HabitsService",
-    "DailiesService",
-    "HabitsCronService",
-    "UserStatsService",
-    "ProfileService",
-    "ProfileService",
-    "DiagnosticsService",
-    "build_dashboard_overview",
-    "generate_auth_url",
-    "exchange_code",
-    "save_gcal_link",
-    "gcal_initial",
-    "gcal_incremental",
-]
+"""Service exports for easy access.
+
+Services are imported on first attribute access, so importing one service
+module does not pull in every other one (aiogram, Google and CRM clients
+included).
+"""
+
+from importlib import import_module
+from typing import Any
+
+_EXPORTS = {
+    "NoteService": (".note_service", "NoteService"),
+    "TaskService": (".task_service", "TaskService"),
+    "TelegramUserService": (".telegram_user_service", "TelegramUserService"),
+    "CRMService": (".crm_service", "CRMService"),
+    "GroupModerationService": (".group_moderation_service", "GroupModerationService"),
+    "TimeService": (".time_service", "TimeService"),
+    "TaskNotificationService": (".task_notification_service", "TaskNotificationService"),
+    "TaskReminderWorker": (".task_reminder_worker", "TaskReminderWorker"),
+    "WebUserService": (".web_user_service", "WebUserService"),
+    "FavoriteService": (".favorite_service", "FavoriteService"),
+    "HabitsService": (".habits", "HabitsService"),
+    "DailiesService": (".habits", "DailiesService"),
+    "DailyScheduleService": (".habits", "DailyScheduleService"),
+    "HabitsCronService": (".habits", "HabitsCronService"),
+    "UserStatsService": (".habits", "UserStatsService"),
+    "ProfileService": (".profile_service", "ProfileService"),
+    "build_dashboard_overview": (".dashboard_service", "build_dashboard_overview"),
+    "DiagnosticsService": (".diagnostics_service", "DiagnosticsService"),
+    "generate_auth_url": (".sync_gcal", "generate_auth_url"),
+    "exchange_code": (".sync_gcal", "exchange_code"),
+    "save_gcal_link": (".sync_gcal", "save_link"),
+    "gcal_initial": (".sync_gcal", "initial"),
+    "gcal_incremental": (".sync_gcal", "incremental"),
+    "GCalSyncService": (".sync_gcal", "GCalSyncService"),
+}
+
+
+def __getattr__(name: str) -> Any:
+    try:
+        module_name, attr = _EXPORTS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(import_module(module_name, __name__), attr)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *_EXPORTS})
+
+
+__all__ = list(_EXPORTS)
@@ -1,17 +1,34 @@
 """Service layer for alarm operations."""
 from __future__ import annotations
 
+from datetime import datetime
 from typing import List, Optional
 
-from sqlalchemy import select
+import sqlalchemy as sa
+from sqlalchemy import event, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from backend import db
-from backend.models import Alarm, CalendarItem, Area, NotificationTrigger
+from backend.models import Alarm, CalendarItem, NotificationTrigger
 from backend.utils import utcnow
 
 
+@event.listens_for(Alarm, "before_insert")
+def _copy_item_owner(mapper, connection, alarm: Alarm) -> None:
+    # ``alarms.owner_id`` mirrors the item's owner so listings filter on
+    # ``ix_alarms_owner_trigger`` instead of joining calendar_items and areas.
+    if alarm.owner_id is not None or alarm.item_id is None:
+        return
+    item = sa.inspect(alarm).dict.get("item")
+    if item is not None and item.owner_id is not None:
+        alarm.owner_id = item.owner_id
+    else:
+        alarm.owner_id = connection.scalar(
+            select(CalendarItem.owner_id).where(CalendarItem.id == alarm.item_id)
+        )
+
+
 class AlarmService:
     """CRUD helpers for the :class:`Alarm` model."""
 
@@ -33,20 +50,27 @@ class AlarmService:
             await self.session.close()
 
     async def list_upcoming(
-        self, owner_id: int, limit: int | None = None
+        self,
+        owner_id: int,
+        limit: int | None = None,
+        *,
+        until: datetime | None = None,
     ) -> List[Alarm]:
-        """Return upcoming alarms for the given owner."""
+        """Return upcoming alarms for the given owner, soonest first.
+
+        ``until`` bounds the range; the item is loaded with its title only.
+        """
 
         now = utcnow()
         stmt = (
             select(Alarm)
-            .options(selectinload(Alarm.item))
-            .join(CalendarItem, Alarm.item_id == CalendarItem.id)
-            .join(Area, CalendarItem.area_id == Area.id)
-            .where(Area.owner_id == owner_id)
+            .options(selectinload(Alarm.item).load_only(CalendarItem.id, CalendarItem.title))
+            .where(Alarm.owner_id == owner_id)
             .where(Alarm.trigger_at >= now)
             .order_by(Alarm.trigger_at)
         )
+        if until is not None:
+            stmt = stmt.where(Alarm.trigger_at < until)
         if limit is not None:
             stmt = stmt.limit(limit)
         result = await self.session.execute(stmt)
@@ -60,9 +84,7 @@ class AlarmService:
         stmt = (
             select(Alarm)
             .options(selectinload(Alarm.item))
-            .join(CalendarItem, Alarm.item_id == CalendarItem.id)
-            .join(Area, CalendarItem.area_id == Area.id)
-            .where(Area.owner_id == owner_id)
+            .where(Alarm.owner_id == owner_id)
             .where(Alarm.item_id == item_id)
             .order_by(Alarm.trigger_at)
         )
@@ -0,0 +1,147 @@
+"""Singleton background jobs.
+
+Each job runs under its own PostgreSQL session-level advisory lock: no matter
+how many processes try to start it (the supervisor's jobs process, a web
+``lifespan``, ``scripts/run_task_reminder_worker.py``) only the lock holder
+runs it, the others wait and take over when the holder goes away.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import zlib
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from sqlalchemy import text
+
+from backend import db
+
+logger = logging.getLogger(__name__)
+
+# High 32 bits of the advisory lock key; init_app uses 0x5EED1DB on its own.
+_LOCK_NAMESPACE = 0x10B5 << 32
+
+
+@dataclass
+class Job:
+    name: str
+    factory: Callable[[], Any]  # returns an object with ``start(stop_event)``
+
+
+def _enabled(name: str, default: str) -> bool:
+    return str(os.getenv(name, default)).lower() in {"1", "true", "yes"}
+
+
+def configured_jobs() -> list[Job]:
+    """Jobs enabled by the environment, in start order."""
+
+    from backend.services.email_outbox_worker import (
+        EmailOutboxWorker,
+        is_outbox_worker_enabled,
+    )
+    from backend.services.gcal_sync_worker import (
+        GCalSyncWorker,
+        is_gcal_sync_enabled,
+    )
+    from backend.services.group_prune_worker import (
+        GroupPruneWorker,
+        is_group_prune_worker_enabled,
+    )
+    from backend.services.habits_cron_worker import (
+        HabitsCronWorker,
+        is_habits_cron_enabled,
+    )
+    from backend.services.project_notification_worker import (
+        ProjectNotificationWorker,
+        is_scheduler_enabled,
+    )
+    from backend.services.task_reminder_worker import TaskReminderWorker
+
+    jobs: list[Job] = []
+    if is_scheduler_enabled():
+        jobs.append(
+            Job("project_notifications", lambda: ProjectNotificationWorker(poll_interval=60.0))
+        )
+    if _enabled("TASK_REMINDER_WORKER", "1"):
+        interval = float(os.getenv("TASK_REMINDER_INTERVAL", "60"))
+        jobs.append(Job("task_reminders", lambda: TaskReminderWorker(poll_interval=interval)))
+    if is_outbox_worker_enabled():
+        jobs.append(Job("email_outbox", EmailOutboxWorker))
+    if is_habits_cron_enabled():
+        jobs.append(Job("habits_cron", HabitsCronWorker))
+    if is_group_prune_worker_enabled():
+        jobs.append(Job("group_prune", GroupPruneWorker.from_env))
+    if is_gcal_sync_enabled():
+        jobs.append(Job("gcal_sync", GCalSyncWorker.from_env))
+    return jobs
+
+
+def lock_key(name: str) -> int:
+    return _LOCK_NAMESPACE | zlib.crc32(f"job:{name}".encode())
+
+
+async def _wait(stop_event: asyncio.Event, timeout: float) -> bool:
+    try:
+        await asyncio.wait_for(stop_event.wait(), timeout=timeout)
+        return True
+    except asyncio.TimeoutError:
+        return False
+
+
+async def run_singleton(
+    job: Job, stop_event: asyncio.Event, *, retry_interval: float | None = None
+) -> None:
+    """Run ``job`` while holding its advisory lock; restart it if it crashes."""
+
+    retry = retry_interval or float(os.getenv("JOBS_LOCK_RETRY_SECONDS", "15"))
+    key = lock_key(job.name)
+    while not stop_event.is_set():
+        try:
+            async with db.engine.connect() as conn:
+                acquired = await conn.scalar(
+                    text("SELECT pg_try_advisory_lock(:k)"), {"k": key}
+                )
+                await conn.commit()
+                if acquired:
+                    logger.info("background job %s: started in pid %s", job.name, os.getpid())
+                    try:
+                        await job.factory().start(stop_event)
+                    finally:
+                        await conn.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": key})
+                        await conn.commit()
+                    if stop_event.is_set():
+                        return
+        except Exception:
+            logger.exception("background job %s failed", job.name)
+        if await _wait(stop_event, retry):
+            return
+
+
+def start_jobs(stop_event: asyncio.Event) -> list[asyncio.Task]:
+    return [
+        asyncio.create_task(run_singleton(job, stop_event), name=f"job:{job.name}")
+        for job in configured_jobs()
+    ]
+
+
+def background_jobs_in_web() -> bool:
+    """Whether the web ``lifespan`` should start jobs itself.
+
+    The supervisor sets ``RUN_BACKGROUND_JOBS=0`` for web workers because it
+    runs them in a dedicated process.
+    """
+
+    return _enabled("RUN_BACKGROUND_JOBS", "1")
+
+
+__all__ = [
+    "Job",
+    "background_jobs_in_web",
+    "configured_jobs",
+    "lock_key",
+    "run_singleton",
+    "start_jobs",
+]
@@ -2,9 +2,10 @@
 
 from __future__ import annotations
 
+from datetime import datetime
 from typing import List, Optional
 
-from sqlalchemy import select
+from sqlalchemy import Row, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend import db
@@ -52,15 +53,61 @@ class CalendarService:
         await self.session.flush()
         return event
 
-    async def list_events(self, owner_id: Optional[int] = None) -> List[CalendarEvent]:
-        """Return events, optionally filtered by owner."""
+    async def list_events(
+        self,
+        owner_id: Optional[int] = None,
+        *,
+        start_at: datetime | None = None,
+        end_at: datetime | None = None,
+        limit: int | None = None,
+    ) -> List[CalendarEvent]:
+        """Return events, optionally filtered by owner and a start window.
+
+        With a window the result is ordered by ``start_at`` and served by
+        ``ix_calendar_events_owner_start``.
+        """
 
         stmt = select(CalendarEvent)
         if owner_id is not None:
             stmt = stmt.where(CalendarEvent.owner_id == owner_id)
+        if start_at is not None:
+            stmt = stmt.where(CalendarEvent.start_at >= start_at)
+        if end_at is not None:
+            stmt = stmt.where(CalendarEvent.start_at <= end_at)
+        if start_at is not None or end_at is not None or limit is not None:
+            stmt = stmt.order_by(CalendarEvent.start_at, CalendarEvent.id)
+        if limit is not None:
+            stmt = stmt.limit(limit)
         result = await self.session.execute(stmt)
         return result.scalars().all()
 
+    async def agenda(
+        self,
+        owner_id: int,
+        start_at: datetime,
+        end_at: datetime,
+        *,
+        limit: int | None = None,
+    ) -> List[Row]:
+        """``(id, title, start_at, end_at)`` rows of events in the window."""
+
+        stmt = (
+            select(
+                CalendarEvent.id,
+                CalendarEvent.title,
+                CalendarEvent.start_at,
+                CalendarEvent.end_at,
+            )
+            .where(CalendarEvent.owner_id == owner_id)
+            .where(CalendarEvent.start_at >= start_at)
+            .where(CalendarEvent.start_at <= end_at)
+            .order_by(CalendarEvent.start_at, CalendarEvent.id)
+        )
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        result = await self.session.execute(stmt)
+        return result.all()
+
     async def get_event(
         self, event_id: int, owner_id: Optional[int] = None
     ) -> CalendarEvent | None:
@@ -109,12 +156,4 @@ class CalendarService:
     ) -> List[CalendarEvent]:
         """Return events for ``owner_id`` within the [start_at, end_at] range."""
 
-        stmt = (
-            select(CalendarEvent)
-            .where(CalendarEvent.owner_id == owner_id)
-            .where(CalendarEvent.start_at >= start_at)
-            .where(CalendarEvent.start_at <= end_at)
-        )
-        result = await self.session.execute(stmt)
-        return result.scalars().all()
-
+        return await self.list_events(owner_id, start_at=start_at, end_at=end_at)
@@ -0,0 +1,649 @@
+"""Incremental CRM analytics: deal funnel and subscription revenue rollups.
+
+:class:`~backend.services.crm_service.CRMService` calls the ``on_*`` hooks in
+the transaction that changes a deal or a subscription, so every rollup row is
+bumped with a single ``INSERT ... ON CONFLICT DO UPDATE`` and reports read a
+handful of rows instead of scanning deals and events.
+
+Raw inputs are ``crm_deal_stage_events`` (one row per stage a deal enters)
+and the ``status_change`` rows of ``crm_subscription_events`` (carrying the
+MRR and currency they add or remove).  :meth:`CRMAnalyticsService.rebuild`
+recomputes every rollup from them; see ``scripts/rebuild_crm_analytics.py``.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import UTC, date, datetime, timedelta
+from decimal import Decimal, InvalidOperation
+from typing import Any, Optional
+
+import sqlalchemy as sa
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend import db
+from backend.models import (
+    CRMBillingType,
+    CRMDeal,
+    CRMDealStageEvent,
+    CRMPipelineStage,
+    CRMProductTariff,
+    CRMRevenueDaily,
+    CRMRevenueTotal,
+    CRMStageRollup,
+    CRMStageTransitionRollup,
+    CRMSubscription,
+    CRMSubscriptionEvent,
+    CRMSubscriptionStatus,
+)
+from backend.utils import utcnow
+
+STATUS_CHANGE = "status_change"
+ACTIVE = CRMSubscriptionStatus.active.value
+# Leaving ``active`` for these statuses counts as churn; ``completed`` and
+# ``pending`` (upgrades, downgrades) only drop the subscription from MRR.
+CHURN_STATUSES = {
+    CRMSubscriptionStatus.cancelled.value,
+    CRMSubscriptionStatus.failed.value,
+}
+RECURRING_BILLING = {
+    CRMBillingType.subscription,
+    CRMBillingType.upgrade,
+    CRMBillingType.downgrade,
+}
+DEFAULT_CURRENCY = "RUB"
+_CENT = Decimal("0.01")
+
+
+def monthly_amount(tariff: Optional[CRMProductTariff]) -> Decimal:
+    """Monthly recurring value of a tariff; free and one-off tariffs give 0.
+
+    ``metadata.period_months`` spreads longer billing periods over months.
+    """
+
+    if tariff is None or tariff.amount is None or tariff.billing_type not in RECURRING_BILLING:
+        return Decimal("0")
+    try:
+        months = int((tariff.config or {}).get("period_months") or 1)
+    except (TypeError, ValueError):
+        months = 1
+    return (Decimal(str(tariff.amount)) / max(months, 1)).quantize(_CENT)
+
+
+def _decimal(value: Any) -> Decimal:
+    try:
+        return Decimal(str(value)) if value is not None else Decimal("0")
+    except InvalidOperation:
+        return Decimal("0")
+
+
+def _aware(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=UTC)
+
+
+def _seconds_between(start: Optional[datetime], end: datetime) -> int:
+    if start is None:
+        return 0
+    return max(int((_aware(end) - _aware(start)).total_seconds()), 0)
+
+
+def revenue_delta(previous: Optional[str], status: str, mrr: Decimal) -> Optional[dict[str, Any]]:
+    """Rollup increments of one status change, or ``None`` if MRR is unaffected."""
+
+    was_active = previous == ACTIVE
+    is_active = status == ACTIVE
+    if was_active == is_active:
+        return None
+    churned = was_active and status in CHURN_STATUSES
+    sign = 1 if is_active else -1
+    return {
+        "active_count": sign,
+        "mrr": sign * mrr,
+        "new_count": int(is_active),
+        "churned_count": int(churned),
+        "churned_mrr": mrr if churned else Decimal("0"),
+    }
+
+
+# Deals created before the stage log existed enter their current stage at
+# ``stage_entered_at``/``opened_at``.
+_SEED_DEAL_EVENTS_SQL = """
+INSERT INTO crm_deal_stage_events (deal_id, pipeline_id, from_stage_id, to_stage_id, value, occurred_at)
+SELECT d.id, d.pipeline_id, NULL, d.stage_id, d.value,
+       coalesce(d.stage_entered_at, d.opened_at, now())
+FROM crm_deals AS d
+WHERE d.stage_id IS NOT NULL
+  AND NOT EXISTS (SELECT 1 FROM crm_deal_stage_events AS e WHERE e.deal_id = d.id)
+"""
+
+_STAYS_CTE = """
+WITH stays AS (
+    SELECT e.deal_id, e.pipeline_id, e.to_stage_id AS stage_id, e.value,
+           e.occurred_at AS entered_at,
+           lead(e.occurred_at) OVER w AS left_at,
+           lead(e.to_stage_id) OVER w AS next_stage_id
+    FROM crm_deal_stage_events AS e
+    WINDOW w AS (PARTITION BY e.deal_id ORDER BY e.occurred_at, e.id)
+)
+"""
+
+_STAGE_ROLLUPS_SQL = _STAYS_CTE + """
+INSERT INTO crm_stage_rollups
+    (stage_id, pipeline_id, deals_count, deals_value, entered_count, exited_count, exited_seconds)
+SELECT stage_id, max(pipeline_id),
+       count(*) FILTER (WHERE left_at IS NULL),
+       coalesce(sum(value) FILTER (WHERE left_at IS NULL), 0),
+       count(*),
+       count(left_at),
+       coalesce(sum(floor(extract(epoch FROM left_at - entered_at))), 0)::bigint
+FROM stays
+GROUP BY stage_id
+"""
+
+_STAGE_TRANSITIONS_SQL = _STAYS_CTE + """
+INSERT INTO crm_stage_transitions (from_stage_id, to_stage_id, pipeline_id, transitions, seconds)
+SELECT stage_id, next_stage_id, max(pipeline_id), count(*),
+       coalesce(sum(floor(extract(epoch FROM left_at - entered_at))), 0)::bigint
+FROM stays
+WHERE next_stage_id IS NOT NULL
+GROUP BY stage_id, next_stage_id
+"""
+
+_DEAL_STAGE_ENTERED_SQL = """
+UPDATE crm_deals AS d
+SET stage_entered_at = last.occurred_at
+FROM (
+    SELECT DISTINCT ON (deal_id) deal_id, occurred_at
+    FROM crm_deal_stage_events
+    ORDER BY deal_id, occurred_at DESC, id DESC
+) AS last
+WHERE last.deal_id = d.id
+  AND d.stage_entered_at IS DISTINCT FROM last.occurred_at
+"""
+
+# Subscriptions created before status changes were logged start in their
+# current status at ``started_at``.
+_SUBSCRIPTION_EVENTS_SQL = """
+SELECT e.id, e.subscription_id, s.product_id, s.tariff_id, e.details, e.occurred_at
+FROM crm_subscription_events AS e
+JOIN crm_subscriptions AS s ON s.id = e.subscription_id
+WHERE e.event_type = :event_type
+UNION ALL
+SELECT 0, s.id, s.product_id, s.tariff_id,
+       json_build_object('status', s.status), coalesce(s.started_at, now())
+FROM crm_subscriptions AS s
+WHERE NOT EXISTS (
+    SELECT 1 FROM crm_subscription_events AS e
+    WHERE e.subscription_id = s.id AND e.event_type = :event_type
+)
+ORDER BY 6, 1
+"""
+
+
+class CRMAnalyticsService:
+    """Maintain and read CRM funnel and revenue rollups."""
+
+    def __init__(self, session: Optional[AsyncSession] = None) -> None:
+        self.session = session
+        self._external = session is not None
+
+    async def __aenter__(self) -> "CRMAnalyticsService":
+        if self.session is None:
+            self.session = db.async_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if not self._external and self.session is not None:
+            if exc_type is None:
+                await self.session.commit()
+            else:
+                await self.session.rollback()
+            await self.session.close()
+        if not self._external:
+            self.session = None
+
+    async def _bump(
+        self,
+        model: type,
+        keys: dict[str, Any],
+        deltas: dict[str, Any],
+        *,
+        extra: Optional[dict[str, Any]] = None,
+        returning: tuple[str, ...] = (),
+    ) -> Any:
+        """Add ``deltas`` to the rollup row ``keys`` (created on first use)."""
+
+        table = model.__table__
+        stmt = pg_insert(model).values(**keys, **(extra or {}), **deltas)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={name: table.c[name] + stmt.excluded[name] for name in deltas},
+        )
+        if returning:
+            stmt = stmt.returning(*(table.c[name] for name in returning))
+            return (await self.session.execute(stmt)).one()
+        await self.session.execute(stmt)
+        return None
+
+    # ------------------------------------------------------------------
+    # Deal funnel
+    # ------------------------------------------------------------------
+    async def _log_stage(
+        self,
+        deal: CRMDeal,
+        from_stage_id: Optional[int],
+        at: datetime,
+    ) -> None:
+        await self.session.execute(
+            sa.insert(CRMDealStageEvent).values(
+                deal_id=deal.id,
+                pipeline_id=deal.pipeline_id,
+                from_stage_id=from_stage_id,
+                to_stage_id=deal.stage_id,
+                value=deal.value,
+                occurred_at=at,
+            )
+        )
+
+    async def on_deal_created(self, deal: CRMDeal, *, at: Optional[datetime] = None) -> None:
+        at = at or utcnow()
+        await self._log_stage(deal, None, at)
+        await self._bump(
+            CRMStageRollup,
+            {"stage_id": deal.stage_id},
+            {"deals_count": 1, "deals_value": _decimal(deal.value), "entered_count": 1},
+            extra={"pipeline_id": deal.pipeline_id},
+        )
+
+    async def on_deal_stage_changed(
+        self,
+        deal: CRMDeal,
+        *,
+        from_stage_id: Optional[int],
+        entered_at: Optional[datetime],
+        at: datetime,
+    ) -> None:
+        """Account for ``deal`` (already in its new stage) leaving ``from_stage_id``."""
+
+        await self._log_stage(deal, from_stage_id, at)
+        value = _decimal(deal.value)
+        await self._bump(
+            CRMStageRollup,
+            {"stage_id": deal.stage_id},
+            {"deals_count": 1, "deals_value": value, "entered_count": 1},
+            extra={"pipeline_id": deal.pipeline_id},
+        )
+        if from_stage_id is None:
+            return
+        seconds = _seconds_between(entered_at, at)
+        await self._bump(
+            CRMStageRollup,
+            {"stage_id": from_stage_id},
+            {
+                "deals_count": -1,
+                "deals_value": -value,
+                "exited_count": 1,
+                "exited_seconds": seconds,
+            },
+            extra={"pipeline_id": deal.pipeline_id},
+        )
+        await self._bump(
+            CRMStageTransitionRollup,
+            {"from_stage_id": from_stage_id, "to_stage_id": deal.stage_id},
+            {"transitions": 1, "seconds": seconds},
+            extra={"pipeline_id": deal.pipeline_id},
+        )
+
+    # ------------------------------------------------------------------
+    # Subscription revenue
+    # ------------------------------------------------------------------
+    async def status_change_details(
+        self,
+        subscription: CRMSubscription,
+        details: dict[str, Any],
+    ) -> dict[str, Any]:
+        """Complete a ``status_change`` payload with previous status, MRR, currency, tariff.
+
+        The previous status comes from the event log, so replaying it in
+        :meth:`rebuild` sees the same transitions.  Leaving ``active`` removes
+        the MRR recorded when the subscription became active, from the tariff
+        it was recorded under even if the subscription's tariff changed since.
+        """
+
+        last = await self.session.scalar(
+            select(CRMSubscriptionEvent.details)
+            .where(
+                CRMSubscriptionEvent.subscription_id == subscription.id,
+                CRMSubscriptionEvent.event_type == STATUS_CHANGE,
+            )
+            .order_by(CRMSubscriptionEvent.occurred_at.desc(), CRMSubscriptionEvent.id.desc())
+            .limit(1)
+        )
+        last = last if isinstance(last, dict) else {}
+        previous = last.get("status")
+        if previous == ACTIVE and "mrr" in last:
+            mrr, currency = _decimal(last["mrr"]), last.get("currency") or DEFAULT_CURRENCY
+            tariff_id = last.get("tariff_id", subscription.tariff_id)
+        else:
+            tariff = None
+            tariff_id = subscription.tariff_id
+            if tariff_id:
+                tariff = await self.session.get(CRMProductTariff, tariff_id)
+            mrr = monthly_amount(tariff)
+            currency = tariff.currency if tariff else DEFAULT_CURRENCY
+        return {
+            **details,
+            "previous": previous,
+            "mrr": str(mrr),
+            "currency": currency,
+            "tariff_id": tariff_id,
+        }
+
+    async def on_subscription_status(
+        self,
+        subscription: CRMSubscription,
+        details: dict[str, Any],
+        *,
+        at: Optional[datetime] = None,
+    ) -> None:
+        delta = revenue_delta(details.get("previous"), details["status"], _decimal(details.get("mrr")))
+        if delta is None:
+            return
+        await self._apply_revenue(
+            day=(at or utcnow()).date(),
+            key={
+                "product_id": subscription.product_id,
+                "tariff_id": details.get("tariff_id", subscription.tariff_id) or 0,
+                "currency": details.get("currency") or DEFAULT_CURRENCY,
+            },
+            delta=delta,
+        )
+
+    async def _apply_revenue(self, *, day: date, key: dict[str, Any], delta: dict[str, Any]) -> None:
+        total = await self._bump(
+            CRMRevenueTotal,
+            key,
+            {"active_count": delta["active_count"], "mrr": delta["mrr"]},
+            returning=("active_count", "mrr"),
+        )
+        stmt = pg_insert(CRMRevenueDaily).values(
+            day=day,
+            **key,
+            active_count=total.active_count,
+            mrr=total.mrr,
+            new_count=delta["new_count"],
+            churned_count=delta["churned_count"],
+            churned_mrr=delta["churned_mrr"],
+        )
+        table = CRMRevenueDaily.__table__
+        await self.session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["day", *key],
+                set_={
+                    "active_count": stmt.excluded.active_count,
+                    "mrr": stmt.excluded.mrr,
+                    **{
+                        name: table.c[name] + stmt.excluded[name]
+                        for name in ("new_count", "churned_count", "churned_mrr")
+                    },
+                },
+            )
+        )
+
+    # ------------------------------------------------------------------
+    # Reports (read rollups only)
+    # ------------------------------------------------------------------
+    async def funnel(self, pipeline_id: int) -> list[dict[str, Any]]:
+        """Stages of a pipeline with current deals, flow and average time."""
+
+        rows = await self.session.execute(
+            select(
+                CRMPipelineStage.id,
+                CRMPipelineStage.slug,
+                CRMPipelineStage.title,
+                CRMPipelineStage.position,
+                CRMStageRollup.deals_count,
+                CRMStageRollup.deals_value,
+                CRMStageRollup.entered_count,
+                CRMStageRollup.exited_count,
+                CRMStageRollup.exited_seconds,
+            )
+            .outerjoin(CRMStageRollup, CRMStageRollup.stage_id == CRMPipelineStage.id)
+            .where(CRMPipelineStage.pipeline_id == pipeline_id)
+            .order_by(CRMPipelineStage.position, CRMPipelineStage.id)
+        )
+        stages = []
+        for row in rows:
+            exited = row.exited_count or 0
+            stages.append(
+                {
+                    "stage_id": row.id,
+                    "slug": row.slug,
+                    "title": row.title,
+                    "position": row.position,
+                    "deals_count": row.deals_count or 0,
+                    "deals_value": float(row.deals_value or 0),
+                    "entered_count": row.entered_count or 0,
+                    "exited_count": exited,
+                    "avg_seconds_in_stage": (row.exited_seconds or 0) / exited if exited else None,
+                }
+            )
+        return stages
+
+    async def transitions(self, pipeline_id: int) -> list[dict[str, Any]]:
+        """Stage-to-stage moves with conversion from the source stage."""
+
+        rows = await self.session.execute(
+            select(
+                CRMStageTransitionRollup.from_stage_id,
+                CRMStageTransitionRollup.to_stage_id,
+                CRMStageTransitionRollup.transitions,
+                CRMStageTransitionRollup.seconds,
+                CRMStageRollup.entered_count,
+            )
+            .outerjoin(
+                CRMStageRollup,
+                CRMStageRollup.stage_id == CRMStageTransitionRollup.from_stage_id,
+            )
+            .where(CRMStageTransitionRollup.pipeline_id == pipeline_id)
+            .order_by(CRMStageTransitionRollup.from_stage_id, CRMStageTransitionRollup.to_stage_id)
+        )
+        return [
+            {
+                "from_stage_id": row.from_stage_id,
+                "to_stage_id": row.to_stage_id,
+                "count": row.transitions,
+                "conversion": row.transitions / row.entered_count if row.entered_count else None,
+                "avg_seconds": row.seconds / row.transitions if row.transitions else None,
+            }
+            for row in rows
+        ]
+
+    async def revenue(
+        self,
+        *,
+        product_id: Optional[int] = None,
+        days: int = 30,
+        today: Optional[date] = None,
+    ) -> dict[str, Any]:
+        """Current MRR/ARR per product/tariff and a daily series per currency.
+
+        Days without changes have no row; the series carries the previous
+        snapshot forward, starting from the last row before the window.
+        """
+
+        today = today or utcnow().date()
+        start = today - timedelta(days=days - 1)
+        totals_stmt = select(CRMRevenueTotal).order_by(
+            CRMRevenueTotal.product_id, CRMRevenueTotal.tariff_id, CRMRevenueTotal.currency
+        )
+        window_stmt = (
+            select(CRMRevenueDaily)
+            .where(CRMRevenueDaily.day >= start, CRMRevenueDaily.day <= today)
+            .order_by(CRMRevenueDaily.day)
+        )
+        key_cols = (CRMRevenueDaily.product_id, CRMRevenueDaily.tariff_id, CRMRevenueDaily.currency)
+        before_stmt = (
+            select(CRMRevenueDaily)
+            .where(CRMRevenueDaily.day < start)
+            .order_by(*key_cols, CRMRevenueDaily.day.desc())
+            .distinct(*key_cols)
+        )
+        if product_id is not None:
+            totals_stmt = totals_stmt.where(CRMRevenueTotal.product_id == product_id)
+            window_stmt = window_stmt.where(CRMRevenueDaily.product_id == product_id)
+            before_stmt = before_stmt.where(CRMRevenueDaily.product_id == product_id)
+
+        totals = [
+            {
+                "product_id": row.product_id,
+                "tariff_id": row.tariff_id or None,
+                "currency": row.currency,
+                "active_count": row.active_count,
+                "mrr": float(row.mrr),
+                "arr": float(row.mrr * 12),
+            }
+            for row in (await self.session.execute(totals_stmt)).scalars()
+        ]
+
+        snapshot: dict[tuple, tuple[int, Decimal]] = {}
+        for row in (await self.session.execute(before_stmt)).scalars():
+            snapshot[(row.product_id, row.tariff_id, row.currency)] = (row.active_count, row.mrr)
+        by_day: dict[date, list[CRMRevenueDaily]] = defaultdict(list)
+        for row in (await self.session.execute(window_stmt)).scalars():
+            by_day[row.day].append(row)
+
+        currencies = sorted({key[2] for key in snapshot} | {
+            row.currency for rows in by_day.values() for row in rows
+        })
+        series: list[dict[str, Any]] = []
+        for offset in range(days):
+            day = start + timedelta(days=offset)
+            flow: dict[str, list] = {currency: [0, 0, Decimal("0")] for currency in currencies}
+            for row in by_day.get(day, ()):
+                snapshot[(row.product_id, row.tariff_id, row.currency)] = (row.active_count, row.mrr)
+                flow[row.currency][0] += row.new_count
+                flow[row.currency][1] += row.churned_count
+                flow[row.currency][2] += row.churned_mrr
+            for currency in currencies:
+                keys = [key for key in snapshot if key[2] == currency]
+                mrr = sum((snapshot[key][1] for key in keys), Decimal("0"))
+                active = sum(snapshot[key][0] for key in keys)
+                new_count, churned_count, churned_mrr = flow[currency]
+                start_active = active - new_count + churned_count
+                series.append(
+                    {
+                        "day": day,
+                        "currency": currency,
+                        "active_count": active,
+                        "mrr": float(mrr),
+                        "arr": float(mrr * 12),
+                        "new_count": new_count,
+                        "churned_count": churned_count,
+                        "churned_mrr": float(churned_mrr),
+                        "churn_rate": churned_count / start_active if start_active > 0 else None,
+                    }
+                )
+        return {"totals": totals, "series": series}
+
+    # ------------------------------------------------------------------
+    # Rebuild from raw events
+    # ------------------------------------------------------------------
+    async def rebuild(self) -> dict[str, int]:
+        """Recompute every rollup from the stage log and subscription events."""
+
+        for model in (CRMStageRollup, CRMStageTransitionRollup, CRMRevenueTotal, CRMRevenueDaily):
+            await self.session.execute(sa.delete(model))
+        seeded = await self.session.execute(sa.text(_SEED_DEAL_EVENTS_SQL))
+        stages = await self.session.execute(sa.text(_STAGE_ROLLUPS_SQL))
+        moves = await self.session.execute(sa.text(_STAGE_TRANSITIONS_SQL))
+        await self.session.execute(sa.text(_DEAL_STAGE_ENTERED_SQL))
+
+        tariffs = {
+            tariff.id: tariff
+            for tariff in (await self.session.execute(select(CRMProductTariff))).scalars()
+        }
+        state: dict[int, tuple[Optional[str], Decimal, str, Optional[int]]] = {}
+        totals: dict[tuple, list] = defaultdict(lambda: [0, Decimal("0")])
+        daily: dict[tuple, list] = {}
+        events = 0
+        result = await self.session.stream(
+            sa.text(_SUBSCRIPTION_EVENTS_SQL), {"event_type": STATUS_CHANGE}
+        )
+        async for _, sub_id, product_id, tariff_id, details, occurred_at in result:
+            details = details if isinstance(details, dict) else {}
+            status = details.get("status")
+            if not status:
+                continue
+            events += 1
+            previous, active_mrr, active_currency, active_tariff_id = state.get(
+                sub_id, (None, Decimal("0"), "", None)
+            )
+            if previous == ACTIVE:
+                mrr, currency, tariff_id = active_mrr, active_currency, active_tariff_id
+            elif "mrr" in details:
+                mrr, currency = _decimal(details["mrr"]), details.get("currency") or DEFAULT_CURRENCY
+                tariff_id = details.get("tariff_id", tariff_id)
+            else:
+                tariff = tariffs.get(tariff_id)
+                mrr = monthly_amount(tariff)
+                currency = tariff.currency if tariff else DEFAULT_CURRENCY
+            state[sub_id] = (status, mrr, currency, tariff_id)
+            delta = revenue_delta(previous, status, mrr)
+            if delta is None:
+                continue
+            key = (product_id, tariff_id or 0, currency)
+            total = totals[key]
+            total[0] += delta["active_count"]
+            total[1] += delta["mrr"]
+            row = daily.setdefault((occurred_at.date(), *key), [0, Decimal("0"), 0, 0, Decimal("0")])
+            row[0], row[1] = total
+            row[2] += delta["new_count"]
+            row[3] += delta["churned_count"]
+            row[4] += delta["churned_mrr"]
+
+        if totals:
+            await self.session.execute(
+                sa.insert(CRMRevenueTotal),
+                [
+                    {"product_id": p, "tariff_id": t, "currency": c, "active_count": a, "mrr": m}
+                    for (p, t, c), (a, m) in totals.items()
+                ],
+            )
+        if daily:
+            await self.session.execute(
+                sa.insert(CRMRevenueDaily),
+                [
+                    {
+                        "day": day,
+                        "product_id": p,
+                        "tariff_id": t,
+                        "currency": c,
+                        "active_count": a,
+                        "mrr": m,
+                        "new_count": new,
+                        "churned_count": churned,
+                        "churned_mrr": churned_mrr,
+                    }
+                    for (day, p, t, c), (a, m, new, churned, churned_mrr) in daily.items()
+                ],
+            )
+        return {
+            "deal_events_seeded": max(seeded.rowcount or 0, 0),
+            "stages": max(stages.rowcount or 0, 0),
+            "transitions": max(moves.rowcount or 0, 0),
+            "subscription_events": events,
+            "revenue_days": len(daily),
+        }
+
+
+__all__ = [
+    "ACTIVE",
+    "CHURN_STATUSES",
+    "CRMAnalyticsService",
+    "STATUS_CHANGE",
+    "monthly_amount",
+    "revenue_delta",
+]
@@ -0,0 +1,472 @@
+"""Streaming bulk import of CRM contacts (``users_web``) and accounts.
+
+Rows are read lazily from CSV or JSONL and applied in batches of
+``batch_size``.  A batch is normalized and merged in Python (rows sharing an
+email or a phone become one contact), written to the session's temporary
+table ``crm_import_batch`` and then resolved and applied with a fixed number
+of set-based statements, whatever the batch size:
+
+* existing contacts are matched by ``lower(email)``, then ``phone``, and only
+  their blank fields are filled in, as :meth:`CRMService.ensure_web_contact`
+  does;
+* missing contacts are created with one multi-row ``INSERT ... RETURNING``;
+* accounts are matched by contact and updated or created per contact, as
+  :meth:`CRMService.ensure_account` does.
+
+Invalid rows are reported with their line number and skipped.  When the
+service owns its session every batch commits, so an interrupted import keeps
+the batches already applied and can simply be re-run.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import logging
+import re
+from dataclasses import asdict, dataclass, field
+from itertools import islice
+from typing import Any, Awaitable, Callable, Iterable, Iterator, List, Optional, TextIO
+
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend import db
+from backend.models import CRMAccountType, WebUser
+from backend.services.crm_service import _normalize_phone
+
+logger = logging.getLogger(__name__)
+
+IMPORT_BATCH = 1000
+MAX_REPORTED_ERRORS = 1000
+_EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+_TAG_SPLIT_RE = re.compile(r"[;,]")
+
+
+@dataclass(frozen=True)
+class ImportRecord:
+    """One parsed input row; ``error`` is set when it could not be parsed."""
+
+    line: int
+    data: dict
+    error: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class RowError:
+    line: int
+    message: str
+
+
+@dataclass
+class ImportReport:
+    processed: int = 0
+    contacts_created: int = 0
+    contacts_updated: int = 0
+    accounts_created: int = 0
+    accounts_updated: int = 0
+    error_count: int = 0
+    errors: List[RowError] = field(default_factory=list)
+
+    def add_error(self, line: int, message: str) -> None:
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(RowError(line, message))
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+@dataclass
+class _Contact:
+    """Rows of one batch that resolve to the same contact."""
+
+    lines: List[int]
+    title: str
+    email: Optional[str]
+    phone: Optional[str]
+    full_name: Optional[str]
+    account_type: str
+    source: Optional[str]
+    tags: Optional[List[str]]
+
+    @property
+    def email_key(self) -> Optional[str]:
+        return self.email.lower() if self.email else None
+
+
+def read_csv(stream: TextIO) -> Iterator[ImportRecord]:
+    """Rows of a CSV file with a header line; column names are case-insensitive."""
+
+    reader = csv.DictReader(stream)
+    for row in reader:
+        data = {
+            key.strip().lower(): value
+            for key, value in row.items()
+            if key and value not in (None, "")
+        }
+        yield ImportRecord(reader.line_num, data)
+
+
+def read_jsonl(stream: TextIO) -> Iterator[ImportRecord]:
+    """One JSON object per line; blank lines are skipped."""
+
+    for line_no, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError as exc:
+            yield ImportRecord(line_no, {}, f"Некорректный JSON: {exc.msg}")
+            continue
+        if not isinstance(data, dict):
+            yield ImportRecord(line_no, {}, "Ожидается JSON-объект")
+            continue
+        yield ImportRecord(line_no, {str(k).lower(): v for k, v in data.items()})
+
+
+READERS: dict[str, Callable[[TextIO], Iterator[ImportRecord]]] = {
+    "csv": read_csv,
+    "jsonl": read_jsonl,
+}
+
+
+def _text(data: dict, key: str, limit: int) -> Optional[str]:
+    value = data.get(key)
+    if value is None:
+        return None
+    value = str(value).strip()
+    if len(value) > limit:
+        raise ValueError(f"Поле {key} длиннее {limit} символов")
+    return value or None
+
+
+def _tags(value: Any) -> Optional[List[str]]:
+    if value is None:
+        return None
+    items = value if isinstance(value, list) else _TAG_SPLIT_RE.split(str(value))
+    return [str(item).strip() for item in items if str(item).strip()]
+
+
+def normalize_record(record: ImportRecord) -> _Contact:
+    """Validate one row; raise ``ValueError`` with a user-facing message."""
+
+    data = record.data
+    email = _text(data, "email", 255)
+    if email and not _EMAIL_RE.match(email):
+        raise ValueError("Некорректный email")
+    phone = _normalize_phone(_text(data, "phone", 64))
+    if phone and not 5 <= sum(ch.isdigit() for ch in phone) <= 15:
+        raise ValueError("Некорректный телефон")
+    if not email and not phone:
+        raise ValueError("Нужно указать email или телефон")
+    full_name = _text(data, "full_name", 255)
+    account_type = _text(data, "account_type", 32) or CRMAccountType.person.value
+    if account_type not in CRMAccountType.__members__:
+        raise ValueError(f"Неизвестный тип аккаунта: {account_type}")
+    return _Contact(
+        lines=[record.line],
+        title=_text(data, "title", 255) or full_name or email or phone,
+        email=email,
+        phone=phone,
+        full_name=full_name,
+        account_type=account_type,
+        source=_text(data, "source", 64),
+        tags=_tags(data.get("tags")),
+    )
+
+
+def merge_contacts(contacts: Iterable[_Contact]) -> List[_Contact]:
+    """Collapse rows sharing an email or a phone into one contact.
+
+    Contact fields keep the first non-empty value (existing data is never
+    overwritten); account fields take the last row's value.
+    """
+
+    merged: List[_Contact] = []
+    by_email: dict[str, _Contact] = {}
+    by_phone: dict[str, _Contact] = {}
+    for row in contacts:
+        target = (by_email.get(row.email_key) if row.email_key else None) or (
+            by_phone.get(row.phone) if row.phone else None
+        )
+        if target is None:
+            target = row
+            merged.append(row)
+        else:
+            target.lines.extend(row.lines)
+            target.email = target.email or row.email
+            target.phone = target.phone or row.phone
+            target.full_name = target.full_name or row.full_name
+            target.title = row.title
+            target.account_type = row.account_type
+            target.source = row.source or target.source
+            target.tags = row.tags if row.tags is not None else target.tags
+        if target.email_key:
+            by_email.setdefault(target.email_key, target)
+        if target.phone:
+            by_phone.setdefault(target.phone, target)
+    return merged
+
+
+_CREATE_BATCH_TABLE_SQL = """
+CREATE TEMPORARY TABLE IF NOT EXISTS crm_import_batch (
+    grp integer PRIMARY KEY,
+    email text,
+    email_key text,
+    phone text,
+    full_name text,
+    title text NOT NULL,
+    account_type text NOT NULL,
+    source text,
+    tags varchar[],
+    user_id integer,
+    account_id bigint
+) ON COMMIT DELETE ROWS
+"""
+
+_INSERT_BATCH_SQL = """
+INSERT INTO crm_import_batch (grp, email, email_key, phone, full_name, title, account_type, source, tags)
+VALUES (:grp, :email, :email_key, :phone, :full_name, :title, :account_type, :source, :tags)
+"""
+
+_RESOLVE_USERS_SQL = """
+UPDATE crm_import_batch AS b
+SET user_id = coalesce(
+    (SELECT u.id FROM users_web AS u
+     WHERE b.email_key IS NOT NULL AND lower(u.email) = b.email_key
+     ORDER BY u.id LIMIT 1),
+    (SELECT u.id FROM users_web AS u
+     WHERE b.phone IS NOT NULL AND u.phone = b.phone
+     ORDER BY u.id LIMIT 1)
+)
+"""
+
+_FILL_USERS_SQL = """
+UPDATE users_web AS u
+SET email = coalesce(u.email, b.email),
+    phone = coalesce(u.phone, b.phone),
+    full_name = coalesce(u.full_name, b.full_name),
+    updated_at = now()
+FROM crm_import_batch AS b
+WHERE u.id = b.user_id
+  AND ((u.email IS NULL AND b.email IS NOT NULL)
+       OR (u.phone IS NULL AND b.phone IS NOT NULL)
+       OR (u.full_name IS NULL AND b.full_name IS NOT NULL))
+"""
+
+_RESOLVE_ACCOUNTS_SQL = """
+UPDATE crm_import_batch AS b
+SET account_id = (
+    SELECT a.id FROM crm_accounts AS a
+    WHERE a.web_user_id = b.user_id
+    ORDER BY a.id LIMIT 1
+)
+"""
+
+# Several contacts of a batch may resolve to one existing user: the last one
+# wins, like repeated ensure_account() calls.
+_UPDATE_ACCOUNTS_SQL = """
+WITH src AS (
+    SELECT DISTINCT ON (account_id)
+           account_id, title, CAST(account_type AS crm_account_type) AS account_type,
+           email, phone, source, tags
+    FROM crm_import_batch
+    WHERE account_id IS NOT NULL
+    ORDER BY account_id, grp DESC
+)
+UPDATE crm_accounts AS a
+SET title = src.title,
+    account_type = src.account_type,
+    email = coalesce(src.email, a.email),
+    phone = coalesce(src.phone, a.phone),
+    area_id = coalesce(CAST(:area_id AS integer), a.area_id),
+    project_id = coalesce(CAST(:project_id AS integer), a.project_id),
+    source = coalesce(src.source, a.source),
+    tags = coalesce(src.tags, a.tags),
+    updated_at = now()
+FROM src
+WHERE a.id = src.account_id
+  AND (a.title, a.account_type, a.email, a.phone, a.area_id, a.project_id, a.source, a.tags)
+      IS DISTINCT FROM
+      (src.title, src.account_type, coalesce(src.email, a.email), coalesce(src.phone, a.phone),
+       coalesce(CAST(:area_id AS integer), a.area_id), coalesce(CAST(:project_id AS integer), a.project_id),
+       coalesce(src.source, a.source), coalesce(src.tags, a.tags))
+"""
+
+_INSERT_ACCOUNTS_SQL = """
+INSERT INTO crm_accounts
+    (account_type, web_user_id, title, email, phone, area_id, project_id,
+     source, tags, context, created_at, updated_at)
+SELECT DISTINCT ON (user_id)
+       CAST(account_type AS crm_account_type), user_id, title, email, phone,
+       CAST(:area_id AS integer), CAST(:project_id AS integer), source,
+       coalesce(tags, '{}'), CAST('{}' AS json), now(), now()
+FROM crm_import_batch
+WHERE account_id IS NULL
+ORDER BY user_id, grp DESC
+"""
+
+
+class CRMImportService:
+    """Apply streamed contact/account rows in set-based batches."""
+
+    def __init__(
+        self,
+        session: Optional[AsyncSession] = None,
+        *,
+        batch_size: int = IMPORT_BATCH,
+    ) -> None:
+        self.session = session
+        self._external = session is not None
+        self.batch_size = batch_size
+
+    async def __aenter__(self) -> "CRMImportService":
+        if self.session is None:
+            self.session = db.async_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if not self._external and self.session is not None:
+            if exc_type is None:
+                await self.session.commit()
+            else:
+                await self.session.rollback()
+            await self.session.close()
+        if not self._external:
+            self.session = None
+
+    async def import_records(
+        self,
+        records: Iterable[ImportRecord],
+        *,
+        area_id: int | None,
+        project_id: int | None,
+        on_progress: Optional[Callable[[ImportReport], Awaitable[None]]] = None,
+    ) -> ImportReport:
+        if not area_id and not project_id:
+            raise ValueError("CRM-аккаунт требует area_id или project_id")
+        report = ImportReport()
+        rows = iter(records)
+        while batch := list(islice(rows, self.batch_size)):
+            await self._apply_batch(batch, report, area_id=area_id, project_id=project_id)
+            if not self._external:
+                await self.session.commit()
+            logger.info(
+                "crm import: %s rows processed, %s errors", report.processed, report.error_count
+            )
+            if on_progress is not None:
+                await on_progress(report)
+        return report
+
+    async def import_stream(
+        self,
+        stream: TextIO,
+        fmt: str,
+        *,
+        area_id: int | None,
+        project_id: int | None,
+        on_progress: Optional[Callable[[ImportReport], Awaitable[None]]] = None,
+    ) -> ImportReport:
+        try:
+            reader = READERS[fmt]
+        except KeyError:
+            raise ValueError(f"Неподдерживаемый формат: {fmt}") from None
+        return await self.import_records(
+            reader(stream), area_id=area_id, project_id=project_id, on_progress=on_progress
+        )
+
+    async def _apply_batch(
+        self,
+        batch: List[ImportRecord],
+        report: ImportReport,
+        *,
+        area_id: int | None,
+        project_id: int | None,
+    ) -> None:
+        report.processed += len(batch)
+        valid: List[_Contact] = []
+        for record in batch:
+            if record.error:
+                report.add_error(record.line, record.error)
+                continue
+            try:
+                valid.append(normalize_record(record))
+            except ValueError as exc:
+                report.add_error(record.line, str(exc))
+        contacts = merge_contacts(valid)
+        if not contacts:
+            return
+
+        session = self.session
+        await session.execute(sa.text(_CREATE_BATCH_TABLE_SQL))
+        await session.execute(sa.text("TRUNCATE crm_import_batch"))
+        await session.execute(
+            sa.text(_INSERT_BATCH_SQL),
+            [
+                {
+                    "grp": grp,
+                    "email": contact.email,
+                    "email_key": contact.email_key,
+                    "phone": contact.phone,
+                    "full_name": contact.full_name,
+                    "title": contact.title,
+                    "account_type": contact.account_type,
+                    "source": contact.source,
+                    "tags": contact.tags,
+                }
+                for grp, contact in enumerate(contacts)
+            ],
+        )
+        await session.execute(sa.text(_RESOLVE_USERS_SQL))
+        filled = await session.execute(sa.text(_FILL_USERS_SQL))
+        report.contacts_updated += max(filled.rowcount or 0, 0)
+
+        missing = (
+            await session.execute(
+                sa.text("SELECT grp FROM crm_import_batch WHERE user_id IS NULL ORDER BY grp")
+            )
+        ).scalars().all()
+        if missing:
+            created = await session.execute(
+                sa.insert(WebUser).returning(WebUser.id, sort_by_parameter_order=True),
+                [
+                    {
+                        "username": None,
+                        "password_hash": None,
+                        "email": contacts[grp].email,
+                        "phone": contacts[grp].phone,
+                        "full_name": contacts[grp].full_name,
+                    }
+                    for grp in missing
+                ],
+            )
+            await session.execute(
+                sa.text("UPDATE crm_import_batch SET user_id = :user_id WHERE grp = :grp"),
+                [
+                    {"grp": grp, "user_id": user_id}
+                    for grp, user_id in zip(missing, created.scalars().all(), strict=True)
+                ],
+            )
+            report.contacts_created += len(missing)
+
+        params = {"area_id": area_id, "project_id": project_id}
+        await session.execute(sa.text(_RESOLVE_ACCOUNTS_SQL))
+        updated = await session.execute(sa.text(_UPDATE_ACCOUNTS_SQL), params)
+        inserted = await session.execute(sa.text(_INSERT_ACCOUNTS_SQL), params)
+        report.accounts_updated += max(updated.rowcount or 0, 0)
+        report.accounts_created += max(inserted.rowcount or 0, 0)
+
+
+__all__ = [
+    "CRMImportService",
+    "IMPORT_BATCH",
+    "ImportRecord",
+    "ImportReport",
+    "READERS",
+    "RowError",
+    "merge_contacts",
+    "normalize_record",
+    "read_csv",
+    "read_jsonl",
+]
@@ -33,6 +33,7 @@ from backend.models import (
     UserProduct,
     WebUser,
 )
+from backend.services.crm_analytics import STATUS_CHANGE, CRMAnalyticsService
 from backend.services.profile_service import ProfileService, normalize_slug
 from backend.utils import utcnow
 
@@ -87,6 +88,21 @@ class CRMService:
         )
         return row.scalar_one_or_none()
 
+    async def product_id_by_slug(self, slug: str) -> Optional[int]:
+        """Product id only, without selectin-loading every ``user_links`` row."""
+
+        return await self.session.scalar(
+            select(Product.id).where(Product.slug == slug)
+        )
+
+    async def product_brief(self, product_id: int):
+        """``(id, slug, title)`` row of a product, or ``None``."""
+
+        row = await self.session.execute(
+            select(Product.id, Product.slug, Product.title).where(Product.id == product_id)
+        )
+        return row.one_or_none()
+
     async def ensure_product(
         self,
         *,
@@ -283,8 +299,8 @@ class CRMService:
                 if value is not None and getattr(product, attr) != value:
                     setattr(product, attr, value)
                     changed = True
-            if metadata is not None and product.config != metadata:
-                product.config = metadata
+            if context is not None and product.config != context:
+                product.config = context
                 changed = True
             if changed:
                 product.updated_at = utcnow()
@@ -299,7 +315,7 @@ class CRMService:
             kind=kind,
             area_id=area_id,
             project_id=project_id,
-            config=metadata or {},
+            config=context or {},
         )
         self.session.add(product)
         await self.session.flush()
@@ -563,9 +579,11 @@ class CRMService:
             area_id=area_id,
             project_id=project_id,
             context=context or {},
+            stage_entered_at=utcnow(),
         )
         self.session.add(deal)
         await self.session.flush()
+        await CRMAnalyticsService(self.session).on_deal_created(deal, at=deal.stage_entered_at)
         return deal
 
     async def move_deal_stage(
@@ -578,8 +596,12 @@ class CRMService:
         metadata_patch: Optional[dict] = None,
     ) -> CRMDeal:
         changed = False
+        now = utcnow()
+        previous_stage: tuple[int, datetime | None] | None = None
         if deal.stage_id != stage_id:
+            previous_stage = (deal.stage_id, deal.stage_entered_at)
             deal.stage_id = stage_id
+            deal.stage_entered_at = now
             changed = True
         if status and deal.status != status:
             deal.status = status
@@ -592,7 +614,12 @@ class CRMService:
             deal.context = {**current_context, **metadata_patch}
             changed = True
         if changed:
-            deal.updated_at = utcnow()
+            deal.updated_at = now
+        if previous_stage is not None:
+            from_stage_id, entered_at = previous_stage
+            await CRMAnalyticsService(self.session).on_deal_stage_changed(
+                deal, from_stage_id=from_stage_id, entered_at=entered_at, at=now
+            )
         return deal
 
     async def log_touchpoint(
@@ -636,7 +663,7 @@ class CRMService:
         project_id: int | None,
         status: CRMSubscriptionStatus = CRMSubscriptionStatus.active,
         activation_source: str | None = None,
-        metadata: Optional[dict] = None,
+        context: Optional[dict] = None,
     ) -> CRMSubscription:
         if not area_id and not project_id:
             raise ValueError("Подписка должна наследовать PARA-контекст")
@@ -649,10 +676,10 @@ class CRMService:
         row = await self.session.execute(stmt)
         subscription = row.scalar_one_or_none()
         if subscription:
-            changed = False
+            changed = status_changed = False
             if status and subscription.status != status:
                 subscription.status = status
-                changed = True
+                changed = status_changed = True
             if activation_source and subscription.activation_source != activation_source:
                 subscription.activation_source = activation_source
                 changed = True
@@ -667,6 +694,8 @@ class CRMService:
                 changed = True
             if changed:
                 subscription.updated_at = utcnow()
+            if status_changed:
+                await self._record_status_change(subscription)
             return subscription
 
         subscription = CRMSubscription(
@@ -682,8 +711,17 @@ class CRMService:
         )
         self.session.add(subscription)
         await self.session.flush()
+        await self._record_status_change(subscription)
         return subscription
 
+    async def _record_status_change(self, subscription: CRMSubscription) -> None:
+        await self.record_subscription_event(
+            subscription_id=subscription.id,
+            event_type=STATUS_CHANGE,
+            created_by=None,
+            details={"status": subscription.status.value},
+        )
+
     async def close_subscription(
         self,
         subscription: CRMSubscription,
@@ -703,7 +741,7 @@ class CRMService:
             subscription.context = {**current_context, **metadata_patch}
         await self.record_subscription_event(
             subscription_id=subscription.id,
-            event_type="status_change",
+            event_type=STATUS_CHANGE,
             created_by=actor_user_id,
             details={
                 "status": status.value,
@@ -720,14 +758,27 @@ class CRMService:
         created_by: int | None,
         details: Optional[dict] = None,
     ) -> CRMSubscriptionEvent:
+        """Append an event; ``status_change`` events also update revenue rollups."""
+
+        details = dict(details or {})
+        analytics: CRMAnalyticsService | None = None
+        subscription: CRMSubscription | None = None
+        if event_type == STATUS_CHANGE and details.get("status"):
+            subscription = await self.session.get(CRMSubscription, subscription_id)
+            if subscription is not None:
+                analytics = CRMAnalyticsService(self.session)
+                details = await analytics.status_change_details(subscription, details)
         event = CRMSubscriptionEvent(
             subscription_id=subscription_id,
             event_type=event_type,
-            details=details or {},
+            details=details,
             created_by=created_by,
+            occurred_at=utcnow(),
         )
         self.session.add(event)
         await self.session.flush()
+        if analytics is not None:
+            await analytics.on_subscription_status(subscription, details, at=event.occurred_at)
         return event
 
 
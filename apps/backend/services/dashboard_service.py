@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from datetime import UTC, datetime, timedelta
+from datetime import UTC, datetime, time, timedelta
 from typing import Any
 
 from pydantic import BaseModel, Field
@@ -17,6 +17,9 @@ from backend.services.time_service import TimeService
 from backend.utils import utcnow
 from backend.utils.habit_utils import calc_progress
 
+# Reminders and next events look this far ahead.
+AGENDA_HORIZON_DAYS = 30
+
 
 class DashboardProfile(BaseModel):
     """Primary identity block for the overview dashboard."""
@@ -218,10 +221,14 @@ async def build_dashboard_overview(user: WebUser) -> DashboardOverview:
 
         async with TaskService() as task_service:
             tasks = await task_service.list_tasks(owner_id=tg_id)
+        horizon = now + timedelta(days=AGENDA_HORIZON_DAYS)
+        day_start = datetime.combine(now.date(), time.min, tzinfo=now.tzinfo)
         async with AlarmService() as alarm_service:
-            alarms = await alarm_service.list_upcoming(owner_id=tg_id)
+            alarms = await alarm_service.list_upcoming(owner_id=tg_id, until=horizon)
         async with CalendarService() as calendar_service:
-            events = await calendar_service.list_events(owner_id=tg_id)
+            events = await calendar_service.list_events(
+                owner_id=tg_id, start_at=day_start, end_at=horizon
+            )
         async with TimeService() as time_service:
             entries = await time_service.list_entries(owner_id=tg_id)
         async with HabitService() as habit_service:
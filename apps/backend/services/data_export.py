@@ -0,0 +1,400 @@
+"""Per-owner export of PARA, habits and CRM data as NDJSON files in a ZIP.
+
+Every dataset is read through a server-side cursor (``yield_per``) and
+written row by row into a ZIP that is itself produced as a stream of byte
+chunks, so memory use does not depend on the size of the account.
+
+The archive is deterministic: rows are ordered by primary key, entries carry
+a fixed timestamp and ``manifest.json`` holds no wall-clock time.  The same
+data therefore always yields the same bytes and :meth:`fingerprint` (cheap
+aggregates per dataset) serves as its ETag.  The web route keeps the last
+archive of every user on disk under that ETag, which is what lets clients
+resume interrupted downloads with ``Range``/``If-Range``.
+
+With ``since`` only rows changed at or after that moment are exported for
+datasets that track changes; the others are always exported in full.  The
+manifest's ``next_since`` is the value to pass for the next incremental
+backup.  Deletions are not part of incremental exports.
+"""
+
+from __future__ import annotations
+
+import base64
+import enum
+import hashlib
+import json
+import os
+import tempfile
+import uuid
+import zipfile
+from dataclasses import dataclass
+from datetime import UTC, date, datetime
+from decimal import Decimal
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Optional
+
+import sqlalchemy as sa
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from backend import db
+from backend.models import (
+    Alarm,
+    Area,
+    CalendarEvent,
+    CalendarItem,
+    CRMAccount,
+    CRMDeal,
+    CRMSubscription,
+    CRMSubscriptionEvent,
+    CRMTouchpoint,
+    Daily,
+    DailyLog,
+    Habit,
+    HabitLog,
+    Note,
+    Project,
+    Resource,
+    Reward,
+    Task,
+    TaskReminder,
+    TimeEntry,
+    UserStats,
+    WebUser,
+)
+
+if TYPE_CHECKING:
+    from backend.auth.owner import OwnerCtx
+
+EXPORT_FORMAT = 1
+EXPORT_CHUNK = 500
+_FLUSH_BYTES = 64 * 1024
+_ZIP_DATE = (1980, 1, 1, 0, 0, 0)
+
+
+@dataclass(frozen=True)
+class ExportOwner:
+    """Whose data to export.
+
+    ``owner_id`` keys PARA and habits rows (Telegram id, or ``-web_user_id``
+    for accounts without Telegram, see :func:`backend.auth.owner.get_current_owner`);
+    CRM rows are keyed by ``web_user_id``.
+    """
+
+    owner_id: int
+    web_user_id: int
+
+    @classmethod
+    def from_ctx(cls, ctx: "OwnerCtx") -> "ExportOwner":
+        return cls(owner_id=ctx.owner_id, web_user_id=ctx.web_user_id)
+
+
+@dataclass(frozen=True)
+class Dataset:
+    name: str
+    table: sa.Table
+    owned: Callable[[ExportOwner], sa.ColumnElement[bool]]
+    # Column compared with ``since``; ``None`` exports the dataset in full.
+    changed: Optional[str] = "updated_at"
+
+
+def _by_owner(model) -> Callable[[ExportOwner], sa.ColumnElement[bool]]:
+    return lambda owner: model.owner_id == owner.owner_id
+
+
+DATASETS: tuple[Dataset, ...] = (
+    Dataset("areas", Area.__table__, _by_owner(Area)),
+    Dataset("projects", Project.__table__, _by_owner(Project)),
+    Dataset("tasks", Task.__table__, _by_owner(Task)),
+    Dataset("task_reminders", TaskReminder.__table__, _by_owner(TaskReminder)),
+    Dataset("notes", Note.__table__, _by_owner(Note)),
+    Dataset("resources", Resource.__table__, _by_owner(Resource)),
+    Dataset("time_entries", TimeEntry.__table__, _by_owner(TimeEntry)),
+    Dataset("calendar_items", CalendarItem.__table__, _by_owner(CalendarItem)),
+    Dataset(
+        "alarms",
+        Alarm.__table__,
+        lambda owner: Alarm.item_id.in_(
+            select(CalendarItem.id).where(CalendarItem.owner_id == owner.owner_id)
+        ),
+    ),
+    Dataset("calendar_events", CalendarEvent.__table__, _by_owner(CalendarEvent)),
+    Dataset("habits", Habit.__table__, _by_owner(Habit), changed=None),
+    Dataset("habit_logs", HabitLog.__table__, _by_owner(HabitLog), changed="at"),
+    Dataset("dailies", Daily.__table__, _by_owner(Daily), changed=None),
+    Dataset("daily_logs", DailyLog.__table__, _by_owner(DailyLog), changed="date"),
+    Dataset("rewards", Reward.__table__, _by_owner(Reward), changed=None),
+    Dataset("user_stats", UserStats.__table__, _by_owner(UserStats), changed=None),
+    Dataset(
+        "crm_accounts",
+        CRMAccount.__table__,
+        lambda owner: CRMAccount.web_user_id == owner.web_user_id,
+    ),
+    Dataset(
+        "crm_deals",
+        CRMDeal.__table__,
+        lambda owner: CRMDeal.owner_id == owner.web_user_id,
+    ),
+    Dataset(
+        "crm_touchpoints",
+        CRMTouchpoint.__table__,
+        lambda owner: CRMTouchpoint.deal_id.in_(
+            select(CRMDeal.id).where(CRMDeal.owner_id == owner.web_user_id)
+        ),
+        changed="created_at",
+    ),
+    Dataset(
+        "crm_subscriptions",
+        CRMSubscription.__table__,
+        lambda owner: CRMSubscription.web_user_id == owner.web_user_id,
+        # No updated_at: status transitions are only visible in full.
+        changed=None,
+    ),
+    Dataset(
+        "crm_subscription_events",
+        CRMSubscriptionEvent.__table__,
+        lambda owner: CRMSubscriptionEvent.subscription_id.in_(
+            select(CRMSubscription.id).where(CRMSubscription.web_user_id == owner.web_user_id)
+        ),
+        changed="occurred_at",
+    ),
+)
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return (value if value.tzinfo else value.replace(tzinfo=UTC)).isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, (Decimal, uuid.UUID)):
+        return str(value)
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (bytes, memoryview)):
+        return base64.b64encode(bytes(value)).decode()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _since_bound(column: sa.Column, since: datetime) -> Any:
+    """``since`` in the column's own type (naive UTC, aware or a date)."""
+
+    since = since if since.tzinfo else since.replace(tzinfo=UTC)
+    if isinstance(column.type, sa.Date) and not isinstance(column.type, sa.DateTime):
+        return since.astimezone(UTC).date()
+    if not getattr(column.type, "timezone", False):
+        return since.astimezone(UTC).replace(tzinfo=None)
+    return since
+
+
+class _ChunkSink:
+    """Write-only file object collecting the bytes ``zipfile`` produces.
+
+    Without ``tell``/``seek`` ``zipfile`` streams entries with data
+    descriptors instead of rewriting local headers.
+    """
+
+    def __init__(self) -> None:
+        self._parts: list[bytes] = []
+        self.size = 0
+
+    def write(self, data: bytes) -> int:
+        self._parts.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def take(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        self.size = 0
+        return data
+
+
+class DataExportService:
+    """Build streamed per-owner export archives."""
+
+    def __init__(self, session: Optional[AsyncSession] = None) -> None:
+        self.session = session
+        self._external = session is not None
+
+    async def __aenter__(self) -> "DataExportService":
+        if self.session is None:
+            self.session = db.async_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if not self._external and self.session is not None:
+            await self.session.close()
+        if not self._external:
+            self.session = None
+
+    async def owner_for_web_user(self, web_user_id: int) -> Optional[ExportOwner]:
+        user = await self.session.scalar(
+            select(WebUser)
+            .options(selectinload(WebUser.telegram_accounts))
+            .where(WebUser.id == web_user_id)
+        )
+        if user is None:
+            return None
+        tg_user = user.telegram_accounts[0] if user.telegram_accounts else None
+        owner_id = tg_user.telegram_id if tg_user else -user.id
+        return ExportOwner(owner_id=owner_id, web_user_id=user.id)
+
+    @staticmethod
+    def _where(dataset: Dataset, owner: ExportOwner, since: Optional[datetime]) -> list:
+        clauses = [dataset.owned(owner)]
+        if since is not None and dataset.changed:
+            column = dataset.table.c[dataset.changed]
+            clauses.append(column >= _since_bound(column, since))
+        return clauses
+
+    async def fingerprint(self, owner: ExportOwner, since: Optional[datetime] = None) -> str:
+        """Hash identifying the archive these arguments produce right now.
+
+        Datasets tracking changes contribute row count, max key and max change
+        time; the small full datasets contribute a hash of their rows.
+        """
+
+        digest = hashlib.sha256(
+            f"{EXPORT_FORMAT}:{owner.owner_id}:{owner.web_user_id}:"
+            f"{since.isoformat() if since else ''}".encode()
+        )
+        for dataset in DATASETS:
+            table = dataset.table
+            pk = list(table.primary_key.columns)
+            columns: list = [sa.func.count(), *(sa.func.max(col) for col in pk)]
+            if dataset.changed:
+                columns.append(sa.func.max(table.c[dataset.changed]))
+            else:
+                columns.append(
+                    sa.func.md5(
+                        sa.func.string_agg(
+                            sa.cast(sa.literal_column(table.name), sa.Text),
+                            aggregate_order_by(sa.literal("\n"), *pk),
+                        )
+                    )
+                )
+            row = (
+                await self.session.execute(
+                    select(*columns)
+                    .select_from(table)
+                    .where(*self._where(dataset, owner, since))
+                )
+            ).one()
+            digest.update(f"|{dataset.name}:{json.dumps(list(row), default=_json_default)}".encode())
+        return digest.hexdigest()[:32]
+
+    async def iter_archive(
+        self,
+        owner: ExportOwner,
+        since: Optional[datetime] = None,
+    ) -> AsyncIterator[bytes]:
+        """Yield the ZIP archive in chunks of roughly 64 KiB."""
+
+        sink = _ChunkSink()
+        manifest: dict[str, Any] = {
+            "format": EXPORT_FORMAT,
+            "owner_id": owner.owner_id,
+            "web_user_id": owner.web_user_id,
+            "since": _json_default(since) if since else None,
+            "next_since": None,
+            "datasets": {},
+        }
+        next_since: Optional[datetime] = None
+        with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for dataset in DATASETS:
+                table = dataset.table
+                info = zipfile.ZipInfo(f"{dataset.name}.ndjson", date_time=_ZIP_DATE)
+                info.compress_type = zipfile.ZIP_DEFLATED
+                rows = 0
+                stmt = (
+                    select(table)
+                    .where(*self._where(dataset, owner, since))
+                    .order_by(*table.primary_key.columns)
+                    .execution_options(yield_per=EXPORT_CHUNK)
+                )
+                with archive.open(info, "w", force_zip64=True) as entry:
+                    result = await self.session.stream(stmt)
+                    async for row in result:
+                        data = row._asdict()
+                        entry.write(
+                            json.dumps(data, default=_json_default, ensure_ascii=False).encode()
+                        )
+                        entry.write(b"\n")
+                        rows += 1
+                        changed = data.get(dataset.changed) if dataset.changed else None
+                        if isinstance(changed, datetime):
+                            changed = changed if changed.tzinfo else changed.replace(tzinfo=UTC)
+                            if next_since is None or changed > next_since:
+                                next_since = changed
+                        if sink.size >= _FLUSH_BYTES:
+                            yield sink.take()
+                manifest["datasets"][dataset.name] = {
+                    "rows": rows,
+                    "mode": "incremental" if since is not None and dataset.changed else "full",
+                }
+            manifest["next_since"] = _json_default(next_since) if next_since else manifest["since"]
+            info = zipfile.ZipInfo("manifest.json", date_time=_ZIP_DATE)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            archive.writestr(info, json.dumps(manifest, ensure_ascii=False, indent=2))
+        yield sink.take()
+
+    async def write_archive(
+        self,
+        owner: ExportOwner,
+        path: Path,
+        since: Optional[datetime] = None,
+    ) -> None:
+        async for _ in tee_to_file(self.iter_archive(owner, since), path):
+            pass
+
+
+async def tee_to_file(chunks: AsyncIterator[bytes], path: Path) -> AsyncIterator[bytes]:
+    """Pass ``chunks`` through while saving them; ``path`` appears only when complete."""
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(f".{path.name}.{uuid.uuid4().hex}.part")
+    try:
+        with partial.open("wb") as fh:
+            async for chunk in chunks:
+                fh.write(chunk)
+                yield chunk
+        os.replace(partial, path)
+    finally:
+        partial.unlink(missing_ok=True)
+        aclose = getattr(chunks, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+
+def export_dir() -> Path:
+    return Path(os.getenv("DATA_EXPORT_DIR") or Path(tempfile.gettempdir()) / "intdata-exports")
+
+
+def cached_archive_path(owner: ExportOwner, etag: str) -> Path:
+    return export_dir() / f"{owner.web_user_id}-{etag}.zip"
+
+
+def prune_cached_archives(owner: ExportOwner, keep: Path) -> None:
+    """Drop older archives of ``owner``; only the latest one can be resumed."""
+
+    for path in export_dir().glob(f"{owner.web_user_id}-*.zip"):
+        if path != keep:
+            path.unlink(missing_ok=True)
+
+
+__all__ = [
+    "DATASETS",
+    "DataExportService",
+    "Dataset",
+    "EXPORT_FORMAT",
+    "ExportOwner",
+    "cached_archive_path",
+    "export_dir",
+    "prune_cached_archives",
+    "tee_to_file",
+]
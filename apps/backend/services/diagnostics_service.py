@@ -3,10 +3,11 @@ from __future__ import annotations
 
 import re
 import secrets
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Any, Optional, Sequence
 
-from sqlalchemy import Select, func, select
+from sqlalchemy import Select, func, select, true, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -15,16 +16,38 @@ from backend.db import bcrypt
 from backend.models import (
     DiagnosticClient,
     DiagnosticResult,
+    DiagnosticTemplate,
     WebUser,
 )
 from backend.services.access_control import AccessControlService, AccessScope
 from backend.services.web_user_service import WebUserService
 from backend.utils import utcnow
+from backend.utils.cursor import decode_cursor, encode_cursor
 
 USERNAME_SANITIZE_RE = re.compile(r"[^a-z0-9]+")
 DEFAULT_CLIENT_USERNAME_PREFIX = "diagnostic"
 
 
+@dataclass(slots=True)
+class DiagnosticClientSummary:
+    """Listing row of a client: no result payloads, only the latest result."""
+
+    id: int
+    specialist_id: Optional[int]
+    full_name: Optional[str]
+    email: Optional[str]
+    phone: Optional[str]
+    is_new: bool
+    in_archive: bool
+    contact_permission: bool
+    last_result_at: Optional[datetime]
+    created_at: Optional[datetime]
+    results_count: int
+    latest_submitted_at: Optional[datetime]
+    latest_diagnostic_id: Optional[int]
+    latest_title: Optional[str]
+
+
 class DiagnosticsService:
     """Diagnostics domain operations wrapper."""
 
@@ -165,7 +188,7 @@ class DiagnosticsService:
             user.username = login
             user.email = login
         if password:
-            user.password_hash = bcrypt.generate_password_hash(password)
+            user.password_hash = await bcrypt.hash(password)
         display_parts = [part for part in (name, surname) if part]
         if display_parts:
             user.full_name = " ".join(display_parts)
@@ -211,6 +234,107 @@ class DiagnosticsService:
         rows = await self.session.execute(stmt)
         return rows.scalars().all()
 
+    async def client_page(
+        self,
+        actor: WebUser,
+        *,
+        include_all: bool = False,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        archived: Optional[bool] = None,
+    ) -> tuple[list[DiagnosticClientSummary], Optional[str]]:
+        """One keyset page of clients, newest first, as summary rows.
+
+        The latest result and the result count come from LATERAL subqueries
+        over ``ix_diagnostic_results_client``; payloads are never loaded.
+        Raises ``ValueError`` for a malformed ``cursor``.
+        """
+
+        latest = (
+            select(
+                DiagnosticResult.submitted_at.label("submitted_at"),
+                DiagnosticResult.diagnostic_id.label("diagnostic_id"),
+                DiagnosticTemplate.title.label("title"),
+            )
+            .outerjoin(
+                DiagnosticTemplate,
+                DiagnosticTemplate.id == DiagnosticResult.diagnostic_id,
+            )
+            .where(DiagnosticResult.client_id == DiagnosticClient.id)
+            .order_by(DiagnosticResult.submitted_at.desc(), DiagnosticResult.id.desc())
+            .limit(1)
+            .lateral("latest")
+        )
+        stats = (
+            select(func.count().label("results_count"))
+            .where(DiagnosticResult.client_id == DiagnosticClient.id)
+            .lateral("stats")
+        )
+        stmt = (
+            select(
+                DiagnosticClient.id,
+                DiagnosticClient.specialist_id,
+                WebUser.full_name,
+                WebUser.email,
+                WebUser.phone,
+                DiagnosticClient.is_new,
+                DiagnosticClient.in_archive,
+                DiagnosticClient.contact_permission,
+                DiagnosticClient.last_result_at,
+                DiagnosticClient.created_at,
+                stats.c.results_count,
+                latest.c.submitted_at,
+                latest.c.diagnostic_id,
+                latest.c.title,
+            )
+            .outerjoin(WebUser, WebUser.id == DiagnosticClient.user_id)
+            .outerjoin(latest, true())
+            .join(stats, true())
+            .order_by(DiagnosticClient.created_at.desc(), DiagnosticClient.id.desc())
+            .limit(limit + 1)
+        )
+        if not include_all:
+            stmt = stmt.where(DiagnosticClient.specialist_id == actor.id)
+        if archived is not None:
+            stmt = stmt.where(DiagnosticClient.in_archive.is_(archived))
+        if cursor:
+            payload = decode_cursor(cursor)
+            try:
+                created_raw, last_id = payload["k"]
+                created_at = datetime.fromisoformat(created_raw)
+                last_id = int(last_id)
+            except (KeyError, TypeError, ValueError) as exc:
+                raise ValueError("Invalid cursor") from exc
+            stmt = stmt.where(
+                tuple_(DiagnosticClient.created_at, DiagnosticClient.id)
+                < tuple_(created_at, last_id)
+            )
+        rows = (await self.session.execute(stmt)).all()
+        items = [
+            DiagnosticClientSummary(
+                id=row[0],
+                specialist_id=row[1],
+                full_name=row[2],
+                email=row[3],
+                phone=row[4],
+                is_new=bool(row[5]),
+                in_archive=bool(row[6]),
+                contact_permission=bool(row[7]),
+                last_result_at=row[8],
+                created_at=row[9],
+                results_count=int(row[10] or 0),
+                latest_submitted_at=row[11],
+                latest_diagnostic_id=row[12],
+                latest_title=row[13],
+            )
+            for row in rows[:limit]
+        ]
+        next_cursor = None
+        if len(rows) > limit and items:
+            last = items[-1]
+            next_cursor = encode_cursor({"k": [last.created_at, last.id]})
+        return items, next_cursor
+
     async def get_client(
         self,
         client_id: int,
@@ -372,4 +496,4 @@ class DiagnosticsService:
         return default or utcnow()
 
 
-__all__ = ["DiagnosticsService"]
+__all__ = ["DiagnosticClientSummary", "DiagnosticsService"]
@@ -0,0 +1,262 @@
+"""Transactional e-mail outbox.
+
+Request handlers only call :meth:`EmailOutboxService.enqueue`, which inserts
+a row into ``email_outbox`` inside the caller's transaction.  Delivery is
+done by :class:`backend.services.email_outbox_worker.EmailOutboxWorker`
+through :class:`SmtpSender`, so SMTP latency never reaches the response.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+import smtplib
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from email.message import EmailMessage
+from typing import Optional, Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend import db
+from backend.models import EmailOutbox
+from backend.utils import utcnow
+
+logger = logging.getLogger(__name__)
+
+STATUS_PENDING = "pending"
+STATUS_SENT = "sent"
+STATUS_FAILED = "failed"
+
+# A claimed row is not due again for this long, so another worker only picks
+# it up if the claiming one died while sending.
+CLAIM_LEASE = timedelta(minutes=5)
+_TOKEN_RE = re.compile(r"(token=)[^&\s]+")
+
+
+def dedupe_window() -> int:
+    return int(os.getenv("EMAIL_DEDUPE_WINDOW", "300"))
+
+
+def retry_delay(attempts: int, *, base: float = 30.0, cap: float = 3600.0) -> timedelta:
+    """Exponential backoff: 30s, 60s, 120s, ... capped at one hour."""
+
+    return timedelta(seconds=min(base * (2 ** max(attempts - 1, 0)), cap))
+
+
+@dataclass(frozen=True)
+class OutgoingEmail:
+    id: int
+    to_address: str
+    subject: str
+    body: str
+
+
+class SmtpSender:
+    """Send batches of e-mails over a single SMTP connection.
+
+    When SMTP is not configured the messages are dropped and only logged at
+    DEBUG, with ``token=`` values redacted: bodies carry live login links.
+    """
+
+    def __init__(
+        self,
+        host: str | None,
+        port: int = 587,
+        *,
+        user: str | None = None,
+        password: str | None = None,
+        sender: str | None = None,
+        starttls: bool = True,
+        timeout: float = 30.0,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.sender = sender or user
+        self.starttls = starttls
+        self.timeout = timeout
+
+    @classmethod
+    def from_env(cls) -> "SmtpSender":
+        return cls(
+            os.getenv("SMTP_HOST"),
+            int(os.getenv("SMTP_PORT", "587")),
+            user=os.getenv("SMTP_USER"),
+            password=os.getenv("SMTP_PASSWORD"),
+            sender=os.getenv("EMAIL_FROM"),
+            starttls=os.getenv("SMTP_STARTTLS", "1") == "1",
+        )
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.host and self.sender)
+
+    def send_batch(self, messages: Sequence[OutgoingEmail]) -> dict[int, str | None]:
+        """Send ``messages``; return ``{id: error or None}``."""
+
+        if not self.configured:
+            for msg in messages:
+                logger.debug(
+                    "[email] SMTP not configured, to %s: %s",
+                    msg.to_address,
+                    _TOKEN_RE.sub(r"\1<redacted>", msg.body),
+                )
+            return {msg.id: None for msg in messages}
+
+        results: dict[int, str | None] = {}
+        try:
+            with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+                smtp.ehlo()
+                if self.starttls and smtp.has_extn("starttls"):
+                    smtp.starttls()
+                    smtp.ehlo()
+                if self.user and self.password:
+                    smtp.login(self.user, self.password)
+                for msg in messages:
+                    try:
+                        smtp.send_message(self._build(msg))
+                        results[msg.id] = None
+                    except smtplib.SMTPException as exc:
+                        results[msg.id] = str(exc) or exc.__class__.__name__
+        except (OSError, smtplib.SMTPException) as exc:
+            error = str(exc) or exc.__class__.__name__
+            for msg in messages:
+                results.setdefault(msg.id, error)
+        return results
+
+    def _build(self, msg: OutgoingEmail) -> EmailMessage:
+        email = EmailMessage()
+        email["Subject"] = msg.subject
+        email["From"] = self.sender
+        email["To"] = msg.to_address
+        email.set_content(msg.body)
+        return email
+
+
+class EmailOutboxService:
+    """Enqueue and claim rows of ``email_outbox``."""
+
+    def __init__(self, session: Optional[AsyncSession] = None) -> None:
+        self.session = session
+        self._external = session is not None
+
+    async def __aenter__(self) -> "EmailOutboxService":
+        if self.session is None:
+            self.session = db.async_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if not self._external:
+            if exc_type is None:
+                await self.session.commit()
+            else:
+                await self.session.rollback()
+            await self.session.close()
+
+    async def enqueue(
+        self,
+        to_address: str,
+        subject: str,
+        body: str,
+        *,
+        kind: str = "generic",
+        window: int | None = None,
+    ) -> bool:
+        """Queue an e-mail; return ``False`` if deduplicated.
+
+        Only one e-mail of a ``kind`` per address is queued within ``window``
+        seconds (``EMAIL_DEDUPE_WINDOW``); ``window=0`` disables dedupe.
+        """
+
+        window = dedupe_window() if window is None else window
+        address = to_address.strip()
+        dedupe_key = None
+        if window > 0:
+            bucket = int(time.time() // window)
+            dedupe_key = f"{kind}:{address.lower()}:{bucket}"
+        stmt = (
+            pg_insert(EmailOutbox)
+            .values(
+                to_address=address,
+                subject=subject,
+                body=body,
+                kind=kind,
+                dedupe_key=dedupe_key,
+                status=STATUS_PENDING,
+                attempts=0,
+                next_attempt_at=utcnow(),
+            )
+            .on_conflict_do_nothing(index_elements=[EmailOutbox.dedupe_key])
+        )
+        res = await self.session.execute(stmt)
+        return bool(res.rowcount)
+
+    async def claim_due(self, limit: int) -> list[EmailOutbox]:
+        """Claim up to ``limit`` due rows for :data:`CLAIM_LEASE`.
+
+        The rows are locked (concurrent workers skip them) and pushed out of
+        the due set; the caller commits the claim before sending, so no
+        transaction stays open over SMTP.
+        """
+
+        res = await self.session.execute(
+            sa.select(EmailOutbox)
+            .where(
+                EmailOutbox.status == STATUS_PENDING,
+                EmailOutbox.next_attempt_at <= utcnow(),
+            )
+            .order_by(EmailOutbox.next_attempt_at, EmailOutbox.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        rows = list(res.scalars().all())
+        lease_until = utcnow() + CLAIM_LEASE
+        for row in rows:
+            row.next_attempt_at = lease_until
+        return rows
+
+    @staticmethod
+    def apply_result(
+        row: EmailOutbox, error: str | None, *, max_attempts: int
+    ) -> None:
+        now = utcnow()
+        if error is None:
+            row.status = STATUS_SENT
+            row.sent_at = now
+            row.last_error = None
+            return
+        row.attempts = (row.attempts or 0) + 1
+        row.last_error = error[:1000]
+        if row.attempts >= max_attempts:
+            row.status = STATUS_FAILED
+        else:
+            row.next_attempt_at = now + retry_delay(row.attempts)
+
+
+async def enqueue_magic_email(
+    email: str, link: str, *, session: Optional[AsyncSession] = None
+) -> bool:
+    """Queue a magic login link for ``email``."""
+
+    async with EmailOutboxService(session) as outbox:
+        return await outbox.enqueue(
+            email,
+            "Magic login link",
+            f"Click the link to sign in: {link}",
+            kind="magic",
+        )
+
+
+__all__ = [
+    "EmailOutboxService",
+    "OutgoingEmail",
+    "SmtpSender",
+    "enqueue_magic_email",
+    "retry_delay",
+]
@@ -0,0 +1,91 @@
+"""Polling worker delivering queued e-mails from ``email_outbox``."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+
+from backend import db
+from backend.health import Heartbeat
+from backend.services.email_outbox import (
+    EmailOutboxService,
+    OutgoingEmail,
+    SmtpSender,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class EmailOutboxWorker:
+    """Background loop sending e-mails in batches with retry and backoff."""
+
+    def __init__(
+        self,
+        poll_interval: float = 2.0,
+        *,
+        batch_size: int = 50,
+        max_attempts: int = 6,
+        sender: SmtpSender | None = None,
+    ) -> None:
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.sender = sender or SmtpSender.from_env()
+        self.heartbeat = Heartbeat("email_outbox", poll_interval)
+
+    async def run_once(self) -> int:
+        """Send one batch; return the number of rows processed."""
+
+        async with db.async_session() as session:
+            outbox = EmailOutboxService(session)
+            rows = await outbox.claim_due(self.batch_size)
+            if not rows:
+                return 0
+            messages = [
+                OutgoingEmail(row.id, row.to_address, row.subject, row.body)
+                for row in rows
+            ]
+            # Release the row locks before talking to SMTP.
+            await session.commit()
+            results = await asyncio.to_thread(self.sender.send_batch, messages)
+            for row in rows:
+                outbox.apply_result(
+                    row, results.get(row.id, "not sent"), max_attempts=self.max_attempts
+                )
+            await session.commit()
+            failed = sum(1 for err in results.values() if err)
+            if failed:
+                logger.warning("email outbox: %s of %s sends failed", failed, len(rows))
+            return len(rows)
+
+    async def start(self, stop_event: asyncio.Event | None = None) -> None:
+        while True:
+            try:
+                processed = await self.run_once()
+            except Exception:
+                logger.exception("email outbox iteration failed")
+                processed = 0
+            else:
+                await self.heartbeat.beat()
+            stopping = stop_event is not None and stop_event.is_set()
+            if processed >= self.batch_size and not stopping:
+                continue  # backlog: drain without sleeping
+            if stop_event is None:
+                await asyncio.sleep(self.poll_interval)
+            else:
+                try:
+                    await asyncio.wait_for(stop_event.wait(), timeout=self.poll_interval)
+                    break
+                except asyncio.TimeoutError:
+                    continue
+
+
+def is_outbox_worker_enabled() -> bool:
+    """Флаг включения из окружения (по умолчанию включён)."""
+
+    return str(os.getenv("EMAIL_OUTBOX_WORKER", "1")).lower() in {
+        "1",
+        "true",
+        "yes",
+    }
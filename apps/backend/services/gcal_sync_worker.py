@@ -0,0 +1,57 @@
+"""Polling worker syncing every linked Google calendar."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+
+from backend.health import Heartbeat
+from backend.services.sync_gcal import GCalSyncService
+
+logger = logging.getLogger(__name__)
+
+
+class GCalSyncWorker:
+    """Run an incremental sync of all Google Calendar links periodically."""
+
+    def __init__(self, poll_interval: float = 300.0) -> None:
+        self.poll_interval = poll_interval
+        self.heartbeat = Heartbeat("gcal_sync", poll_interval)
+
+    @classmethod
+    def from_env(cls) -> "GCalSyncWorker":
+        return cls(poll_interval=float(os.getenv("GCAL_SYNC_INTERVAL", "300")))
+
+    async def run_once(self) -> int:
+        results = await GCalSyncService().sync_all()
+        changed = sum(r.upserted + r.cancelled for r in results)
+        if changed:
+            logger.info("gcal sync: %s links, %s changed items", len(results), changed)
+        return changed
+
+    async def start(self, stop_event: asyncio.Event | None = None) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("gcal sync round failed")
+            await self.heartbeat.beat()
+            if stop_event is None:
+                await asyncio.sleep(self.poll_interval)
+            else:
+                try:
+                    await asyncio.wait_for(stop_event.wait(), timeout=self.poll_interval)
+                    break
+                except asyncio.TimeoutError:
+                    continue
+
+
+def is_gcal_sync_enabled() -> bool:
+    """Флаг включения из окружения (по умолчанию выключен)."""
+
+    return str(os.getenv("GCAL_SYNC_WORKER", "0")).lower() in {
+        "1",
+        "true",
+        "yes",
+    }
@@ -4,10 +4,11 @@ from __future__ import annotations
 
 from collections import defaultdict
 from dataclasses import dataclass
-from datetime import date, datetime, timedelta
-from typing import Any, Dict, List, Optional, Sequence
+from datetime import UTC, date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 
-from sqlalchemy import Select, func, select
+from sqlalchemy import Select, cast, func, select, tuple_
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend import db
@@ -15,15 +16,21 @@ from backend.models import (
     Group,
     GroupActivityDaily,
     GroupRemovalLog,
+    Product,
     ProductStatus,
     TgUser,
     UserGroup,
     UserProduct,
 )
 from backend.utils import utcnow
+from backend.utils.cursor import decode_cursor, encode_cursor
 
 from .crm_service import CRMService
 
+MEMBER_SORTS = ("joined", "activity")
+# Stand-in for a missing ``joined_at`` so the keyset stays totally ordered.
+_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+
 
 @dataclass(slots=True)
 class ActivityTotals:
@@ -320,6 +327,277 @@ class GroupModerationService:
         result = await self.session.execute(stmt)
         return result.scalars().all()
 
+    # ------------------------------------------------------------------
+    # Paginated roster, history and product summaries
+    # ------------------------------------------------------------------
+    def _activity_subquery(self, group_id: int, since: date):
+        return (
+            select(
+                GroupActivityDaily.user_id.label("user_id"),
+                func.sum(GroupActivityDaily.messages_count).label("messages"),
+                func.sum(GroupActivityDaily.reactions_count).label("reactions"),
+                func.max(GroupActivityDaily.last_activity_at).label("last_activity"),
+            )
+            .where(
+                GroupActivityDaily.group_id == group_id,
+                GroupActivityDaily.activity_date >= since,
+            )
+            .group_by(GroupActivityDaily.user_id)
+            .subquery("activity")
+        )
+
+    @staticmethod
+    def _decode_keyset(
+        cursor: str, kind: str, parse: Callable[[Any], Any]
+    ) -> Tuple[Any, int]:
+        """``(parse(value), id)`` from a keyset cursor of ``kind``.
+
+        Cursors come back from clients, so every malformed or tampered
+        payload is reported as ``ValueError``.
+        """
+
+        payload = decode_cursor(cursor)
+        if (
+            not isinstance(payload, dict)
+            or payload.get("s") != kind
+            or not isinstance(payload.get("k"), list)
+            or len(payload["k"]) != 2
+        ):
+            raise ValueError("Invalid cursor")
+        value, after_id = payload["k"]
+        if not isinstance(after_id, int) or isinstance(after_id, bool):
+            raise ValueError("Invalid cursor")
+        try:
+            return parse(value), after_id
+        except (TypeError, ValueError) as exc:
+            raise ValueError("Invalid cursor") from exc
+
+    async def member_products_summary(
+        self, user_ids: Sequence[int]
+    ) -> Dict[int, List[Any]]:
+        """Product links of ``user_ids`` with product slug/title, as rows.
+
+        Column select on purpose: loading ``UserProduct`` entities joins
+        ``Product``, whose ``user_links`` are selectin-loaded in full.
+        """
+
+        if not user_ids:
+            return {}
+        rows = await self.session.execute(
+            select(
+                UserProduct.user_id,
+                UserProduct.product_id,
+                Product.slug.label("product_slug"),
+                Product.title.label("product_title"),
+                UserProduct.status,
+                UserProduct.source,
+                UserProduct.acquired_at,
+                UserProduct.notes,
+            )
+            .join(Product, Product.id == UserProduct.product_id)
+            .where(UserProduct.user_id.in_(user_ids))
+            .order_by(UserProduct.user_id, Product.title)
+        )
+        grouped: Dict[int, List[Any]] = defaultdict(list)
+        for row in rows:
+            grouped[row.user_id].append(row)
+        return grouped
+
+    async def member_page(
+        self,
+        group_id: int,
+        *,
+        since: Optional[date] = None,
+        sort: str = "joined",
+        cursor: Optional[str] = None,
+        limit: int = 50,
+        quiet: Optional[bool] = None,
+        unpaid_product_id: Optional[int] = None,
+        tags: Optional[Sequence[str]] = None,
+        user_id: Optional[int] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """One keyset page of the roster, filtered and sorted in SQL.
+
+        ``sort="joined"`` pages by join time, ``"activity"`` by messages plus
+        reactions since ``since`` (most active first).  ``quiet`` keeps members
+        without (``True``) or with (``False``) activity in that window,
+        ``unpaid_product_id`` keeps members lacking a paid link to the product
+        and ``tags`` keeps members whose CRM tags include all of them.
+
+        Entries have the same keys as :meth:`list_group_members`, with
+        products as rows from :meth:`member_products_summary`.  Returns the
+        entries and the cursor of the next page (``None`` on the last page).
+        Raises ``ValueError`` for an unknown sort or a malformed cursor.
+        """
+
+        if sort not in MEMBER_SORTS:
+            raise ValueError(f"Unknown sort: {sort}")
+        since = since or (date.today() - timedelta(days=30))
+        activity = self._activity_subquery(group_id, since)
+        messages = func.coalesce(activity.c.messages, 0)
+        reactions = func.coalesce(activity.c.reactions, 0)
+        score = messages + reactions
+        if sort == "joined":
+            key = (func.coalesce(UserGroup.joined_at, _EPOCH), UserGroup.user_id)
+        else:
+            key = (score, UserGroup.user_id)
+
+        stmt = (
+            select(
+                UserGroup,
+                TgUser,
+                messages.label("messages"),
+                reactions.label("reactions"),
+                activity.c.last_activity,
+            )
+            .join(TgUser, TgUser.telegram_id == UserGroup.user_id)
+            .outerjoin(activity, activity.c.user_id == UserGroup.user_id)
+            .where(UserGroup.group_id == group_id)
+        )
+        if user_id is not None:
+            stmt = stmt.where(UserGroup.user_id == user_id)
+        if quiet is not None:
+            stmt = stmt.where(score == 0 if quiet else score > 0)
+        if unpaid_product_id is not None:
+            paid = select(UserProduct.user_id).where(
+                UserProduct.user_id == UserGroup.user_id,
+                UserProduct.product_id == unpaid_product_id,
+                UserProduct.status == ProductStatus.paid,
+            )
+            stmt = stmt.where(~paid.exists())
+        if tags:
+            stmt = stmt.where(cast(UserGroup.crm_tags, JSONB).contains(list(tags)))
+        if cursor:
+            if sort == "joined":
+                value, after_id = self._decode_keyset(
+                    cursor, sort, datetime.fromisoformat
+                )
+                stmt = stmt.where(tuple_(*key) > tuple_(value, after_id))
+            else:
+                value, after_id = self._decode_keyset(cursor, sort, int)
+                stmt = stmt.where(tuple_(*key) < tuple_(value, after_id))
+        if sort == "joined":
+            stmt = stmt.order_by(*(k.asc() for k in key))
+        else:
+            stmt = stmt.order_by(*(k.desc() for k in key))
+
+        rows = (await self.session.execute(stmt.limit(limit + 1))).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        products_map = await self.member_products_summary(
+            [link.user_id for link, *_ in rows]
+        )
+        entries: List[Dict[str, Any]] = []
+        for link, user, msg_count, reaction_count, last_activity in rows:
+            entries.append(
+                {
+                    "membership": link,
+                    "user": user,
+                    "products": products_map.get(link.user_id, []),
+                    "activity": ActivityTotals(
+                        messages=int(msg_count or 0),
+                        reactions=int(reaction_count or 0),
+                        last_activity=last_activity,
+                    ),
+                }
+            )
+        next_cursor = None
+        if has_more and entries:
+            last = entries[-1]
+            value = (
+                last["membership"].joined_at or _EPOCH
+                if sort == "joined"
+                else last["activity"].messages + last["activity"].reactions
+            )
+            next_cursor = encode_cursor(
+                {"s": sort, "k": [value, last["membership"].user_id]}
+            )
+        return entries, next_cursor
+
+    async def count_members(self, group_id: int) -> int:
+        total = await self.session.scalar(
+            select(func.count())
+            .select_from(UserGroup)
+            .where(UserGroup.group_id == group_id)
+        )
+        return int(total or 0)
+
+    async def history_page(
+        self,
+        group_id: int,
+        *,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+    ) -> Tuple[List[Any], Optional[str]]:
+        """Newest-first page of removal logs with user and product joined in.
+
+        Rows are ``(log, user, product_slug, product_title)``; ``user`` is
+        ``None`` for users we have no record of.
+        """
+
+        stmt = (
+            select(
+                GroupRemovalLog,
+                TgUser,
+                Product.slug.label("product_slug"),
+                Product.title.label("product_title"),
+            )
+            .outerjoin(TgUser, TgUser.telegram_id == GroupRemovalLog.user_id)
+            .outerjoin(Product, Product.id == GroupRemovalLog.product_id)
+            .where(GroupRemovalLog.group_id == group_id)
+        )
+        if cursor:
+            created_at, after_id = self._decode_keyset(
+                cursor, "history", datetime.fromisoformat
+            )
+            stmt = stmt.where(
+                tuple_(GroupRemovalLog.created_at, GroupRemovalLog.id)
+                < tuple_(created_at, after_id)
+            )
+        stmt = stmt.order_by(
+            GroupRemovalLog.created_at.desc(), GroupRemovalLog.id.desc()
+        ).limit(limit + 1)
+        rows = (await self.session.execute(stmt)).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        next_cursor = None
+        if has_more and rows:
+            last = rows[-1][0]
+            next_cursor = encode_cursor(
+                {"s": "history", "k": [last.created_at, last.id]}
+            )
+        return rows, next_cursor
+
+    async def product_summaries(self, group_id: int) -> List[Any]:
+        """Every product with the number of group members who paid for it."""
+
+        buyers = (
+            select(
+                UserProduct.product_id,
+                func.count().label("buyers"),
+            )
+            .join(
+                UserGroup,
+                (UserGroup.user_id == UserProduct.user_id)
+                & (UserGroup.group_id == group_id),
+            )
+            .where(UserProduct.status == ProductStatus.paid)
+            .group_by(UserProduct.product_id)
+            .subquery("buyers")
+        )
+        rows = await self.session.execute(
+            select(
+                Product.id,
+                Product.slug,
+                Product.title,
+                Product.active,
+                func.coalesce(buyers.c.buyers, 0).label("buyers"),
+            )
+            .outerjoin(buyers, buyers.c.product_id == Product.id)
+            .order_by(Product.title.asc())
+        )
+        return rows.all()
+
     # ------------------------------------------------------------------
     # Dashboards
     # ------------------------------------------------------------------
@@ -392,4 +670,4 @@ class GroupModerationService:
         return overview
 
 
-__all__ = ["GroupModerationService", "ActivityTotals"]
+__all__ = ["GroupModerationService", "ActivityTotals", "MEMBER_SORTS"]
@@ -0,0 +1,283 @@
+"""Persisted bulk-prune jobs for Telegram groups.
+
+The web handler only calls :meth:`GroupPruneJobService.enqueue`.  Members are
+kicked by :class:`backend.services.group_prune_worker.GroupPruneWorker` in
+batches of candidates ordered by ``user_id``.  Each batch commits, in one
+transaction, the removal of kicked members from ``user_group``, their
+``group_removal_log`` rows (one multi-row INSERT) and the job's counters and
+cursor.  A restarted worker therefore resumes after the last committed batch;
+kicking a member twice is harmless.  A batch that fails outright backs off
+(``attempts``/``next_attempt_at``) and fails the job after a few tries.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend import db
+from backend.models import (
+    Group,
+    GroupPruneJob,
+    GroupRemovalLog,
+    ProductStatus,
+    TgUser,
+    UserGroup,
+    UserProduct,
+)
+from backend.services.email_outbox import retry_delay
+from backend.utils import utcnow
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+STATUS_CANCELLED = "cancelled"
+ACTIVE_STATUSES = (STATUS_QUEUED, STATUS_RUNNING)
+
+
+@dataclass(frozen=True)
+class KickResult:
+    user_id: int
+    error: Optional[str] = None
+
+
+class GroupPruneJobService:
+    """Create, inspect and advance rows of ``group_prune_jobs``."""
+
+    def __init__(self, session: Optional[AsyncSession] = None) -> None:
+        self.session = session
+        self._external = session is not None
+
+    async def __aenter__(self) -> "GroupPruneJobService":
+        if self.session is None:
+            self.session = db.async_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if not self._external:
+            if exc_type is None:
+                await self.session.commit()
+            else:
+                await self.session.rollback()
+            await self.session.close()
+
+    def _candidates(self, group_id: int, product_id: int) -> sa.Select:
+        return (
+            sa.select(UserGroup.user_id)
+            .outerjoin(
+                UserProduct,
+                (UserProduct.user_id == UserGroup.user_id)
+                & (UserProduct.product_id == product_id)
+                & (UserProduct.status == ProductStatus.paid),
+            )
+            .where(UserGroup.group_id == group_id, UserProduct.user_id.is_(None))
+        )
+
+    async def count_candidates(self, group_id: int, product_id: int) -> int:
+        total = await self.session.scalar(
+            sa.select(sa.func.count()).select_from(
+                self._candidates(group_id, product_id).subquery()
+            )
+        )
+        return int(total or 0)
+
+    async def candidate_batch(self, job: GroupPruneJob, limit: int) -> List[int]:
+        """Next ``limit`` members without the paid product, after the cursor."""
+
+        rows = await self.session.execute(
+            self._candidates(job.group_id, job.product_id)
+            .where(UserGroup.user_id > job.cursor)
+            .order_by(UserGroup.user_id)
+            .limit(limit)
+        )
+        return list(rows.scalars())
+
+    async def candidate_users(self, group_id: int, product_id: int) -> List[tuple]:
+        """``(user_id, TgUser | None)`` of every candidate, for dry runs."""
+
+        rows = await self.session.execute(
+            self._candidates(group_id, product_id)
+            .add_columns(TgUser)
+            .outerjoin(TgUser, TgUser.telegram_id == UserGroup.user_id)
+            .order_by(UserGroup.user_id)
+        )
+        return [tuple(row) for row in rows]
+
+    async def active_job(self, group_id: int, product_id: int) -> Optional[GroupPruneJob]:
+        return await self.session.scalar(
+            sa.select(GroupPruneJob)
+            .where(
+                GroupPruneJob.group_id == group_id,
+                GroupPruneJob.product_id == product_id,
+                GroupPruneJob.status.in_(ACTIVE_STATUSES),
+            )
+            .order_by(GroupPruneJob.id)
+            .limit(1)
+        )
+
+    async def enqueue(
+        self,
+        *,
+        group_id: int,
+        product_id: int,
+        initiator_web_id: Optional[int] = None,
+        initiator_tg_id: Optional[int] = None,
+        reason: Optional[str] = None,
+    ) -> tuple[GroupPruneJob, bool]:
+        """Queue a prune; an active job for the same group and product is reused.
+
+        Returns the job and whether it was created by this call.
+        """
+
+        existing = await self.active_job(group_id, product_id)
+        if existing is not None:
+            return existing, False
+        job = GroupPruneJob(
+            group_id=group_id,
+            product_id=product_id,
+            initiator_web_id=initiator_web_id,
+            initiator_tg_id=initiator_tg_id,
+            reason=reason,
+            status=STATUS_QUEUED,
+            total=await self.count_candidates(group_id, product_id),
+            processed=0,
+            removed=0,
+            failed=0,
+            cursor=0,
+        )
+        try:
+            async with self.session.begin_nested():
+                self.session.add(job)
+        except sa.exc.IntegrityError:
+            # A concurrent request queued the same prune first
+            # (ux_group_prune_jobs_active).
+            existing = await self.active_job(group_id, product_id)
+            if existing is None:
+                raise
+            return existing, False
+        return job, True
+
+    async def get(self, job_id: int) -> Optional[GroupPruneJob]:
+        return await self.session.get(GroupPruneJob, job_id)
+
+    async def list_for_group(self, group_id: int, *, limit: int = 20) -> List[GroupPruneJob]:
+        rows = await self.session.execute(
+            sa.select(GroupPruneJob)
+            .where(GroupPruneJob.group_id == group_id)
+            .order_by(GroupPruneJob.created_at.desc(), GroupPruneJob.id.desc())
+            .limit(limit)
+        )
+        return list(rows.scalars())
+
+    async def next_active(self) -> Optional[GroupPruneJob]:
+        """Oldest queued or interrupted job not backing off after a failure.
+
+        The worker runs as a singleton, so no row locking is needed.
+        """
+
+        return await self.session.scalar(
+            sa.select(GroupPruneJob)
+            .where(
+                GroupPruneJob.status.in_(ACTIVE_STATUSES),
+                sa.or_(
+                    GroupPruneJob.next_attempt_at.is_(None),
+                    GroupPruneJob.next_attempt_at <= utcnow(),
+                ),
+            )
+            .order_by(GroupPruneJob.id)
+            .limit(1)
+        )
+
+    @staticmethod
+    def cancel(job: GroupPruneJob) -> bool:
+        if job.status not in ACTIVE_STATUSES:
+            return False
+        job.status = STATUS_CANCELLED
+        job.finished_at = utcnow()
+        return True
+
+    @staticmethod
+    def mark_running(job: GroupPruneJob) -> None:
+        job.status = STATUS_RUNNING
+        job.started_at = job.started_at or utcnow()
+
+    @staticmethod
+    def finish(job: GroupPruneJob, *, error: Optional[str] = None) -> None:
+        job.status = STATUS_FAILED if error else STATUS_DONE
+        job.error = error
+        job.finished_at = utcnow()
+
+    @staticmethod
+    def record_failure(job: GroupPruneJob, error: str, *, max_attempts: int) -> None:
+        """Back off after a failed batch; fail the job after ``max_attempts``."""
+
+        job.attempts = (job.attempts or 0) + 1
+        if job.attempts >= max_attempts:
+            GroupPruneJobService.finish(job, error=error[:1000])
+        else:
+            job.error = error[:1000]
+            job.next_attempt_at = utcnow() + retry_delay(job.attempts)
+
+    async def apply_batch(self, job: GroupPruneJob, results: Sequence[KickResult]) -> None:
+        """Record one batch of kicks: roster, removal log and job progress."""
+
+        if not results:
+            return
+        removed = [r.user_id for r in results if r.error is None]
+        if removed:
+            await self.session.execute(
+                sa.delete(UserGroup).where(
+                    UserGroup.group_id == job.group_id,
+                    UserGroup.user_id.in_(removed),
+                )
+            )
+            await self.session.execute(
+                sa.update(Group)
+                .where(Group.telegram_id == job.group_id, Group.participants_count > 0)
+                .values(
+                    participants_count=sa.func.greatest(
+                        Group.participants_count - len(removed), 0
+                    )
+                )
+            )
+        now = utcnow()
+        await self.session.execute(
+            sa.insert(GroupRemovalLog),
+            [
+                {
+                    "group_id": job.group_id,
+                    "user_id": r.user_id,
+                    "product_id": job.product_id,
+                    "initiator_web_id": job.initiator_web_id,
+                    "initiator_tg_id": job.initiator_tg_id,
+                    "reason": job.reason or "auto-prune",
+                    "result": "removed" if r.error is None else "failed",
+                    "details": {"job_id": job.id, **({"error": r.error} if r.error else {})},
+                    "created_at": now,
+                }
+                for r in results
+            ],
+        )
+        job.attempts = 0
+        job.next_attempt_at = None
+        job.error = None
+        job.processed += len(results)
+        job.removed += len(removed)
+        job.failed += len(results) - len(removed)
+        job.cursor = max(job.cursor, max(r.user_id for r in results))
+
+
+__all__ = [
+    "ACTIVE_STATUSES",
+    "GroupPruneJobService",
+    "KickResult",
+    "STATUS_CANCELLED",
+    "STATUS_DONE",
+    "STATUS_FAILED",
+    "STATUS_QUEUED",
+    "STATUS_RUNNING",
+]
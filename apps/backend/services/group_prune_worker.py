@@ -0,0 +1,212 @@
+"""Polling worker executing queued group prune jobs."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend import db
+from backend.health import Heartbeat
+from backend.models import GroupPruneJob
+from backend.services.group_prune_jobs import (
+    ACTIVE_STATUSES,
+    STATUS_CANCELLED,
+    STATUS_FAILED,
+    STATUS_QUEUED,
+    GroupPruneJobService,
+    KickResult,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """Space calls ``1/rate`` seconds apart across all tasks of the worker.
+
+    :meth:`pause` pushes the next slot back for everyone; Telegram's flood
+    control (``RetryAfter``) applies to the whole bot, not to one request.
+    """
+
+    def __init__(self, rate: float) -> None:
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            now = loop.time()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        resume = asyncio.get_running_loop().time() + seconds
+        self._next = max(self._next, resume)
+
+
+class GroupPruneWorker:
+    """Kick members of prune jobs in batches under Telegram rate limits."""
+
+    def __init__(
+        self,
+        poll_interval: float = 5.0,
+        *,
+        batch_size: int = 50,
+        concurrency: int = 4,
+        rate: float = 20.0,
+        max_retries: int = 5,
+        max_attempts: int = 5,
+        bot: Any = None,
+    ) -> None:
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.max_attempts = max_attempts
+        self.limiter = RateLimiter(rate)
+        self._bot = bot
+        self.heartbeat = Heartbeat("group_prune", poll_interval)
+
+    @classmethod
+    def from_env(cls) -> "GroupPruneWorker":
+        return cls(
+            batch_size=int(os.getenv("GROUP_PRUNE_BATCH", "50")),
+            concurrency=int(os.getenv("GROUP_PRUNE_CONCURRENCY", "4")),
+            rate=float(os.getenv("GROUP_PRUNE_RATE", "20")),
+        )
+
+    @property
+    def bot(self) -> Any:
+        if self._bot is None:
+            from backend.db import bot  # aiogram loads only in the worker
+
+            self._bot = bot
+        return self._bot
+
+    async def kick(self, group_id: int, user_id: int) -> KickResult:
+        """Ban and unban so the member can rejoin later; retry on RetryAfter."""
+
+        attempt = 0
+        while True:
+            try:
+                await self.limiter.acquire()
+                await self.bot.ban_chat_member(group_id, user_id)
+                await self.limiter.acquire()
+                await self.bot.unban_chat_member(group_id, user_id)
+                return KickResult(user_id)
+            except Exception as exc:
+                # aiogram's TelegramRetryAfter; checked by attribute to keep
+                # aiogram out of this module's imports.
+                retry_after = getattr(exc, "retry_after", None)
+                if retry_after is None or attempt >= self.max_retries:
+                    return KickResult(user_id, str(exc) or exc.__class__.__name__)
+                attempt += 1
+                logger.warning("group prune: flood control, pausing %ss", retry_after)
+                self.limiter.pause(float(retry_after))
+
+    async def run_once(self) -> int:
+        """Process one batch of the oldest active job; return members handled.
+
+        A batch that raises is recorded on the job, which backs off and is
+        marked failed after ``max_attempts`` consecutive failures; the error
+        is then re-raised for the polling loop to log.
+        """
+
+        async with db.async_session() as session:
+            jobs = GroupPruneJobService(session)
+            job = await jobs.next_active()
+            if job is None:
+                return 0
+            job_id = job.id
+            try:
+                return await self._run_batch(session, jobs, job)
+            except Exception as exc:
+                await session.rollback()
+                error = str(exc) or exc.__class__.__name__
+                await self._record_failure(job_id, error)
+                raise
+
+    async def _record_failure(self, job_id: int, error: str) -> None:
+        async with db.async_session() as session:
+            jobs = GroupPruneJobService(session)
+            job = await jobs.get(job_id)
+            if job is None or job.status not in ACTIVE_STATUSES:
+                return
+            jobs.record_failure(job, error, max_attempts=self.max_attempts)
+            await session.commit()
+            if job.status == STATUS_FAILED:
+                logger.error(
+                    "group prune job %s failed after %s attempts: %s",
+                    job_id,
+                    job.attempts,
+                    error,
+                )
+
+    async def _run_batch(
+        self, session: AsyncSession, jobs: GroupPruneJobService, job: GroupPruneJob
+    ) -> int:
+        if job.status == STATUS_QUEUED:
+            jobs.mark_running(job)
+        user_ids = await jobs.candidate_batch(job, self.batch_size)
+        if not user_ids:
+            jobs.finish(job)
+            await session.commit()
+            logger.info(
+                "group prune job %s done: %s removed, %s failed",
+                job.id,
+                job.removed,
+                job.failed,
+            )
+            return 0
+        await session.commit()  # no transaction stays open during Telegram calls
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def guarded(user_id: int) -> KickResult:
+            async with semaphore:
+                return await self.kick(job.group_id, user_id)
+
+        results = await asyncio.gather(*(guarded(uid) for uid in user_ids))
+        await session.refresh(job)
+        await jobs.apply_batch(job, results)
+        await session.commit()
+        if job.status == STATUS_CANCELLED:
+            logger.info("group prune job %s cancelled after %s members", job.id, job.processed)
+        return len(results)
+
+    async def start(self, stop_event: asyncio.Event | None = None) -> None:
+        while True:
+            try:
+                processed = await self.run_once()
+            except Exception:
+                logger.exception("group prune iteration failed")
+                processed = 0
+            else:
+                await self.heartbeat.beat()
+            stopping = stop_event is not None and stop_event.is_set()
+            if processed and not stopping:
+                continue  # job in progress: next batch right away
+            if stop_event is None:
+                await asyncio.sleep(self.poll_interval)
+            else:
+                try:
+                    await asyncio.wait_for(stop_event.wait(), timeout=self.poll_interval)
+                    break
+                except asyncio.TimeoutError:
+                    continue
+
+
+def is_group_prune_worker_enabled() -> bool:
+    """Флаг включения из окружения (по умолчанию включён)."""
+
+    return str(os.getenv("GROUP_PRUNE_WORKER", "1")).lower() in {
+        "1",
+        "true",
+        "yes",
+    }
@@ -1,6 +1,7 @@
 """Habitica-like services for habits, dailies and user stats (E16)."""
 from __future__ import annotations
 
+import logging
 import math
 from datetime import date, timedelta, datetime, timezone
 from typing import Any, Dict, Optional, List
@@ -12,8 +13,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from backend import db
 from backend.config import config
 from .errors import CooldownError, InsufficientGoldError
+from .recurrence import compile_rule, expand_many
 from backend.models import Area, Project
 
+logger = logging.getLogger(__name__)
+
 # SQLite-friendly table metadata used by tests and services
 metadata = sa.MetaData()
 
@@ -89,6 +93,15 @@ daily_logs = sa.Table(
     sa.UniqueConstraint("daily_id", "date", name="ux_daily_date"),
 )
 
+# Materialised ``dailies.rrule`` expansion; see :class:`DailyScheduleService`.
+daily_occurrences = sa.Table(
+    "daily_occurrences",
+    metadata,
+    sa.Column("daily_id", sa.Integer, sa.ForeignKey("dailies.id", ondelete="CASCADE"), primary_key=True),
+    sa.Column("occurs_on", sa.Date, primary_key=True),
+    sa.Column("owner_id", sa.BigInteger, nullable=False),
+    sa.Index("ix_daily_occurrences_owner_day", "owner_id", "occurs_on"),
+)
 
 rewards = sa.Table(
     "rewards",
@@ -437,6 +450,127 @@ class HabitsService:
         }
 
 
+class DailyScheduleService:
+    """Keep ``daily_occurrences`` filled for the next :attr:`HORIZON_DAYS`.
+
+    Rules are expanded in bulk (see :func:`expand_many`) whenever a daily is
+    created or its rule changes, and the cron extends the horizon once per
+    day (on the tick that rolls users over to a new date), so
+    "due on a day" and calendar windows are ``(owner_id, occurs_on)`` index
+    lookups.  A daily's series starts on its ``created_at`` date.
+    """
+
+    HORIZON_DAYS = 90
+    CRON_OVERLAP_DAYS = 7
+    _INSERT_CHUNK = 5000
+
+    def __init__(self, session: Optional[AsyncSession] = None) -> None:
+        self.session = session
+        self._external = session is not None
+
+    async def __aenter__(self) -> "DailyScheduleService":
+        if self.session is None:
+            self.session = db.async_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if not self._external:
+            if exc_type is None:
+                await self.session.commit()
+            else:
+                await self.session.rollback()
+            await self.session.close()
+
+    async def refresh(
+        self,
+        *,
+        daily_ids: Optional[List[int]] = None,
+        owner_id: Optional[int] = None,
+        start: Optional[date] = None,
+        today: Optional[date] = None,
+    ) -> int:
+        """Rewrite occurrences from ``start`` (default ``today``) to the horizon.
+
+        Limited to ``daily_ids`` and/or ``owner_id`` when given; archived
+        dailies lose their future occurrences.  Returns rows written.
+        """
+
+        today = today or date.today()
+        start = start or today
+        end = today + timedelta(days=self.HORIZON_DAYS)
+        scope: list[Any] = []
+        if daily_ids is not None:
+            scope.append(dailies.c.id.in_(daily_ids))
+        if owner_id is not None:
+            scope.append(dailies.c.owner_id == owner_id)
+
+        stale = delete(daily_occurrences).where(daily_occurrences.c.occurs_on >= start)
+        if scope:
+            stale = stale.where(
+                daily_occurrences.c.daily_id.in_(select(dailies.c.id).where(*scope))
+            )
+        await self.session.execute(stale)
+
+        res = await self.session.execute(
+            select(dailies.c.id, dailies.c.owner_id, dailies.c.rrule, dailies.c.created_at).where(
+                dailies.c.archived_at.is_(None), *scope
+            )
+        )
+        owners: Dict[int, int] = {}
+        items = []
+        for row in res.all():
+            try:
+                compile_rule(row.rrule)
+            except ValueError:
+                logger.warning("daily %s has an invalid rrule %r", row.id, row.rrule)
+                continue
+            created = row.created_at.date() if row.created_at else today
+            owners[row.id] = row.owner_id
+            items.append((row.id, row.rrule, created))
+        expanded = expand_many(items, start, end)
+        rows = [
+            {"daily_id": daily_id, "owner_id": owners[daily_id], "occurs_on": day}
+            for daily_id, days in expanded.items()
+            for day in days
+        ]
+        for i in range(0, len(rows), self._INSERT_CHUNK):
+            await self.session.execute(insert(daily_occurrences), rows[i : i + self._INSERT_CHUNK])
+        await self.session.flush()
+        return len(rows)
+
+    async def extend(self, today: Optional[date] = None) -> int:
+        """Roll every owner's horizon forward; tolerates a week of missed runs."""
+
+        today = today or date.today()
+        start = today + timedelta(days=self.HORIZON_DAYS - self.CRON_OVERLAP_DAYS)
+        return await self.refresh(start=start, today=today)
+
+    async def due_on(self, owner_id: int, on: Optional[date] = None) -> List[int]:
+        on = on or date.today()
+        res = await self.session.execute(
+            select(daily_occurrences.c.daily_id)
+            .where(daily_occurrences.c.owner_id == owner_id, daily_occurrences.c.occurs_on == on)
+            .order_by(daily_occurrences.c.daily_id)
+        )
+        return list(res.scalars().all())
+
+    async def window(self, owner_id: int, start: date, end: date) -> Dict[date, List[int]]:
+        """Daily ids due per day in ``[start, end]``, days without any omitted."""
+
+        res = await self.session.execute(
+            select(daily_occurrences.c.occurs_on, daily_occurrences.c.daily_id)
+            .where(
+                daily_occurrences.c.owner_id == owner_id,
+                daily_occurrences.c.occurs_on.between(start, end),
+            )
+            .order_by(daily_occurrences.c.occurs_on, daily_occurrences.c.daily_id)
+        )
+        out: Dict[date, List[int]] = {}
+        for day, daily_id in res.all():
+            out.setdefault(day, []).append(daily_id)
+        return out
+
+
 class DailiesService:
     def __init__(self, session: Optional[AsyncSession] = None) -> None:
         self.session = session
@@ -479,6 +613,10 @@ class DailiesService:
         project_id: Optional[int] = None,
         note: str | None = None,
     ) -> int:
+        try:
+            compile_rule(rrule)
+        except ValueError:
+            raise ValueError("invalid_rrule") from None
         area_id = await self._resolve_area(owner_id, area_id, project_id)
         stmt = (
             insert(dailies)
@@ -494,7 +632,45 @@ class DailiesService:
             .returning(dailies.c.id)
         )
         res = await self.session.execute(stmt)
-        return res.scalar_one()
+        daily_id = res.scalar_one()
+        await DailyScheduleService(self.session).refresh(daily_ids=[daily_id])
+        return daily_id
+
+    async def update_daily(
+        self,
+        daily_id: int,
+        *,
+        owner_id: int,
+        title: Optional[str] = None,
+        note: Optional[str] = None,
+        rrule: Optional[str] = None,
+        difficulty: Optional[str] = None,
+    ) -> bool:
+        changes: Dict[str, Any] = {}
+        if title is not None:
+            changes["title"] = title
+        if note is not None:
+            changes["note"] = note
+        if difficulty is not None:
+            changes["difficulty"] = difficulty
+        if rrule is not None:
+            try:
+                compile_rule(rrule)
+            except ValueError:
+                raise ValueError("invalid_rrule") from None
+            changes["rrule"] = rrule
+        if not changes:
+            return False
+        res = await self.session.execute(
+            update(dailies)
+            .where(dailies.c.id == daily_id, dailies.c.owner_id == owner_id)
+            .values(**changes)
+        )
+        if res.rowcount == 0:
+            return False
+        if rrule is not None:
+            await DailyScheduleService(self.session).refresh(daily_ids=[daily_id])
+        return True
 
     async def done(self, daily_id: int, *, owner_id: int, on: Optional[date] = None) -> bool:
         on = on or date.today()
@@ -601,6 +777,25 @@ class HabitsCronService:
         await self.session.flush()
         return True
 
+    async def run_all(self, today: Optional[date] = None) -> int:
+        """Reset daily counters for every user not yet processed ``today``.
+
+        The occurrence horizon is only extended when some user actually rolled
+        over, so the worker's frequent ticks within a day stay cheap.
+        """
+
+        today = today or date.today()
+        res = await self.session.execute(
+            update(user_stats)
+            .where(sa.or_(user_stats.c.last_cron.is_(None), user_stats.c.last_cron < today))
+            .values(last_cron=today, daily_xp=0, daily_gold=0)
+        )
+        await self.session.flush()
+        updated = res.rowcount or 0
+        if updated:
+            await DailyScheduleService(self.session).extend(today)
+        return updated
+
 
 class RewardsService:
     """Simple rewards store where gold can be exchanged for items."""
@@ -867,8 +1062,10 @@ class HabitsDashboardService:
             .order_by(dailies.c.id.asc())
         )
         res_dailies = await self.session.execute(stmt_dailies)
+        due = set(await DailyScheduleService(self.session).due_on(owner_id))
         dailies_payload = [
-            self._daily_payload(row) for row in res_dailies.mappings().all()
+            {**self._daily_payload(row), "due_today": row["id"] in due}
+            for row in res_dailies.mappings().all()
         ]
 
         filters_rewards: list[Any] = [
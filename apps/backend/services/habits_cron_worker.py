@@ -0,0 +1,50 @@
+"""Polling worker running the daily habits cron for all users."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+
+from backend.health import Heartbeat
+from backend.services.habits import HabitsCronService
+
+logger = logging.getLogger(__name__)
+
+
+class HabitsCronWorker:
+    """Reset daily XP/gold counters once per day for every user."""
+
+    def __init__(self, poll_interval: float = 300.0) -> None:
+        self.poll_interval = poll_interval
+        self.heartbeat = Heartbeat("habits_cron", poll_interval)
+
+    async def run_once(self) -> int:
+        async with HabitsCronService() as svc:
+            updated = await svc.run_all()
+        if updated:
+            logger.info("habits cron: reset daily counters for %s users", updated)
+        return updated
+
+    async def start(self, stop_event: asyncio.Event | None = None) -> None:
+        while True:
+            await self.run_once()
+            await self.heartbeat.beat()
+            if stop_event is None:
+                await asyncio.sleep(self.poll_interval)
+            else:
+                try:
+                    await asyncio.wait_for(stop_event.wait(), timeout=self.poll_interval)
+                    break
+                except asyncio.TimeoutError:
+                    continue
+
+
+def is_habits_cron_enabled() -> bool:
+    """Флаг включения из окружения (по умолчанию включён)."""
+
+    return str(os.getenv("HABITS_CRON_WORKER", "1")).lower() in {
+        "1",
+        "true",
+        "yes",
+    }
@@ -0,0 +1,346 @@
+"""Link graph over ``links``: wikilink sync and multi-hop traversal.
+
+``links`` rows are directed edges between ``(type, id)`` nodes (``note``,
+``project``, ``resource``, ``deal``...).  :meth:`LinkGraphService.neighbourhood`
+walks them in both directions with a recursive CTE, using the
+``(source_type, source_id)`` and ``(target_type, target_id)`` indexes on each
+hop.  A path's score is the product of its hops' ``weight``, hop *k* being
+attenuated by ``decay ** (k - 1)``; a node scores as its best path.  Notes of
+other owners are never entered, so they neither appear nor act as bridges.
+
+Reference links whose source is a note are derived from the note's
+``[[wikilinks]]`` and rewritten by :meth:`LinkGraphService.sync_wikilinks`
+whenever the content is saved.  ``[[Title]]`` resolves to the owner's note
+with that title, ``[[project:12]]`` (or ``[[project:12|label]]``) to the
+owner's project 12; typed references to unknown types, missing nodes or other
+owners' nodes are ignored.
+
+Neighbourhoods of hot notes are cached per owner for a short time.  The cache
+lives in each worker process: a link change drops the owner's snapshots of
+the committing process once its transaction ends, while other workers keep
+serving theirs until the TTL (:attr:`LinkGraphService._SNAPSHOT_TTL`) runs out.
+"""
+
+from __future__ import annotations
+
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import sqlalchemy as sa
+from sqlalchemy import event, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, SessionTransaction
+
+from backend import db
+from backend.models import Area, Link, LinkType, Note, Project, Resource, Task
+
+NOTE = "note"
+MAX_DEPTH = 3
+_WIKILINK_RE = re.compile(r"\[\[([^\[\]|\n]+)(?:\|[^\[\]\n]*)?\]\]")
+_TYPED_REF_RE = re.compile(r"^([a-z_]+):(\d+)$")
+_EDGE_KEY = ["source_type", "source_id", "target_type", "target_id", "link_type"]
+# Node types a typed ``[[type:id]]`` reference may point at; all are owned by
+# a Telegram user like notes are.
+_REF_MODELS = {"area": Area, "note": Note, "project": Project, "resource": Resource, "task": Task}
+_PENDING_OWNERS = "link_graph_pending_owners"
+
+
+def _invalidate_pending(session: Session, transaction: SessionTransaction) -> None:
+    # Runs when the outermost transaction ends; a rollback invalidates too,
+    # which costs one extra query at most.
+    if transaction.parent is not None:
+        return
+    pending = session.info.get(_PENDING_OWNERS)
+    for owner_id in pending or ():
+        LinkGraphService.invalidate_owner(owner_id)
+    if pending:
+        pending.clear()
+
+
+@dataclass(frozen=True)
+class GraphNode:
+    node_type: str
+    node_id: int
+    depth: int
+    score: float
+    paths: int
+    title: Optional[str] = None
+
+
+def parse_wikilinks(content: str | None) -> tuple[list[tuple[str, int]], list[str]]:
+    """Split ``[[...]]`` targets into typed references and note titles."""
+
+    refs: list[tuple[str, int]] = []
+    titles: list[str] = []
+    for raw in _WIKILINK_RE.findall(content or ""):
+        target = raw.strip()
+        typed = _TYPED_REF_RE.match(target.lower())
+        if typed:
+            refs.append((typed.group(1), int(typed.group(2))))
+        elif target:
+            titles.append(target)
+    return refs, titles
+
+
+_NEIGHBOURHOOD_SQL = """
+WITH RECURSIVE walk(node_type, node_id, depth, score, path) AS (
+    SELECT CAST(:node_type AS text), CAST(:node_id AS integer), 0,
+           CAST(1.0 AS double precision),
+           ARRAY[CAST(:node_type AS text) || ':' || CAST(:node_id AS text)]
+    UNION ALL
+    SELECT CAST(e.node_type AS text), e.node_id, w.depth + 1,
+           w.score * coalesce(e.weight, 1.0) * power(coalesce(e.decay, 1.0), w.depth),
+           w.path || (CAST(e.node_type AS text) || ':' || CAST(e.node_id AS text))
+    FROM walk AS w
+    CROSS JOIN LATERAL (
+        SELECT l.target_type AS node_type, l.target_id AS node_id, l.weight, l.decay
+        FROM links AS l
+        WHERE l.source_type = w.node_type AND l.source_id = w.node_id
+          AND (CAST(:link_types AS text[]) IS NULL
+               OR CAST(l.link_type AS text) = ANY(CAST(:link_types AS text[])))
+        UNION ALL
+        SELECT l.source_type, l.source_id, l.weight, l.decay
+        FROM links AS l
+        WHERE l.target_type = w.node_type AND l.target_id = w.node_id
+          AND (CAST(:link_types AS text[]) IS NULL
+               OR CAST(l.link_type AS text) = ANY(CAST(:link_types AS text[])))
+    ) AS e
+    LEFT JOIN notes AS n ON e.node_type = 'note' AND n.id = e.node_id
+    WHERE w.depth < :max_depth
+      AND e.node_type IS NOT NULL AND e.node_id IS NOT NULL
+      AND NOT (CAST(e.node_type AS text) || ':' || CAST(e.node_id AS text)) = ANY(w.path)
+      AND (e.node_type <> 'note' OR n.owner_id = :owner_id)
+)
+SELECT node_type, node_id, min(depth) AS depth, max(score) AS score, count(*) AS paths
+FROM walk
+WHERE depth > 0
+GROUP BY node_type, node_id
+ORDER BY max(score) DESC, min(depth), node_type, node_id
+LIMIT :limit
+"""
+
+
+class LinkGraphService:
+    """Maintain wikilink edges and answer "what is connected" queries."""
+
+    _SNAPSHOT_TTL = 60.0
+    _SNAPSHOT_LIMIT = 512
+    _snapshots: "OrderedDict[tuple, tuple[float, List[GraphNode]]]" = OrderedDict()
+
+    def __init__(self, session: Optional[AsyncSession] = None) -> None:
+        self.session = session
+        self._external = session is not None
+
+    async def __aenter__(self) -> "LinkGraphService":
+        if self.session is None:
+            self.session = db.async_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if not self._external and self.session is not None:
+            if exc_type is None:
+                await self.session.commit()
+            else:
+                await self.session.rollback()
+            await self.session.close()
+        if not self._external:
+            self.session = None
+
+    @classmethod
+    def invalidate_owner(cls, owner_id: int) -> None:
+        """Drop this process's snapshots of ``owner_id``."""
+
+        for key in [key for key in cls._snapshots if key[0] == owner_id]:
+            cls._snapshots.pop(key, None)
+
+    @classmethod
+    def invalidate_cache(cls) -> None:
+        cls._snapshots.clear()
+
+    def _invalidate_after_commit(self, owner_id: int) -> None:
+        # Invalidating before the commit would let a concurrent request cache
+        # the old edges again until the TTL expires.
+        sync_session = self.session.sync_session
+        pending = sync_session.info.get(_PENDING_OWNERS)
+        if pending is None:
+            pending = sync_session.info[_PENDING_OWNERS] = set()
+            event.listen(sync_session, "after_transaction_end", _invalidate_pending)
+        pending.add(owner_id)
+
+    # ------------------------------------------------------------------
+    # Wikilinks
+    # ------------------------------------------------------------------
+    async def _resolve_titles(self, owner_id: int, titles: Sequence[str]) -> Dict[str, int]:
+        keys = {title.lower() for title in titles}
+        if not keys:
+            return {}
+        rows = await self.session.execute(
+            select(sa.func.lower(Note.title), sa.func.min(Note.id))
+            .where(Note.owner_id == owner_id, sa.func.lower(Note.title).in_(keys))
+            .group_by(sa.func.lower(Note.title))
+        )
+        return {key: note_id for key, note_id in rows}
+
+    async def _owned_refs(
+        self, owner_id: int, refs: Iterable[tuple[str, int]]
+    ) -> set[tuple[str, int]]:
+        """The typed references that exist and belong to ``owner_id``."""
+
+        wanted: Dict[str, set[int]] = {}
+        for node_type, node_id in refs:
+            if node_type in _REF_MODELS:
+                wanted.setdefault(node_type, set()).add(node_id)
+        owned: set[tuple[str, int]] = set()
+        for node_type, ids in wanted.items():
+            model = _REF_MODELS[node_type]
+            rows = await self.session.execute(
+                select(model.id).where(model.id.in_(sorted(ids)), model.owner_id == owner_id)
+            )
+            owned.update((node_type, node_id) for node_id in rows.scalars())
+        return owned
+
+    async def sync_wikilinks(self, note: Note) -> tuple[int, int]:
+        """Rewrite the note's reference links from its ``[[wikilinks]]``.
+
+        Returns ``(added, removed)``.
+        """
+
+        refs, titles = parse_wikilinks(note.content)
+        resolved = await self._resolve_titles(note.owner_id, titles)
+        wanted = await self._owned_refs(note.owner_id, refs)
+        wanted |= {(NOTE, resolved[t.lower()]) for t in titles if t.lower() in resolved}
+        wanted.discard((NOTE, note.id))
+
+        source = (Link.source_type == NOTE) & (Link.source_id == note.id) & (
+            Link.link_type == LinkType.reference
+        )
+        existing = {
+            (row.target_type, row.target_id)
+            for row in await self.session.execute(
+                select(Link.target_type, Link.target_id).where(source)
+            )
+        }
+        stale = existing - wanted
+        removed = 0
+        if stale:
+            result = await self.session.execute(
+                sa.delete(Link).where(
+                    source,
+                    sa.tuple_(Link.target_type, Link.target_id).in_(sorted(stale)),
+                )
+            )
+            removed = result.rowcount or 0
+        added = 0
+        missing = sorted(wanted - existing)
+        if missing:
+            stmt = pg_insert(Link).values(
+                [
+                    {
+                        "source_type": NOTE,
+                        "source_id": note.id,
+                        "target_type": target_type,
+                        "target_id": target_id,
+                        "link_type": LinkType.reference,
+                        "weight": 1.0,
+                        "decay": 1.0,
+                    }
+                    for target_type, target_id in missing
+                ]
+            )
+            result = await self.session.execute(
+                stmt.on_conflict_do_nothing(index_elements=_EDGE_KEY)
+            )
+            added = result.rowcount or 0
+        if added or removed:
+            self._invalidate_after_commit(note.owner_id)
+        return added, removed
+
+    async def drop_node(self, node_type: str, node_id: int, *, owner_id: int) -> None:
+        """Remove every edge touching a deleted node."""
+
+        await self.session.execute(
+            sa.delete(Link).where(
+                sa.or_(
+                    (Link.source_type == node_type) & (Link.source_id == node_id),
+                    (Link.target_type == node_type) & (Link.target_id == node_id),
+                )
+            )
+        )
+        self._invalidate_after_commit(owner_id)
+
+    # ------------------------------------------------------------------
+    # Traversal
+    # ------------------------------------------------------------------
+    async def neighbourhood(
+        self,
+        node_type: str,
+        node_id: int,
+        *,
+        owner_id: int,
+        depth: int = 2,
+        limit: int = 100,
+        link_types: Optional[Iterable[LinkType]] = None,
+    ) -> List[GraphNode]:
+        """Nodes within ``depth`` hops of ``(node_type, node_id)``, best first.
+
+        Not cached while this session holds uncommitted link changes of the
+        owner, so a rolled-back edit never reaches the snapshot cache.
+        """
+
+        depth = max(1, min(depth, MAX_DEPTH))
+        types = sorted(t.name for t in link_types) if link_types else None
+        key = (owner_id, node_type, node_id, depth, limit, tuple(types or ()))
+        now = time.monotonic()
+        cacheable = owner_id not in self.session.sync_session.info.get(_PENDING_OWNERS, ())
+        cached = self._snapshots.get(key) if cacheable else None
+        if cached and now - cached[0] < self._SNAPSHOT_TTL:
+            self._snapshots.move_to_end(key)
+            return cached[1]
+
+        rows = (
+            await self.session.execute(
+                sa.text(_NEIGHBOURHOOD_SQL),
+                {
+                    "node_type": node_type,
+                    "node_id": node_id,
+                    "owner_id": owner_id,
+                    "max_depth": depth,
+                    "limit": limit,
+                    "link_types": types,
+                },
+            )
+        ).all()
+        note_ids = [row.node_id for row in rows if row.node_type == NOTE]
+        titles: Dict[int, Optional[str]] = {}
+        if note_ids:
+            titles = dict(
+                (await self.session.execute(
+                    select(Note.id, Note.title).where(Note.id.in_(note_ids))
+                )).all()
+            )
+        nodes = [
+            GraphNode(
+                node_type=row.node_type,
+                node_id=row.node_id,
+                depth=row.depth,
+                score=float(row.score),
+                paths=row.paths,
+                title=titles.get(row.node_id) if row.node_type == NOTE else None,
+            )
+            for row in rows
+        ]
+        if not cacheable:
+            return nodes
+        snapshots = LinkGraphService._snapshots
+        snapshots[key] = (now, nodes)
+        snapshots.move_to_end(key)
+        while len(snapshots) > self._SNAPSHOT_LIMIT:
+            snapshots.popitem(last=False)
+        return nodes
+
+
+__all__ = ["GraphNode", "LinkGraphService", "MAX_DEPTH", "parse_wikilinks"]
@@ -245,8 +245,16 @@ class LinkService(CRUDService[Link]):
     def __init__(self, session: Optional[AsyncSession] = None) -> None:
         super().__init__(Link, session)
 
-    async def related(self, source_id: int, link_type: str | None = None):
+    async def related(
+        self,
+        source_id: int,
+        link_type: str | None = None,
+        *,
+        source_type: str | None = None,
+    ):
         stmt = select(Link).where(Link.source_id == source_id)
+        if source_type is not None:
+            stmt = stmt.where(Link.source_type == source_type)  # uses ix_links_source
         if link_type is not None:
             stmt = stmt.where(Link.link_type == link_type)
         result = await self.session.execute(stmt)
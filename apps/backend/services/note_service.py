@@ -11,6 +11,7 @@ from sqlalchemy.orm import selectinload
 
 from backend import db
 from backend.models import Area, ContainerType, Link, LinkType, Note
+from backend.services.link_graph import LinkGraphService
 
 
 class NoteService:
@@ -65,6 +66,7 @@ class NoteService:
         )
         self.session.add(note)
         await self.session.flush()
+        await LinkGraphService(self.session).sync_wikilinks(note)
         return note
 
     async def _ensure_inbox(self, owner_id: int) -> Area:
@@ -176,6 +178,8 @@ class NoteService:
         if archived_at is not None:
             note.archived_at = archived_at
         await self.session.flush()
+        if content is not None:
+            await LinkGraphService(self.session).sync_wikilinks(note)
         return note
 
     async def assign_container(
@@ -244,6 +248,7 @@ class NoteService:
         note = await self.session.get(Note, note_id)
         if note is None:
             return False
+        await LinkGraphService(self.session).drop_node("note", note.id, owner_id=note.owner_id)
         await self.session.delete(note)
         await self.session.flush()
         return True
@@ -5,7 +5,7 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import select
+from sqlalchemy import Row, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -24,6 +24,16 @@ from backend.utils import utcnow
 from .nexus_service import CRUDService
 from .alarm_service import AlarmService
 
+AGENDA_COLUMNS = (
+    CalendarItem.id,
+    CalendarItem.title,
+    CalendarItem.start_at,
+    CalendarItem.end_at,
+    CalendarItem.status,
+    CalendarItem.area_id,
+    CalendarItem.project_id,
+)
+
 
 class AreaRepository(CRUDService[Area]):
     """CRUD repository for :class:`Area`."""
@@ -104,8 +114,11 @@ class CalendarItemRepository(CRUDService[CalendarItem]):
         start_from: Optional[datetime] = None,
         start_to: Optional[datetime] = None,
         status: Optional[CalendarItemStatus] = None,
+        with_alarms: bool = True,
     ) -> list[CalendarItem]:
-        stmt = select(CalendarItem).options(selectinload(CalendarItem.alarms))
+        stmt = select(CalendarItem)
+        if with_alarms:
+            stmt = stmt.options(selectinload(CalendarItem.alarms))
         if owner_id is not None:
             stmt = stmt.where(CalendarItem.owner_id == owner_id)
         if project_id is not None:
@@ -121,6 +134,42 @@ class CalendarItemRepository(CRUDService[CalendarItem]):
         res = await self.session.execute(stmt.order_by(CalendarItem.start_at))
         return res.scalars().all()
 
+    async def agenda(
+        self,
+        owner_id: int,
+        start_from: datetime,
+        start_to: datetime,
+        *,
+        project_id: Optional[int] = None,
+        area_id: Optional[int] = None,
+        status: Optional[CalendarItemStatus] = None,
+        limit: Optional[int] = None,
+    ) -> list[Row]:
+        """Items starting in ``[start_from, start_to]`` as column-only rows.
+
+        Reads only the columns of ``ix_calendar_items_owner_start``; rows
+        expose ``id``, ``title``, ``start_at``, ``end_at``, ``status``,
+        ``area_id`` and ``project_id``.
+        """
+
+        stmt = (
+            select(*AGENDA_COLUMNS)
+            .where(CalendarItem.owner_id == owner_id)
+            .where(CalendarItem.start_at >= start_from)
+            .where(CalendarItem.start_at <= start_to)
+        )
+        if project_id is not None:
+            stmt = stmt.where(CalendarItem.project_id == project_id)
+        if area_id is not None:
+            stmt = stmt.where(CalendarItem.area_id == area_id)
+        if status is not None:
+            stmt = stmt.where(CalendarItem.status == status)
+        stmt = stmt.order_by(CalendarItem.start_at, CalendarItem.id)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        res = await self.session.execute(stmt)
+        return res.all()
+
     async def update(self, obj_id: int, **kwargs) -> CalendarItem | None:
         obj = await super().update(obj_id, **kwargs)
         if obj is not None:
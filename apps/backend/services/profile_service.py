@@ -6,14 +6,17 @@ import re
 from dataclasses import dataclass
 from typing import Any, Optional, Sequence
 
-from sqlalchemy import Select, func, or_, select
+import sqlalchemy as sa
+from sqlalchemy import Select, and_, exists, func, literal_column, or_, select
+from sqlalchemy.engine import Connection
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload, selectinload
 
 from backend import db
 from backend.models import (
     EntityProfile,
     EntityProfileGrant,
+    EntityProfileVisibility,
     UserGroup,
     UserRoleLink,
     WebTgLink,
@@ -39,6 +42,96 @@ def normalize_slug(value: Optional[str], fallback: str) -> str:
     return candidate or fallback
 
 
+# ---------------------------------------------------------------------------
+# Visibility index
+# ---------------------------------------------------------------------------
+
+# Rebuild ``entity_profile_visibility`` for the profiles matching ``{range}``
+# (aliased ``t``, as in ``backend.db.repair``).  Mirrors the Python rules of
+# ``ProfileService``: a grant yields a row only if it resolves to at least one
+# section; user profiles with public/authenticated ``profile_meta`` visibility
+# get a general row; resource profiles get an ``owner`` row.
+_DEFAULT_SECTION_IDS = ", ".join(f"'{section['id']}'" for section in DEFAULT_SECTIONS)
+
+VISIBILITY_INDEX_STATEMENTS: list[str] = [
+    """
+    DELETE FROM entity_profile_visibility AS v
+    USING entity_profiles AS t
+    WHERE v.profile_id = t.id AND {range}
+    """,
+    f"""
+    WITH prof AS (
+        SELECT t.id, t.entity_type,
+               CASE WHEN json_typeof(t.profile_meta::json) = 'object'
+                    THEN t.profile_meta::json ELSE '{{}}'::json END AS meta,
+               CASE WHEN json_typeof(t.sections::json) = 'array'
+                         AND json_array_length(t.sections::json) > 0
+                    THEN ARRAY(SELECT s.value->>'id' FROM json_array_elements(t.sections::json) AS s)
+                    ELSE ARRAY[{_DEFAULT_SECTION_IDS}] END AS section_ids
+        FROM entity_profiles AS t
+        WHERE {{range}}
+    ),
+    grants AS (
+        SELECT g.profile_id, g.audience_type,
+               CASE WHEN g.audience_type IN ('public', 'authenticated') THEN 0
+                    ELSE g.subject_id END AS subject_id,
+               g.expires_at
+        FROM entity_profile_grants AS g
+        JOIN prof AS p ON p.id = g.profile_id
+        WHERE (g.audience_type IN ('public', 'authenticated')
+               OR g.audience_type IN ('user', 'group', 'project', 'area')
+                  AND g.subject_id IS NOT NULL)
+          AND CASE WHEN json_typeof(g.sections::json) = 'array'
+                        AND json_array_length(g.sections::json) > 0
+                   THEN EXISTS (
+                       SELECT 1 FROM json_array_elements_text(g.sections::json) AS gs(id)
+                       WHERE gs.id = ANY(p.section_ids)
+                   )
+                   ELSE true END
+    ),
+    fallback AS (
+        SELECT p.id AS profile_id,
+               lower(coalesce(nullif(p.meta->>'visibility', ''),
+                              nullif(p.meta->>'profile_visibility', ''), '')) AS audience_type
+        FROM prof AS p
+        WHERE p.entity_type = 'user'
+    ),
+    audiences AS (
+        SELECT profile_id, audience_type, subject_id, expires_at FROM grants
+        UNION ALL
+        SELECT profile_id, audience_type, 0, NULL FROM fallback
+        WHERE audience_type IN ('public', 'authenticated')
+        UNION ALL
+        SELECT p.id, 'owner', (p.meta->>'owner_id')::bigint, NULL
+        FROM prof AS p
+        WHERE p.entity_type = 'resource'
+          AND json_typeof(p.meta->'owner_id') = 'number'
+          AND p.meta->>'owner_id' ~ '^-?[0-9]+$'
+    )
+    INSERT INTO entity_profile_visibility (profile_id, audience_type, subject_id, expires_at)
+    SELECT profile_id, audience_type, subject_id,
+           CASE WHEN bool_or(expires_at IS NULL) THEN NULL ELSE max(expires_at) END
+    FROM audiences
+    GROUP BY profile_id, audience_type, subject_id
+    """,
+]
+
+
+def refresh_visibility(conn: Connection, profile_ids: set[int]) -> None:
+    """Rebuild the visibility rows of ``profile_ids`` on ``conn``.
+
+    Called from the ``after_flush`` listener in ``backend.models``.
+    """
+
+    if not profile_ids:
+        return
+    for sql in VISIBILITY_INDEX_STATEMENTS:
+        stmt = sa.text(sql.replace("{range}", "t.id IN :ids")).bindparams(
+            sa.bindparam("ids", expanding=True)
+        )
+        conn.execute(stmt, {"ids": sorted(profile_ids)})
+
+
 @dataclass(slots=True)
 class ViewerContext:
     user: Optional[WebUser]
@@ -348,6 +441,7 @@ class ProfileService:
                 "expires_at": None,
             })
 
+        await self.session.refresh(profile, ["grants"])
         for grant in profile.grants:
             if grant.audience_type in {"public", "authenticated"}:
                 continue
@@ -466,6 +560,48 @@ class ProfileService:
             return sections
         return [section for section in sections if str(section.get("id")) in collected]
 
+    def _visible_to(self, context: ViewerContext, entity_type: str) -> Any:
+        """SQL predicate: the profile is listed for ``context`` (non-admin)."""
+
+        audiences = [EntityProfileVisibility.audience_type == "public"]
+        if context.is_authenticated:
+            audiences.append(EntityProfileVisibility.audience_type == "authenticated")
+        subjects: dict[str, set[int]] = {
+            "user": {context.user.id} if context.user else set(),
+            "group": context.group_ids,
+            "project": context.project_ids,
+            "area": context.area_ids,
+            "owner": context.telegram_ids if entity_type == "resource" else set(),
+        }
+        for audience, ids in subjects.items():
+            if ids:
+                audiences.append(
+                    and_(
+                        EntityProfileVisibility.audience_type == audience,
+                        EntityProfileVisibility.subject_id.in_(sorted(ids)),
+                    )
+                )
+        visible = exists().where(
+            EntityProfileVisibility.profile_id == EntityProfile.id,
+            or_(
+                EntityProfileVisibility.expires_at.is_(None),
+                EntityProfileVisibility.expires_at >= utcnow(),
+            ),
+            or_(*audiences),
+        )
+        owned: set[int] = set()
+        if entity_type == "user" and context.user:
+            owned = {context.user.id}
+        elif entity_type == "group":
+            owned = context.owned_group_ids
+        elif entity_type == "project":
+            owned = context.project_ids
+        elif entity_type == "area":
+            owned = context.area_ids
+        if owned:
+            return or_(visible, EntityProfile.entity_id.in_(sorted(owned)))
+        return visible
+
     async def _base_query(self, entity_type: str) -> Select:
         return (
             select(EntityProfile)
@@ -484,22 +620,35 @@ class ProfileService:
         search: Optional[str] = None,
     ) -> list[ProfileAccess]:
         context = await self._load_viewer_context(viewer)
-        stmt = (await self._base_query(entity_type)).execution_options(populate_existing=True)
+        # One query per page: access filtering and pagination run in SQL
+        # against entity_profile_visibility; grants come in the same round trip.
+        stmt = (
+            select(EntityProfile)
+            .where(EntityProfile.entity_type == entity_type)
+            .options(joinedload(EntityProfile.grants))
+            .order_by(EntityProfile.display_name.asc(), EntityProfile.id.asc())
+            .execution_options(populate_existing=True)
+        )
+        if not context.is_admin:
+            stmt = stmt.where(self._visible_to(context, entity_type))
         if search:
+            # Same expressions as the pg_trgm indexes; '' stays a literal so
+            # the planner can match lower(coalesce(summary, '')).
             pattern = f"%{search.lower()}%"
             stmt = stmt.where(
                 or_(
                     func.lower(EntityProfile.display_name).like(pattern),
                     func.lower(EntityProfile.slug).like(pattern),
-                    func.lower(func.coalesce(EntityProfile.summary, "")).like(pattern),
+                    func.lower(
+                        func.coalesce(EntityProfile.summary, literal_column("''"))
+                    ).like(pattern),
                 )
             )
         stmt = stmt.offset(offset).limit(limit)
         result = await self.session.execute(stmt)
-        profiles = result.scalars().all()
+        profiles = result.unique().scalars().all()
         response: list[ProfileAccess] = []
         for profile in profiles:
-            await self.session.refresh(profile, attribute_names=["grants"])
             owner_access = self._owned_by_viewer(profile, context)
             admin_access = context.is_admin
             grants = [] if (owner_access or admin_access) else self._grants_for_viewer(profile, context)
@@ -3,6 +3,7 @@ import os
 from sqlalchemy import select
 
 from backend import db
+from backend.health import Heartbeat
 from backend.models import (
     NotificationTrigger,
     NotificationDelivery,
@@ -26,6 +27,7 @@ class ProjectNotificationWorker:
     def __init__(self, poll_interval: float = 60.0) -> None:
         self.poll_interval = poll_interval
         self.bot = TelegramBotClient()
+        self.heartbeat = Heartbeat("project_notifications", poll_interval)
 
     async def run_once(self) -> None:
         async with db.async_session() as session:
@@ -74,6 +76,7 @@ class ProjectNotificationWorker:
 
         while True:
             await self.run_once()
+            await self.heartbeat.beat()
             if stop_event is None:
                 await asyncio.sleep(self.poll_interval)
             else:  # pragma: no branch - простая ветка ожидания
@@ -0,0 +1,248 @@
+"""Date-level RRULE (RFC 5545) compilation and expansion.
+
+Dailies store their schedule as an ``RRULE`` string.  :func:`compile_rule`
+parses and validates a string once into an immutable :class:`CompiledRule`
+(memoised by the rule text), and :func:`expand_many` expands many
+``(rule, dtstart)`` pairs over a window, doing the calendar walk once per
+group of items that share a rule and a phase instead of once per item.
+
+The calendar walk itself is :class:`dateutil.rrule.rrule`, so occurrences
+agree with dateutil for every supported combination of parts.  Only the date
+part of a rule matters here: ``FREQ`` (``DAILY`` to ``YEARLY``),
+``INTERVAL``, ``COUNT``, ``UNTIL``, ``WKST``, ``BYDAY`` (with ordinals for
+monthly and yearly rules), ``BYMONTHDAY`` and ``BYMONTH``.
+``BYHOUR``/``BYMINUTE``/``BYSECOND`` are accepted and ignored; other parts
+raise :class:`ValueError`.
+"""
+
+from __future__ import annotations
+
+import re
+from bisect import bisect_left
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+from dateutil import rrule as du
+
+FREQUENCIES = ("DAILY", "WEEKLY", "MONTHLY", "YEARLY")
+WEEKDAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+_DATEUTIL_FREQ = {"DAILY": du.DAILY, "WEEKLY": du.WEEKLY, "MONTHLY": du.MONTHLY, "YEARLY": du.YEARLY}
+_IGNORED_PARTS = {"BYHOUR", "BYMINUTE", "BYSECOND"}
+_BYDAY_RE = re.compile(r"^([+-]?\d{1,2})?(MO|TU|WE|TH|FR|SA|SU)$")
+
+
+def _add_months(day: date, months: int) -> date:
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+@dataclass(frozen=True)
+class CompiledRule:
+    """Parsed recurrence rule; expansion needs only a ``dtstart`` date."""
+
+    freq: str
+    interval: int = 1
+    count: Optional[int] = None
+    until: Optional[date] = None
+    wkst: int = 0
+    byweekday: Tuple[Tuple[int, Optional[int]], ...] = ()
+    bymonthday: Tuple[int, ...] = ()
+    bymonth: Tuple[int, ...] = ()
+
+    # -- periods -------------------------------------------------------
+    def _period_start(self, day: date) -> date:
+        if self.freq == "DAILY":
+            return day
+        if self.freq == "WEEKLY":
+            return day - timedelta(days=(day.weekday() - self.wkst) % 7)
+        if self.freq == "MONTHLY":
+            return day.replace(day=1)
+        return date(day.year, 1, 1)
+
+    def _period_index(self, period: date) -> int:
+        if self.freq == "DAILY":
+            return period.toordinal()
+        if self.freq == "WEEKLY":
+            return period.toordinal() // 7
+        if self.freq == "MONTHLY":
+            return period.year * 12 + period.month - 1
+        return period.year
+
+    def _advance(self, period: date, steps: int) -> date:
+        if self.freq == "DAILY":
+            return period + timedelta(days=steps)
+        if self.freq == "WEEKLY":
+            return period + timedelta(days=7 * steps)
+        if self.freq == "MONTHLY":
+            return _add_months(period, steps)
+        return date(period.year + steps, 1, 1)
+
+    # -- dateutil series ----------------------------------------------
+    def defaults(self, dtstart: date) -> tuple:
+        """The parts of ``dtstart`` the rule falls back to when BY* parts are absent.
+
+        Mirrors dateutil: only rules without ``BYDAY`` and ``BYMONTHDAY``
+        inherit anything from ``dtstart``.
+        """
+
+        if self.byweekday or self.bymonthday:
+            return ()
+        if self.freq == "WEEKLY":
+            return (dtstart.weekday(),)
+        if self.freq == "MONTHLY":
+            return (dtstart.day,)
+        if self.freq == "YEARLY":
+            return (dtstart.month, dtstart.day)
+        return ()
+
+    def _series(self, first: date, defaults: tuple, last: date) -> du.rrule:
+        """The dateutil rule over ``[first, last]`` with ``defaults`` made explicit.
+
+        Spelling out the parts dateutil would otherwise take from ``dtstart``
+        lets the walk start at a later period without changing the series.
+        """
+
+        byweekday = [du.weekday(wd, nth) for wd, nth in self.byweekday]
+        bymonthday = list(self.bymonthday)
+        bymonth = list(self.bymonth)
+        if defaults and self.freq == "WEEKLY":
+            byweekday = [du.weekday(defaults[0])]
+        elif defaults and self.freq == "MONTHLY":
+            bymonthday = [defaults[0]]
+        elif defaults:
+            bymonth = bymonth or [defaults[0]]
+            bymonthday = [defaults[1]]
+        return du.rrule(
+            _DATEUTIL_FREQ[self.freq],
+            dtstart=datetime(first.year, first.month, first.day),
+            until=datetime(last.year, last.month, last.day),
+            interval=self.interval,
+            wkst=self.wkst,
+            byweekday=byweekday or None,
+            bymonthday=bymonthday or None,
+            bymonth=bymonth or None,
+        )
+
+    # -- expansion -----------------------------------------------------
+    def anchor(self, dtstart: date) -> Hashable:
+        """Key under which items expand identically up to their own ``dtstart``."""
+
+        if self.count is not None:
+            return dtstart
+        phase = self._period_index(self._period_start(dtstart)) % self.interval
+        return (phase, self.defaults(dtstart))
+
+    def occurrences(self, dtstart: date, start: date, end: date) -> List[date]:
+        """Occurrences in ``[start, end]`` of the series beginning at ``dtstart``."""
+
+        if self.until is not None:
+            end = min(end, self.until)
+        if end < start or end < dtstart:
+            return []
+        defaults = self.defaults(dtstart)
+        first = dtstart
+        if self.count is None and start > dtstart:
+            period = self._period_start(dtstart)
+            gap = self._period_index(self._period_start(start)) - self._period_index(period)
+            first = max(dtstart, self._advance(period, (gap // self.interval) * self.interval))
+        # Bounding the walk by ``end`` (and applying COUNT here) keeps rules
+        # that can never match, such as BYMONTH=2;BYMONTHDAY=30, from walking
+        # dateutil all the way to year 9999.
+        days = [occurrence.date() for occurrence in self._series(first, defaults, end)]
+        if self.count is not None:
+            days = days[: self.count]
+        return days[bisect_left(days, start):]
+
+
+@lru_cache(maxsize=4096)
+def compile_rule(text: str) -> CompiledRule:
+    """Parse an ``RRULE`` string; raises :class:`ValueError` when it is invalid."""
+
+    body = (text or "").strip()
+    for line in body.splitlines():
+        if line.upper().startswith("RRULE:"):
+            body = line
+            break
+    if body.upper().startswith("RRULE:"):
+        body = body[len("RRULE:"):]
+    parts: Dict[str, str] = {}
+    for chunk in body.split(";"):
+        if not chunk.strip():
+            continue
+        key, sep, value = chunk.partition("=")
+        if not sep:
+            raise ValueError(f"invalid rrule part: {chunk!r}")
+        parts[key.strip().upper()] = value.strip().upper()
+
+    freq = parts.pop("FREQ", None)
+    if freq not in FREQUENCIES:
+        raise ValueError("rrule requires FREQ of DAILY, WEEKLY, MONTHLY or YEARLY")
+    try:
+        interval = int(parts.pop("INTERVAL", "1"))
+        count = int(parts["COUNT"]) if "COUNT" in parts else None
+        parts.pop("COUNT", None)
+        until_raw = parts.pop("UNTIL", None)
+        until = date(int(until_raw[:4]), int(until_raw[4:6]), int(until_raw[6:8])) if until_raw else None
+        bymonthday = tuple(int(v) for v in parts.pop("BYMONTHDAY", "").split(",") if v)
+        bymonth = tuple(int(v) for v in parts.pop("BYMONTH", "").split(",") if v)
+    except (TypeError, ValueError):
+        raise ValueError("invalid rrule number") from None
+    wkst = parts.pop("WKST", "MO")
+    if wkst not in WEEKDAYS:
+        raise ValueError("invalid rrule WKST")
+    byweekday = []
+    for token in filter(None, parts.pop("BYDAY", "").split(",")):
+        match = _BYDAY_RE.match(token)
+        if not match:
+            raise ValueError(f"invalid rrule BYDAY: {token!r}")
+        nth = int(match.group(1)) if match.group(1) else None
+        if nth is not None and (nth == 0 or freq not in {"MONTHLY", "YEARLY"}):
+            raise ValueError(f"invalid rrule BYDAY: {token!r}")
+        byweekday.append((WEEKDAYS.index(match.group(2)), nth))
+    for key in _IGNORED_PARTS:
+        parts.pop(key, None)
+    if parts:
+        raise ValueError(f"unsupported rrule parts: {', '.join(sorted(parts))}")
+    if interval < 1 or (count is not None and count < 1):
+        raise ValueError("rrule INTERVAL and COUNT must be positive")
+    if any(md == 0 or not -31 <= md <= 31 for md in bymonthday):
+        raise ValueError("invalid rrule BYMONTHDAY")
+    if any(not 1 <= m <= 12 for m in bymonth):
+        raise ValueError("invalid rrule BYMONTH")
+    return CompiledRule(
+        freq=freq,
+        interval=interval,
+        count=count,
+        until=until,
+        wkst=WEEKDAYS.index(wkst),
+        byweekday=tuple(byweekday),
+        bymonthday=bymonthday,
+        bymonth=bymonth,
+    )
+
+
+def expand_many(
+    items: Iterable[Tuple[Hashable, str, date]], start: date, end: date
+) -> Dict[Hashable, List[date]]:
+    """Expand ``(key, rrule, dtstart)`` items over ``[start, end]``.
+
+    Items sharing a rule and :meth:`CompiledRule.anchor` are expanded once
+    from the earliest ``dtstart`` and clipped per item.  Invalid rules raise.
+    """
+
+    groups: Dict[tuple, List[Tuple[date, Hashable]]] = {}
+    for key, text, dtstart in items:
+        rule = compile_rule(text)
+        groups.setdefault((rule, rule.anchor(dtstart)), []).append((dtstart, key))
+    out: Dict[Hashable, List[date]] = {}
+    for (rule, _), members in groups.items():
+        members.sort(key=lambda member: member[0])
+        days = rule.occurrences(members[0][0], start, end)
+        for dtstart, key in members:
+            out[key] = days[bisect_left(days, dtstart):]
+    return out
+
+
+__all__ = ["CompiledRule", "compile_rule", "expand_many"]
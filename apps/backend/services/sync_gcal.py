@@ -1,50 +1,421 @@
-"""Google Calendar sync helpers."""
+"""Google Calendar OAuth and event sync into ``calendar_items``.
+
+:class:`GCalSyncService` pulls a linked calendar with ``events.list``:
+:meth:`~GCalSyncService.iter_pages` follows ``nextPageToken`` as an async
+generator, and each page is upserted into ``calendar_items`` in batches keyed
+by ``(gcal_link_id, gcal_event_id)`` and committed on its own.  Page tokens
+are not persisted: an interrupted sync keeps the pages it already wrote, but
+the next run starts again from the stored ``syncToken`` (only the last page
+carries ``nextSyncToken``), which is harmless because the upserts are
+idempotent.
+
+* With a stored ``syncToken`` only changes are fetched.  Google answers 410
+  when the token is no longer valid; the token is dropped and the link is
+  resynced in full.
+* A full sync covers ``FULL_SYNC_PAST_DAYS`` before and
+  ``FULL_SYNC_FUTURE_DAYS`` after now; imported items in that window that were
+  not seen again are cancelled.
+* ``showDeleted`` tombstones (``status: cancelled``) cancel the matching
+  items instead of deleting them, so alarms and links stay intact.
+
+All requests go through one pooled ``httpx.AsyncClient`` per event loop
+(HTTP/2 when ``h2`` is installed), and concurrent link syncs share the
+``GCAL_SYNC_CONCURRENCY`` cap.  ``API_BASE`` and ``TOKEN_URL`` can be pointed
+at a local fake server in tests.
+"""
+
 from __future__ import annotations
 
-from datetime import datetime, timedelta, timezone
-from typing import Any
-from urllib.parse import urlencode
+import asyncio
+import os
 import uuid
+import weakref
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Sequence
+from urllib.parse import quote, urlencode
 
 import httpx
-from sqlalchemy import select
+import sqlalchemy as sa
+from sqlalchemy import or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend import db
 from backend.logger import logger
-from backend.models import GCalLink
+from backend.models import (
+    Area,
+    CalendarItem,
+    CalendarItemStatus,
+    GCalLink,
+    TgUser,
+    WebTgLink,
+)
 from backend.utils import utcnow
 
+try:  # pragma: no cover - optional HTTP/2 support
+    import h2  # noqa: F401
+
+    HTTP2 = True
+except ImportError:  # pragma: no cover
+    HTTP2 = False
+
 AUTH_URL = "https://accounts.google.com/o/oauth2/v2/auth"
 TOKEN_URL = "https://oauth2.googleapis.com/token"
-EVENTS_URL_TMPL = "https://www.googleapis.com/calendar/v3/calendars/{cal_id}/events"
-WATCH_URL_TMPL = EVENTS_URL_TMPL + "/watch"
+API_BASE = "https://www.googleapis.com/calendar/v3"
 SCOPE = "https://www.googleapis.com/auth/calendar"
 
+PAGE_SIZE = 250
+FULL_SYNC_PAST_DAYS = 60
+FULL_SYNC_FUTURE_DAYS = 180
+UNTITLED = "(без названия)"
 
-async def _refresh_if_needed(link: GCalLink, session: AsyncSession) -> GCalLink:
-    from web.config import S
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
 
-    if link.token_expiry and link.token_expiry > utcnow() + timedelta(minutes=1):
-        return link
-    data = {
-        "client_id": S.GOOGLE_CLIENT_ID,
-        "client_secret": S.GOOGLE_CLIENT_SECRET,
-        "refresh_token": link.refresh_token,
-        "grant_type": "refresh_token",
+
+def get_client() -> httpx.AsyncClient:
+    """Shared Google API client of the running event loop."""
+
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            http2=HTTP2,
+            timeout=httpx.Timeout(30.0, connect=10.0),
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        )
+        _clients[loop] = client
+    return client
+
+
+async def close_client() -> None:
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+def sync_concurrency() -> int:
+    return max(1, int(os.getenv("GCAL_SYNC_CONCURRENCY", "4")))
+
+
+def _semaphore() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    sem = _semaphores.get(loop)
+    if sem is None:
+        sem = _semaphores[loop] = asyncio.Semaphore(sync_concurrency())
+    return sem
+
+
+class SyncTokenExpired(Exception):
+    """Google rejected the stored ``syncToken`` (HTTP 410)."""
+
+
+@dataclass
+class SyncResult:
+    link_id: int
+    mode: str
+    upserted: int = 0
+    cancelled: int = 0
+    pages: int = 0
+    resynced: bool = False
+
+
+def _parse_when(value: Optional[Dict[str, Any]]) -> Optional[datetime]:
+    if not value:
+        return None
+    if value.get("dateTime"):
+        moment = datetime.fromisoformat(value["dateTime"].replace("Z", "+00:00"))
+        return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+    if value.get("date"):
+        return datetime.combine(date.fromisoformat(value["date"]), time(), tzinfo=timezone.utc)
+    return None
+
+
+def event_row(event: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """``calendar_items`` values of a live event; ``None`` for tombstones."""
+
+    if event.get("status") == "cancelled":
+        return None
+    start_at = _parse_when(event.get("start"))
+    if start_at is None:
+        return None
+    return {
+        "gcal_event_id": event["id"],
+        "title": (event.get("summary") or UNTITLED)[:255],
+        "start_at": start_at,
+        "end_at": _parse_when(event.get("end")),
     }
-    async with httpx.AsyncClient() as client:
-        resp = await client.post(TOKEN_URL, data=data)
+
+
+class GCalSyncService:
+    """Sync linked Google calendars into ``calendar_items``."""
+
+    def __init__(
+        self,
+        client: Optional[httpx.AsyncClient] = None,
+        *,
+        api_base: str = API_BASE,
+        token_url: str = TOKEN_URL,
+        batch_size: int = 500,
+    ) -> None:
+        self._client = client
+        self.api_base = api_base.rstrip("/")
+        self.token_url = token_url
+        self.batch_size = batch_size
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return self._client or get_client()
+
+    # ------------------------------------------------------------------
+    # Google API
+    # ------------------------------------------------------------------
+    async def refresh_token(self, session: AsyncSession, link: GCalLink) -> None:
+        if not link.refresh_token:
+            return
+        if link.token_expiry and link.token_expiry > utcnow() + timedelta(minutes=1):
+            return
+        from web.config import S
+
+        resp = await self.client.post(
+            self.token_url,
+            data={
+                "client_id": S.GOOGLE_CLIENT_ID,
+                "client_secret": S.GOOGLE_CLIENT_SECRET,
+                "refresh_token": link.refresh_token,
+                "grant_type": "refresh_token",
+            },
+        )
         resp.raise_for_status()
         payload = resp.json()
-    link.access_token = payload["access_token"]
-    expires_in = int(payload.get("expires_in", 3600))
-    link.token_expiry = utcnow() + timedelta(seconds=expires_in)
-    session.add(link)
-    await session.commit()
-    return link
+        link.access_token = payload["access_token"]
+        link.token_expiry = utcnow() + timedelta(seconds=int(payload.get("expires_in", 3600)))
+        await session.commit()
+
+    async def iter_pages(
+        self, link: GCalLink, params: Dict[str, Any]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield ``events.list`` pages until there is no ``nextPageToken``."""
+
+        url = f"{self.api_base}/calendars/{quote(link.calendar_id, safe='')}/events"
+        headers = {"Authorization": f"Bearer {link.access_token}"}
+        page_token: Optional[str] = None
+        while True:
+            query = {**params, "pageToken": page_token} if page_token else params
+            resp = await self.client.get(url, params=query, headers=headers)
+            if resp.status_code == 410:
+                raise SyncTokenExpired(link.id)
+            resp.raise_for_status()
+            page = resp.json()
+            yield page
+            page_token = page.get("nextPageToken")
+            if not page_token:
+                return
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+    async def _ensure_inbox(self, session: AsyncSession, owner_id: int) -> Area:
+        stmt = select(Area).where(
+            Area.owner_id == owner_id,
+            or_(Area.slug == "inbox", Area.name.ilike("входящие")),
+        )
+        inbox = (await session.execute(stmt)).scalars().first()
+        if inbox is None:
+            inbox = Area(owner_id=owner_id, name="Входящие", title="Входящие")
+            inbox.slug = "inbox"
+            inbox.mp_path = "inbox."
+            inbox.depth = 0
+            session.add(inbox)
+            await session.flush()
+        return inbox
+
+    async def _upsert(
+        self, session: AsyncSession, link: GCalLink, area_id: int, rows: Sequence[Dict[str, Any]]
+    ) -> int:
+        now = utcnow()
+        values = [
+            {
+                **row,
+                "owner_id": link.owner_id,
+                "area_id": area_id,
+                "gcal_link_id": link.id,
+                "status": CalendarItemStatus.planned,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for row in rows
+        ]
+        stmt = pg_insert(CalendarItem).values(values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[CalendarItem.gcal_link_id, CalendarItem.gcal_event_id],
+            set_={
+                "title": stmt.excluded.title,
+                "start_at": stmt.excluded.start_at,
+                "end_at": stmt.excluded.end_at,
+                "updated_at": stmt.excluded.updated_at,
+                # A re-confirmed event comes back; local "done" is kept.
+                "status": sa.case(
+                    (CalendarItem.status == CalendarItemStatus.cancelled, stmt.excluded.status),
+                    else_=CalendarItem.status,
+                ),
+            },
+        )
+        await session.execute(stmt)
+        return len(values)
+
+    async def _cancel(self, session: AsyncSession, link: GCalLink, event_ids: Iterable[str]) -> int:
+        result = await session.execute(
+            sa.update(CalendarItem)
+            .where(
+                CalendarItem.gcal_link_id == link.id,
+                CalendarItem.gcal_event_id.in_(list(event_ids)),
+                CalendarItem.status != CalendarItemStatus.cancelled,
+            )
+            .values(status=CalendarItemStatus.cancelled, updated_at=utcnow())
+        )
+        return result.rowcount or 0
 
+    async def _apply(
+        self,
+        session: AsyncSession,
+        link: GCalLink,
+        area_id: int,
+        events: Sequence[Dict[str, Any]],
+        result: SyncResult,
+    ) -> None:
+        # The last version of an event in the page wins; one statement may
+        # not touch the same row twice.
+        latest: Dict[str, Optional[Dict[str, Any]]] = {}
+        for event in events:
+            if event.get("id"):
+                latest[event["id"]] = event_row(event)
+        live = [row for row in latest.values() if row is not None]
+        gone = [event_id for event_id, row in latest.items() if row is None]
+        for i in range(0, len(live), self.batch_size):
+            result.upserted += await self._upsert(session, link, area_id, live[i : i + self.batch_size])
+        for i in range(0, len(gone), self.batch_size):
+            result.cancelled += await self._cancel(session, link, gone[i : i + self.batch_size])
 
+    async def _consume(
+        self,
+        session: AsyncSession,
+        link: GCalLink,
+        area_id: int,
+        params: Dict[str, Any],
+        result: SyncResult,
+    ) -> None:
+        query = {"singleEvents": "true", "showDeleted": "true", "maxResults": PAGE_SIZE, **params}
+        async for page in self.iter_pages(link, query):
+            result.pages += 1
+            await self._apply(session, link, area_id, page.get("items") or [], result)
+            if page.get("nextSyncToken"):
+                link.sync_token = page["nextSyncToken"]
+            await session.commit()
+
+    async def _full(
+        self, session: AsyncSession, link: GCalLink, area_id: int, result: SyncResult
+    ) -> None:
+        started = utcnow()
+        time_min = started - timedelta(days=FULL_SYNC_PAST_DAYS)
+        time_max = started + timedelta(days=FULL_SYNC_FUTURE_DAYS)
+        await self._consume(
+            session,
+            link,
+            area_id,
+            {"timeMin": time_min.isoformat(), "timeMax": time_max.isoformat()},
+            result,
+        )
+        swept = await session.execute(
+            sa.update(CalendarItem)
+            .where(
+                CalendarItem.gcal_link_id == link.id,
+                CalendarItem.start_at >= time_min,
+                CalendarItem.start_at < time_max,
+                CalendarItem.updated_at < started,
+                CalendarItem.status != CalendarItemStatus.cancelled,
+            )
+            .values(status=CalendarItemStatus.cancelled, updated_at=utcnow())
+        )
+        result.cancelled += swept.rowcount or 0
+
+    # ------------------------------------------------------------------
+    # Entry points
+    # ------------------------------------------------------------------
+    async def sync_link(self, link_id: int, *, full: bool = False) -> SyncResult:
+        """Sync one link: incremental when it has a ``syncToken``, else full."""
+
+        async with _semaphore():
+            async with db.async_session() as session:  # type: ignore
+                link = await session.get(GCalLink, link_id)
+                if link is None:
+                    raise ValueError("gcal link not found")
+                if link.owner_id is None:
+                    raise ValueError("gcal link has no telegram owner")
+                area_id = (await self._ensure_inbox(session, link.owner_id)).id
+                await self.refresh_token(session, link)
+
+                result = SyncResult(link_id=link_id, mode="full")
+                if link.sync_token and not full:
+                    result.mode = "incremental"
+                    try:
+                        await self._consume(
+                            session, link, area_id, {"syncToken": link.sync_token}, result
+                        )
+                    except SyncTokenExpired:
+                        # Pages applied before the 410 are already committed
+                        # and stay counted in the result.
+                        logger.warning("gcal link %s: sync token expired, resyncing", link_id)
+                        link.sync_token = None
+                        result.mode = "full"
+                        result.resynced = True
+                if result.mode == "full":
+                    await self._full(session, link, area_id, result)
+                link.last_synced_at = utcnow()
+                await session.commit()
+        logger.info(
+            "gcal link %s: %s sync, %s upserted, %s cancelled, %s pages",
+            link_id,
+            result.mode,
+            result.upserted,
+            result.cancelled,
+            result.pages,
+        )
+        return result
+
+    async def sync_all(self, link_ids: Optional[Iterable[int]] = None) -> List[SyncResult]:
+        """Sync links concurrently (bounded by ``GCAL_SYNC_CONCURRENCY``)."""
+
+        if link_ids is None:
+            async with db.async_session() as session:  # type: ignore
+                link_ids = (
+                    await session.execute(
+                        select(GCalLink.id)
+                        .where(GCalLink.owner_id.is_not(None), GCalLink.access_token.is_not(None))
+                        .order_by(GCalLink.id)
+                    )
+                ).scalars().all()
+        ids = list(link_ids)
+        outcomes = await asyncio.gather(
+            *(self.sync_link(link_id) for link_id in ids), return_exceptions=True
+        )
+        results: List[SyncResult] = []
+        for link_id, outcome in zip(ids, outcomes, strict=True):
+            if isinstance(outcome, BaseException):
+                logger.error("gcal link %s: sync failed: %r", link_id, outcome)
+            else:
+                results.append(outcome)
+        return results
+
+
+# ----------------------------------------------------------------------
+# OAuth and links
+# ----------------------------------------------------------------------
 def generate_auth_url(state: str, redirect_uri: str) -> str:
     from web.config import S
 
@@ -70,27 +441,39 @@ async def exchange_code(code: str, redirect_uri: str) -> dict[str, Any]:
         "grant_type": "authorization_code",
         "redirect_uri": redirect_uri,
     }
-    async with httpx.AsyncClient() as client:
-        resp = await client.post(TOKEN_URL, data=data)
-        resp.raise_for_status()
-        return resp.json()
+    resp = await get_client().post(TOKEN_URL, data=data)
+    resp.raise_for_status()
+    return resp.json()
 
 
-async def save_link(
-    user_id: str,
-    google_calendar_id: str,
-    token_data: dict[str, Any],
-) -> GCalLink:
+async def save_link(user_id: str, calendar_id: str, token_data: dict[str, Any]) -> GCalLink:
+    """Create or refresh the link of web user ``user_id`` to ``calendar_id``."""
+
     async with db.async_session() as session:
-        link = GCalLink(
-            user_id=user_id,
-            google_calendar_id=google_calendar_id,
-            access_token=token_data["access_token"],
-            refresh_token=token_data.get("refresh_token", ""),
-            scope=token_data.get("scope", ""),
-            token_expiry=utcnow() + timedelta(seconds=int(token_data.get("expires_in", 3600))),
-        )
-        session.add(link)
+        owner_id = (
+            await session.execute(
+                select(TgUser.telegram_id)
+                .join(WebTgLink, WebTgLink.tg_user_id == TgUser.id)
+                .where(WebTgLink.web_user_id == int(user_id))
+                .order_by(WebTgLink.id)
+                .limit(1)
+            )
+        ).scalar_one_or_none()
+        link = (
+            await session.execute(
+                select(GCalLink).where(
+                    GCalLink.user_id == user_id, GCalLink.calendar_id == calendar_id
+                )
+            )
+        ).scalar_one_or_none()
+        if link is None:
+            link = GCalLink(user_id=user_id, calendar_id=calendar_id)
+            session.add(link)
+        link.owner_id = owner_id
+        link.access_token = token_data["access_token"]
+        link.refresh_token = token_data.get("refresh_token") or link.refresh_token
+        link.scope = token_data.get("scope", "")
+        link.token_expiry = utcnow() + timedelta(seconds=int(token_data.get("expires_in", 3600)))
         await session.commit()
         await session.refresh(link)
         return link
@@ -101,71 +484,28 @@ async def get_link(user_id: str, calendar_id: str) -> GCalLink | None:
         res = await session.execute(
             select(GCalLink).where(
                 GCalLink.user_id == user_id,
-                GCalLink.google_calendar_id == calendar_id,
+                GCalLink.calendar_id == calendar_id,
             )
         )
         link = res.scalar_one_or_none()
         if not link:
             return None
-        return await _refresh_if_needed(link, session)
+        await GCalSyncService().refresh_token(session, link)
+        return link
 
 
-async def initial(user_id: str, google_calendar_id: str) -> list[dict[str, Any]]:
-    link = await get_link(user_id, google_calendar_id)
+async def initial(user_id: str, calendar_id: str) -> SyncResult:
+    link = await get_link(user_id, calendar_id)
     if not link:
         raise ValueError("not linked")
-    params = {
-        "timeMin": (utcnow() - timedelta(days=60)).isoformat(),
-        "timeMax": (utcnow() + timedelta(days=180)).isoformat(),
-        "singleEvents": True,
-        "showDeleted": True,
-    }
-    headers = {"Authorization": f"Bearer {link.access_token}"}
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(
-            EVENTS_URL_TMPL.format(cal_id=google_calendar_id),
-            params=params,
-            headers=headers,
-        )
-        resp.raise_for_status()
-        data = resp.json()
-    async with db.async_session() as session:
-        link.sync_token = data.get("nextSyncToken")
-        session.add(link)
-        await session.commit()
-    items = data.get("items", [])
-    logger.info("gcal initial sync: %s items", len(items))
-    return items
+    return await GCalSyncService().sync_link(link.id, full=True)
 
 
-async def incremental(user_id: str, google_calendar_id: str) -> list[dict[str, Any]]:
-    link = await get_link(user_id, google_calendar_id)
-    if not link or not link.sync_token:
-        return await initial(user_id, google_calendar_id)
-    params = {
-        "syncToken": link.sync_token,
-        "singleEvents": True,
-        "showDeleted": True,
-    }
-    headers = {"Authorization": f"Bearer {link.access_token}"}
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(
-            EVENTS_URL_TMPL.format(cal_id=google_calendar_id),
-            params=params,
-            headers=headers,
-        )
-    if resp.status_code == 410:
-        logger.warning("gcal sync token expired, resyncing")
-        return await initial(user_id, google_calendar_id)
-    resp.raise_for_status()
-    data = resp.json()
-    async with db.async_session() as session:
-        link.sync_token = data.get("nextSyncToken")
-        session.add(link)
-        await session.commit()
-    items = data.get("items", [])
-    logger.info("gcal incremental sync: %s items", len(items))
-    return items
+async def incremental(user_id: str, calendar_id: str) -> SyncResult:
+    link = await get_link(user_id, calendar_id)
+    if not link:
+        raise ValueError("not linked")
+    return await GCalSyncService().sync_link(link.id)
 
 
 async def start_watch(link: GCalLink) -> None:
@@ -177,12 +517,13 @@ async def start_watch(link: GCalLink) -> None:
         "address": S.GCAL_WEBHOOK_URL,
     }
     headers = {"Authorization": f"Bearer {link.access_token}"}
-    async with httpx.AsyncClient() as client:
-        resp = await client.post(
-            WATCH_URL_TMPL.format(cal_id=link.google_calendar_id), json=body, headers=headers
-        )
-        resp.raise_for_status()
-        payload = resp.json()
+    resp = await get_client().post(
+        f"{API_BASE}/calendars/{quote(link.calendar_id, safe='')}/events/watch",
+        json=body,
+        headers=headers,
+    )
+    resp.raise_for_status()
+    payload = resp.json()
     link.channel_id = payload.get("id")
     link.resource_id = payload.get("resourceId")
     exp = payload.get("expiration")
@@ -191,3 +532,20 @@ async def start_watch(link: GCalLink) -> None:
     async with db.async_session() as session:
         session.add(link)
         await session.commit()
+
+
+__all__ = [
+    "GCalSyncService",
+    "SyncResult",
+    "SyncTokenExpired",
+    "close_client",
+    "event_row",
+    "exchange_code",
+    "generate_auth_url",
+    "get_client",
+    "get_link",
+    "incremental",
+    "initial",
+    "save_link",
+    "start_watch",
+]
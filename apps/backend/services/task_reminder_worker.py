@@ -8,6 +8,7 @@ from datetime import timedelta
 from sqlalchemy import select
 
 from backend import db
+from backend.health import Heartbeat
 from backend.models import TaskReminder, Task
 from backend.services.task_notification_service import TaskNotificationService
 from backend.services.telegram_bot import TelegramBotClient
@@ -20,6 +21,7 @@ class TaskReminderWorker:
     def __init__(self, poll_interval: float = 60.0, bot: TelegramBotClient | None = None) -> None:
         self.poll_interval = poll_interval
         self.bot = bot or TelegramBotClient()
+        self.heartbeat = Heartbeat("task_reminders", poll_interval)
 
     async def run_once(self) -> None:
         async with db.async_session() as session:
@@ -53,6 +55,7 @@ class TaskReminderWorker:
     async def start(self, stop_event: asyncio.Event | None = None) -> None:
         while True:
             await self.run_once()
+            await self.heartbeat.beat()
             if stop_event is None:
                 await asyncio.sleep(self.poll_interval)
             else:
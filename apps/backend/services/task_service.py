@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from datetime import datetime
 from typing import List, Optional, Sequence
 
 from sqlalchemy import select, or_
@@ -21,6 +22,7 @@ from backend.models import (
     ScheduleException,
     Project,
     Area,
+    TimeEntry,
 )
 from backend.services.time_service import TimeService
 from sqlalchemy import func
@@ -161,6 +163,18 @@ class TaskService:
         result = await self.session.execute(stmt)
         return result.scalars().all()
 
+    async def list_due_dates(self, owner_id: int) -> list[tuple[int, str, datetime]]:
+        """``(id, title, due_date)`` of the owner's tasks that have a due date.
+
+        Column select for read-only listings: no ORM entities are built.
+        """
+
+        stmt = select(Task.id, Task.title, Task.due_date).where(
+            Task.owner_id == owner_id, Task.due_date.is_not(None)
+        )
+        result = await self.session.execute(stmt)
+        return [tuple(row) for row in result.all()]
+
     async def update_task(self, task_id: int, **fields) -> Task | None:
         """Update task fields and return the task."""
 
@@ -424,6 +438,21 @@ class TaskService:
                 total += int((e.end_time - e.start_time).total_seconds())
         return total // 60
 
+    async def tracked_minutes_by_task(self, task_ids: Sequence[int]) -> dict[int, int]:
+        """``total_tracked_minutes`` for many tasks in one query."""
+
+        if not task_ids:
+            return {}
+        stmt = select(TimeEntry.task_id, TimeEntry.start_time, TimeEntry.end_time).where(
+            TimeEntry.task_id.in_(task_ids),
+            TimeEntry.end_time.is_not(None),
+            TimeEntry.start_time.is_not(None),
+        )
+        seconds: dict[int, int] = {}
+        for task_id, start, end in (await self.session.execute(stmt)).all():
+            seconds[task_id] = seconds.get(task_id, 0) + int((end - start).total_seconds())
+        return {task_id: total // 60 for task_id, total in seconds.items()}
+
     async def list_tasks_by_area(self, owner_id: int, area_id: int, include_sub: bool = False) -> List[Task]:
         if not include_sub:
             return await self.list_tasks(owner_id=owner_id, area_id=area_id)
@@ -2,15 +2,13 @@
 
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+from dataclasses import dataclass, replace
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Set, Tuple
 import secrets
 import hashlib
 
-from aiogram import Bot
-from aiogram.enums import ChatMemberStatus
-from aiogram.exceptions import TelegramBadRequest
-from aiogram.types import ChatMember, User
-from sqlalchemy import select, func
+from sqlalchemy import func, literal_column, or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -28,6 +26,54 @@ from backend.models import (
 from backend.utils import utcnow
 from backend.services.profile_service import ProfileService, normalize_slug
 
+if TYPE_CHECKING:  # aiogram is imported lazily: the web app never loads it
+    from aiogram import Bot
+    from aiogram.types import ChatMember, User
+
+# Rows per multi-row INSERT; keeps bind parameters well under PostgreSQL's 32767.
+ROSTER_CHUNK = 1000
+_PROFILE_FIELDS = ("username", "first_name", "last_name", "language_code")
+
+
+@dataclass(frozen=True)
+class RosterMember:
+    """A Telegram user and their flags in one group, as the Bot API reports."""
+
+    telegram_id: int
+    username: Optional[str] = None
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    language_code: Optional[str] = None
+    is_owner: bool = False
+    is_moderator: bool = False
+
+    @classmethod
+    def from_telegram(
+        cls, user: "User", *, is_owner: bool = False, is_moderator: bool = False
+    ) -> "RosterMember":
+        return cls(
+            telegram_id=user.id,
+            username=getattr(user, "username", None),
+            first_name=getattr(user, "first_name", None),
+            last_name=getattr(user, "last_name", None),
+            language_code=getattr(user, "language_code", None),
+            is_owner=is_owner,
+            is_moderator=is_moderator,
+        )
+
+
+@dataclass
+class RosterUpsertResult:
+    users_inserted: int = 0
+    users_updated: int = 0
+    links_inserted: int = 0
+    links_updated: int = 0
+
+
+def _inserted_flag():
+    # xmax is 0 for a freshly inserted row and set for one updated ON CONFLICT.
+    return literal_column("xmax = 0").label("inserted")
+
 
 class TelegramUserService:
     """CRUD helpers for ``TgUser`` and related models."""
@@ -354,6 +400,134 @@ class TelegramUserService:
         await self.session.flush()
         return True
 
+    # ------------------------------------------------------------------
+    # Bulk roster
+    # ------------------------------------------------------------------
+    async def upsert_users(
+        self, members: Sequence[RosterMember]
+    ) -> Tuple[int, int]:
+        """Insert or refresh ``users_tg`` rows; return ``(inserted, updated)``.
+
+        Like :meth:`update_from_telegram`, ``None`` fields keep the stored
+        value.  Rows whose data did not change are not rewritten.
+        """
+
+        by_id: Dict[int, RosterMember] = {m.telegram_id: m for m in members}
+        inserted = updated = 0
+        now = utcnow()
+        rows = list(by_id.values())
+        for start in range(0, len(rows), ROSTER_CHUNK):
+            chunk = rows[start : start + ROSTER_CHUNK]
+            stmt = pg_insert(TgUser).values(
+                [
+                    {
+                        "telegram_id": m.telegram_id,
+                        "username": m.username,
+                        "first_name": m.first_name,
+                        "last_name": m.last_name,
+                        "language_code": m.language_code,
+                        "role": UserRole.single.name,
+                        "bot_settings": {},
+                        "created_at": now,
+                        "updated_at": now,
+                    }
+                    for m in chunk
+                ]
+            )
+            table = TgUser.__table__
+            merged = {
+                field: func.coalesce(stmt.excluded[field], table.c[field])
+                for field in _PROFILE_FIELDS
+            }
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[TgUser.telegram_id],
+                set_={**merged, "updated_at": stmt.excluded.updated_at},
+                where=or_(
+                    *(table.c[field].is_distinct_from(merged[field]) for field in _PROFILE_FIELDS)
+                ),
+            ).returning(TgUser.telegram_id, _inserted_flag())
+            for row in await self.session.execute(stmt):
+                if row.inserted:
+                    inserted += 1
+                else:
+                    updated += 1
+        return inserted, updated
+
+    async def upsert_group_links(
+        self, group_id: int, members: Sequence[RosterMember]
+    ) -> Tuple[int, int]:
+        """Insert or refresh ``user_group`` links; return ``(inserted, updated)``.
+
+        Flags follow :meth:`upsert_user_group_link`: ownership is only ever
+        granted, ``is_moderator`` is set to ``is_owner or is_moderator``.
+        ``participants_count`` grows by the number of new links.
+        """
+
+        by_id: Dict[int, RosterMember] = {}
+        for m in members:
+            seen = by_id.get(m.telegram_id)
+            if seen is not None:
+                m = replace(
+                    m,
+                    is_owner=m.is_owner or seen.is_owner,
+                    is_moderator=m.is_moderator or seen.is_moderator,
+                )
+            by_id[m.telegram_id] = m
+        inserted = updated = 0
+        now = utcnow()
+        rows = list(by_id.values())
+        for start in range(0, len(rows), ROSTER_CHUNK):
+            chunk = rows[start : start + ROSTER_CHUNK]
+            stmt = pg_insert(UserGroup).values(
+                [
+                    {
+                        "user_id": m.telegram_id,
+                        "group_id": group_id,
+                        "is_owner": m.is_owner,
+                        "is_moderator": m.is_owner or m.is_moderator,
+                        "joined_at": now,
+                        "crm_tags": [],
+                        "crm_metadata": {},
+                    }
+                    for m in chunk
+                ]
+            )
+            table = UserGroup.__table__
+            is_owner = func.coalesce(table.c.is_owner, False) | stmt.excluded.is_owner
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[UserGroup.user_id, UserGroup.group_id],
+                set_={"is_owner": is_owner, "is_moderator": stmt.excluded.is_moderator},
+                where=or_(
+                    table.c.is_owner.is_distinct_from(is_owner),
+                    table.c.is_moderator.is_distinct_from(stmt.excluded.is_moderator),
+                ),
+            ).returning(UserGroup.user_id, _inserted_flag())
+            for row in await self.session.execute(stmt):
+                if row.inserted:
+                    inserted += 1
+                else:
+                    updated += 1
+        if inserted:
+            group = await self.get_group_by_telegram_id(group_id)
+            if group:
+                group.participants_count = (group.participants_count or 0) + inserted
+                await self.session.flush()
+        return inserted, updated
+
+    async def upsert_roster(
+        self, group_id: int, members: Sequence[RosterMember]
+    ) -> RosterUpsertResult:
+        """Apply a roster snapshot with two multi-row upserts (users, links)."""
+
+        users_inserted, users_updated = await self.upsert_users(members)
+        links_inserted, links_updated = await self.upsert_group_links(group_id, members)
+        return RosterUpsertResult(
+            users_inserted=users_inserted,
+            users_updated=users_updated,
+            links_inserted=links_inserted,
+            links_updated=links_updated,
+        )
+
     async def sync_group_members_from_bot(
         self,
         *,
@@ -365,8 +539,47 @@ class TelegramUserService:
     ) -> int:
         """Fetch available roster information from Bot API and persist it."""
 
+        from aiogram.enums import ChatMemberStatus
+        from aiogram.exceptions import TelegramBadRequest
+
         extra_users = extra_users or []
 
+        members: Sequence[ChatMember] = []
+        try:
+            members = await bot.get_chat_administrators(chat_id)
+        except TelegramBadRequest as exc:
+            logger.debug("Failed to fetch administrators for %s: %s", chat_id, exc)
+        except Exception as exc:  # pragma: no cover - defensive
+            logger.warning("Unexpected error fetching admins for %s: %s", chat_id, exc)
+
+        admin_statuses = {
+            ChatMemberStatus.ADMINISTRATOR,
+            ChatMemberStatus.CREATOR,
+        }
+        roster: List[RosterMember] = []
+        seen_ids: Set[int] = set()
+        for member in members:
+            if member.user.is_bot:
+                continue
+            roster.append(
+                RosterMember.from_telegram(
+                    member.user,
+                    is_owner=member.status == ChatMemberStatus.CREATOR,
+                    is_moderator=member.status in admin_statuses,
+                )
+            )
+            seen_ids.add(member.user.id)
+        for user_obj in extra_users:
+            if user_obj.is_bot or user_obj.id in seen_ids:
+                continue
+            roster.append(RosterMember.from_telegram(user_obj))
+            seen_ids.add(user_obj.id)
+
+        # Users first: the group's owner_id references users_tg.
+        await self.upsert_users(
+            roster + [RosterMember.from_telegram(u) for u in extra_users if u.is_bot]
+        )
+
         group_kwargs: Dict[str, Any] = {}
         if chat_title:
             group_kwargs["title"] = chat_title
@@ -376,14 +589,6 @@ class TelegramUserService:
             except ValueError:
                 logger.debug("Unknown group type %s when syncing", chat_type)
         if extra_users:
-            for user_obj in extra_users:
-                await self.update_from_telegram(
-                    telegram_id=user_obj.id,
-                    username=getattr(user_obj, "username", None),
-                    first_name=getattr(user_obj, "first_name", None),
-                    last_name=getattr(user_obj, "last_name", None),
-                    language_code=getattr(user_obj, "language_code", None),
-                )
             group_kwargs.setdefault("owner_id", extra_users[0].id)
 
         group, created = await self.get_or_create_group(chat_id, **group_kwargs)
@@ -403,56 +608,7 @@ class TelegramUserService:
             if updated:
                 await self.session.flush()
 
-        members: Sequence[ChatMember] = []
-        try:
-            members = await bot.get_chat_administrators(chat_id)
-        except TelegramBadRequest as exc:
-            logger.debug("Failed to fetch administrators for %s: %s", chat_id, exc)
-        except Exception as exc:  # pragma: no cover - defensive
-            logger.warning("Unexpected error fetching admins for %s: %s", chat_id, exc)
-
-        processed = 0
-        seen_ids: Set[int] = set()
-        admin_statuses = {
-            ChatMemberStatus.ADMINISTRATOR,
-            ChatMemberStatus.CREATOR,
-        }
-
-        for member in members:
-            user_obj = member.user
-            if user_obj.is_bot:
-                continue
-            tg_user = await self.update_from_telegram(
-                telegram_id=user_obj.id,
-                username=user_obj.username,
-                first_name=user_obj.first_name,
-                last_name=user_obj.last_name,
-                language_code=user_obj.language_code,
-            )
-            is_owner = member.status == ChatMemberStatus.CREATOR
-            is_moderator = member.status in admin_statuses
-            await self.upsert_user_group_link(
-                tg_user.telegram_id,
-                chat_id,
-                is_owner=is_owner,
-                is_moderator=is_moderator,
-            )
-            seen_ids.add(tg_user.telegram_id)
-            processed += 1
-
-        for user_obj in extra_users:
-            if user_obj.is_bot or user_obj.id in seen_ids:
-                continue
-            tg_user = await self.update_from_telegram(
-                telegram_id=user_obj.id,
-                username=user_obj.username,
-                first_name=user_obj.first_name,
-                last_name=user_obj.last_name,
-                language_code=user_obj.language_code,
-            )
-            await self.upsert_user_group_link(tg_user.telegram_id, chat_id)
-            seen_ids.add(tg_user.telegram_id)
-            processed += 1
+        await self.upsert_group_links(chat_id, roster)
 
         try:
             count = await bot.get_chat_member_count(chat_id)
@@ -462,12 +618,10 @@ class TelegramUserService:
             logger.warning("Failed to fetch member count for %s: %s", chat_id, exc)
             count = None
 
-        if count is not None:
-            group = await self.get_group_by_telegram_id(chat_id)
-            if group:
-                group.participants_count = count
+        if count is not None and group:
+            group.participants_count = count
 
-        return processed
+        return len(roster)
 
     async def update_group_description(self, group_id: int, description: str) -> bool:
         """Update group's description."""
@@ -581,12 +735,21 @@ class TelegramUserService:
             return False
 
     async def list_groups_with_members(self) -> List[Dict[str, Any]]:
-        result = await self.session.execute(select(Group))
-        groups = result.scalars().all()
+        result = await self.session.execute(
+            select(Group, TgUser)
+            .outerjoin(UserGroup, UserGroup.group_id == Group.telegram_id)
+            .outerjoin(TgUser, TgUser.telegram_id == UserGroup.user_id)
+            .order_by(Group.id)
+        )
         data: List[Dict[str, Any]] = []
-        for group in groups:
-            members = await self.get_group_members(group.telegram_id)
-            data.append({"group": group, "members": members})
+        by_group: Dict[int, List[TgUser]] = {}
+        for group, user in result:
+            members = by_group.get(group.id)
+            if members is None:
+                members = by_group[group.id] = []
+                data.append({"group": group, "members": members})
+            if user is not None:
+                members.append(user)
         return data
 
     # ------------------------------------------------------------------
@@ -629,6 +792,8 @@ class TelegramUserService:
             settings = await self.get_log_settings()
             if not settings or level.value < settings.level.value:
                 return False
+            from aiogram import Bot
+
             bot = Bot(token=db.TG_BOT_TOKEN)
             await bot.send_message(
                 chat_id=settings.chat_id,
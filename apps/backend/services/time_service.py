@@ -298,6 +298,26 @@ class TimeService:
         return res.scalars().first()
 
 
+    async def running_entries_by_task(
+        self, owner_id: int, task_ids: list[int]
+    ) -> dict[int, int]:
+        """Latest running entry id per task (``get_running_entry`` for many tasks)."""
+
+        if not task_ids:
+            return {}
+        stmt = (
+            select(TimeEntry.task_id, TimeEntry.id)
+            .where(TimeEntry.owner_id == owner_id)
+            .where(TimeEntry.end_time.is_(None))
+            .where(TimeEntry.task_id.in_(task_ids))
+            .order_by(TimeEntry.start_time.desc())
+        )
+        res = await self._execute_with_retry(stmt)
+        running: dict[int, int] = {}
+        for task_id, entry_id in res.all():
+            running.setdefault(task_id, entry_id)
+        return running
+
     async def list_entries_filtered(self, owner_id: int, *, area_id: int | None = None, include_sub: bool = False, time_from=None, time_to=None) -> list[TimeEntry]:
         stmt = select(TimeEntry).where(TimeEntry.owner_id == owner_id)
         from sqlalchemy import and_, or_
@@ -129,7 +129,7 @@ class WebUserService:
         if base_user and base_user.username:
             raise ValueError("identifier already registered")
 
-        hashed = bcrypt.generate_password_hash(password)
+        hashed = await bcrypt.hash(password)
         if base_user:
             base_user.username = username
             base_user.password_hash = hashed
@@ -175,9 +175,14 @@ class WebUserService:
         user = await self.get_by_identifier(identifier)
         if not user or not user.password_hash:
             return None
-        if user.check_password(password):
-            return user
-        return None
+        if not await bcrypt.run_in_pool("verify", user.check_password, password):
+            return None
+        if bcrypt.needs_rehash(user.password_hash):
+            # cost factor changed: upgrade the stored hash transparently
+            user.password_hash = await bcrypt.hash(password)
+            user.updated_at = utcnow()
+            await self.session.flush()
+        return user
 
     async def ensure_test_user(self) -> Optional[str]:
         """Create ``test`` user with random password if missing.
@@ -191,7 +196,7 @@ class WebUserService:
         if result.scalar_one_or_none():
             return None
         password = secrets.token_urlsafe(12)
-        hashed = bcrypt.generate_password_hash(password)
+        hashed = await bcrypt.hash(password)
         user = WebUser(
             username="test",
             password_hash=hashed,
@@ -1,16 +1,21 @@
-"""OpenTelemetry setup."""
-import os
+"""OpenTelemetry setup.
 
-from opentelemetry import trace
-from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
-from opentelemetry.sdk.resources import SERVICE_NAME, Resource
-from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import BatchSpanProcessor
-from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
-from opentelemetry.instrumentation.requests import RequestsInstrumentor
+The SDK and instrumentations are imported inside :func:`setup_tracing`, which
+the web app calls only with ``OTEL_ENABLED=1``, so a default start does not
+pay for loading them.
+"""
+import os
 
 
 def setup_tracing(app) -> None:
+    from opentelemetry import trace
+    from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+    from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+    from opentelemetry.instrumentation.requests import RequestsInstrumentor
+    from opentelemetry.sdk.resources import SERVICE_NAME, Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
     endpoint = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT")
     provider = TracerProvider(resource=Resource({SERVICE_NAME: "intdata"}))
     if endpoint:
@@ -0,0 +1,37 @@
+"""Opaque cursors for keyset pagination.
+
+A cursor is URL-safe base64 of a small JSON payload (usually the sort key of
+the last row on a page).  Datetimes are written as ISO strings; callers turn
+them back with ``datetime.fromisoformat``.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+from datetime import date, datetime
+from typing import Any
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Cannot encode {type(value).__name__} in a cursor")
+
+
+def encode_cursor(payload: Any) -> str:
+    raw = json.dumps(payload, separators=(",", ":"), default=_default).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(token: str) -> Any:
+    """Inverse of :func:`encode_cursor`; raises ``ValueError`` on garbage."""
+
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        return json.loads(raw)
+    except ValueError as exc:  # binascii.Error, JSONDecodeError, UnicodeDecodeError
+        raise ValueError("Invalid cursor") from exc
+
+
+__all__ = ["decode_cursor", "encode_cursor"]
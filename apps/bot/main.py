@@ -1,27 +1,27 @@
 # /sd/intdata/bot/main.py
 import asyncio
 import logging
+import os
 
 from aiogram.exceptions import TelegramNetworkError
 from backend.db import bot, dp
 from backend.db.init_app import init_app_once
 from backend.db.engine import ENGINE_MODE
 from backend.env import env
+from backend.logging import setup_logging
 from bot.handlers.telegram import user_router, group_router, router
 from bot.handlers.note import router as note_router
 from bot.handlers.task import router as task_router
 from bot.handlers.habit import router as habit_router
-from backend.logger import LoggerMiddleware
+from backend.logger_middleware import LoggerMiddleware
 from backend.models import LogLevel
 from backend.services.telegram_user_service import TelegramUserService
 from bot.middleware import GroupActivityMiddleware
+from bot.webhook import WebhookSettings, run_webhook
 
 
-async def main() -> None:
-    """Run bot polling with middleware and routers."""
-    logging.getLogger(__name__).info("Bot startup: ENGINE_MODE=%s", ENGINE_MODE)
-    await init_app_once(env)
-
+def setup_dispatcher() -> None:
+    """Attach middleware and routers to the shared dispatcher."""
     dp.message.middleware(LoggerMiddleware(bot))
     dp.message.middleware(GroupActivityMiddleware())
     dp.callback_query.middleware(LoggerMiddleware(bot))
@@ -32,6 +32,14 @@ async def main() -> None:
     dp.include_router(note_router)
     dp.include_router(task_router)
 
+
+async def main() -> None:
+    """Run the bot in polling mode or, with ``BOT_MODE=webhook``, via webhook."""
+    logging.getLogger(__name__).info("Bot startup: ENGINE_MODE=%s", ENGINE_MODE)
+    await init_app_once(env)
+
+    setup_dispatcher()
+
     try:
         async with TelegramUserService() as user_service:
             await user_service.send_log_to_telegram(
@@ -40,6 +48,18 @@ async def main() -> None:
     except Exception as e:
         logging.error(f"Failed to send restart notification: {e}")
 
+    webhook = WebhookSettings()
+    if webhook.enabled and not webhook.url:
+        logging.warning("BOT_MODE=webhook without BOT_WEBHOOK_URL, falling back to polling")
+    elif webhook.enabled:
+        await run_webhook(dp, bot, webhook)
+        return
+
+    try:
+        await bot.delete_webhook(drop_pending_updates=False)
+    except Exception as e:
+        logging.warning(f"Failed to reset webhook before polling: {e}")
+
     try:
         await dp.start_polling(bot)
     except TelegramNetworkError as e:
@@ -47,4 +67,6 @@ async def main() -> None:
 
 
 if __name__ == "__main__":
+    # Отдельно запущенный бот по умолчанию пишет в консоль текстом, как раньше
+    setup_logging(fmt=os.getenv("LOG_FORMAT", "text"))
     asyncio.run(main())
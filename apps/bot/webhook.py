@@ -0,0 +1,315 @@
+"""Webhook ingestion mode for the Telegram bot.
+
+Telegram posts updates to a small dedicated ASGI app.  The endpoint checks
+the secret token (webhook mode refuses to start without one), hands the raw
+payload to :class:`ChatShardedWorkerPool` and acknowledges right away, so one
+slow handler no longer delays the whole bot.  The pool routes every update to a shard chosen by ``chat_id``:
+different chats are processed concurrently, updates of the same chat keep
+their order.  Polling (``BOT_MODE=polling``) stays the default for local
+development.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hmac
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from backend.metrics import (
+    BOT_UPDATE_LAG,
+    BOT_UPDATE_QUEUE_DEPTH,
+    BOT_UPDATES_FAILED,
+    BOT_UPDATES_REJECTED,
+    metrics_response,
+)
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+# Update fields carrying a ``chat`` object, in the order Telegram documents them.
+_CHAT_FIELDS = (
+    "message",
+    "edited_message",
+    "channel_post",
+    "edited_channel_post",
+    "business_message",
+    "edited_business_message",
+    "message_reaction",
+    "message_reaction_count",
+    "my_chat_member",
+    "chat_member",
+    "chat_join_request",
+    "chat_boost",
+    "removed_chat_boost",
+)
+# Update fields without a chat: order by the acting user instead.
+_USER_FIELDS = (
+    "inline_query",
+    "chosen_inline_result",
+    "shipping_query",
+    "pre_checkout_query",
+    "poll_answer",
+)
+
+UpdateHandler = Callable[[dict[str, Any]], Awaitable[None]]
+
+
+def _env_bool(name: str, default: str = "0") -> bool:
+    return str(os.getenv(name, default)).lower() in {"1", "true", "yes"}
+
+
+@dataclass
+class WebhookSettings:
+    """Webhook mode configuration read from the environment."""
+
+    mode: str = field(default_factory=lambda: os.getenv("BOT_MODE", "polling").lower())
+    url: str = field(default_factory=lambda: os.getenv("BOT_WEBHOOK_URL", "").rstrip("/"))
+    path: str = field(default_factory=lambda: os.getenv("BOT_WEBHOOK_PATH", "/tg/webhook"))
+    secret: str = field(default_factory=lambda: os.getenv("BOT_WEBHOOK_SECRET", ""))
+    host: str = field(default_factory=lambda: os.getenv("BOT_WEBHOOK_HOST", "127.0.0.1"))
+    port: int = field(default_factory=lambda: int(os.getenv("BOT_WEBHOOK_PORT", "8081")))
+    shards: int = field(default_factory=lambda: int(os.getenv("BOT_WORKER_SHARDS", "8")))
+    queue_size: int = field(
+        default_factory=lambda: int(os.getenv("BOT_SHARD_QUEUE_SIZE", "1000"))
+    )
+    drop_pending: bool = field(
+        default_factory=lambda: _env_bool("BOT_WEBHOOK_DROP_PENDING")
+    )
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode == "webhook"
+
+
+def extract_chat_key(payload: dict[str, Any]) -> int:
+    """Return the ordering key (chat id, user id or update id) of an update."""
+
+    for name in _CHAT_FIELDS:
+        obj = payload.get(name)
+        if isinstance(obj, dict):
+            chat = obj.get("chat")
+            if isinstance(chat, dict) and "id" in chat:
+                return int(chat["id"])
+    callback = payload.get("callback_query")
+    if isinstance(callback, dict):
+        message = callback.get("message")
+        if isinstance(message, dict) and isinstance(message.get("chat"), dict):
+            return int(message["chat"]["id"])
+        sender = callback.get("from")
+        if isinstance(sender, dict) and "id" in sender:
+            return int(sender["id"])
+    for name in _USER_FIELDS:
+        obj = payload.get(name)
+        if isinstance(obj, dict):
+            sender = obj.get("from") or obj.get("user")
+            if isinstance(sender, dict) and "id" in sender:
+                return int(sender["id"])
+    return int(payload.get("update_id") or 0)
+
+
+class ChatShardedWorkerPool:
+    """Bounded worker pool with one FIFO queue (and one worker) per shard.
+
+    ``submit`` never blocks: when the target shard is full the update is
+    rejected so the webhook can answer 503 and let Telegram retry later.
+    """
+
+    def __init__(
+        self,
+        handler: UpdateHandler,
+        *,
+        shards: int = 8,
+        queue_size: int = 1000,
+    ) -> None:
+        if shards < 1:
+            raise ValueError("shards must be >= 1")
+        self._handler = handler
+        self._queues: list[asyncio.Queue[tuple[float, dict[str, Any]]]] = [
+            asyncio.Queue(maxsize=queue_size) for _ in range(shards)
+        ]
+        self._workers: list[asyncio.Task[None]] = []
+
+    @property
+    def shards(self) -> int:
+        return len(self._queues)
+
+    def shard_for(self, key: int) -> int:
+        return key % len(self._queues)
+
+    def pending(self) -> int:
+        return sum(q.qsize() for q in self._queues)
+
+    def depths(self) -> list[int]:
+        return [q.qsize() for q in self._queues]
+
+    def submit(self, key: int, payload: dict[str, Any]) -> bool:
+        shard = self.shard_for(key)
+        queue = self._queues[shard]
+        try:
+            queue.put_nowait((time.monotonic(), payload))
+        except asyncio.QueueFull:
+            BOT_UPDATES_REJECTED.inc()
+            return False
+        BOT_UPDATE_QUEUE_DEPTH.labels(str(shard)).set(queue.qsize())
+        return True
+
+    def start(self) -> None:
+        if self._workers:
+            return
+        self._workers = [
+            asyncio.create_task(self._run(idx), name=f"bot-shard-{idx}")
+            for idx in range(len(self._queues))
+        ]
+
+    async def stop(self, *, drain: bool = True, timeout: float = 10.0) -> None:
+        """Stop workers, optionally letting queued updates finish first."""
+
+        if drain and self._workers:
+            try:
+                await asyncio.wait_for(
+                    asyncio.gather(*(q.join() for q in self._queues)), timeout
+                )
+            except asyncio.TimeoutError:
+                logger.warning(
+                    "Webhook pool stopped with %s pending updates", self.pending()
+                )
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def _run(self, shard: int) -> None:
+        queue = self._queues[shard]
+        label = str(shard)
+        while True:
+            enqueued_at, payload = await queue.get()
+            BOT_UPDATE_LAG.observe(time.monotonic() - enqueued_at)
+            try:
+                await self._handler(payload)
+            except Exception:
+                BOT_UPDATES_FAILED.inc()
+                logger.exception(
+                    "Webhook update %s failed", payload.get("update_id")
+                )
+            finally:
+                queue.task_done()
+                BOT_UPDATE_QUEUE_DEPTH.labels(label).set(queue.qsize())
+
+
+def make_update_handler(dispatcher: Any, bot: Any) -> UpdateHandler:
+    """Feed raw webhook payloads into an aiogram dispatcher."""
+
+    from aiogram.types import Update
+
+    async def handle(payload: dict[str, Any]) -> None:
+        update = Update.model_validate(payload, context={"bot": bot})
+        await dispatcher.feed_update(bot, update)
+
+    return handle
+
+
+def create_webhook_app(
+    pool: ChatShardedWorkerPool,
+    *,
+    secret: str,
+    path: str = "/tg/webhook",
+) -> Starlette:
+    """Build the ASGI app accepting Telegram webhook calls.
+
+    ``secret`` is mandatory: without it anyone who can reach the endpoint
+    could post forged updates.
+    """
+
+    if not secret:
+        raise ValueError("webhook mode requires a non-empty BOT_WEBHOOK_SECRET")
+
+    async def receive_update(request: Request) -> Response:
+        supplied = request.headers.get(SECRET_HEADER, "")
+        if not hmac.compare_digest(supplied.encode(), secret.encode()):
+            return Response(status_code=401)
+        try:
+            payload = await request.json()
+        except ValueError:
+            return Response(status_code=400)
+        if not isinstance(payload, dict):
+            return Response(status_code=400)
+        if not pool.submit(extract_chat_key(payload), payload):
+            return Response(status_code=503, headers={"Retry-After": "1"})
+        return Response(status_code=200)
+
+    async def healthz(request: Request) -> Response:
+        return JSONResponse({"ok": True, "pending": pool.pending()})
+
+    async def metrics(request: Request) -> Response:
+        data, content_type = metrics_response()
+        return Response(data, media_type=content_type)
+
+    @asynccontextmanager
+    async def lifespan(app: Starlette):
+        pool.start()
+        try:
+            yield
+        finally:
+            await pool.stop()
+
+    return Starlette(
+        routes=[
+            Route(path, receive_update, methods=["POST"]),
+            Route("/healthz", healthz, methods=["GET"]),
+            Route("/metrics", metrics, methods=["GET"]),
+        ],
+        lifespan=lifespan,
+    )
+
+
+async def run_webhook(dispatcher: Any, bot: Any, settings: WebhookSettings) -> None:
+    """Register the webhook with Telegram and serve updates until stopped."""
+
+    import uvicorn
+
+    if not settings.secret:
+        raise ValueError("BOT_MODE=webhook requires BOT_WEBHOOK_SECRET")
+    pool = ChatShardedWorkerPool(
+        make_update_handler(dispatcher, bot),
+        shards=settings.shards,
+        queue_size=settings.queue_size,
+    )
+    app = create_webhook_app(pool, secret=settings.secret, path=settings.path)
+    await bot.set_webhook(
+        f"{settings.url}{settings.path}",
+        secret_token=settings.secret,
+        allowed_updates=dispatcher.resolve_used_update_types(),
+        drop_pending_updates=settings.drop_pending,
+    )
+    logger.info(
+        "Bot webhook mode: %s%s shards=%s queue=%s",
+        settings.url,
+        settings.path,
+        settings.shards,
+        settings.queue_size,
+    )
+    config = uvicorn.Config(
+        app, host=settings.host, port=settings.port, log_level="info"
+    )
+    await uvicorn.Server(config).serve()
+
+
+__all__ = [
+    "ChatShardedWorkerPool",
+    "WebhookSettings",
+    "create_webhook_app",
+    "extract_chat_key",
+    "make_update_handler",
+    "run_webhook",
+]
@@ -1,53 +1,47 @@
 """Combined entry point for the Telegram bot and FastAPI web application.
 
 This module keeps the ``app`` object available for tests and external
-tools.  When executed as a script it sequentially starts the bot and the
-web server.  If one of them fails to launch the error is logged and the
-other service still attempts to run.
+tools (imported lazily, so the supervisor itself does not load the web
+stack).  When executed as a script it runs :class:`Supervisor`: ``WEB_WORKERS``
+uvicorn workers, one background-jobs process and the bot, each restarted
+with backoff if it crashes.  ``SIGHUP`` rolls the web workers.
 """
 
 from __future__ import annotations
 
-import asyncio
-import multiprocessing
-import uvicorn
+import logging
+from typing import Any
 
-from bot.main import main as bot_main
-from web import app as fastapi_app
-from backend.logger import logger
+from backend.logging import setup_logging
+from orchestrator.supervisor import Supervisor, SupervisorSettings
 
-# Expose FastAPI app for tests
-app = fastapi_app
+logger = logging.getLogger("orchestrator")
 
 
-def run_bot() -> None:
-    """Start Telegram bot polling."""
-    try:
-        asyncio.run(bot_main())
-    except Exception:  # pragma: no cover - log unexpected errors
-        logger.exception("Bot module failed to start")
+def __getattr__(name: str) -> Any:
+    # Expose FastAPI app for tests
+    if name == "app":
+        from web import app as fastapi_app
 
-
-def run_web() -> None:
-    """Run FastAPI application via Uvicorn."""
-    try:
-        uvicorn.run(app, host="0.0.0.0", port=8000)
-    except Exception:  # pragma: no cover - log unexpected errors
-        logger.exception("Web module failed to start")
+        return fastapi_app
+    raise AttributeError(name)
 
 
 def main() -> None:
-    """Launch bot then web, allowing the second to start even if first fails."""
-    bot_process = multiprocessing.Process(target=run_bot, name="bot")
-    bot_process.start()
-
-    web_process = multiprocessing.Process(target=run_web, name="web")
-    web_process.start()
-
-    bot_process.join()
-    web_process.join()
+    """Run the supervisor until SIGTERM/SIGINT."""
+    setup_logging()
+    settings = SupervisorSettings.from_env()
+    logger.info(
+        "Supervisor: %s web workers on %s:%s (%s), jobs=%s, bot=%s",
+        settings.web_workers,
+        settings.host,
+        settings.port,
+        settings.socket_mode,
+        settings.run_jobs,
+        settings.run_bot,
+    )
+    Supervisor(settings).run()
 
 
 if __name__ == "__main__":  # pragma: no cover
     main()
-
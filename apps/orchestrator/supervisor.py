@@ -0,0 +1,317 @@
+"""Process supervisor for the web workers, the bot and background jobs.
+
+Children are started with the ``spawn`` method so none of them inherits the
+parent's threads (log listener) or DB connections:
+
+* ``web-N``: uvicorn workers (uvloop/httptools when installed) on a
+  ``SO_REUSEPORT`` socket each, or on one shared socket opened by the
+  supervisor (``WEB_SOCKET_MODE=shared``).  Web workers get
+  ``RUN_BACKGROUND_JOBS=0``, so their ``lifespan`` does not start jobs.
+* ``jobs``: the single process running singleton workers
+  (see :mod:`backend.services.background_jobs`).
+* ``bot``: the Telegram bot.
+
+Crashed children are restarted with exponential backoff.  ``SIGHUP`` makes
+a rolling restart of the web workers: a replacement is started and must
+finish its startup before the old worker is asked to shut down gracefully.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import time
+from dataclasses import dataclass
+from typing import Any, Callable
+
+logger = logging.getLogger("orchestrator")
+
+
+def _env_flag(name: str, default: str) -> bool:
+    return str(os.getenv(name, default)).lower() in {"1", "true", "yes"}
+
+
+@dataclass
+class SupervisorSettings:
+    host: str = "0.0.0.0"
+    port: int = 8000
+    web_workers: int = 1
+    socket_mode: str = "reuseport"
+    backlog: int = 2048
+    graceful_timeout: float = 30.0
+    backoff_base: float = 1.0
+    backoff_max: float = 30.0
+    stable_after: float = 60.0
+    run_bot: bool = True
+    run_jobs: bool = True
+
+    @classmethod
+    def from_env(cls) -> "SupervisorSettings":
+        default_mode = "reuseport" if hasattr(socket, "SO_REUSEPORT") else "shared"
+        return cls(
+            host=os.getenv("WEB_HOST", "0.0.0.0"),
+            port=int(os.getenv("WEB_PORT", "8000")),
+            web_workers=max(int(os.getenv("WEB_WORKERS", "1")), 0),
+            socket_mode=os.getenv("WEB_SOCKET_MODE", default_mode).lower(),
+            backlog=int(os.getenv("WEB_BACKLOG", "2048")),
+            graceful_timeout=float(os.getenv("WEB_GRACEFUL_TIMEOUT", "30")),
+            backoff_max=float(os.getenv("SUPERVISOR_BACKOFF_MAX", "30")),
+            run_bot=_env_flag("SUPERVISOR_RUN_BOT", "1"),
+            run_jobs=_env_flag("SUPERVISOR_RUN_JOBS", "1"),
+        )
+
+
+def backoff_delay(failures: int, base: float, cap: float) -> float:
+    """Delay before restarting a child that crashed ``failures`` times in a row."""
+
+    if failures <= 0:
+        return 0.0
+    return min(cap, base * 2 ** (failures - 1))
+
+
+def make_listen_socket(
+    host: str, port: int, *, reuse_port: bool, backlog: int = 2048
+) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+# --- child entry points (run in spawned processes) -----------------------------
+
+
+def run_web_worker(settings: SupervisorSettings, sock: socket.socket | None, ready: Any) -> None:
+    os.environ["RUN_BACKGROUND_JOBS"] = "0"
+    import uvicorn
+
+    from web import app
+
+    class _Server(uvicorn.Server):
+        async def startup(self, sockets=None) -> None:
+            await super().startup(sockets=sockets)
+            if not self.should_exit:
+                ready.set()
+
+    if sock is None:
+        sock = make_listen_socket(
+            settings.host, settings.port, reuse_port=True, backlog=settings.backlog
+        )
+    loop = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    http = "httptools" if importlib.util.find_spec("httptools") else "h11"
+    logger.info("web worker %s: loop=%s http=%s", os.getpid(), loop, http)
+    config = uvicorn.Config(
+        app,
+        loop=loop,
+        http=http,
+        lifespan="on",
+        backlog=settings.backlog,
+        timeout_graceful_shutdown=int(settings.graceful_timeout),
+    )
+    _Server(config).run(sockets=[sock])
+
+
+def run_bot_process() -> None:
+    from backend.logging import setup_logging
+    from bot.main import main as bot_main
+
+    setup_logging()
+
+    asyncio.run(bot_main())
+
+
+async def _jobs_main() -> None:
+    from backend.db.init_app import init_app_once
+    from backend.env import env
+    from backend.services.background_jobs import start_jobs
+
+    await init_app_once(env)
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop_event.set)
+    tasks = start_jobs(stop_event)
+    logger.info("jobs process %s: %s jobs", os.getpid(), len(tasks))
+    await stop_event.wait()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def run_jobs_process() -> None:
+    from backend.logging import setup_logging
+
+    setup_logging()
+    asyncio.run(_jobs_main())
+
+
+# --- supervisor ----------------------------------------------------------------
+
+
+@dataclass
+class ChildSpec:
+    name: str
+    target: Callable[..., None]
+    args: tuple = ()
+    web: bool = False
+
+
+@dataclass
+class _Child:
+    spec: ChildSpec
+    process: Any = None
+    ready: Any = None
+    started_at: float = 0.0
+    failures: int = 0
+    restart_at: float | None = None
+    restarts: int = 0
+
+
+class Supervisor:
+    """Start children, restart them on crash and roll web workers on SIGHUP."""
+
+    def __init__(
+        self, settings: SupervisorSettings, specs: list[ChildSpec] | None = None
+    ) -> None:
+        self.settings = settings
+        self.ctx = multiprocessing.get_context("spawn")
+        self._socket: socket.socket | None = None
+        self._stopping = False
+        self._reload = False
+        self.children = [_Child(spec) for spec in (specs or self._default_specs())]
+
+    def _default_specs(self) -> list[ChildSpec]:
+        specs: list[ChildSpec] = []
+        if self.settings.web_workers and self.settings.socket_mode == "shared":
+            self._socket = make_listen_socket(
+                self.settings.host,
+                self.settings.port,
+                reuse_port=False,
+                backlog=self.settings.backlog,
+            )
+        for i in range(self.settings.web_workers):
+            specs.append(
+                ChildSpec(f"web-{i}", run_web_worker, (self.settings, self._socket), web=True)
+            )
+        if self.settings.run_jobs:
+            specs.append(ChildSpec("jobs", run_jobs_process))
+        if self.settings.run_bot:
+            specs.append(ChildSpec("bot", run_bot_process))
+        return specs
+
+    def _spawn(self, child: _Child) -> None:
+        args = child.spec.args
+        if child.spec.web:
+            child.ready = self.ctx.Event()
+            args = (*args, child.ready)
+        child.process = self.ctx.Process(
+            target=child.spec.target, args=args, name=child.spec.name
+        )
+        child.process.start()
+        child.started_at = time.monotonic()
+        child.restart_at = None
+        logger.info("started %s (pid %s)", child.spec.name, child.process.pid)
+
+    def start(self) -> None:
+        for child in self.children:
+            self._spawn(child)
+
+    def poll(self) -> None:
+        """Reap exited children and restart them once their backoff has passed."""
+
+        now = time.monotonic()
+        for child in self.children:
+            proc = child.process
+            if proc is not None and not proc.is_alive() and child.restart_at is None:
+                proc.join(0)
+                if now - child.started_at >= self.settings.stable_after:
+                    child.failures = 0
+                child.failures += 1
+                delay = backoff_delay(
+                    child.failures, self.settings.backoff_base, self.settings.backoff_max
+                )
+                child.restart_at = now + delay
+                logger.warning(
+                    "%s exited with %s; restarting in %.1fs",
+                    child.spec.name,
+                    proc.exitcode,
+                    delay,
+                )
+            if child.restart_at is not None and now >= child.restart_at and not self._stopping:
+                child.restarts += 1
+                self._spawn(child)
+
+    def rolling_restart(self) -> None:
+        """Replace web workers one at a time without dropping the listener."""
+
+        for child in [c for c in self.children if c.spec.web]:
+            old = child.process
+            replacement = _Child(child.spec)
+            self._spawn(replacement)
+            if not replacement.ready.wait(self.settings.graceful_timeout):
+                logger.error("%s: replacement did not start, keeping old worker", child.spec.name)
+                self._terminate([replacement.process])
+                continue
+            self._terminate([old])
+            child.process = replacement.process
+            child.ready = replacement.ready
+            child.started_at = replacement.started_at
+            child.failures = 0
+            child.restart_at = None
+
+    def _terminate(self, processes: list[Any]) -> None:
+        alive = [p for p in processes if p is not None and p.is_alive()]
+        for proc in alive:
+            proc.terminate()
+        deadline = time.monotonic() + self.settings.graceful_timeout
+        for proc in alive:
+            proc.join(max(deadline - time.monotonic(), 0))
+            if proc.is_alive():
+                logger.warning("%s did not stop in time, killing", proc.name)
+                proc.kill()
+                proc.join()
+
+    def stop(self) -> None:
+        self._stopping = True
+        self._terminate([c.process for c in self.children])
+        if self._socket is not None:
+            self._socket.close()
+
+    def _on_stop(self, *_: Any) -> None:
+        self._stopping = True
+
+    def _on_reload(self, *_: Any) -> None:
+        self._reload = True
+
+    def run(self, poll_interval: float = 0.5) -> None:
+        signal.signal(signal.SIGTERM, self._on_stop)
+        signal.signal(signal.SIGINT, self._on_stop)
+        if hasattr(signal, "SIGHUP"):
+            signal.signal(signal.SIGHUP, self._on_reload)
+        self.start()
+        try:
+            while not self._stopping:
+                if self._reload:
+                    self._reload = False
+                    self.rolling_restart()
+                self.poll()
+                time.sleep(poll_interval)
+        finally:
+            self.stop()
+
+
+__all__ = [
+    "ChildSpec",
+    "Supervisor",
+    "SupervisorSettings",
+    "backoff_delay",
+    "make_listen_socket",
+]
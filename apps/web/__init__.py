@@ -2,15 +2,16 @@
 from pathlib import Path
 from urllib.parse import quote
 from contextlib import asynccontextmanager
+from functools import lru_cache
 import json
 import logging
 import os
 
 from fastapi import FastAPI, Request
 from fastapi.responses import RedirectResponse, FileResponse, Response
-from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.docs import get_swagger_ui_html
+from .middleware_compression import CompressionMiddleware
 from .middleware_logging import LoggingMiddleware
 from .middleware_security import (
     BodySizeLimitMiddleware,
@@ -18,6 +19,10 @@ from .middleware_security import (
 )
 from .security.csp import build_csp
 from .config import S
+from . import next_pages
+from .precompressed import CachedBody, CachedBodyResponse
+from .serialization import FastJSONResponse
+from .static_assets import StaticAssets
 from .middleware_rate_limit import RateLimitMiddleware
 from backend.tracing import setup_tracing
 from .routes import system as system_routes
@@ -42,17 +47,15 @@ from .routes import (
     inbox,
     api_router,
 )
-from backend.db import engine
+from backend.db import PasswordHasherBusy, engine
 from backend.db.engine import ENGINE_MODE
+from backend import health
 from backend.db.init_app import init_app_once
 from backend.env import env
 from backend.services.web_user_service import WebUserService
 from backend.services.telegram_user_service import TelegramUserService
 from backend.models import LogLevel
-from backend.services.project_notification_worker import (
-    ProjectNotificationWorker,
-    is_scheduler_enabled,
-)
+from backend.services.background_jobs import background_jobs_in_web, start_jobs
 from . import para_schemas  # noqa: F401
 from backend.db.schema_export import check as check_schema
 from backend.logging import setup_logging
@@ -65,7 +68,7 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     logger.info("Lifespan startup: begin (ENGINE_MODE=%s)", ENGINE_MODE)
     stop_event = None
-    task = None
+    tasks = []
     try:
         await init_app_once(env)
         logger.info("Lifespan startup: init_app_once() completed")
@@ -87,13 +90,26 @@ async def lifespan(app: FastAPI):
                     f"test user created:\nusername: test\npassword: {password}",
                 )
 
-        # Запускаем фоновый воркер уведомлений при включённом флаге
-        if is_scheduler_enabled():
-            import asyncio
+        import asyncio
+
+        stop_event = asyncio.Event()
+        # Фоновые воркеры (уведомления, напоминания, outbox писем, habits cron)
+        # под супервизором живут в отдельном процессе; advisory lock не даёт
+        # запустить второй экземпляр задачи.
+        if background_jobs_in_web():
+            tasks.extend(start_jobs(stop_event))
+
+        # Next.js страницы (HTML, CSP, ETag, gzip/br) собираются до первого запроса
+        await asyncio.to_thread(next_pages.prepare)
+        for static_app in STATIC_APPS:
+            await asyncio.to_thread(static_app.scan)
+        await asyncio.to_thread(_openapi_document)
 
-            stop_event = asyncio.Event()
-            worker = ProjectNotificationWorker(poll_interval=60.0)
-            task = asyncio.create_task(worker.start(stop_event))
+        # Версия и пробы готовятся один раз; /healthz и /readyz читают кэш
+        await asyncio.to_thread(health.build_info)
+        health.register_default_probes()
+        await health.monitor.refresh()
+        health.monitor.start()
 
         yield
         logger.info("Lifespan startup: completed")
@@ -101,14 +117,18 @@ async def lifespan(app: FastAPI):
         logger.exception("Lifespan startup failed with exception")
         raise
     finally:
+        await health.monitor.stop()
         if stop_event:
             stop_event.set()
-        if task:
+        for task in tasks:
             try:
                 await task
             except Exception:
-                logger.exception("Notification worker task raised during shutdown")
+                logger.exception("Background worker task raised during shutdown")
         try:
+            from backend.services.sync_gcal import close_client
+
+            await close_client()
             await engine.dispose()
             logger.info("Lifespan shutdown: engine disposed")
         except Exception:
@@ -158,19 +178,41 @@ app = FastAPI(
     openapi_tags=tags_metadata,
     redirect_slashes=False,
     servers=[{"url": "/api/v1"}],
+    default_response_class=FastJSONResponse,
 )
-STATIC_DIR = Path(__file__).resolve().parent / "static"
-app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
 
-NEXT_STATIC_DIR = Path(__file__).resolve().parent / ".next" / "static"
-if NEXT_STATIC_DIR.exists():
-    app.mount("/_next/static", StaticFiles(directory=str(NEXT_STATIC_DIR)), name="next-static")
-else:
-    logger.warning("Next.js static assets directory not found: %s", NEXT_STATIC_DIR)
 
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy(request: Request, exc: PasswordHasherBusy) -> Response:
+    """Перегруженный bcrypt-пул (регистрация, смена пароля) — 503, а не 500."""
+
+    logger.warning("%s %s: password hashing pool is busy", request.method, request.url.path)
+    return FastJSONResponse(
+        {"detail": "Сервис перегружен. Попробуйте ещё раз через минуту."},
+        status_code=503,
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+STATIC_DIR = Path(__file__).resolve().parent / "static"
+NEXT_STATIC_DIR = Path(__file__).resolve().parent / ".next" / "static"
 NEXT_DATA_DIR = Path(__file__).resolve().parent / ".next" / "data"
-if NEXT_DATA_DIR.exists():
-    app.mount("/_next/data", StaticFiles(directory=str(NEXT_DATA_DIR)), name="next-data")
+# Каталоги индексируются в lifespan; Next.js ассеты содержат хэш/buildId в пути
+STATIC_APPS = (
+    StaticAssets(STATIC_DIR),
+    StaticAssets(NEXT_STATIC_DIR, immutable=True),
+    StaticAssets(NEXT_DATA_DIR, immutable=True),
+)
+app.mount("/static", STATIC_APPS[0], name="static")
+app.mount("/_next/static", STATIC_APPS[1], name="next-static")
+app.mount("/_next/data", STATIC_APPS[2], name="next-data")
+
+# Сжатие JSON/HTML/текста (br/gzip); предсжатые ответы проходят без изменений
+if os.getenv("COMPRESSION_ENABLED", "1") == "1":
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=int(os.getenv("COMPRESSION_MIN_SIZE", "1024")),
+    )
 
 # Observability & security middlewares
 app.add_middleware(LoggingMiddleware)
@@ -233,10 +275,16 @@ async def swagger_docs_redirect():
     return RedirectResponse("/api", status_code=307)
 
 
-def _build_openapi_response() -> Response:
+@lru_cache(maxsize=1)
+def _openapi_document() -> CachedBody:
+    """Minified, precompressed OpenAPI document; routes are fixed after import."""
     data = app.openapi()
-    text = json.dumps(data, ensure_ascii=False, indent=2, sort_keys=True)
-    return Response(text, media_type="application/json")
+    body = json.dumps(data, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+    return CachedBody.build(body.encode("utf-8"), {"Cache-Control": "no-cache"})
+
+
+def _build_openapi_response() -> Response:
+    return CachedBodyResponse(_openapi_document(), media_type="application/json")
 
 
 @app.get("/backend/api/openapi.json", include_in_schema=False)
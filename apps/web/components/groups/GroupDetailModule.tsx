@@ -9,8 +9,10 @@ import type {
   CrmProductStatus,
   GroupDetail,
   GroupMember,
+  GroupMemberPage,
   GroupMemberProduct,
   GroupProductSummary,
+  GroupPruneJob,
   GroupPruneResponse,
 } from '../../lib/types';
 import {
@@ -48,6 +50,8 @@ const PRODUCT_STATUS_OPTIONS: { value: CrmProductStatus; label: string }[] = [
   { value: 'refunded', label: 'Возврат средств' },
 ];
 
+const PRUNE_JOB_ACTIVE = new Set(['queued', 'running']);
+
 function useGroupDetail(groupId: number) {
   return useQuery<GroupDetail>({
     queryKey: ['groups', 'detail', groupId],
@@ -58,6 +62,30 @@ function useGroupDetail(groupId: number) {
   });
 }
 
+function useGroupMemberPages(groupId: number, detail?: GroupDetail) {
+  const firstPage = detail?.members;
+  const [pages, setPages] = useState<GroupMemberPage[]>([]);
+
+  useEffect(() => {
+    setPages([]);
+  }, [firstPage]);
+
+  const nextCursor = pages.length > 0 ? pages[pages.length - 1].next_cursor : detail?.members_next_cursor;
+  const loadMore = useMutation({
+    mutationFn: async (cursor: string) =>
+      apiFetch<GroupMemberPage>(
+        `/api/v1/groups/${groupId}/members?cursor=${encodeURIComponent(cursor)}`,
+      ),
+    onSuccess: (page) => setPages((prev) => [...prev, page]),
+  });
+  const members = useMemo(
+    () => [...(firstPage ?? []), ...pages.flatMap((page) => page.items)],
+    [firstPage, pages],
+  );
+
+  return { members, nextCursor: nextCursor ?? null, loadMore };
+}
+
 function formatDateTime(value?: string | null) {
   if (!value) {
     return '—';
@@ -335,6 +363,7 @@ function GroupPrunePanel({ groupId, products, onRefetch }: GroupPrunePanelProps)
   const [productSlug, setProductSlug] = useState(products[0]?.slug ?? '');
   const [reason, setReason] = useState('');
   const [lastResult, setLastResult] = useState<GroupPruneResponse | null>(null);
+  const [jobId, setJobId] = useState<number | null>(null);
   const pruneMutation = useMutation({
     mutationFn: async (dryRun: boolean) => {
       const payload = {
@@ -347,21 +376,39 @@ function GroupPrunePanel({ groupId, products, onRefetch }: GroupPrunePanelProps)
         body: JSON.stringify(payload),
       });
     },
-    onSuccess: (data, dryRun) => {
+    onSuccess: (data) => {
       setLastResult(data);
-      if (!dryRun) {
-        onRefetch();
-      }
+      setJobId(data.job?.id ?? null);
     },
   });
+  // Удаление идёт фоновой задачей: опрашиваем прогресс, пока она активна
+  const jobQuery = useQuery<GroupPruneJob>({
+    queryKey: ['groups', 'prune-job', groupId, jobId],
+    enabled: jobId !== null,
+    queryFn: () => apiFetch<GroupPruneJob>(`/api/v1/groups/${groupId}/prune/jobs/${jobId}`),
+    refetchInterval: (query) =>
+      query.state.data && !PRUNE_JOB_ACTIVE.has(query.state.data.status) ? false : 2_000,
+  });
+  const job = jobQuery.data ?? lastResult?.job ?? null;
+  const jobActive = job ? PRUNE_JOB_ACTIVE.has(job.status) : false;
+  const jobStatus = job?.status;
+  useEffect(() => {
+    if (jobStatus && !PRUNE_JOB_ACTIVE.has(jobStatus)) {
+      onRefetch();
+    }
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [jobStatus]);
 
   const hasProducts = products.length > 0;
+  const busy = pruneMutation.isPending || jobActive;
   const statusMessage = pruneMutation.isPending
-    ? 'Выполняем запрос к Telegram…'
+    ? 'Выполняем запрос…'
     : lastResult
     ? lastResult.dry_run
       ? `Найдено кандидатов: ${lastResult.total_candidates}`
-      : `Удалено участников: ${(lastResult.removed ?? []).length}`
+      : job
+      ? `Обработано ${job.processed} из ${job.total}: удалено ${job.removed}, ошибок ${job.failed}`
+      : null
     : null;
 
   return (
@@ -399,9 +446,9 @@ function GroupPrunePanel({ groupId, products, onRefetch }: GroupPrunePanelProps)
               type="button"
               variant="danger"
               onClick={() => pruneMutation.mutate(false)}
-              disabled={pruneMutation.isPending}
+              disabled={busy}
             >
-              {pruneMutation.isPending ? 'Удаляем…' : 'Удалить из Telegram'}
+              {busy ? 'Удаляем…' : 'Удалить из Telegram'}
             </Button>
           </div>
         </div>
@@ -422,9 +469,15 @@ function GroupPrunePanel({ groupId, products, onRefetch }: GroupPrunePanelProps)
             </>
           ) : (
             <>
-              <p>Удалено участников: {(lastResult.removed ?? []).length}.</p>
-              {lastResult.failed && lastResult.failed.length > 0 ? (
-                <p className="mt-1 text-red-500">Не удалось удалить: {lastResult.failed.length}. Проверьте лог действий.</p>
+              <p>
+                {jobActive
+                  ? 'Удаление выполняется в фоне, страницу можно закрыть.'
+                  : job?.status === 'cancelled'
+                  ? 'Удаление остановлено.'
+                  : `Удалено участников: ${job?.removed ?? 0}.`}
+              </p>
+              {job && job.failed > 0 ? (
+                <p className="mt-1 text-red-500">Не удалось удалить: {job.failed}. Проверьте лог действий.</p>
               ) : null}
             </>
           )}
@@ -451,7 +504,12 @@ export default function GroupDetailModule({ groupId }: GroupDetailModuleProps) {
   const groupTitle = detail?.group.title ?? 'Группа';
   const participantsCount = detail?.group.participants_count ?? 0;
   const products = detail?.products ?? [];
-  const members = useMemo(() => detail?.members ?? [], [detail?.members]);
+  const { members, nextCursor, loadMore } = useGroupMemberPages(groupId, detail);
+  const loadMoreError = loadMore.error
+    ? loadMore.error instanceof ApiError
+      ? loadMore.error.message
+      : 'Не удалось загрузить участников.'
+    : null;
 
   return (
     <PageLayout
@@ -579,6 +637,30 @@ export default function GroupDetailModule({ groupId }: GroupDetailModuleProps) {
                 </table>
               </div>
             )}
+            {nextCursor || loadMoreError ? (
+              <div className="flex flex-col items-center gap-2 border-t border-subtle px-4 py-3 text-sm">
+                <span className="text-xs text-muted">
+                  Показано {members.length} из {detail.members_total}
+                </span>
+                {loadMoreError ? (
+                  <span className="text-xs text-red-600" role="alert">
+                    {loadMoreError}
+                  </span>
+                ) : null}
+                {nextCursor ? (
+                  <Button
+                    type="button"
+                    size="sm"
+                    variant="ghost"
+                    onClick={() => loadMore.mutate(nextCursor)}
+                    disabled={loadMore.isPending}
+                    data-testid="group-members-load-more"
+                  >
+                    {loadMore.isPending ? 'Загружаем…' : 'Показать ещё'}
+                  </Button>
+                ) : null}
+              </div>
+            ) : null}
           </Card>
         </>
       ) : null}
@@ -280,9 +280,22 @@ export interface GroupRemovalLogEntry {
 export interface GroupDetail {
   group: GroupInfo;
   members: GroupMember[];
+  members_total: number;
+  members_next_cursor?: string | null;
   products: GroupProductSummary[];
   leaderboard: GroupLeaderboardEntry[];
   removal_history: GroupRemovalLogEntry[];
+  history_next_cursor?: string | null;
+}
+
+export interface GroupMemberPage {
+  items: GroupMember[];
+  next_cursor?: string | null;
+}
+
+export interface GroupRemovalLogPage {
+  items: GroupRemovalLogEntry[];
+  next_cursor?: string | null;
 }
 
 export interface GroupPruneMember {
@@ -290,6 +303,22 @@ export interface GroupPruneMember {
   display_name: string;
 }
 
+export interface GroupPruneJob {
+  id: number;
+  group_id: number;
+  product_id: number;
+  status: 'queued' | 'running' | 'done' | 'failed' | 'cancelled';
+  total: number;
+  processed: number;
+  removed: number;
+  failed: number;
+  reason?: string | null;
+  error?: string | null;
+  created_at?: string | null;
+  started_at?: string | null;
+  finished_at?: string | null;
+}
+
 export interface GroupPruneResponse {
   dry_run: boolean;
   product_id: number;
@@ -298,6 +327,7 @@ export interface GroupPruneResponse {
   failed?: (GroupPruneMember & { error: string })[];
   candidates?: GroupPruneMember[];
   total_candidates: number;
+  job?: GroupPruneJob | null;
 }
 
 export interface DashboardWidgetDefinition {
@@ -0,0 +1,172 @@
+"""Response compression middleware (pure ASGI).
+
+Compresses responses with brotli (when installed) or gzip, chosen from
+``Accept-Encoding``.  Only 2xx responses (except 204/206) with an allowlisted
+``Content-Type`` and no ``Content-Encoding`` of their own are touched, so
+precompressed pages and static variants pass through unchanged.
+
+A single-message body is compressed only if it is at least ``minimum_size``
+bytes.  A streamed body (``more_body=True``) is compressed chunk by chunk with
+a sync flush after each chunk, so clients still receive data as it is
+produced.
+"""
+
+from __future__ import annotations
+
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .precompressed import CODINGS, _brotli, accepted_encodings
+
+DEFAULT_CONTENT_TYPES = (
+    "application/json",
+    "application/problem+json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/",
+)
+# Server-sent events must reach the client unbuffered.
+EXCLUDED_CONTENT_TYPES = ("text/event-stream",)
+
+
+class _GzipStream:
+    def __init__(self, level: int) -> None:
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data) + self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._obj.compress(data) + self._obj.flush(zlib.Z_FINISH)
+
+
+class _BrotliStream:
+    def __init__(self, quality: int) -> None:
+        self._obj = _brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.process(data) + self._obj.flush()
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._obj.process(data) + self._obj.finish()
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        content_types: tuple[str, ...] = DEFAULT_CONTENT_TYPES,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.content_types = content_types
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        accepted = accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        coding = next((c for c in CODINGS if c in accepted), None)
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+        await self.app(scope, receive, _Responder(self, coding, send).send)
+
+    def compressible(self, status: int, headers: Headers) -> bool:
+        if status < 200 or status >= 300 or status in {204, 206}:
+            return False
+        if "content-encoding" in headers or "content-range" in headers:
+            return False
+        if "no-transform" in headers.get("cache-control", ""):
+            return False
+        content_type = headers.get("content-type", "").lower()
+        if content_type.startswith(EXCLUDED_CONTENT_TYPES):
+            return False
+        return content_type.startswith(self.content_types)
+
+    def stream(self, coding: str) -> _GzipStream | _BrotliStream:
+        if coding == "br":
+            return _BrotliStream(self.brotli_quality)
+        return _GzipStream(self.gzip_level)
+
+
+class _Responder:
+    def __init__(self, middleware: CompressionMiddleware, coding: str, send: Send) -> None:
+        self.middleware = middleware
+        self.coding = coding
+        self._send = send
+        self.start: Message | None = None
+        self.stream: _GzipStream | _BrotliStream | None = None
+        self.passthrough = False
+
+    def _encode_headers(self, *, length: int | None) -> None:
+        assert self.start is not None
+        headers = MutableHeaders(raw=self.start["headers"])
+        headers["Content-Encoding"] = self.coding
+        vary = headers.get("vary")
+        if not vary:
+            headers["Vary"] = "Accept-Encoding"
+        elif "accept-encoding" not in vary.lower():
+            headers["Vary"] = f"{vary}, Accept-Encoding"
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = f"W/{etag}"
+        if length is None:
+            del headers["content-length"]
+        else:
+            headers["Content-Length"] = str(length)
+
+    async def send(self, message: Message) -> None:
+        kind = message["type"]
+        if kind == "http.response.start":
+            self.start = message
+            self.passthrough = not self.middleware.compressible(
+                message["status"], Headers(raw=message["headers"])
+            )
+            if self.passthrough:
+                await self._send(message)
+            return
+        if self.passthrough:
+            await self._send(message)
+            return
+        if kind != "http.response.body":
+            # pathsend and other extensions carry no bytes we could compress.
+            if self.start is not None:
+                await self._send(self.start)
+                self.start = None
+            self.passthrough = True
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.stream is None:
+            if not more_body and len(body) < self.middleware.minimum_size:
+                self.passthrough = True
+                await self._send(self.start)
+                await self._send(message)
+                return
+            self.stream = self.middleware.stream(self.coding)
+            if not more_body:
+                data = self.stream.finish(body)
+                self._encode_headers(length=len(data))
+                await self._send(self.start)
+                await self._send({"type": "http.response.body", "body": data})
+                return
+            self._encode_headers(length=None)
+            await self._send(self.start)
+
+        data = self.stream.compress(body) if more_body else self.stream.finish(body)
+        await self._send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+
+__all__ = ["CompressionMiddleware", "DEFAULT_CONTENT_TYPES"]
@@ -0,0 +1,237 @@
+"""Registry of prerendered Next.js pages.
+
+Every ``.next/server/app/*.html`` page is loaded once (at startup by
+:func:`warm`, or on first use) into a :class:`NextPage`: the HTML bytes,
+a strong ETag, the ``Content-Security-Policy`` header with the page's inline
+script hashes, and gzip/brotli variants.  Serving a page is then a dict
+lookup: :class:`NextPageResponse` picks the encoding from ``Accept-Encoding``
+and answers ``If-None-Match`` with 304.
+
+Building the frontend never happens in a request handler: run
+``python -m web.next_pages build`` in deploys, or set ``NEXT_AUTO_BUILD=1``
+to build at startup when the pages are missing.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+from fastapi import HTTPException
+
+from .precompressed import (
+    CachedBody,
+    CachedBodyResponse,
+    compress_variants,
+    strong_etag,
+)
+from .security.csp import augment_csp, extract_inline_script_hashes
+
+NEXT_SOURCE_DIR = Path(__file__).resolve().parent
+NEXT_BUILD_ROOT = NEXT_SOURCE_DIR / ".next"
+NEXT_APP_HTML_DIR = NEXT_BUILD_ROOT / "server" / "app"
+NEXT_STATIC_DIR = NEXT_BUILD_ROOT / "static"
+NEXT_HTML_ALIASES: dict[str, tuple[str, ...]] = {
+    "page": ("index",),
+}
+
+# The HTML shell is identical for every user: let caches keep it, but revalidate.
+PAGE_CACHE_CONTROL = "no-cache"
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CspPolicy:
+    enabled: bool
+    base: str | None
+
+    @classmethod
+    def from_env(cls) -> "CspPolicy":
+        return cls(
+            enabled=os.getenv("SECURITY_HEADERS_ENABLED", "1") == "1",
+            base=os.getenv("CSP_DEFAULT") or None,
+        )
+
+
+@dataclass
+class NextPage(CachedBody):
+    name: str = ""
+    script_hashes: tuple[str, ...] = ()
+
+    @property
+    def html(self) -> str:
+        return self.body.decode("utf-8")
+
+
+def build_page(name: str, html: str, policy: CspPolicy) -> NextPage:
+    body = html.encode("utf-8")
+    script_hashes = extract_inline_script_hashes(html)
+    etag = strong_etag(body)
+    headers = {"ETag": etag, "Cache-Control": PAGE_CACHE_CONTROL}
+    if policy.enabled:
+        headers["Content-Security-Policy"] = augment_csp(script_hashes, base=policy.base)
+    return NextPage(body, etag, headers, compress_variants(body), name, script_hashes)
+
+
+class NextPageResponse(CachedBodyResponse):
+    """HTML response of a registry page (see :class:`CachedBodyResponse`)."""
+
+    media_type = "text/html"
+
+    def __init__(self, page: NextPage, status_code: int = 200) -> None:
+        super().__init__(page, status_code=status_code)
+        self.page = page
+
+
+class NextPageRegistry:
+    def __init__(self, html_dir: Path = NEXT_APP_HTML_DIR) -> None:
+        self.html_dir = html_dir
+        self.policy = CspPolicy.from_env()
+        self._pages: dict[str, NextPage] = {}
+        self._lock = threading.Lock()
+
+    def _resolve(self, name: str) -> Path | None:
+        for candidate in (name, *NEXT_HTML_ALIASES.get(name, ())):
+            path = self.html_dir / f"{candidate}.html"
+            if path.is_file():
+                return path
+        return None
+
+    def load(self, name: str) -> NextPage | None:
+        path = self._resolve(name)
+        if path is None:
+            return None
+        page = build_page(name, path.read_text(encoding="utf-8"), self.policy)
+        with self._lock:
+            self._pages[name] = page
+        return page
+
+    def get(self, name: str) -> NextPage:
+        page = self._pages.get(name)
+        if page is None:
+            page = self.load(name)
+            if page is None:
+                raise HTTPException(
+                    status_code=500,
+                    detail=f"Next.js page '{name}' отсутствует — запустите npm run build",
+                )
+        return page
+
+    def warm(self) -> int:
+        """(Re)load every built page with the current CSP settings."""
+
+        self.policy = CspPolicy.from_env()
+        self.clear()
+        if not self.html_dir.is_dir():
+            logger.warning("Next.js pages directory not found: %s", self.html_dir)
+            return 0
+        for path in sorted(self.html_dir.rglob("*.html")):
+            name = path.relative_to(self.html_dir).with_suffix("").as_posix()
+            self.load(name)
+        for name, aliases in NEXT_HTML_ALIASES.items():
+            if name not in self._pages and any(a in self._pages for a in aliases):
+                self.load(name)
+        logger.info("Next.js pages loaded: %s", len(self._pages))
+        return len(self._pages)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._pages.clear()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._pages
+
+
+registry = NextPageRegistry()
+
+
+def render_next_page(page: str) -> NextPageResponse:
+    return NextPageResponse(registry.get(page))
+
+
+@lru_cache(maxsize=1)
+def _npm_bin() -> str:
+    path = shutil.which("npm")
+    if path is None:
+        raise RuntimeError("npm executable not found")
+    return path
+
+
+def _run_npm_command(*args: str) -> subprocess.CompletedProcess:
+    allowed = {("ci",), ("run", "build")}
+    if args not in allowed:
+        raise ValueError(f"Unsupported npm command: {' '.join(args)}")
+    timeout = int(os.getenv("NEXT_BUILD_TIMEOUT", "600"))
+    return subprocess.run(
+        [_npm_bin(), *args],
+        cwd=str(NEXT_SOURCE_DIR),
+        check=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        timeout=timeout,
+    )
+
+
+def build_next() -> bool:
+    """Run ``npm ci`` (when needed) and ``npm run build``; never call from a request."""
+
+    try:
+        if not (NEXT_SOURCE_DIR / "node_modules").exists():
+            logger.info("Node modules отсутствуют — запускаем npm ci")
+            ci_completed = _run_npm_command("ci")
+            logger.info("npm ci завершён (эмиссия %s байт)", len(ci_completed.stdout))
+        logger.info("Next.js build отсутствует — запускаем npm run build")
+        completed = _run_npm_command("run", "build")
+        logger.info("Next.js build завершён (эмиссия %s байт)", len(completed.stdout))
+        return True
+    except Exception as exc:
+        logger.error("Не удалось собрать Next.js: %s", exc)
+        if isinstance(exc, subprocess.CalledProcessError) and exc.stderr:
+            logger.error("npm run build stderr:\n%s", exc.stderr.decode("utf-8", "ignore"))
+        return False
+
+
+def prepare(auto_build: bool | None = None) -> int:
+    """Startup step: build the frontend if allowed and missing, then warm the registry."""
+
+    if auto_build is None:
+        auto_build = os.getenv("NEXT_AUTO_BUILD", "1") == "1"
+    if auto_build and not NEXT_APP_HTML_DIR.is_dir():
+        build_next()
+    return registry.warm()
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = sys.argv[1:] if argv is None else argv
+    if args[:1] == ["build"]:
+        if not build_next():
+            return 1
+        from .static_assets import precompress
+
+        print(f"Precompressed static assets: {precompress(NEXT_STATIC_DIR)}")
+    count = registry.warm()
+    print(f"Next.js pages: {count}")
+    return 0 if count else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
+
+
+__all__ = [
+    "NextPage",
+    "NextPageRegistry",
+    "NextPageResponse",
+    "build_next",
+    "prepare",
+    "registry",
+    "render_next_page",
+]
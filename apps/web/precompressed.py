@@ -0,0 +1,141 @@
+"""Helpers for responses whose body is built once and served many times.
+
+A :class:`CachedBody` holds the bytes, a strong ETag, fixed headers and
+gzip/brotli variants compressed at build time.  :class:`CachedBodyResponse`
+answers ``If-None-Match`` with 304 and picks a variant from
+``Accept-Encoding`` when it is sent, using the request headers from the ASGI
+scope, so handlers do not need a ``Request`` argument.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+from dataclasses import dataclass, field
+
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+try:  # pragma: no cover - optional dependency
+    import brotli as _brotli
+except ImportError:  # pragma: no cover
+    _brotli = None
+
+# Variants smaller than this are not worth a Content-Encoding round trip.
+MIN_COMPRESS_BYTES = 512
+# Preference order when the client accepts several codings.
+CODINGS = ("br", "gzip") if _brotli is not None else ("gzip",)
+
+
+def brotli_available() -> bool:
+    return _brotli is not None
+
+
+def compress_variants(body: bytes, *, min_size: int = MIN_COMPRESS_BYTES) -> dict[str, bytes]:
+    """Max-level gzip/brotli encodings of ``body`` that are actually smaller."""
+
+    if len(body) < min_size:
+        return {}
+    variants: dict[str, bytes] = {}
+    if _brotli is not None:
+        variants["br"] = _brotli.compress(body, quality=11)
+    variants["gzip"] = gzip.compress(body, compresslevel=9, mtime=0)
+    return {k: v for k, v in variants.items() if len(v) < len(body)}
+
+
+def strong_etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def variant_etag(etag: str, coding: str) -> str:
+    """Strong ETags differ per representation: ``"<hash>-gzip"``."""
+
+    return f'"{etag.strip(chr(34))}-{coding}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.strip('"')
+    for token in if_none_match.split(","):
+        token = token.strip().removeprefix("W/").strip('"')
+        if token == opaque or token.rsplit("-", 1)[0] == opaque:
+            return True
+    return False
+
+
+def accepted_encodings(accept_encoding: str) -> set[str]:
+    accepted = set()
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+@dataclass
+class CachedBody:
+    body: bytes
+    etag: str
+    headers: dict[str, str]
+    encoded: dict[str, bytes] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, body: bytes, headers: dict[str, str] | None = None) -> "CachedBody":
+        etag = strong_etag(body)
+        return cls(body, etag, {"ETag": etag, **(headers or {})}, compress_variants(body))
+
+
+class CachedBodyResponse(Response):
+    def __init__(
+        self, cached: CachedBody, status_code: int = 200, media_type: str | None = None
+    ) -> None:
+        super().__init__(
+            cached.body, status_code=status_code, headers=cached.headers, media_type=media_type
+        )
+        self.cached = cached
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        cached = self.cached
+        if self.status_code == 200:
+            request_headers = Headers(scope=scope)
+            self.headers["Vary"] = "Accept-Encoding"
+            if_none_match = request_headers.get("if-none-match")
+            if if_none_match and etag_matches(if_none_match, cached.etag):
+                headers = {
+                    k: v
+                    for k, v in self.headers.items()
+                    if k not in {"content-length", "content-type"}
+                }
+                await Response(status_code=304, headers=headers)(scope, receive, send)
+                return
+            if cached.encoded:
+                accepted = accepted_encodings(request_headers.get("accept-encoding", ""))
+                for coding in CODINGS:
+                    if coding in accepted and coding in cached.encoded:
+                        self.body = cached.encoded[coding]
+                        self.headers["Content-Encoding"] = coding
+                        self.headers["Content-Length"] = str(len(self.body))
+                        self.headers["ETag"] = variant_etag(cached.etag, coding)
+                        break
+        await super().__call__(scope, receive, send)
+
+
+__all__ = [
+    "CODINGS",
+    "CachedBody",
+    "CachedBodyResponse",
+    "accepted_encodings",
+    "brotli_available",
+    "compress_variants",
+    "etag_matches",
+    "strong_etag",
+    "variant_etag",
+]
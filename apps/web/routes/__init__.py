@@ -1,7 +1,5 @@
 from fastapi import APIRouter
 
-api_router = APIRouter()
-
 #
 # Подключаем ВСЕ feature-API под единый префикс.
 # Каждая фича-страница (tasks, notes, …) в своих модулях
@@ -34,6 +32,9 @@ from .api.habits_v1 import api as habits_v1_api
 from .api.diagnostics import router as diagnostics_api
 from .api.dashboard import router as dashboard_api
 from .api.crm import router as crm_api
+from .api.data_export import router as data_export_api
+
+api_router = APIRouter()
 
 api_router.include_router(tasks_api)
 api_router.include_router(calendar_api)
@@ -58,3 +59,4 @@ api_router.include_router(diagnostics_api)
 api_router.include_router(profiles_api)
 api_router.include_router(dashboard_api)
 api_router.include_router(crm_api)
+api_router.include_router(data_export_api)
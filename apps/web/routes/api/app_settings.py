@@ -17,6 +17,7 @@ from backend.services.app_settings_service import (
     upsert_settings,
 )
 from web.dependencies import get_current_web_user, role_required
+from web.precompressed import etag_matches
 
 PERSONA_DEFAULTS: Dict[str, str] = {
     # RU defaults
@@ -60,7 +61,7 @@ async def api_get_settings(request: Request, prefix: str) -> Response:
     entries = _apply_defaults(prefix, entries)
     entries_raw = json.dumps(entries, ensure_ascii=False, sort_keys=True)
     etag = hashlib.md5(entries_raw.encode()).hexdigest()
-    if request.headers.get("if-none-match") == etag:
+    if etag_matches(request.headers.get("if-none-match", ""), etag):
         return Response(status_code=304)
     payload = {"entries": entries, "ts": datetime.utcnow().isoformat()}
     raw = json.dumps(payload, ensure_ascii=False, sort_keys=True)
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+import io
+from datetime import date
 from decimal import Decimal
 from typing import List, Literal, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, UploadFile, status
 from pydantic import BaseModel, Field
 
 from backend.models import (
@@ -14,9 +16,11 @@ from backend.models import (
     CRMSubscriptionStatus,
     WebUser,
 )
+from backend.services.crm_analytics import CRMAnalyticsService
+from backend.services.crm_import import READERS, CRMImportService
 from backend.services.crm_service import CRMService, CRMBillingType, CRMPricingMode
 from backend.services.web_user_service import WebUserService
-from web.dependencies import get_current_web_user
+from web.dependencies import get_current_web_user, role_required
 
 router = APIRouter(prefix="/crm", tags=["crm"])
 
@@ -252,4 +256,140 @@ async def transition_subscription(
         )
 
 
+class FunnelStageOut(BaseModel):
+    stage_id: int
+    slug: str
+    title: str
+    position: int
+    deals_count: int
+    deals_value: float
+    entered_count: int
+    exited_count: int
+    avg_seconds_in_stage: Optional[float]
+
+
+class StageTransitionOut(BaseModel):
+    from_stage_id: int
+    to_stage_id: int
+    count: int
+    conversion: Optional[float]
+    avg_seconds: Optional[float]
+
+
+class FunnelReportOut(BaseModel):
+    pipeline_id: int
+    stages: List[FunnelStageOut]
+    transitions: List[StageTransitionOut]
+
+
+class RevenueTotalOut(BaseModel):
+    product_id: int
+    tariff_id: Optional[int]
+    currency: str
+    active_count: int
+    mrr: float
+    arr: float
+
+
+class RevenueDayOut(BaseModel):
+    day: date
+    currency: str
+    active_count: int
+    mrr: float
+    arr: float
+    new_count: int
+    churned_count: int
+    churned_mrr: float
+    churn_rate: Optional[float]
+
+
+class RevenueReportOut(BaseModel):
+    totals: List[RevenueTotalOut]
+    series: List[RevenueDayOut]
+
+
+@router.get("/reports/funnel/{pipeline_id}", response_model=FunnelReportOut)
+async def crm_funnel_report(
+    pipeline_id: int,
+    current_user: WebUser | None = Depends(get_current_web_user),
+):
+    if current_user is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+    async with CRMAnalyticsService() as analytics:
+        stages = await analytics.funnel(pipeline_id)
+        transitions = await analytics.transitions(pipeline_id)
+    if not stages:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Воронка не найдена")
+    return FunnelReportOut(pipeline_id=pipeline_id, stages=stages, transitions=transitions)
+
+
+@router.get("/reports/revenue", response_model=RevenueReportOut)
+async def crm_revenue_report(
+    product_id: Optional[int] = None,
+    days: int = Query(30, ge=1, le=366),
+    current_user: WebUser | None = Depends(get_current_web_user),
+):
+    if current_user is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+    async with CRMAnalyticsService() as analytics:
+        report = await analytics.revenue(product_id=product_id, days=days)
+    return RevenueReportOut(**report)
+
+
+class CRMImportErrorOut(BaseModel):
+    line: int
+    message: str
+
+
+class CRMImportReportOut(BaseModel):
+    processed: int
+    contacts_created: int
+    contacts_updated: int
+    accounts_created: int
+    accounts_updated: int
+    error_count: int
+    errors: List[CRMImportErrorOut]
+
+
+@router.post("/accounts/import", response_model=CRMImportReportOut)
+async def import_crm_accounts(
+    file: UploadFile = File(...),
+    file_format: Optional[Literal["csv", "jsonl"]] = Form(None, alias="format"),
+    area_id: Optional[int] = Form(None),
+    project_id: Optional[int] = Form(None),
+    current_user: WebUser = Depends(role_required("admin")),
+):
+    """Bulk-create or update contacts and accounts from a CSV/JSONL upload.
+
+    Columns: ``email``, ``phone``, ``full_name``, ``title``, ``account_type``,
+    ``source``, ``tags``.  Only the first 1000 row errors are listed.
+    """
+
+    fmt = file_format or (file.filename or "").rsplit(".", 1)[-1].lower()
+    if fmt not in READERS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Поддерживаются файлы CSV и JSONL",
+        )
+    if not area_id and not project_id:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Нужно указать area_id или project_id для импорта",
+        )
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        async with CRMImportService() as importer:
+            report = await importer.import_stream(
+                stream, fmt, area_id=area_id, project_id=project_id
+            )
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Файл должен быть в кодировке UTF-8",
+        ) from None
+    finally:
+        stream.detach()
+    return CRMImportReportOut(**report.as_dict())
+
+
 __all__ = ["router"]
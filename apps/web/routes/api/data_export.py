@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import AsyncIterator, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import FileResponse, StreamingResponse
+
+from backend.auth.owner import OwnerCtx, get_current_owner
+from backend.models import WebUser
+from backend.services.data_export import (
+    DataExportService,
+    ExportOwner,
+    cached_archive_path,
+    prune_cached_archives,
+    tee_to_file,
+)
+from web.dependencies import permission_required
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+
+async def _stream_and_cache(
+    owner: ExportOwner, since: Optional[datetime], path
+) -> AsyncIterator[bytes]:
+    async with DataExportService() as exporter:
+        async for chunk in tee_to_file(exporter.iter_archive(owner, since), path):
+            yield chunk
+    prune_cached_archives(owner, keep=path)
+
+
+@router.get("/archive", response_class=StreamingResponse)
+async def export_archive(
+    request: Request,
+    since: Optional[datetime] = None,
+    current_user: WebUser = Depends(permission_required("app.data.export")),
+    owner_ctx: OwnerCtx | None = Depends(get_current_owner),
+):
+    """ZIP of the user's data, one NDJSON file per dataset plus ``manifest.json``.
+
+    ``since`` limits change-tracking datasets to rows changed since then
+    (pass the previous manifest's ``next_since``).  The ETag identifies the
+    archive's content; an interrupted download resumes with ``Range`` and
+    ``If-Range: <ETag>`` while the data is unchanged.
+    """
+
+    if owner_ctx is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+    owner = ExportOwner.from_ctx(owner_ctx)
+    async with DataExportService() as exporter:
+        etag = await exporter.fingerprint(owner, since)
+    suffix = f"-since-{since:%Y%m%d%H%M%S}" if since else ""
+    headers = {
+        "ETag": f'"{etag}"',
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "private, no-cache",
+        "Content-Disposition": f'attachment; filename="export-{owner.web_user_id}{suffix}.zip"',
+    }
+    path = cached_archive_path(owner, etag)
+    if not path.exists() and "range" in request.headers:
+        # A resumed download needs the complete archive to cut the range from.
+        async with DataExportService() as exporter:
+            await exporter.write_archive(owner, path, since)
+        prune_cached_archives(owner, keep=path)
+    if path.exists():
+        return FileResponse(path, media_type="application/zip", headers=headers)
+    return StreamingResponse(
+        _stream_and_cache(owner, since, path),
+        media_type="application/zip",
+        headers=headers,
+    )
+
+
+__all__ = ["router"]
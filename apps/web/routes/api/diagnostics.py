@@ -4,11 +4,16 @@ import json
 from typing import Any, Dict, List, Optional
 from urllib.parse import parse_qsl
 
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 
 from backend.models import DiagnosticClient, DiagnosticResult, WebUser
-from backend.services.diagnostics_service import DiagnosticsService
+from backend.services.diagnostics_service import (
+    DiagnosticClientSummary,
+    DiagnosticsService,
+)
 from web.dependencies import get_current_web_user
+from web.serialization import FastJSONResponse, dumps
 
 router = APIRouter(tags=["diagnostics"])
 
@@ -82,6 +87,35 @@ def _client_payload(client: DiagnosticClient) -> Dict[str, Any]:
     }
 
 
+def _client_summary_payload(client: DiagnosticClientSummary) -> Dict[str, Any]:
+    first, last = _split_name(client.full_name)
+    latest = None
+    if client.latest_submitted_at is not None:
+        latest = {
+            "date": _ts(client.latest_submitted_at),
+            "diagnostic-id": client.latest_diagnostic_id,
+            "title": client.latest_title,
+        }
+    return {
+        "id": client.id,
+        "manager_id": client.specialist_id,
+        "name": first or (client.full_name or ""),
+        "surname": last,
+        "email": client.email,
+        "phone": client.phone,
+        "new": client.is_new,
+        "in_archive": client.in_archive,
+        "results_count": client.results_count,
+        "latest": latest,
+        "date": _ts(client.last_result_at),
+        "contact_permission": client.contact_permission,
+    }
+
+
+# Page size when the whole listing is streamed (no ``limit`` in the request).
+CLIENTS_STREAM_PAGE = 200
+
+
 @router.get("/login")
 async def diagnostics_login(
     actor: WebUser = Depends(_get_actor),
@@ -254,11 +288,55 @@ async def _check_client_permissions(
 
 
 @router.get("/clients")
-async def list_clients(actor: WebUser = Depends(_get_actor)) -> Any:
+async def list_clients(
+    actor: WebUser = Depends(_get_actor),
+    cursor: Optional[str] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    archived: Optional[bool] = Query(None),
+) -> Any:
+    """Client summaries, newest first; full results come from ``/client/{id}``.
+
+    With ``limit`` (or ``cursor``) one page is returned and the next page's
+    cursor is sent in ``X-Next-Cursor``.  Without them every page is streamed
+    as one JSON array per line, which the manager UI consumes incrementally.
+    """
+
     async with DiagnosticsService() as service:
         include_all = await service.has_permission(actor, "diagnostics.specialists.manage")
-        clients = await service.list_clients(actor, include_all=include_all)
-        return [_client_payload(client) for client in clients]
+        if limit is not None or cursor is not None:
+            try:
+                clients, next_cursor = await service.client_page(
+                    actor,
+                    include_all=include_all,
+                    cursor=cursor,
+                    limit=limit or CLIENTS_STREAM_PAGE,
+                    archived=archived,
+                )
+            except ValueError:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+                ) from None
+            headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+            return FastJSONResponse(
+                [_client_summary_payload(client) for client in clients], headers=headers
+            )
+
+    async def pages():
+        page_cursor: Optional[str] = None
+        async with DiagnosticsService() as service:
+            while True:
+                clients, page_cursor = await service.client_page(
+                    actor,
+                    include_all=include_all,
+                    cursor=page_cursor,
+                    limit=CLIENTS_STREAM_PAGE,
+                    archived=archived,
+                )
+                yield dumps([_client_summary_payload(client) for client in clients]) + b"\n"
+                if page_cursor is None:
+                    break
+
+    return StreamingResponse(pages(), media_type="application/x-ndjson")
 
 
 @router.get("/client/{client_id}")
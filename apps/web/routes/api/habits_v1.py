@@ -13,6 +13,7 @@ from backend.services.habits import (
     UserStatsService,
     HabitsCronService,
     HabitsDashboardService,
+    DailyScheduleService,
     habits,
 )
 from backend.services.nexus_service import HabitService
@@ -86,6 +87,7 @@ class HabitDashboardDaily(BaseModel):
     area_id: Optional[int] = None
     project_id: Optional[int] = None
     created_at: Optional[str] = None
+    due_today: bool = False
 
 
 class HabitDashboardReward(BaseModel):
@@ -428,11 +430,66 @@ async def api_create_daily(
                 project_id=payload.project_id,
                 note=payload.note,
             )
-    except ValueError:
-        raise HTTPException(status_code=400, detail="area_or_project_required")
+    except ValueError as exc:
+        if str(exc) == "invalid_rrule":
+            raise HTTPException(status_code=400, detail={"error": "invalid_rrule"}) from exc
+        raise HTTPException(status_code=400, detail="area_or_project_required") from exc
     return {"id": did}
 
 
+class DailyUpdate(BaseModel):
+    title: Optional[str] = None
+    note: Optional[str] = None
+    rrule: Optional[str] = None
+    difficulty: Optional[str] = None
+
+
+@router.patch("/dailies/{daily_id}", tags=["Habits"], responses=TG_RESP)
+async def api_update_daily(
+    daily_id: int,
+    payload: DailyUpdate,
+    owner: OwnerCtx | None = Depends(get_current_owner),
+):
+    if owner is None:
+        raise HTTPException(status_code=401)
+    if not owner.has_tg:
+        raise HTTPException(status_code=403, detail=TG_LINK_ERROR)
+    try:
+        async with DailiesService() as svc:
+            updated = await svc.update_daily(
+                daily_id,
+                owner_id=owner.owner_id,
+                title=payload.title,
+                note=payload.note,
+                rrule=payload.rrule,
+                difficulty=payload.difficulty,
+            )
+    except ValueError as exc:
+        if str(exc) != "invalid_rrule":
+            raise
+        raise HTTPException(status_code=400, detail={"error": "invalid_rrule"}) from exc
+    if not updated:
+        raise HTTPException(status_code=404)
+    return {"status": "ok"}
+
+
+@router.get("/dailies/occurrences", tags=["Habits"])
+async def api_daily_occurrences(
+    start: date = Query(...),
+    end: date = Query(...),
+    owner: OwnerCtx | None = Depends(get_current_owner),
+):
+    """Daily ids due per day; covers up to the materialised horizon."""
+
+    if owner is None:
+        raise HTTPException(status_code=401)
+    if end < start or (end - start).days > DailyScheduleService.HORIZON_DAYS:
+        raise HTTPException(status_code=400, detail={"error": "invalid_window"})
+    async with DailyScheduleService() as svc:
+        days = await svc.window(owner.owner_id, start, end)
+    return {day.isoformat(): ids for day, ids in days.items()}
+
+
 @router.post(
     "/dailies/{daily_id}/done",
     tags=["Habits"],
@@ -6,10 +6,10 @@ from fastapi.responses import RedirectResponse, Response
 from backend.logger import logger
 from backend.models import WebUser
 from backend.services import (
-    generate_auth_url,
     exchange_code,
-    save_gcal_link,
     gcal_incremental,
+    generate_auth_url,
+    save_gcal_link,
 )
 from web.config import S
 from web.dependencies import get_current_web_user
@@ -47,9 +47,10 @@ async def disconnect(current_user: WebUser | None = Depends(get_current_web_user
     if not current_user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
     # Simple removal of link
+    from sqlalchemy import delete
+
     from backend import db
     from backend.models import GCalLink
-    from sqlalchemy import delete
 
     async with db.async_session() as session:
         await session.execute(
@@ -15,8 +15,10 @@ from fastapi.responses import JSONResponse, RedirectResponse
 from itsdangerous import BadSignature, SignatureExpired, URLSafeTimedSerializer
 from sqlalchemy import select
 
+from backend.db import PasswordHasherBusy
 from backend.logger import logger
 from backend.models import WebUser
+from backend.services.email_outbox import enqueue_magic_email
 from backend.services.telegram_user_service import TelegramUserService
 from backend.services.web_user_service import WebUserService
 from web.config import S
@@ -222,49 +224,6 @@ async def upsert_user_from_email(email: str) -> WebUser:
         return user
 
 
-async def send_magic_email(email: str, link: str) -> None:  # pragma: no cover - network
-    """Send magic link email via SMTP using environment settings.
-
-    Falls back to stdout if SMTP is not configured. Expected environment variables:
-
-    - ``SMTP_HOST`` – SMTP server hostname
-    - ``SMTP_PORT`` – SMTP port (defaults to ``587``)
-    - ``SMTP_USER`` – username for authentication
-    - ``SMTP_PASSWORD`` – password for authentication
-    - ``EMAIL_FROM`` – sender address
-    """
-    host = os.getenv("SMTP_HOST")
-    user = os.getenv("SMTP_USER")
-    password = os.getenv("SMTP_PASSWORD")
-    sender = os.getenv("EMAIL_FROM", user)
-    port = int(os.getenv("SMTP_PORT", "587"))
-
-    if not all([host, port, user, password, sender]):
-        # No SMTP configuration; emulate sending
-        print(f"[magic] send to {email}: {link}")
-        return
-
-    import asyncio
-    import smtplib
-    from email.message import EmailMessage
-
-    def _send() -> None:
-        msg = EmailMessage()
-        msg["Subject"] = "Magic login link"
-        msg["From"] = sender
-        msg["To"] = email
-        msg.set_content(f"Click the link to sign in: {link}")
-        with smtplib.SMTP(host, port) as smtp:
-            try:
-                smtp.starttls()
-            except Exception:
-                pass
-            smtp.login(user, password)
-            smtp.send_message(msg)
-
-    await asyncio.to_thread(_send)
-
-
 def verify_telegram_auth(data: dict) -> dict:
     """Validate Telegram Login Widget signature."""
     token = S.TG_BOT_TOKEN
@@ -370,7 +329,7 @@ async def restore_password(
     try:
         token = serializer.dumps({"email": user.email, "kind": "magic"})
         magic_url = f"{os.getenv('APP_BASE_URL', 'https://intdata.pro')}/auth/magic?token={token}"
-        await send_magic_email(user.email, magic_url)
+        await enqueue_magic_email(user.email, magic_url)
         log_event(request, "restore_req", user, {"email": user.email})
     except Exception:
         pass
@@ -426,7 +385,7 @@ async def login(
                                 }
                             )
                             magic_url = f"{os.getenv('APP_BASE_URL', 'https://intdata.pro')}/auth/magic?token={token}"
-                            await send_magic_email(existing.email, magic_url)
+                            await enqueue_magic_email(existing.email, magic_url)
                             log_event(
                                 request,
                                 "restore_req",
@@ -508,6 +467,17 @@ async def login(
                     prefer_json=prefer_json,
                     telegram_id=tg_id_int,
                 )
+    except PasswordHasherBusy as exc:
+        logger.warning("login: password hashing pool is busy")
+        response = auth_feedback(
+            request,
+            active="login",
+            form_values={"username": identifier},
+            flash="Сервис перегружен. Попробуйте ещё раз через минуту.",
+            status_code=503,
+        )
+        response.headers["Retry-After"] = str(exc.retry_after)
+        return response
     except Exception as exc:  # pragma: no cover - defensive
         logger.exception("login: unexpected error")
         return auth_feedback(
@@ -639,9 +609,9 @@ async def magic_request(
         f"{os.getenv('APP_BASE_URL', 'https://intdata.pro')}/auth/magic?token={token}"
     )
     try:
-        await send_magic_email(email, magic_url)  # если есть почтовик
+        await enqueue_magic_email(email, magic_url)  # отправит EmailOutboxWorker
     except Exception:
-        print("MAGIC:", magic_url)
+        logger.exception("magic_request: failed to enqueue magic link")
     return auth_feedback(
         request,
         active="restore",
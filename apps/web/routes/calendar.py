@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from datetime import UTC, datetime
+from datetime import UTC, datetime, time, timedelta
 from typing import List, Optional
 import hashlib
 import os
@@ -13,6 +13,7 @@ from backend.services.calendar_service import CalendarService
 from backend.services.para_repository import CalendarItemRepository
 from backend.services.telegram_user_service import TelegramUserService
 from web.dependencies import get_current_tg_user, get_current_web_user
+from web.serialization import ModelListSerializer
 from .index import render_next_page
 
 
@@ -43,8 +44,8 @@ class EventResponse(BaseModel):
     description: Optional[str]
 
     @classmethod
-    def from_model(cls, event: CalendarEvent) -> "EventResponse":
-        return cls(
+    def to_row(cls, event: CalendarEvent) -> dict:
+        return dict(
             id=event.id,
             title=event.title,
             start_at=event.start_at,
@@ -52,6 +53,13 @@ class EventResponse(BaseModel):
             description=event.description,
         )
 
+    @classmethod
+    def from_model(cls, event: CalendarEvent) -> "EventResponse":
+        return cls(**cls.to_row(event))
+
+
+EVENT_LIST = ModelListSerializer(EventResponse)
+
 
 class EventTodayItem(BaseModel):
     """Lightweight representation of a calendar event starting today (UTC)."""
@@ -72,26 +80,24 @@ async def list_events_today(
 
     if not current_user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
-    async with CalendarService() as service:
-        events = await service.list_events(owner_id=current_user.telegram_id)
 
-    from datetime import UTC
     from backend.utils import utcnow
 
     now = utcnow()
     if getattr(now, "tzinfo", None) is None:
         now = now.replace(tzinfo=UTC)
-    today = now.date()
+    day_start = datetime.combine(now.date(), time.min, tzinfo=UTC)
+    async with CalendarService() as service:
+        events = await service.agenda(
+            current_user.telegram_id, day_start, day_start + timedelta(days=1, microseconds=-1)
+        )
 
     items: list[EventTodayItem] = []
     for e in events:
-        dt = getattr(e, "start_at", None)
-        if not dt:
-            continue
+        dt = e.start_at
         if getattr(dt, "tzinfo", None) is None:
             dt = dt.replace(tzinfo=UTC)
-        if dt.date() != today:
-            continue
+        dt = dt.astimezone(UTC)
         date_s = dt.date().isoformat()
         time_s = dt.strftime("%H:%M")
         items.append(
@@ -109,15 +115,20 @@ async def list_events_today(
 
 @router.get("", response_model=List[EventResponse])
 async def list_events(
+    from_dt: datetime | None = Query(None, alias="from"),
+    to_dt: datetime | None = Query(None, alias="to"),
+    limit: int | None = Query(None, ge=1, le=5000),
     current_user: TgUser | None = Depends(get_current_tg_user),
 ):
-    """List calendar events for the current user."""
+    """List calendar events for the current user, optionally within a window."""
 
     if not current_user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
     async with CalendarService() as service:
-        events = await service.list_events(owner_id=current_user.telegram_id)
-    return [EventResponse.from_model(e) for e in events]
+        events = await service.list_events(
+            owner_id=current_user.telegram_id, start_at=from_dt, end_at=to_dt, limit=limit
+        )
+    return EVENT_LIST.response(EventResponse.to_row(e) for e in events)
 
 
 @router.post(
@@ -203,7 +214,7 @@ class CalendarItemResponse(CalendarItemBase):
             title=item.title,
             start_at=item.start_at,
             end_at=item.end_at,
-            description=item.description,
+            description=getattr(item, "description", None),
             tzid=tzid,
             project_id=item.project_id,
             area_id=item.area_id,
@@ -303,12 +314,12 @@ async def agenda(
     if not current_user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
     async with CalendarItemRepository() as repo:
-        items = await repo.list(
-            owner_id=current_user.telegram_id,
+        items = await repo.agenda(
+            current_user.telegram_id,
+            from_dt,
+            to_dt,
             project_id=project_id,
             area_id=area_id,
-            start_from=from_dt,
-            start_to=to_dt,
         )
     return [CalendarItemResponse.from_model(i) for i in items]
 
@@ -374,6 +385,11 @@ def _generate_ics(items: list[CalendarItem]) -> str:
     return "\r\n".join(lines)
 
 
+# ICS subscribers re-fetch the whole feed on every poll; serve a bounded window.
+FEED_PAST_DAYS = 90
+FEED_FUTURE_DAYS = 365
+
+
 @router.get("/feed.ics")
 async def feed(
     scope: str = "all",
@@ -389,13 +405,21 @@ async def feed(
         user = await users.get_user_by_ics_token_hash(token_hash)
         if not user:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
+    from backend.utils import utcnow
+
+    now = utcnow()
+    window = dict(
+        owner_id=user.telegram_id,
+        start_from=now - timedelta(days=FEED_PAST_DAYS),
+        start_to=now + timedelta(days=FEED_FUTURE_DAYS),
+    )
     async with CalendarItemRepository() as repo:
         if scope == "project" and id:
-            events = await repo.list(owner_id=user.telegram_id, project_id=id)
+            events = await repo.list(project_id=id, **window)
         elif scope == "area" and id:
-            events = await repo.list(owner_id=user.telegram_id, area_id=id)
+            events = await repo.list(area_id=id, **window)
         else:
-            events = await repo.list(owner_id=user.telegram_id)
+            events = await repo.list(**window)
     ics = _generate_ics(events)
     return Response(content=ics, media_type="text/calendar")
 
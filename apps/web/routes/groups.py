@@ -1,16 +1,16 @@
 from __future__ import annotations
 
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Literal, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Response, status
 from fastapi.responses import HTMLResponse
 from pydantic import BaseModel, Field
 
-from backend.db import bot
-from backend.models import Group, Product, ProductStatus, TgUser, WebUser
+from backend.models import Group, GroupPruneJob, ProductStatus, TgUser, WebUser
 from backend.services.crm_service import CRMService
 from backend.services.group_moderation_service import GroupModerationService
+from backend.services.group_prune_jobs import GroupPruneJobService
 from backend.services.telegram_user_service import TelegramUserService
 from backend.utils import utcnow
 from backend.services.access_control import AccessControlService
@@ -97,11 +97,29 @@ class GroupInfoOut(BaseModel):
 
 
 class GroupDetailResponse(BaseModel):
+    """Group card with the first pages of members and removal history.
+
+    Further pages come from ``/members`` and ``/history`` using the cursors.
+    """
+
     group: GroupInfoOut
     members: List[GroupMemberOut]
+    members_total: int = 0
+    members_next_cursor: Optional[str] = None
     products: List[ProductSummary]
     leaderboard: List[LeaderboardEntry]
     removal_history: List[RemovalLogEntry]
+    history_next_cursor: Optional[str] = None
+
+
+class GroupMemberPage(BaseModel):
+    items: List[GroupMemberOut]
+    next_cursor: Optional[str] = None
+
+
+class RemovalLogPage(BaseModel):
+    items: List[RemovalLogEntry]
+    next_cursor: Optional[str] = None
 
 
 class GroupMemberProfileUpdate(BaseModel):
@@ -143,7 +161,43 @@ class FailedPruneMember(PruneMember):
     error: str
 
 
+class PruneJobOut(BaseModel):
+    id: int
+    group_id: int
+    product_id: int
+    status: str
+    total: int
+    processed: int
+    removed: int
+    failed: int
+    reason: Optional[str] = None
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    @classmethod
+    def from_model(cls, job: GroupPruneJob) -> "PruneJobOut":
+        return cls(
+            id=job.id,
+            group_id=job.group_id,
+            product_id=job.product_id,
+            status=job.status,
+            total=job.total,
+            processed=job.processed,
+            removed=job.removed,
+            failed=job.failed,
+            reason=job.reason,
+            error=job.error,
+            created_at=job.created_at,
+            started_at=job.started_at,
+            finished_at=job.finished_at,
+        )
+
+
 class GroupPruneResponse(BaseModel):
+    """Dry run: the candidates.  Real run: the queued background job."""
+
     dry_run: bool
     product_id: int
     product_slug: str
@@ -151,6 +205,7 @@ class GroupPruneResponse(BaseModel):
     failed: List[FailedPruneMember] = Field(default_factory=list)
     candidates: List[PruneMember] = Field(default_factory=list)
     total_candidates: int
+    job: Optional[PruneJobOut] = None
 
 
 async def _ensure_group_access(
@@ -177,61 +232,72 @@ async def _ensure_group_access(
     return tg_user, group
 
 
+def _member_out(entry: Dict[str, Any]) -> GroupMemberOut:
+    user: TgUser = entry["user"]
+    membership = entry["membership"]
+    activity = entry["activity"]
+    return GroupMemberOut(
+        telegram_id=user.telegram_id,
+        username=user.username,
+        display_name=_format_display_name(user),
+        is_owner=membership.is_owner,
+        is_moderator=membership.is_moderator,
+        crm_notes=membership.crm_notes,
+        crm_tags=list(membership.crm_tags or []),
+        trial_expires_at=membership.trial_expires_at,
+        products=[
+            MemberProductOut(
+                product_id=link.product_id,
+                product_slug=link.product_slug,
+                product_title=link.product_title,
+                status=link.status,
+                source=link.source,
+                acquired_at=link.acquired_at,
+                notes=link.notes,
+            )
+            for link in entry["products"]
+        ],
+        activity=ActivityOut(
+            messages=activity.messages,
+            reactions=activity.reactions,
+            last_activity=activity.last_activity,
+        ),
+    )
+
+
+def _removal_out(row: Any) -> RemovalLogEntry:
+    record, user, product_slug, product_title = row
+    return RemovalLogEntry(
+        id=record.id,
+        user_id=record.user_id,
+        display_name=_format_display_name(user) if user else str(record.user_id),
+        product_id=record.product_id,
+        product_slug=product_slug,
+        product_title=product_title,
+        result=record.result,
+        reason=record.reason,
+        created_at=record.created_at,
+    )
+
+
+def _bad_cursor(exc: ValueError) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+
 async def _collect_group_detail(
     *,
     group: Group,
-    crm: CRMService,
     moderation: GroupModerationService,
-    service: TelegramUserService,
     days: int,
+    members_limit: int = 50,
+    history_limit: int = 50,
 ) -> GroupDetailResponse:
     since_date = utcnow().date() - timedelta(days=days)
-    roster = await moderation.list_group_members(group.telegram_id, since=since_date)
-    products = await crm.list_products(active_only=False)
-    product_map: Dict[int, Product] = {p.id: p for p in products}
-    buyers_map: Dict[int, int] = {p.id: 0 for p in products}
-
-    members_out: List[GroupMemberOut] = []
-    for entry in roster:
-        user: TgUser = entry["user"]
-        membership = entry["membership"]
-        activity = entry["activity"]
-        product_links = entry["products"]
-        products_out: List[MemberProductOut] = []
-        for link in product_links:
-            prod = product_map.get(link.product_id)
-            if prod:
-                if link.status == ProductStatus.paid:
-                    buyers_map[prod.id] = buyers_map.get(prod.id, 0) + 1
-                products_out.append(
-                    MemberProductOut(
-                        product_id=prod.id,
-                        product_slug=prod.slug,
-                        product_title=prod.title,
-                        status=link.status,
-                        source=link.source,
-                        acquired_at=link.acquired_at,
-                        notes=link.notes,
-                    )
-                )
-        members_out.append(
-            GroupMemberOut(
-                telegram_id=user.telegram_id,
-                username=user.username,
-                display_name=_format_display_name(user),
-                is_owner=membership.is_owner,
-                is_moderator=membership.is_moderator,
-                crm_notes=membership.crm_notes,
-                crm_tags=list(membership.crm_tags or []),
-                trial_expires_at=membership.trial_expires_at,
-                products=products_out,
-                activity=ActivityOut(
-                    messages=activity.messages,
-                    reactions=activity.reactions,
-                    last_activity=activity.last_activity,
-                ),
-            )
-        )
+    members_total = await moderation.count_members(group.telegram_id)
+    entries, members_cursor = await moderation.member_page(
+        group.telegram_id, since=since_date, limit=members_limit
+    )
+    product_rows = await moderation.product_summaries(group.telegram_id)
 
     leaderboard_raw = await moderation.activity_leaderboard(
         group.telegram_id, since=since_date, limit=10
@@ -249,56 +315,34 @@ async def _collect_group_detail(
             )
         )
 
-    history = await moderation.removal_history(group.telegram_id)
-    user_cache: Dict[int, TgUser] = {
-        member.telegram_id: entry["user"]
-        for member, entry in zip(members_out, roster)
-    }
-    logs: List[RemovalLogEntry] = []
-    for record in history:
-        user = user_cache.get(record.user_id)
-        if not user:
-            user = await service.get_user_by_telegram_id(record.user_id)
-            if user:
-                user_cache[record.user_id] = user
-        product = product_map.get(record.product_id) if record.product_id else None
-        logs.append(
-            RemovalLogEntry(
-                id=record.id,
-                user_id=record.user_id,
-                display_name=_format_display_name(user) if user else str(record.user_id),
-                product_id=record.product_id,
-                product_slug=product.slug if product else None,
-                product_title=product.title if product else None,
-                result=record.result,
-                reason=record.reason,
-                created_at=record.created_at,
-            )
-        )
-
-    products_out = [
-        ProductSummary(
-            id=p.id,
-            slug=p.slug,
-            title=p.title,
-            active=p.active,
-            buyers=buyers_map.get(p.id, 0),
-            total_members=len(members_out),
-        )
-        for p in products
-    ]
+    history, history_cursor = await moderation.history_page(
+        group.telegram_id, limit=history_limit
+    )
 
     return GroupDetailResponse(
         group=GroupInfoOut(
             telegram_id=group.telegram_id,
             title=group.title,
             description=group.description,
-            participants_count=group.participants_count or len(members_out),
+            participants_count=group.participants_count or members_total,
         ),
-        members=members_out,
-        products=products_out,
+        members=[_member_out(entry) for entry in entries],
+        members_total=members_total,
+        members_next_cursor=members_cursor,
+        products=[
+            ProductSummary(
+                id=row.id,
+                slug=row.slug,
+                title=row.title,
+                active=row.active,
+                buyers=row.buyers,
+                total_members=members_total,
+            )
+            for row in product_rows
+        ],
         leaderboard=leaderboard,
-        removal_history=logs,
+        removal_history=[_removal_out(row) for row in history],
+        history_next_cursor=history_cursor,
     )
 
 
@@ -329,21 +373,108 @@ async def list_groups(
 async def get_group_detail(
     group_id: int = Path(..., description="Telegram chat ID"),
     days: int = Query(30, ge=1, le=365),
+    members_limit: int = Query(50, ge=1, le=200),
+    history_limit: int = Query(50, ge=1, le=200),
     current_user: WebUser = Depends(role_required("moderator")),
 ):
     async with TelegramUserService() as service:
         _, group = await _ensure_group_access(
             group_id=group_id, current_user=current_user, service=service
         )
-        crm = CRMService(service.session)
-        moderation = GroupModerationService(service.session, crm=crm)
+        moderation = GroupModerationService(service.session)
         return await _collect_group_detail(
             group=group,
-            crm=crm,
             moderation=moderation,
-            service=service,
             days=days,
+            members_limit=members_limit,
+            history_limit=history_limit,
+        )
+
+
+@router.get("/{group_id}/members", response_model=GroupMemberPage)
+async def list_group_members_page(
+    group_id: int = Path(..., description="Telegram chat ID"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(50, ge=1, le=200),
+    sort: Literal["joined", "activity"] = Query("joined"),
+    days: int = Query(30, ge=1, le=365, description="Activity window for sort and quiet"),
+    quiet: Optional[bool] = Query(None, description="Only members without (true) or with (false) activity"),
+    unpaid_product: Optional[str] = Query(None, description="Only members without a paid link to this product slug"),
+    tag: Optional[List[str]] = Query(None, description="Only members having all these CRM tags"),
+    current_user: WebUser = Depends(role_required("moderator")),
+):
+    async with TelegramUserService() as service:
+        _, group = await _ensure_group_access(
+            group_id=group_id, current_user=current_user, service=service
+        )
+        moderation = GroupModerationService(service.session)
+        unpaid_product_id = None
+        if unpaid_product:
+            unpaid_product_id = await moderation.crm.product_id_by_slug(unpaid_product)
+            if unpaid_product_id is None:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Продукт не найден")
+        try:
+            entries, next_cursor = await moderation.member_page(
+                group.telegram_id,
+                since=utcnow().date() - timedelta(days=days),
+                sort=sort,
+                cursor=cursor,
+                limit=limit,
+                quiet=quiet,
+                unpaid_product_id=unpaid_product_id,
+                tags=tag,
+            )
+        except ValueError as exc:
+            raise _bad_cursor(exc) from exc
+    return GroupMemberPage(
+        items=[_member_out(entry) for entry in entries], next_cursor=next_cursor
+    )
+
+
+@router.get("/{group_id}/history", response_model=RemovalLogPage)
+async def list_group_history_page(
+    group_id: int = Path(..., description="Telegram chat ID"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(50, ge=1, le=200),
+    current_user: WebUser = Depends(role_required("moderator")),
+):
+    async with TelegramUserService() as service:
+        _, group = await _ensure_group_access(
+            group_id=group_id, current_user=current_user, service=service
         )
+        moderation = GroupModerationService(service.session)
+        try:
+            rows, next_cursor = await moderation.history_page(
+                group.telegram_id, cursor=cursor, limit=limit
+            )
+        except ValueError as exc:
+            raise _bad_cursor(exc) from exc
+    return RemovalLogPage(items=[_removal_out(row) for row in rows], next_cursor=next_cursor)
+
+
+@router.get("/{group_id}/products", response_model=List[ProductSummary])
+async def list_group_products(
+    group_id: int = Path(..., description="Telegram chat ID"),
+    current_user: WebUser = Depends(role_required("moderator")),
+):
+    async with TelegramUserService() as service:
+        _, group = await _ensure_group_access(
+            group_id=group_id, current_user=current_user, service=service
+        )
+        moderation = GroupModerationService(service.session)
+        members_total = await moderation.count_members(group.telegram_id)
+        rows = await moderation.product_summaries(group.telegram_id)
+    return [
+        ProductSummary(
+            id=row.id,
+            slug=row.slug,
+            title=row.title,
+            active=row.active,
+            buyers=row.buyers,
+            total_members=members_total,
+        )
+        for row in rows
+    ]
 
 
 @router.put(
@@ -370,20 +501,13 @@ async def update_member_profile(
         )
         if not updated:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
-        crm = moderation.crm
-        detail = await _collect_group_detail(
-            group=group,
-            crm=crm,
-            moderation=moderation,
-            service=service,
-            days=30,
-        )
-        member = next(
-            (m for m in detail.members if m.telegram_id == user_id), None
+        await service.session.flush()
+        entries, _ = await moderation.member_page(
+            group.telegram_id, user_id=user_id, limit=1
         )
-        if not member:
+        if not entries:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
-        return member
+        return _member_out(entries[0])
 
 
 @router.post(
@@ -446,9 +570,11 @@ async def remove_product_from_member(
 @router.post(
     "/{group_id}/prune",
     response_model=GroupPruneResponse,
+    responses={202: {"model": GroupPruneResponse, "description": "Prune job queued"}},
 )
 async def prune_group_members(
     payload: GroupPruneRequest,
+    response: Response,
     group_id: int,
     current_user: WebUser = Depends(role_required("moderator")),
 ):
@@ -457,86 +583,103 @@ async def prune_group_members(
             group_id=group_id, current_user=current_user, service=service
         )
         crm = CRMService(service.session)
-        moderation = GroupModerationService(service.session, crm=crm)
-        product: Optional[Product] = None
+        product_id: Optional[int] = None
         if payload.product_id:
-            product = await service.session.get(Product, payload.product_id)
+            product_id = payload.product_id
         elif payload.product_slug:
-            product = await crm.get_product_by_slug(payload.product_slug)
+            product_id = await crm.product_id_by_slug(payload.product_slug)
+        product = await crm.product_brief(product_id) if product_id else None
         if not product:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Продукт не найден")
 
-        members = await moderation.list_group_members(group.telegram_id)
-        member_map = {entry["membership"].user_id: entry["user"] for entry in members}
-        candidates_links = await moderation.members_without_product(
-            group_id=group.telegram_id, product_id=product.id
-        )
-        candidates: List[PruneMember] = [
-            PruneMember(
-                user_id=link.user_id,
-                display_name=_format_display_name(member_map.get(link.user_id)),
-            )
-            for link in candidates_links
-        ]
-
+        jobs = GroupPruneJobService(service.session)
         if payload.dry_run:
+            rows = await jobs.candidate_users(group.telegram_id, product.id)
             return GroupPruneResponse(
                 dry_run=True,
                 product_id=product.id,
                 product_slug=product.slug,
-                candidates=candidates,
-                total_candidates=len(candidates),
+                candidates=[
+                    PruneMember(user_id=user_id, display_name=_format_display_name(user))
+                    for user_id, user in rows
+                ],
+                total_candidates=len(rows),
             )
 
-        removed: List[PruneMember] = []
-        failed: List[FailedPruneMember] = []
-        # Telegram requires ban+unban for graceful kick allowing rejoin later
-        for link in candidates_links:
-            display_name = _format_display_name(member_map.get(link.user_id))
-            try:
-                await bot.ban_chat_member(group.telegram_id, link.user_id)
-                await bot.unban_chat_member(group.telegram_id, link.user_id)
-                await service.remove_user_from_group(link.user_id, group.telegram_id)
-                await moderation.log_removal(
-                    group_id=group.telegram_id,
-                    user_id=link.user_id,
-                    product_id=product.id,
-                    initiator_web_id=current_user.id,
-                    initiator_tg_id=tg_user.telegram_id,
-                    reason=payload.reason or "auto-prune",
-                    result="removed",
-                    details=None,
-                )
-                removed.append(
-                    PruneMember(user_id=link.user_id, display_name=display_name)
-                )
-            except Exception as exc:  # pragma: no cover - Telegram errors
-                await moderation.log_removal(
-                    group_id=group.telegram_id,
-                    user_id=link.user_id,
-                    product_id=product.id,
-                    initiator_web_id=current_user.id,
-                    initiator_tg_id=tg_user.telegram_id,
-                    reason=payload.reason or "auto-prune",
-                    result="failed",
-                    details={"error": str(exc)},
-                )
-                failed.append(
-                    FailedPruneMember(
-                        user_id=link.user_id,
-                        display_name=display_name,
-                        error=str(exc),
-                    )
-                )
-
+        # Kicks run in GroupPruneWorker; poll /prune/jobs/{id} for progress.
+        job, _ = await jobs.enqueue(
+            group_id=group.telegram_id,
+            product_id=product.id,
+            initiator_web_id=current_user.id,
+            initiator_tg_id=tg_user.telegram_id,
+            reason=payload.reason,
+        )
+        response.status_code = status.HTTP_202_ACCEPTED
         return GroupPruneResponse(
             dry_run=False,
             product_id=product.id,
             product_slug=product.slug,
-            removed=removed,
-            failed=failed,
-            total_candidates=len(candidates_links),
+            total_candidates=job.total,
+            job=PruneJobOut.from_model(job),
+        )
+
+
+@router.get("/{group_id}/prune/jobs", response_model=List[PruneJobOut])
+async def list_prune_jobs(
+    group_id: int,
+    limit: int = Query(20, ge=1, le=100),
+    current_user: WebUser = Depends(role_required("moderator")),
+):
+    async with TelegramUserService() as service:
+        _, group = await _ensure_group_access(
+            group_id=group_id, current_user=current_user, service=service
         )
+        jobs = await GroupPruneJobService(service.session).list_for_group(
+            group.telegram_id, limit=limit
+        )
+    return [PruneJobOut.from_model(job) for job in jobs]
+
+
+async def _get_prune_job(
+    service: TelegramUserService, group: Group, job_id: int
+) -> GroupPruneJob:
+    job = await GroupPruneJobService(service.session).get(job_id)
+    if not job or job.group_id != group.telegram_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    return job
+
+
+@router.get("/{group_id}/prune/jobs/{job_id}", response_model=PruneJobOut)
+async def get_prune_job(
+    group_id: int,
+    job_id: int,
+    current_user: WebUser = Depends(role_required("moderator")),
+):
+    async with TelegramUserService() as service:
+        _, group = await _ensure_group_access(
+            group_id=group_id, current_user=current_user, service=service
+        )
+        job = await _get_prune_job(service, group, job_id)
+        return PruneJobOut.from_model(job)
+
+
+@router.post("/{group_id}/prune/jobs/{job_id}/cancel", response_model=PruneJobOut)
+async def cancel_prune_job(
+    group_id: int,
+    job_id: int,
+    current_user: WebUser = Depends(role_required("moderator")),
+):
+    async with TelegramUserService() as service:
+        _, group = await _ensure_group_access(
+            group_id=group_id, current_user=current_user, service=service
+        )
+        job = await _get_prune_job(service, group, job_id)
+        if not GroupPruneJobService.cancel(job):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT, detail="Задача уже завершена"
+            )
+        await service.session.flush()
+        return PruneJobOut.from_model(job)
 
 
 @ui_router.get("", include_in_schema=False, response_class=HTMLResponse)
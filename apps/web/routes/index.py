@@ -1,25 +1,12 @@
 from __future__ import annotations
 
-from functools import lru_cache
-from pathlib import Path
 import logging
-import os
-import shutil
-import subprocess
 
-from fastapi import APIRouter, Request, Depends, status, HTTPException
-from fastapi.responses import HTMLResponse, FileResponse, Response
+from fastapi import APIRouter, Request, Depends, status
+from fastapi.responses import HTMLResponse, Response
 
 from web.dependencies import get_current_web_user
-from ..security.csp import augment_csp, extract_inline_script_hashes
-
-NEXT_build_ROOT = Path(__file__).resolve().parents[1] / ".next"
-NEXT_APP_HTML_DIR = NEXT_build_ROOT / "server" / "app"
-NEXT_HTML_ALIASES: dict[str, tuple[str, ...]] = {
-    "page": ("index",),
-}
-NEXT_STATIC_DIR = NEXT_build_ROOT / "static"
-NEXT_SOURCE_DIR = Path(__file__).resolve().parents[1]
+from ..next_pages import render_next_page
 
 logger = logging.getLogger(__name__)
 
@@ -71,94 +58,6 @@ async def index(
     return RedirectResponse("/auth", status_code=status.HTTP_302_FOUND)
 
 
-@lru_cache(maxsize=None)
-def _resolve_html_path(page: str) -> Path | None:
-    html_path = NEXT_APP_HTML_DIR / f"{page}.html"
-    if html_path.exists():
-        return html_path
-    for alias in NEXT_HTML_ALIASES.get(page, ()):  # pragma: no cover - fallback diff between Next versions
-        alias_path = NEXT_APP_HTML_DIR / f"{alias}.html"
-        if alias_path.exists():
-            return alias_path
-    return None
-
-
-@lru_cache(maxsize=1)
-def _npm_bin() -> str:
-    path = shutil.which("npm")
-    if path is None:
-        raise RuntimeError("npm executable not found")
-    return path
-
-
-def _run_npm_command(*args: str) -> subprocess.CompletedProcess:
-    allowed = {("ci",), ("run", "build")}
-    if args not in allowed:
-        raise ValueError(f"Unsupported npm command: {' '.join(args)}")
-    timeout = int(os.getenv("NEXT_BUILD_TIMEOUT", "600"))
-    return subprocess.run(
-        [_npm_bin(), *args],
-        cwd=str(NEXT_SOURCE_DIR),
-        check=True,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        timeout=timeout,
-    )
-
-
-@lru_cache(maxsize=None)
-def _load_next_html(page: str) -> str:
-    html_path = _resolve_html_path(page)
-    if html_path is None:
-        auto_build = os.getenv("NEXT_AUTO_BUILD", "1") == "1"
-        if auto_build:
-            try:
-                node_modules_dir = NEXT_SOURCE_DIR / "node_modules"
-                if not node_modules_dir.exists():
-                    logger.info("Node modules отсутствуют — запускаем npm ci")
-                    ci_completed = _run_npm_command("ci")
-                    logger.info("npm ci завершён (эмиссия %s байт)", len(ci_completed.stdout))
-                logger.info("Next.js page '%s' отсутствует — запускаем npm run build", page)
-                completed = _run_npm_command("run", "build")
-                logger.info("Next.js build завершён (эмиссия %s байт)", len(completed.stdout))
-            except Exception as exc:  # pragma: no cover - build failures reported as HTTP error
-                logger.error("Не удалось собрать Next.js: %s", exc)
-                if isinstance(exc, subprocess.CalledProcessError) and exc.stderr:
-                    logger.error("npm run build stderr:\n%s", exc.stderr.decode("utf-8", "ignore"))
-            html_path = _resolve_html_path(page)
-            if html_path is not None:
-                return html_path.read_text(encoding="utf-8")
-        raise HTTPException(status_code=500, detail=f"Next.js page '{page}' отсутствует — запустите npm run build")
-    return html_path.read_text(encoding="utf-8")
-
-
-@lru_cache(maxsize=None)
-def _load_next_payload(page: str) -> tuple[str, tuple[str, ...]]:
-    html = _load_next_html(page)
-    script_hashes = extract_inline_script_hashes(html)
-    return html, script_hashes
-
-
-def render_next_page(page: str) -> HTMLResponse:
-    html, script_hashes = _load_next_payload(page)
-    response = HTMLResponse(html)
-    if os.getenv("SECURITY_HEADERS_ENABLED", "1") == "1":
-        base_csp = os.getenv("CSP_DEFAULT")
-        response.headers["Content-Security-Policy"] = augment_csp(
-            script_hashes,
-            base=base_csp,
-        )
-    return response
-
-
-@router.get("/_next/static/{asset_path:path}", include_in_schema=False, response_class=FileResponse)
-async def next_static(asset_path: str) -> FileResponse:
-    target = NEXT_STATIC_DIR / asset_path
-    if not target.exists() or not target.is_file():
-        raise HTTPException(status_code=404)
-    return FileResponse(target)
-
-
 @router.get("/users", include_in_schema=False, response_class=HTMLResponse)
 @router.get("/users/", include_in_schema=False, response_class=HTMLResponse)
 async def users_directory_page() -> HTMLResponse:
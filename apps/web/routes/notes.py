@@ -7,10 +7,12 @@ from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from fastapi.responses import HTMLResponse
 from pydantic import BaseModel
 
-from backend.models import ContainerType, Note, TgUser
+from backend.models import ContainerType, LinkType, Note, TgUser
+from backend.services.link_graph import MAX_DEPTH, LinkGraphService
 from backend.services.note_service import NoteService
 from backend.services.para_service import ParaService
 from web.dependencies import get_current_tg_user, get_current_web_user
+from web.serialization import ModelListSerializer
 from .index import render_next_page
 
 router = APIRouter(prefix="/notes", tags=["Tasks & Projects"])
@@ -60,10 +62,10 @@ class NoteResponse(BaseModel):
     project: Optional[ProjectOut] = None
 
     @classmethod
-    def from_model(cls, note: Note) -> "NoteResponse":
+    def to_row(cls, note: Note) -> dict:
         area = note.area
         project = note.project
-        return cls(
+        return dict(
             id=note.id,
             title=note.title,
             content=note.content,
@@ -73,15 +75,31 @@ class NoteResponse(BaseModel):
             area_id=area.id,
             project_id=project.id if project else None,
             color=getattr(area, "color", None) or "#F1F5F9",
-            area=AreaOut(
+            area=dict(
                 id=area.id,
                 name=area.name,
                 slug=getattr(area, "slug", None),
                 color=getattr(area, "color", None),
             ),
-            project=ProjectOut(id=project.id, name=project.name) if project else None,
+            project=dict(id=project.id, name=project.name) if project else None,
         )
 
+    @classmethod
+    def from_model(cls, note: Note) -> "NoteResponse":
+        return cls(**cls.to_row(note))
+
+
+NOTE_LIST = ModelListSerializer(NoteResponse)
+
+
+class GraphNodeOut(BaseModel):
+    type: str
+    id: int
+    title: Optional[str] = None
+    depth: int
+    score: float
+    paths: int
+
 
 class NoteReorder(BaseModel):
     area_id: Optional[int] = None
@@ -120,7 +138,7 @@ async def list_notes(
             limit=limit,
             offset=offset,
         )
-    return [NoteResponse.from_model(n) for n in notes]
+    return NOTE_LIST.response(NoteResponse.to_row(n) for n in notes)
 
 
 @router.post(
@@ -215,6 +233,43 @@ async def note_backlinks(
     ]
 
 
+@router.get("/{note_id}/graph", response_model=List[GraphNodeOut])
+async def note_graph(
+    note_id: int,
+    depth: int = Query(2, ge=1, le=MAX_DEPTH),
+    limit: int = Query(100, ge=1, le=500),
+    link_type: List[LinkType] | None = Query(None),
+    current_user: TgUser | None = Depends(get_current_tg_user),
+):
+    """Nodes connected to the note within ``depth`` hops, strongest first."""
+
+    if not current_user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+    async with NoteService() as service:
+        note = await service.get_note(note_id)
+        if note is None or note.owner_id != current_user.telegram_id:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+        nodes = await LinkGraphService(service.session).neighbourhood(
+            "note",
+            note_id,
+            owner_id=current_user.telegram_id,
+            depth=depth,
+            limit=limit,
+            link_types=link_type,
+        )
+    return [
+        {
+            "type": n.node_type,
+            "id": n.node_id,
+            "title": n.title,
+            "depth": n.depth,
+            "score": round(n.score, 6),
+            "paths": n.paths,
+        }
+        for n in nodes
+    ]
+
+
 @router.delete("/{note_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_note(
     note_id: int,
@@ -46,9 +46,15 @@ async def settings_page(
 
     body = response.body.decode("utf-8")
     body = body.replace("</body>", marker_html + "</body>")
+    # The body differs per role: drop the cached page's length and ETag.
+    headers = {
+        k: v
+        for k, v in response.headers.items()
+        if k not in {"content-length", "content-type", "etag"}
+    }
     return HTMLResponse(
         body,
         status_code=response.status_code,
-        headers=dict(response.headers),
+        headers=headers,
         media_type=response.media_type,
     )
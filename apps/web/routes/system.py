@@ -1,44 +1,17 @@
 """System endpoints."""
 
-import asyncio
 import base64
 import logging
 import os
-import shutil
-import subprocess
-import time
-from functools import lru_cache
 
 from fastapi import APIRouter, HTTPException, Request
-from fastapi.responses import PlainTextResponse
-from sqlalchemy import text
+from fastapi.responses import PlainTextResponse, Response
 
-from backend.db import engine
+from backend import health
 from backend.metrics import metrics_response
 
 logger = logging.getLogger(__name__)
 
-
-@lru_cache(maxsize=1)
-def _git_bin() -> str:
-    path = shutil.which("git")
-    if path is None:
-        raise RuntimeError("git executable not found")
-    return path
-
-
-def _resolve_git_sha() -> str:
-    timeout = int(os.getenv("GIT_SHA_TIMEOUT", "5"))
-    try:
-        sha_bytes = subprocess.check_output(
-            [_git_bin(), "rev-parse", "--short", "HEAD"],
-            timeout=timeout,
-        )
-        return sha_bytes.decode().strip()
-    except (subprocess.CalledProcessError, subprocess.TimeoutExpired, OSError) as exc:
-        logger.warning("Failed to resolve git SHA: %s", exc)
-        return "unknown"
-
 router = APIRouter()
 
 
@@ -64,17 +37,15 @@ async def metrics(request: Request):
 
 @router.get("/healthz")
 async def healthz():
-    sha = await asyncio.to_thread(_resolve_git_sha)
-    return {"ok": True, "version": sha}
+    return {"ok": True, "version": health.build_info()["version"]}
 
 
 @router.get("/readyz")
 async def readyz():
-    start = time.perf_counter()
-    try:
-        async with engine.connect() as conn:
-            await conn.execute(text("SELECT 1"))
-    except Exception as err:
-        raise HTTPException(status_code=503) from err
-    duration = time.perf_counter() - start
-    return {"ok": True, "db": {"seconds": duration}}
+    monitor = health.monitor
+    if not monitor.started:
+        # No background monitor (lifespan not running): probe inline.
+        health.register_default_probes(monitor)
+        await monitor.refresh()
+    ok, body = monitor.snapshot()
+    return Response(body, status_code=200 if ok else 503, media_type="application/json")
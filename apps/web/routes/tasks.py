@@ -10,6 +10,7 @@ from pydantic import BaseModel, model_validator
 from backend.models import Task, TaskStatus, TgUser
 from backend.services.task_service import TaskService
 from web.dependencies import get_current_tg_user
+from web.serialization import ModelListSerializer, rows_response
 
 from .index import render_next_page
 
@@ -52,8 +53,8 @@ class TaskResponse(BaseModel):
     is_watched: bool
 
     @classmethod
-    def from_model(cls, task: Task, *, tracked_minutes: int = 0, running_entry_id: int | None = None) -> "TaskResponse":
-        return cls(
+    def to_row(cls, task: Task, *, tracked_minutes: int = 0, running_entry_id: int | None = None) -> dict[str, Any]:
+        return dict(
             id=task.id,
             title=task.title,
             description=task.description,
@@ -77,6 +78,13 @@ class TaskResponse(BaseModel):
             is_watched=bool(getattr(task, "is_watched", False)),
         )
 
+    @classmethod
+    def from_model(cls, task: Task, *, tracked_minutes: int = 0, running_entry_id: int | None = None) -> "TaskResponse":
+        return cls(**cls.to_row(task, tracked_minutes=tracked_minutes, running_entry_id=running_entry_id))
+
+
+TASK_LIST = ModelListSerializer(TaskResponse)
+
 
 class TaskTodayItem(BaseModel):
     """Lightweight representation of a task due today (UTC)."""
@@ -103,9 +111,9 @@ async def list_tasks_today(
 
     if not current_user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
-    # Fetch all tasks for user and filter by UTC date
+    # Only the columns the listing needs; rows are mapped straight to dicts
     async with TaskService() as service:
-        tasks = await service.list_tasks(owner_id=current_user.telegram_id)
+        rows = await service.list_due_dates(owner_id=current_user.telegram_id)
 
     from datetime import UTC
     from backend.utils import utcnow
@@ -115,11 +123,8 @@ async def list_tasks_today(
         now = now.replace(tzinfo=UTC)
     today = now.date()
 
-    items: list[TaskTodayItem] = []
-    for t in tasks:
-        dt = getattr(t, "due_date", None)
-        if not dt:
-            continue
+    items: list[dict[str, Any]] = []
+    for task_id, title, dt in rows:
         # ensure aware
         if getattr(dt, "tzinfo", None) is None:
             dt = dt.replace(tzinfo=UTC)
@@ -128,16 +133,16 @@ async def list_tasks_today(
         date_s = dt.date().isoformat()
         time_s = dt.strftime("%H:%M")
         items.append(
-            TaskTodayItem(
-                id=t.id,
-                title=t.title,
-                date=date_s,
-                time=time_s,
-                due_date=date_s,
-                due_time=time_s,
-            )
+            {
+                "id": task_id,
+                "title": title,
+                "date": date_s,
+                "time": time_s,
+                "due_date": date_s,
+                "due_time": time_s,
+            }
         )
-    return items
+    return rows_response(items)
 
 
 @router.get("", response_model=List[TaskResponse])
@@ -153,15 +158,17 @@ async def list_tasks(
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
     async with TaskService() as service:
         tasks = await service.list_tasks_by_area(owner_id=current_user.telegram_id, area_id=area_id, include_sub=True) if (area_id is not None and include_sub) else await service.list_tasks(owner_id=current_user.telegram_id, project_id=project_id, area_id=area_id)
-        # Enrich with time tracking info
+        # Enrich with time tracking info (two queries for the whole list)
         from backend.services.time_service import TimeService
         time_svc = TimeService(service.session)
-        enriched: list[TaskResponse] = []
-        for t in tasks:
-            mins = await service.total_tracked_minutes(t.id)
-            running = await time_svc.get_running_entry(owner_id=current_user.telegram_id, task_id=t.id)
-            enriched.append(TaskResponse.from_model(t, tracked_minutes=mins, running_entry_id=getattr(running, 'id', None)))
-    return enriched
+        task_ids = [t.id for t in tasks]
+        minutes = await service.tracked_minutes_by_task(task_ids)
+        running = await time_svc.running_entries_by_task(current_user.telegram_id, task_ids)
+        rows = [
+            TaskResponse.to_row(t, tracked_minutes=minutes.get(t.id, 0), running_entry_id=running.get(t.id))
+            for t in tasks
+        ]
+    return TASK_LIST.response(rows)
 
 
 @router.get("/stats", response_model=TaskStats)
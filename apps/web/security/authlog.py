@@ -1,14 +1,283 @@
+"""Auth event log.
+
+``log_event`` only builds a record and puts it into a bounded in-memory
+queue; a background thread owns the log file.  The writer keeps the handle
+open, writes in batches, fsyncs periodically, rotates by size/age (rotated
+files are gzip-compressed) and can mirror events with a known user into
+``auth_audit_entries`` in bulk.  When the queue is full the event is
+dropped and counted instead of blocking the request.
+"""
+
+from __future__ import annotations
+
+import atexit
+import gzip
 import json
+import logging
 import os
+import queue
+import shutil
+import threading
+import time
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import Any
 
+from backend.metrics import AUTH_EVENTS_DROPPED
 from backend.utils import utcnow
 
+logger = logging.getLogger(__name__)
+
 LOG_PATH = Path(os.getenv("AUTH_LOG_PATH", "/sd/intdata/.logs/auth.log"))
 
 
+class _FlushMarker:
+    __slots__ = ("done",)
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+
+
+class AuthEventSink:
+    """Bounded queue + background writer for auth events."""
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        max_queue: int = 10000,
+        batch_size: int = 256,
+        flush_interval: float = 0.5,
+        fsync_interval: float = 5.0,
+        max_bytes: int = 50 * 1024 * 1024,
+        rotate_interval: float = 86400.0,
+        backups: int = 14,
+        db_enabled: bool = False,
+    ) -> None:
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.fsync_interval = fsync_interval
+        self.max_bytes = max_bytes
+        self.rotate_interval = rotate_interval
+        self.backups = backups
+        self.db_enabled = db_enabled
+        self.dropped = 0
+        self.written = 0
+        self.db_written = 0
+        self.db_failed = 0
+        self._queue: queue.Queue[Any] = queue.Queue(maxsize=max_queue)
+        self._thread: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+        self._closed = False
+        self._fh = None
+        self._opened_at = 0.0
+        self._last_fsync = 0.0
+        self._db_conn = None
+
+    @classmethod
+    def from_env(cls, path: Path) -> "AuthEventSink":
+        return cls(
+            path,
+            max_queue=int(os.getenv("AUTH_LOG_MAX_QUEUE", "10000")),
+            max_bytes=int(os.getenv("AUTH_LOG_MAX_BYTES", str(50 * 1024 * 1024))),
+            rotate_interval=float(os.getenv("AUTH_LOG_ROTATE_SECONDS", "86400")),
+            backups=int(os.getenv("AUTH_LOG_BACKUPS", "14")),
+            db_enabled=os.getenv("AUTH_LOG_DB", "0") == "1",
+        )
+
+    # --- producer side ---
+    def emit(self, record: dict[str, Any]) -> bool:
+        """Queue ``record`` without blocking; return ``False`` if dropped."""
+
+        if self._closed:
+            return False
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            AUTH_EVENTS_DROPPED.inc()
+            return False
+        return True
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Block until everything queued so far is written."""
+
+        if self._thread is None:
+            return True
+        marker = _FlushMarker()
+        try:
+            self._queue.put(marker, timeout=timeout)
+        except queue.Full:
+            return False
+        return marker.done.wait(timeout)
+
+    def close(self, timeout: float = 5.0) -> None:
+        if self._closed:
+            return
+        self.flush(timeout)
+        self._closed = True
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout)
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="authlog-writer", daemon=True
+                )
+                self._thread.start()
+
+    # --- writer thread ---
+    def _run(self) -> None:
+        while True:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                self._maybe_fsync()
+                continue
+            batch: list[dict[str, Any]] = []
+            markers: list[_FlushMarker] = []
+            stop = False
+            while True:
+                if item is None:
+                    stop = True
+                elif isinstance(item, _FlushMarker):
+                    markers.append(item)
+                else:
+                    batch.append(item)
+                if stop or len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            try:
+                self._write_batch(batch, force_sync=bool(markers) or stop)
+            except Exception:  # pragma: no cover - never kill the writer
+                logger.exception("auth log write failed")
+            for marker in markers:
+                marker.done.set()
+            if stop:
+                self._close_file()
+                return
+
+    def _write_batch(self, batch: list[dict[str, Any]], *, force_sync: bool) -> None:
+        if batch:
+            self._maybe_rotate()
+            fh = self._open()
+            fh.write(
+                "".join(json.dumps(rec, ensure_ascii=False) + "\n" for rec in batch)
+            )
+            fh.flush()
+            self.written += len(batch)
+            if self.db_enabled:
+                self._write_db(batch)
+        if force_sync:
+            self._fsync()
+        else:
+            self._maybe_fsync()
+
+    def _open(self):
+        if self._fh is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._fh = self.path.open("a", encoding="utf-8")
+            self._opened_at = time.time()
+        return self._fh
+
+    def _fsync(self) -> None:
+        if self._fh is not None:
+            self._fh.flush()
+            os.fsync(self._fh.fileno())
+            self._last_fsync = time.monotonic()
+
+    def _maybe_fsync(self) -> None:
+        if time.monotonic() - self._last_fsync >= self.fsync_interval:
+            self._fsync()
+
+    def _close_file(self) -> None:
+        if self._fh is not None:
+            self._fsync()
+            self._fh.close()
+            self._fh = None
+
+    def _maybe_rotate(self) -> None:
+        fh = self._open()
+        size = fh.tell()
+        if size == 0:
+            return
+        too_big = self.max_bytes and size >= self.max_bytes
+        too_old = self.rotate_interval and time.time() - self._opened_at >= self.rotate_interval
+        if not (too_big or too_old):
+            return
+        self._close_file()
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+        rotated = self.path.with_name(f"{self.path.name}.{stamp}")
+        suffix = 1
+        while rotated.exists() or rotated.with_name(rotated.name + ".gz").exists():
+            rotated = self.path.with_name(f"{self.path.name}.{stamp}-{suffix}")
+            suffix += 1
+        os.replace(self.path, rotated)
+        with rotated.open("rb") as src, gzip.open(f"{rotated}.gz", "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        rotated.unlink()
+        self._prune_backups()
+
+    def _prune_backups(self) -> None:
+        old = sorted(self.path.parent.glob(f"{self.path.name}.*.gz"))
+        for extra in old[: max(len(old) - self.backups, 0)]:
+            try:
+                extra.unlink()
+            except OSError:
+                pass
+
+    def _write_db(self, batch: list[dict[str, Any]]) -> None:
+        rows = [
+            (
+                rec["user_id"],
+                str(rec.get("event"))[:50],
+                json.dumps(rec, ensure_ascii=False),
+            )
+            for rec in batch
+            if rec.get("user_id")
+        ]
+        if not rows:
+            return
+        try:
+            if self._db_conn is None:
+                from backend.db.legacy import get_raw_connection, validate_config
+
+                dsn = validate_config().replace("+asyncpg", "").replace("+psycopg", "")
+                self._db_conn = get_raw_connection(dsn)
+            with self._db_conn.cursor() as cur:
+                cur.executemany(
+                    "INSERT INTO auth_audit_entries "
+                    "(target_user_id, action, scope_type, details, created_at) "
+                    "VALUES (%s, %s, 'global', %s::json, now())",
+                    rows,
+                )
+            self._db_conn.commit()
+            self.db_written += len(rows)
+        except Exception as exc:
+            self.db_failed += len(rows)
+            logger.warning("auth log: failed to store %s events in DB: %s", len(rows), exc)
+            if self._db_conn is not None:
+                try:
+                    self._db_conn.close()
+                except Exception:
+                    pass
+                self._db_conn = None
+
+
+sink = AuthEventSink.from_env(LOG_PATH)
+atexit.register(sink.close)
+
+
 def log_event(request, event: str, user=None, extra: dict | None = None):
-    LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
     rec = {
         "ts": utcnow().isoformat() + "Z",
         "event": event,  # e.g. "login_ok", "login_fail", "tg_ok", "magic_ok"
@@ -19,5 +288,4 @@ def log_event(request, event: str, user=None, extra: dict | None = None):
     }
     if extra:
         rec.update(extra)
-    with LOG_PATH.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+    sink.emit(rec)
@@ -0,0 +1,120 @@
+"""Fast JSON serialization for API responses.
+
+The default FastAPI path for ``response_model=List[Model]`` makes three passes
+over every row: re-validate the returned models, serialize them to Python
+primitives, then ``json.dumps``.  For list endpoints that build their models
+from trusted ORM rows this module offers shorter paths:
+
+* :class:`FastJSONResponse` — the app's default response class, rendering
+  with orjson when it is installed.
+* :class:`ModelListSerializer` — dumps row dicts built from trusted ORM
+  objects straight to JSON bytes, without building a model per row.  (A
+  ``model_construct`` per row is no cheaper: its Python-level field loop costs
+  more than pydantic-core validation.)  Routes keep ``response_model`` for the
+  OpenAPI schema and return ``serializer.response(rows)``.
+* :func:`rows_response` — ``Row``/mapping results of column selects go to JSON
+  without building ORM entities or models at all.
+"""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Iterable, Mapping, Sequence
+from typing import Any, Generic, TypeVar
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+from starlette.responses import Response
+
+try:  # pragma: no cover - optional speed-up
+    import orjson as _orjson
+except ImportError:  # pragma: no cover
+    _orjson = None
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+# Same datetime format as pydantic ("...Z" for UTC) so both paths agree.
+_ORJSON_OPTIONS = 0 if _orjson is None else _orjson.OPT_NON_STR_KEYS | _orjson.OPT_UTC_Z
+
+
+def _orjson_default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    return jsonable_encoder(obj)
+
+
+def dumps(content: Any) -> bytes:
+    if _orjson is not None:
+        return _orjson.dumps(content, default=_orjson_default, option=_ORJSON_OPTIONS)
+    return json.dumps(
+        jsonable_encoder(content),
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class ModelListSerializer(Generic[ModelT]):
+    """JSON for lists shaped like ``model``, built from trusted row dicts.
+
+    Routes keep ``response_model=List[model]`` for the schema and return
+    ``serializer.response(rows)`` where each row is a dict with the model's
+    fields (see the ``to_row`` classmethods on response models).  With orjson
+    the rows are dumped directly; without it pydantic-core validates and dumps
+    them in one pass.  Either way the bytes match what ``response_model``
+    produces.
+    """
+
+    def __init__(self, model: type[ModelT]) -> None:
+        self.model = model
+        self._adapter: TypeAdapter[list[ModelT]] = TypeAdapter(list[model])  # type: ignore[valid-type]
+
+    def dump_json(self, rows: Iterable[Mapping[str, Any]]) -> bytes:
+        rows = list(rows)
+        if _orjson is not None:
+            return _orjson.dumps(rows, default=_orjson_default, option=_ORJSON_OPTIONS)
+        return self._adapter.dump_json(self._adapter.validate_python(rows), by_alias=True)
+
+    def response(
+        self,
+        rows: Iterable[Mapping[str, Any]],
+        *,
+        status_code: int = 200,
+        headers: Mapping[str, str] | None = None,
+    ) -> Response:
+        return Response(
+            self.dump_json(rows),
+            status_code=status_code,
+            headers=headers,
+            media_type="application/json",
+        )
+
+
+def rows_response(
+    rows: Sequence[Mapping[str, Any]],
+    *,
+    status_code: int = 200,
+    headers: Mapping[str, str] | None = None,
+) -> Response:
+    """JSON response from ``result.mappings()`` rows or plain dicts."""
+
+    return Response(
+        dumps([dict(row) for row in rows]),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json",
+    )
+
+
+__all__ = [
+    "FastJSONResponse",
+    "ModelListSerializer",
+    "dumps",
+    "rows_response",
+]
@@ -0,0 +1,285 @@
+"""Static asset server backed by a startup manifest.
+
+:class:`StaticAssets` replaces ``StaticFiles`` for ``/static`` and the
+Next.js build output.  The asset directory is indexed once (``scan()``, run
+from the lifespan in a thread) into a manifest of path → stat, content-hash
+ETag and precompressed ``.br``/``.gz`` siblings.  Requests for immutable
+assets do no ``stat()`` calls; other files are re-stated (in a thread) and
+re-indexed when their size or mtime changed, so an asset edited in place is
+never served with a stale ``Content-Length`` or ETag.  Files missing from the
+manifest (added after the scan) are indexed on first request.
+
+* Content-hashed files — everything under ``/_next/static`` and names like
+  ``app.3f9a1c2b.js`` — are sent with a one-year ``immutable`` cache, so
+  browsers stop revalidating bundles; other files get ``no-cache`` and are
+  answered with 304 when the ETag still matches.
+* ``Accept-Encoding`` picks a precompressed sibling when one exists.
+* Range, ``If-Range`` and ``HEAD`` are handled by Starlette's
+  ``FileResponse``, which also uses the ``http.response.pathsend`` zero-copy
+  extension when the server offers it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import mimetypes
+import os
+import posixpath
+import re
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, PlainTextResponse, Response
+from starlette.types import Receive, Scope, Send
+
+from .precompressed import (
+    CODINGS,
+    accepted_encodings,
+    compress_variants,
+    etag_matches,
+    variant_etag,
+)
+
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "public, no-cache"
+# ``name.<hex>.ext`` / ``name-<hex>.ext`` as emitted by bundlers.
+HASHED_NAME_RE = re.compile(r"[.-][0-9a-fA-F]{8,}\.[^/]+$")
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+COMPRESSIBLE_SUFFIXES = {".js", ".mjs", ".css", ".html", ".json", ".svg", ".txt", ".map", ".xml"}
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Asset:
+    path: Path
+    stat: os.stat_result
+    etag: str
+    media_type: str
+    cache_control: str
+    variants: dict[str, tuple[Path, os.stat_result]] = field(default_factory=dict)
+
+    @property
+    def immutable(self) -> bool:
+        return self.cache_control == IMMUTABLE_CACHE
+
+
+def _same_file(a: os.stat_result, b: os.stat_result) -> bool:
+    return (a.st_mtime_ns, a.st_size, a.st_ino) == (b.st_mtime_ns, b.st_size, b.st_ino)
+
+
+def _file_etag(path: Path) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with path.open("rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(chunk)
+    return f'"{digest.hexdigest()}"'
+
+
+def index_file(path: Path, rel: str, *, immutable: bool) -> Asset | None:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    if not path.is_file():
+        return None
+    variants = {}
+    for coding, suffix in ENCODINGS:
+        sibling = path.with_name(path.name + suffix)
+        try:
+            variants[coding] = (sibling, sibling.stat())
+        except OSError:
+            continue
+    media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+    hashed = immutable or bool(HASHED_NAME_RE.search(rel))
+    return Asset(
+        path=path,
+        stat=stat,
+        etag=_file_etag(path),
+        media_type=media_type,
+        cache_control=IMMUTABLE_CACHE if hashed else REVALIDATE_CACHE,
+        variants=variants,
+    )
+
+
+def precompress(directory: Path, *, min_size: int = 1024) -> int:
+    """Write ``.gz`` (and ``.br`` with brotli installed) next to text assets.
+
+    Run after ``npm run build``; existing up-to-date siblings are kept.
+    """
+
+    written = 0
+    for path in Path(directory).rglob("*"):
+        if path.suffix not in COMPRESSIBLE_SUFFIXES or not path.is_file():
+            continue
+        stat = path.stat()
+        if stat.st_size < min_size:
+            continue
+        stale = []
+        for coding, suffix in ENCODINGS:
+            target = path.with_name(path.name + suffix)
+            if coding in CODINGS and (
+                not target.exists() or target.stat().st_mtime < stat.st_mtime
+            ):
+                stale.append((coding, target))
+        if not stale:
+            continue
+        variants = compress_variants(path.read_bytes(), min_size=0)
+        for coding, target in stale:
+            if coding in variants:
+                target.write_bytes(variants[coding])
+                written += 1
+    return written
+
+
+class AssetManifest:
+    def __init__(self, directory: Path, *, immutable: bool = False) -> None:
+        self.directory = Path(directory).resolve()
+        self.immutable = immutable
+        self.assets: dict[str, Asset] = {}
+
+    def scan(self) -> int:
+        assets: dict[str, Asset] = {}
+        if not self.directory.is_dir():
+            logger.warning("Static assets directory not found: %s", self.directory)
+            self.assets = assets
+            return 0
+        for root, _dirs, files in os.walk(self.directory):
+            names = set(files)
+            for name in files:
+                # ``x.js.gz`` next to ``x.js`` is a variant, not an asset of its own.
+                if any(name.endswith(sfx) and name[: -len(sfx)] in names for _, sfx in ENCODINGS):
+                    continue
+                path = Path(root) / name
+                rel = path.relative_to(self.directory).as_posix()
+                asset = index_file(path, rel, immutable=self.immutable)
+                if asset is not None:
+                    assets[rel] = asset
+        self.assets = assets
+        logger.info("Static assets indexed: %s (%s files)", self.directory, len(assets))
+        return len(assets)
+
+    def resolve(self, rel: str) -> Path | None:
+        normalized = posixpath.normpath(rel).lstrip("/")
+        if not normalized or normalized == "." or normalized.startswith("..") or "\x00" in normalized:
+            return None
+        path = (self.directory / normalized).resolve()
+        if os.path.commonpath([self.directory, path]) != str(self.directory):
+            return None
+        return path
+
+    def _is_current(self, asset: Asset) -> bool:
+        try:
+            if not _same_file(asset.path.stat(), asset.stat):
+                return False
+            for path, stat in asset.variants.values():
+                if not _same_file(path.stat(), stat):
+                    return False
+        except OSError:
+            return False
+        return True
+
+    def lookup(self, rel: str) -> Asset | None:
+        """Current asset for ``rel`` (does blocking I/O).
+
+        Immutable assets come straight from the manifest; others are checked
+        against the file system and re-indexed when changed.  Files added
+        after ``scan()`` are indexed here, deleted ones are dropped.
+        """
+
+        asset = self.assets.get(rel)
+        if asset is not None and (asset.immutable or self._is_current(asset)):
+            return asset
+        path = asset.path if asset is not None else self.resolve(rel)
+        if path is None:
+            return None
+        asset = index_file(path, rel, immutable=self.immutable)
+        if asset is not None:
+            self.assets[rel] = asset
+        else:
+            self.assets.pop(rel, None)
+        return asset
+
+
+def _not_modified(asset: Asset, headers: Headers) -> bool:
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, asset.etag)
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(asset.stat.st_mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+class StaticAssets:
+    """ASGI app serving one asset directory (mount it like ``StaticFiles``)."""
+
+    def __init__(self, directory: Path | str, *, immutable: bool = False) -> None:
+        self.manifest = AssetManifest(Path(directory), immutable=immutable)
+
+    def scan(self) -> int:
+        return self.manifest.scan()
+
+    def _route_path(self, scope: Scope) -> str:
+        path = scope["path"]
+        root_path = scope.get("root_path", "")
+        if root_path and path.startswith(root_path):
+            path = path[len(root_path):]
+        return path.lstrip("/")
+
+    def respond(self, rel: str, asset: Asset | None, headers: Headers) -> Response:
+        if asset is None:
+            return PlainTextResponse("Not Found", status_code=404)
+        base_headers = {"ETag": asset.etag, "Cache-Control": asset.cache_control}
+        if asset.variants:
+            base_headers["Vary"] = "Accept-Encoding"
+        if _not_modified(asset, headers):
+            return Response(status_code=304, headers=base_headers)
+
+        path, stat = asset.path, asset.stat
+        # Byte ranges always address the identity representation.
+        if asset.variants and "range" not in headers:
+            accepted = accepted_encodings(headers.get("accept-encoding", ""))
+            for coding, _ in ENCODINGS:
+                if coding in accepted and coding in asset.variants:
+                    path, stat = asset.variants[coding]
+                    base_headers["Content-Encoding"] = coding
+                    base_headers["ETag"] = variant_etag(asset.etag, coding)
+                    break
+        return FileResponse(
+            path,
+            stat_result=stat,
+            headers=base_headers,
+            media_type=asset.media_type,
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        assert scope["type"] == "http"
+        if scope["method"] not in {"GET", "HEAD"}:
+            response: Response = PlainTextResponse(
+                "Method Not Allowed", status_code=405, headers={"Allow": "GET, HEAD"}
+            )
+        else:
+            rel = self._route_path(scope)
+            asset = self.manifest.assets.get(rel)
+            if asset is None or not asset.immutable:
+                asset = await anyio.to_thread.run_sync(self.manifest.lookup, rel)
+            response = self.respond(rel, asset, Headers(scope=scope))
+        await response(scope, receive, send)
+
+
+__all__ = [
+    "Asset",
+    "AssetManifest",
+    "IMMUTABLE_CACHE",
+    "REVALIDATE_CACHE",
+    "StaticAssets",
+    "precompress",
+]
@@ -0,0 +1,199 @@
+"""Benchmark one-week agenda reads for an owner with a large calendar.
+
+Seeds ``--items`` calendar items (one alarm each) and as many calendar
+events for a throwaway owner, then times the previous read paths against the
+range-bounded ones:
+
+* items: ``CalendarItemRepository.list`` (entities + selectinload of alarms,
+  owner filter only) vs ``CalendarItemRepository.agenda`` (column-only rows
+  from ``ix_calendar_items_owner_start``);
+* events: ``CalendarService.list_events`` for the owner, filtered in Python,
+  vs ``CalendarService.agenda``;
+* alarms: upcoming alarms joined through ``calendar_items`` and ``areas`` vs
+  ``AlarmService.list_upcoming`` on ``ix_alarms_owner_trigger``.
+
+Everything runs in one transaction that is rolled back, and the plan of each
+new query is printed.  Needs a database with the
+``20261018_agenda_indexes.sql`` indexes:
+
+    PYTHONPATH=apps python scripts/bench_agenda.py --items 50000 --repeat 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from datetime import timedelta
+from pathlib import Path
+from typing import Awaitable, Callable
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "apps"))
+
+import sqlalchemy as sa  # noqa: E402
+
+from backend import db  # noqa: E402
+from backend.db.init_app import init_app_once  # noqa: E402
+from backend.env import env  # noqa: E402
+from backend.models import (  # noqa: E402
+    Alarm,
+    Area,
+    CalendarEvent,
+    CalendarItem,
+    CalendarItemStatus,
+    TgUser,
+)
+from backend.services.alarm_service import AlarmService  # noqa: E402
+from backend.services.calendar_service import CalendarService  # noqa: E402
+from backend.services.para_repository import (  # noqa: E402
+    AGENDA_COLUMNS,
+    CalendarItemRepository,
+)
+from backend.utils import utcnow  # noqa: E402
+
+OWNER_ID = -987_654_321
+
+
+async def seed(session, n: int) -> None:
+    session.add(TgUser(telegram_id=OWNER_ID, first_name="bench"))
+    await session.flush()
+    area = Area(owner_id=OWNER_ID, name="Bench", title="Bench")
+    session.add(area)
+    await session.flush()
+    # Spread over roughly three years around now, ~45 items a day.
+    base = utcnow() - timedelta(days=n // 90)
+    step = timedelta(minutes=32)
+    items = [
+        {
+            "owner_id": OWNER_ID,
+            "title": f"Item {i}",
+            "start_at": base + step * i,
+            "end_at": base + step * i + timedelta(minutes=30),
+            "area_id": area.id,
+            "status": CalendarItemStatus.planned,
+        }
+        for i in range(n)
+    ]
+    ids = (
+        await session.execute(
+            sa.insert(CalendarItem).returning(CalendarItem.id, sort_by_parameter_order=True), items
+        )
+    ).scalars().all()
+    await session.execute(
+        sa.insert(Alarm),
+        [
+            {"item_id": item_id, "owner_id": OWNER_ID, "trigger_at": row["start_at"] - timedelta(minutes=10)}
+            for item_id, row in zip(ids, items, strict=True)
+        ],
+    )
+    await session.execute(
+        sa.insert(CalendarEvent),
+        [{"owner_id": OWNER_ID, "title": row["title"], "start_at": row["start_at"]} for row in items],
+    )
+    for table in ("calendar_items", "alarms", "calendar_events"):
+        await session.execute(sa.text(f"ANALYZE {table}"))
+
+
+async def _median_ms(fn: Callable[[], Awaitable[int]], repeat: int) -> tuple[float, int]:
+    samples = []
+    rows = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows = await fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), rows
+
+
+async def report(name: str, previous, fast, repeat: int) -> None:
+    old_ms, old_rows = await _median_ms(previous, repeat)
+    new_ms, new_rows = await _median_ms(fast, repeat)
+    print(
+        f"{name:7} previous {old_ms:9.1f} ms ({old_rows} rows)  "
+        f"bounded {new_ms:8.1f} ms ({new_rows} rows)  x{old_ms / max(new_ms, 1e-6):.1f}"
+    )
+
+
+async def explain(session, stmt) -> None:
+    compiled = stmt.compile(dialect=session.bind.dialect, compile_kwargs={"literal_binds": True})
+    plan = await session.execute(sa.text(f"EXPLAIN (ANALYZE, BUFFERS) {compiled}"))
+    print("\n".join(f"    {line}" for (line,) in plan))
+
+
+async def run(n: int, repeat: int) -> None:
+    await init_app_once(env)
+    async with db.async_session() as session:  # type: ignore
+        await session.begin()
+        try:
+            await seed(session, n)
+            start = utcnow()
+            end = start + timedelta(days=7)
+            items = CalendarItemRepository(session)
+            events = CalendarService(session)
+            alarms = AlarmService(session)
+
+            async def items_before() -> int:
+                rows = await items.list(owner_id=OWNER_ID)
+                return sum(1 for row in rows if start <= row.start_at <= end)
+
+            async def items_after() -> int:
+                return len(await items.agenda(OWNER_ID, start, end))
+
+            async def events_before() -> int:
+                rows = await events.list_events(owner_id=OWNER_ID)
+                return sum(1 for row in rows if start <= row.start_at <= end)
+
+            async def events_after() -> int:
+                return len(await events.agenda(OWNER_ID, start, end))
+
+            async def alarms_before() -> int:
+                stmt = (
+                    sa.select(Alarm)
+                    .join(CalendarItem, Alarm.item_id == CalendarItem.id)
+                    .join(Area, CalendarItem.area_id == Area.id)
+                    .where(Area.owner_id == OWNER_ID, Alarm.trigger_at >= start)
+                    .order_by(Alarm.trigger_at)
+                )
+                rows = (await session.execute(stmt)).scalars().all()
+                return sum(1 for row in rows if row.trigger_at < end)
+
+            async def alarms_after() -> int:
+                return len(await alarms.list_upcoming(OWNER_ID, until=end))
+
+            print(f"owner with {n} items/events/alarms, one-week window, median of {repeat}")
+            await report("items", items_before, items_after, repeat)
+            await report("events", events_before, events_after, repeat)
+            await report("alarms", alarms_before, alarms_after, repeat)
+
+            print("plan: items agenda")
+            await explain(
+                session,
+                sa.select(*AGENDA_COLUMNS)
+                .where(CalendarItem.owner_id == OWNER_ID)
+                .where(CalendarItem.start_at.between(start, end))
+                .order_by(CalendarItem.start_at, CalendarItem.id),
+            )
+            print("plan: upcoming alarms")
+            await explain(
+                session,
+                sa.select(Alarm.id, Alarm.trigger_at)
+                .where(Alarm.owner_id == OWNER_ID)
+                .where(Alarm.trigger_at >= start, Alarm.trigger_at < end)
+                .order_by(Alarm.trigger_at),
+            )
+        finally:
+            await session.rollback()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(run(args.items, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Measure cold import time of the app entry points.
+
+Runs ``python -X importtime -c "import <module>"`` in a fresh interpreter
+(so nothing is cached in ``sys.modules``), prints the total, the slowest
+modules by cumulative time and, for packages that must stay out of the
+import graph (aiogram, OpenTelemetry and Google clients in the web app), the chain that
+pulled them in.  ``--budget-ms`` makes the script exit with status 1 when a
+module is over budget or loads a forbidden package — usable as a CI gate.
+
+    python scripts/bench_imports.py
+    python scripts/bench_imports.py web --budget-ms 3000 --forbid aiogram --forbid opentelemetry
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+DEFAULT_FORBIDDEN = {"web": ("aiogram", "opentelemetry", "google")}
+
+
+@dataclass
+class ImportRow:
+    name: str
+    depth: int
+    self_us: int
+    cumulative_us: int
+
+
+def run_importtime(module: str, env: dict[str, str] | None = None) -> list[ImportRow]:
+    """Import ``module`` in a subprocess and parse the ``-X importtime`` log."""
+
+    run_env = {**os.environ, **(env or {})}
+    run_env["PYTHONPATH"] = os.pathsep.join(
+        p for p in (str(ROOT / "apps"), run_env.get("PYTHONPATH", "")) if p
+    )
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT / "apps",
+        env=run_env,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append(ImportRow(name.strip(), depth, int(self_us), int(cumulative_us)))
+    return rows
+
+
+def import_chain(rows: list[ImportRow], package: str) -> list[str] | None:
+    """Importer chain of the first module of ``package`` (outermost first).
+
+    ``-X importtime`` logs a module after its children, so the parents of a
+    row are the next rows with a smaller depth.
+    """
+
+    for index, row in enumerate(rows):
+        if row.name.split(".")[0] != package:
+            continue
+        chain = [row.name]
+        depth = row.depth
+        for parent in rows[index + 1:]:
+            if parent.depth < depth:
+                chain.append(parent.name)
+                depth = parent.depth
+        return list(reversed(chain))
+    return None
+
+
+def report(module: str, rows: list[ImportRow], top: int, forbidden: list[str]) -> tuple[float, list[str]]:
+    total_ms = sum(r.self_us for r in rows) / 1000
+    print(f"== {module}: {total_ms:,.0f} ms, {len(rows)} modules")
+    for row in sorted(rows, key=lambda r: r.cumulative_us, reverse=True)[:top]:
+        print(f"  {row.cumulative_us / 1000:9.1f} ms  {row.name}")
+    loaded = []
+    for package in forbidden:
+        chain = import_chain(rows, package)
+        if chain:
+            loaded.append(package)
+            print(f"  ! {package} is imported: {' -> '.join(chain)}")
+    return total_ms, loaded
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("modules", nargs="*", default=["web", "bot.main"])
+    parser.add_argument("--top", type=int, default=15, help="slowest modules to list")
+    parser.add_argument("--budget-ms", type=float, help="fail when an import is slower")
+    parser.add_argument(
+        "--forbid",
+        action="append",
+        help="package that must not be imported (default for web: aiogram, opentelemetry, google)",
+    )
+    args = parser.parse_args()
+
+    failed = False
+    for module in args.modules:
+        forbidden = args.forbid if args.forbid is not None else list(DEFAULT_FORBIDDEN.get(module, ()))
+        total_ms, loaded = report(module, run_importtime(module), args.top, forbidden)
+        if args.budget_ms is not None and total_ms > args.budget_ms:
+            print(f"  ! over budget: {total_ms:,.0f} ms > {args.budget_ms:,.0f} ms")
+            failed = True
+        failed = failed or bool(loaded)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""Benchmark the logging pipeline: records/second and caller-side p99.
+
+Compares the previous setup (StreamHandler + JsonFormatter formatting in
+the calling thread) with the queue pipeline from ``backend.logging``.
+Output goes to /dev/null so only formatting and handoff costs are measured.
+
+    PYTHONPATH=apps python scripts/bench_logging.py --records 50000
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import logging.handlers
+import os
+import queue
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "apps"))
+
+from backend.logging import (  # noqa: E402
+    ContextQueueHandler,
+    JsonFormatter,
+    SamplingFilter,
+    request_id_var,
+)
+
+
+def _request_record(logger: logging.Logger, i: int) -> None:
+    logger.info(
+        "request",
+        extra={
+            "extra": {
+                "path": f"/api/v1/tasks/{i}",
+                "method": "GET",
+                "status": 200,
+                "duration_ms": 1.23,
+                "user": "someone@example.com",
+            }
+        },
+    )
+
+
+def _measure(logger: logging.Logger, records: int) -> tuple[float, float]:
+    latencies = []
+    started = time.perf_counter()
+    for i in range(records):
+        t0 = time.perf_counter()
+        _request_record(logger, i)
+        latencies.append(time.perf_counter() - t0)
+    total = time.perf_counter() - started
+    p99 = statistics.quantiles(latencies, n=100)[98]
+    return records / total, p99 * 1e6
+
+
+def _fresh_logger(name: str, handler: logging.Handler) -> logging.Logger:
+    logger = logging.getLogger(name)
+    logger.handlers = [handler]
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    return logger
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=50000)
+    parser.add_argument("--sample", type=float, default=0.1)
+    args = parser.parse_args()
+    request_id_var.set("bench-request")
+    devnull = open(os.devnull, "w")
+
+    inline = logging.StreamHandler(devnull)
+    inline.setFormatter(JsonFormatter())
+    rate, p99 = _measure(_fresh_logger("bench.inline", inline), args.records)
+    print(f"inline formatter : {rate:10.0f} rec/s  caller p99 {p99:7.1f} us")
+
+    for label, sample in (("queue pipeline   ", None), ("queue + sampling ", args.sample)):
+        out = logging.StreamHandler(devnull)
+        out.setFormatter(JsonFormatter())
+        q: queue.Queue[logging.LogRecord] = queue.Queue(maxsize=args.records + 1)
+        handler = ContextQueueHandler(q)
+        name = "bench.queue"
+        if sample is not None:
+            name = "bench.sampled"
+            handler.addFilter(SamplingFilter({name: sample}))
+        listener = logging.handlers.QueueListener(q, out)
+        listener.start()
+        rate, p99 = _measure(_fresh_logger(name, handler), args.records)
+        drain_started = time.perf_counter()
+        listener.stop()
+        drain = time.perf_counter() - drain_started
+        print(
+            f"{label}: {rate:10.0f} rec/s  caller p99 {p99:7.1f} us"
+            f"  (listener drained in {drain:.2f}s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Benchmark JSON serialization of large task and note lists.
+
+Compares the previous path — validated ``Model(...)`` per row, FastAPI's
+``serialize_response`` (re-validation + ``serialize``) and stdlib
+``JSONResponse`` — with the fast path from ``web.serialization`` (row dicts
+from ``to_row`` dumped in one pass).  Rows are
+transient ORM objects, so no database is needed.  Reports CPU time per
+response (``time.process_time``).
+
+    PYTHONPATH=apps python scripts/bench_serialization.py --rows 10000 --repeat 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, List
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "apps"))
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_model_field  # noqa: E402
+
+from backend.models import Area, Note, Project, Task, TaskStatus  # noqa: E402
+from web.routes.notes import NOTE_LIST, NoteResponse  # noqa: E402
+from web.routes.tasks import TASK_LIST, TaskResponse  # noqa: E402
+
+
+def make_tasks(n: int) -> list[Task]:
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    return [
+        Task(
+            id=i,
+            title=f"Task {i}",
+            description="Описание задачи " * 3,
+            status=TaskStatus.todo,
+            due_date=base + timedelta(hours=i),
+            control_enabled=i % 2 == 0,
+            remind_policy={"offsets": [15, 60]},
+        )
+        for i in range(n)
+    ]
+
+
+def make_notes(n: int) -> list[Note]:
+    area = Area(id=1, name="Inbox", slug="inbox", color="#F1F5F9")
+    project = Project(id=7, name="Launch")
+    return [
+        Note(
+            id=i,
+            title=f"Note {i}",
+            content="Текст заметки. " * 10,
+            pinned=i % 10 == 0,
+            order_index=i,
+            area=area,
+            area_id=area.id,
+            project=project if i % 3 == 0 else None,
+            project_id=project.id if i % 3 == 0 else None,
+        )
+        for i in range(n)
+    ]
+
+
+def _cpu_ms(fn: Callable[[], bytes], repeat: int) -> tuple[float, int]:
+    samples = []
+    size = 0
+    for _ in range(repeat):
+        started = time.process_time()
+        size = len(fn())
+        samples.append((time.process_time() - started) * 1000)
+    return statistics.median(samples), size
+
+
+def bench(name: str, model, serializer, rows, repeat: int) -> None:
+    field = create_model_field(name="Response_" + name, type_=List[model], mode="serialization")
+    loop = asyncio.new_event_loop()
+
+    def previous() -> bytes:
+        items = [model.from_model(row) for row in rows]
+        content = loop.run_until_complete(
+            serialize_response(field=field, response_content=items)
+        )
+        return JSONResponse(content).body
+
+    def fast() -> bytes:
+        return serializer.dump_json(model.to_row(row) for row in rows)
+
+    old_ms, old_size = _cpu_ms(previous, repeat)
+    new_ms, new_size = _cpu_ms(fast, repeat)
+    loop.close()
+    print(
+        f"{name:6} {len(rows):>7} rows  previous {old_ms:8.1f} ms ({old_size:,} B)  "
+        f"fast {new_ms:8.1f} ms ({new_size:,} B)  x{old_ms / max(new_ms, 1e-6):.1f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    bench("tasks", TaskResponse, TASK_LIST, make_tasks(args.rows), args.repeat)
+    bench("notes", NoteResponse, NOTE_LIST, make_notes(args.rows), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
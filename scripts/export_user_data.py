@@ -0,0 +1,43 @@
+"""CLI to export one user's data as a ZIP of NDJSON files.
+
+Usage: ``python scripts/export_user_data.py 42 -o backup.zip [--since ISO]``.
+For incremental backups pass the ``next_since`` of the previous archive's
+``manifest.json``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from backend.db.init_app import init_app_once
+from backend.env import env
+from backend.services.data_export import DataExportService
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("web_user_id", type=int)
+    parser.add_argument("-o", "--output", type=Path, required=True)
+    parser.add_argument("--since", type=datetime.fromisoformat)
+    return parser.parse_args()
+
+
+async def _main() -> int:
+    args = _parse_args()
+    await init_app_once(env)
+    async with DataExportService() as exporter:
+        owner = await exporter.owner_for_web_user(args.web_user_id)
+        if owner is None:
+            print(f"web user {args.web_user_id} not found", file=sys.stderr)
+            return 1
+        await exporter.write_archive(owner, args.output, args.since)
+    print(args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(_main()))
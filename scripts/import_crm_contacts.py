@@ -0,0 +1,65 @@
+"""CLI to bulk-import CRM contacts and accounts from a CSV or JSONL file.
+
+Usage: ``python scripts/import_crm_contacts.py contacts.csv --area-id 3``.
+Each batch commits on its own, so an interrupted import can be re-run: rows
+already imported are matched by email or phone and only updated.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+from pathlib import Path
+
+from backend.db.init_app import init_app_once
+from backend.env import env
+from backend.services.crm_import import (
+    IMPORT_BATCH,
+    READERS,
+    CRMImportService,
+    ImportReport,
+)
+
+logger = logging.getLogger("import_crm_contacts")
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--format", choices=sorted(READERS), help="по умолчанию — по расширению")
+    parser.add_argument("--area-id", type=int)
+    parser.add_argument("--project-id", type=int)
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH)
+    return parser.parse_args()
+
+
+async def _progress(report: ImportReport) -> None:
+    print(f"{report.processed} rows, {report.error_count} errors", flush=True)
+
+
+async def _main() -> None:
+    args = _parse_args()
+    fmt = args.format or args.path.suffix.lstrip(".").lower()
+    await init_app_once(env)
+    with args.path.open(encoding="utf-8-sig", newline="") as stream:
+        async with CRMImportService(batch_size=args.batch_size) as importer:
+            report = await importer.import_stream(
+                stream,
+                fmt,
+                area_id=args.area_id,
+                project_id=args.project_id,
+                on_progress=_progress,
+            )
+    for error in report.errors:
+        print(f"line {error.line}: {error.message}")
+    logger.info("CRM import finished: %s", report)
+    print(
+        f"contacts: +{report.contacts_created} ~{report.contacts_updated}, "
+        f"accounts: +{report.accounts_created} ~{report.accounts_updated}, "
+        f"errors: {report.error_count}"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -0,0 +1,29 @@
+"""CLI to recompute CRM funnel and revenue rollups from raw events.
+
+Run once after applying ``20261018_crm_analytics.sql`` and whenever the
+rollups are suspected to have drifted; it runs in one transaction, so
+reports keep serving the previous numbers until it commits.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from backend.db.init_app import init_app_once
+from backend.env import env
+from backend.services.crm_analytics import CRMAnalyticsService
+
+logger = logging.getLogger("rebuild_crm_analytics")
+
+
+async def _main() -> None:
+    await init_app_once(env)
+    async with CRMAnalyticsService() as analytics:
+        stats = await analytics.rebuild()
+    logger.info("CRM analytics rebuilt: %s", stats)
+    print(", ".join(f"{key}={value}" for key, value in stats.items()))
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
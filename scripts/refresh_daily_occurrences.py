@@ -0,0 +1,28 @@
+"""CLI to re-expand every daily's rrule into ``daily_occurrences``.
+
+Run once after applying ``20261018_daily_occurrences.sql``; afterwards the
+table is kept current on edits and by the habits cron.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from backend.db.init_app import init_app_once
+from backend.env import env
+from backend.services.habits import DailyScheduleService
+
+logger = logging.getLogger("refresh_daily_occurrences")
+
+
+async def _main() -> None:
+    await init_app_once(env)
+    async with DailyScheduleService() as schedule:
+        written = await schedule.refresh()
+    logger.info("daily occurrences refreshed: %s rows", written)
+    print(f"rows={written}")
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -1,4 +1,8 @@
-"""CLI entrypoint to run TaskReminderWorker from cron/systemd."""
+"""CLI entrypoint to run TaskReminderWorker from cron/systemd.
+
+The worker runs under the same advisory lock as in the supervisor's jobs
+process, so starting it here as well never delivers reminders twice.
+"""
 
 from __future__ import annotations
 
@@ -9,6 +13,7 @@ from signal import SIGINT, SIGTERM
 
 from backend.env import env
 from backend.db.init_app import init_app_once
+from backend.services.background_jobs import Job, run_singleton
 from backend.services.task_reminder_worker import TaskReminderWorker
 
 logger = logging.getLogger("task_reminder_worker")
@@ -17,7 +22,6 @@ logger = logging.getLogger("task_reminder_worker")
 async def _main() -> None:
     await init_app_once(env)
     interval = float(os.getenv("TASK_REMINDER_INTERVAL", "60"))
-    worker = TaskReminderWorker(poll_interval=interval)
     stop_event = asyncio.Event()
 
     loop = asyncio.get_running_loop()
@@ -30,7 +34,10 @@ async def _main() -> None:
 
     logger.info("TaskReminderWorker started with poll interval %.1f seconds", interval)
     try:
-        await worker.start(stop_event)
+        await run_singleton(
+            Job("task_reminders", lambda: TaskReminderWorker(poll_interval=interval)),
+            stop_event,
+        )
     finally:
         logger.info("TaskReminderWorker stopped")
 
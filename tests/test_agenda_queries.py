@@ -0,0 +1,49 @@
+from datetime import timedelta
+
+import pytest
+
+from backend.models import Alarm, Area, CalendarItem
+from backend.services.alarm_service import AlarmService
+from backend.services.calendar_service import CalendarService
+from backend.services.para_repository import CalendarItemRepository
+from backend.utils import utcnow
+from tests.utils.seeds import ensure_tg_user
+
+
+@pytest.mark.asyncio
+async def test_agenda_reads_are_range_bounded_and_owner_scoped(session):
+    await ensure_tg_user(session, 801, first_name="A")
+    await ensure_tg_user(session, 802, first_name="B")
+    area = Area(owner_id=801, name="Cal", title="Cal")
+    other = Area(owner_id=802, name="Cal", title="Cal")
+    session.add_all([area, other])
+    await session.flush()
+
+    now = utcnow()
+    items = [
+        CalendarItem(owner_id=801, title=f"day {d}", start_at=now + timedelta(days=d), area_id=area.id)
+        for d in (-1, 1, 3, 9)
+    ]
+    foreign = CalendarItem(owner_id=802, title="theirs", start_at=now + timedelta(days=1), area_id=other.id)
+    session.add_all([*items, foreign])
+    await session.flush()
+    session.add_all(
+        [Alarm(item_id=item.id, trigger_at=item.start_at - timedelta(hours=1)) for item in (*items, foreign)]
+    )
+    await session.flush()
+
+    rows = await CalendarItemRepository(session).agenda(801, now, now + timedelta(days=7))
+    assert [row.title for row in rows] == ["day 1", "day 3"]
+    assert rows[0].area_id == area.id
+
+    alarms = await AlarmService(session).list_upcoming(801, until=now + timedelta(days=7))
+    assert [alarm.item.title for alarm in alarms] == ["day 1", "day 3"]
+    assert {alarm.owner_id for alarm in alarms} == {801}
+    assert len(await AlarmService(session).list_upcoming(802)) == 1
+
+    calendar = CalendarService(session)
+    await calendar.create_event(801, "later", now + timedelta(days=2))
+    await calendar.create_event(801, "soon", now + timedelta(hours=2))
+    await calendar.create_event(801, "past", now - timedelta(days=2))
+    events = await calendar.agenda(801, now, now + timedelta(days=7))
+    assert [event.title for event in events] == ["soon", "later"]
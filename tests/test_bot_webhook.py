@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from bot.webhook import (
+    SECRET_HEADER,
+    ChatShardedWorkerPool,
+    WebhookSettings,
+    create_webhook_app,
+    extract_chat_key,
+    run_webhook,
+)
+
+
+def test_extract_chat_key_prefers_chat_then_user():
+    assert extract_chat_key({"update_id": 1, "message": {"chat": {"id": -100}}}) == -100
+    assert (
+        extract_chat_key(
+            {"update_id": 2, "callback_query": {"from": {"id": 7}, "message": {"chat": {"id": 5}}}}
+        )
+        == 5
+    )
+    assert extract_chat_key({"update_id": 3, "inline_query": {"from": {"id": 9}}}) == 9
+    assert extract_chat_key({"update_id": 4}) == 4
+
+
+@pytest.mark.asyncio
+async def test_pool_keeps_chat_order_and_runs_chats_concurrently():
+    seen: list[tuple[int, int]] = []
+    slow_started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def handler(payload):
+        chat, seq = payload["chat"], payload["seq"]
+        if chat == 1 and seq == 0:
+            slow_started.set()
+            await release.wait()
+        seen.append((chat, seq))
+
+    pool = ChatShardedWorkerPool(handler, shards=2, queue_size=10)
+    pool.start()
+    for seq in range(3):
+        assert pool.submit(1, {"chat": 1, "seq": seq})
+    await slow_started.wait()
+    assert pool.submit(2, {"chat": 2, "seq": 0})
+    for _ in range(20):
+        if (2, 0) in seen:
+            break
+        await asyncio.sleep(0.01)
+    # chat 2 is not blocked by the slow handler of chat 1
+    assert seen == [(2, 0)]
+    release.set()
+    await pool.stop()
+    assert [s for c, s in seen if c == 1] == [0, 1, 2]
+
+
+@pytest.mark.asyncio
+async def test_pool_rejects_when_shard_is_full():
+    async def handler(payload):
+        return None
+
+    pool = ChatShardedWorkerPool(handler, shards=1, queue_size=1)
+    assert pool.submit(1, {"update_id": 1})
+    assert not pool.submit(1, {"update_id": 2})
+    assert pool.pending() == 1
+
+
+@pytest.mark.asyncio
+async def test_webhook_checks_secret_and_acks():
+    async def handler(payload):
+        return None
+
+    pool = ChatShardedWorkerPool(handler, shards=1, queue_size=1)
+    app = create_webhook_app(pool, secret="s3cret", path="/tg/webhook")
+    update = {"update_id": 1, "message": {"chat": {"id": 1}}}
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bot") as client:
+        denied = await client.post("/tg/webhook", json=update)
+        accepted = await client.post(
+            "/tg/webhook", json=update, headers={SECRET_HEADER: "s3cret"}
+        )
+        overflow = await client.post(
+            "/tg/webhook", json=update, headers={SECRET_HEADER: "s3cret"}
+        )
+    assert denied.status_code == 401
+    assert accepted.status_code == 200
+    assert overflow.status_code == 503
+    assert pool.pending() == 1
+
+
+@pytest.mark.asyncio
+async def test_webhook_refuses_to_start_without_secret():
+    async def handler(payload):
+        return None
+
+    pool = ChatShardedWorkerPool(handler, shards=1)
+    with pytest.raises(ValueError):
+        create_webhook_app(pool, secret="")
+
+    class Bot:
+        async def set_webhook(self, *args, **kwargs):
+            raise AssertionError("webhook must not be registered without a secret")
+
+    settings = WebhookSettings(mode="webhook", url="https://bot.test", secret="")
+    with pytest.raises(ValueError):
+        await run_webhook(object(), Bot(), settings)
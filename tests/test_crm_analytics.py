@@ -0,0 +1,134 @@
+import pytest
+import sqlalchemy as sa
+
+from backend.models import (
+    Area,
+    CRMBillingType,
+    CRMPipeline,
+    CRMPipelineStage,
+    CRMRevenueTotal,
+    CRMStageRollup,
+    CRMSubscriptionStatus,
+    WebUser,
+)
+from backend.services.crm_analytics import CRMAnalyticsService, monthly_amount
+from backend.services.crm_service import CRMService
+
+
+async def _rollups(session):
+    stages = {
+        row.stage_id: (row.deals_count, float(row.deals_value), row.entered_count, row.exited_count)
+        for row in (await session.execute(sa.select(CRMStageRollup))).scalars()
+    }
+    revenue = {
+        (row.product_id, row.tariff_id): (row.active_count, float(row.mrr))
+        for row in (await session.execute(sa.select(CRMRevenueTotal))).scalars()
+    }
+    return stages, revenue
+
+
+@pytest.mark.asyncio
+async def test_rollups_follow_deals_and_subscriptions(session):
+    crm = CRMService(session)
+    area = Area(name="Sales", title="Sales")
+    user = WebUser(username="buyer", password_hash="", role="single")
+    pipeline = CRMPipeline(slug="sales", title="Sales")
+    session.add_all([area, user, pipeline])
+    await session.flush()
+    lead, won = (
+        CRMPipelineStage(pipeline_id=pipeline.id, slug=slug, title=slug, position=pos)
+        for pos, slug in enumerate(("lead", "won"))
+    )
+    session.add_all([lead, won])
+    await session.flush()
+
+    account = await crm.ensure_account(title="Acme", area_id=area.id, project_id=None)
+    deals = [
+        await crm.create_deal(
+            account_id=account.id,
+            pipeline_id=pipeline.id,
+            stage_id=lead.id,
+            title=f"Deal {n}",
+            area_id=area.id,
+            project_id=None,
+            value=100,
+        )
+        for n in range(3)
+    ]
+    await crm.move_deal_stage(deal=deals[0], stage_id=won.id)
+
+    product = await crm.upsert_crm_product(
+        slug="club", title="Club", area_id=area.id, project_id=None
+    )
+    yearly = await crm.add_product_tariff(
+        product_id=product.id,
+        slug="yearly",
+        title="Yearly",
+        billing_type=CRMBillingType.subscription,
+        amount=1200,
+        metadata={"period_months": 12},
+    )
+    assert monthly_amount(yearly) == 100
+    subscription = await crm.ensure_subscription(
+        web_user_id=user.id,
+        product_id=product.id,
+        version_id=None,
+        tariff_id=yearly.id,
+        area_id=area.id,
+        project_id=None,
+    )
+    stages, revenue = await _rollups(session)
+    assert stages == {lead.id: (2, 200.0, 3, 1), won.id: (1, 100.0, 1, 0)}
+    assert revenue == {(product.id, yearly.id): (1, 100.0)}
+
+    await crm.close_subscription(subscription, status=CRMSubscriptionStatus.cancelled)
+    analytics = CRMAnalyticsService(session)
+    report = await analytics.revenue(product_id=product.id, days=1)
+    assert report["totals"][0]["mrr"] == 0
+    assert report["series"][0]["new_count"] == 1
+    assert report["series"][0]["churned_count"] == 1
+    funnel = await analytics.funnel(pipeline.id)
+    assert [stage["deals_count"] for stage in funnel] == [2, 1]
+    (move,) = await analytics.transitions(pipeline.id)
+    assert (move["from_stage_id"], move["to_stage_id"], move["count"]) == (lead.id, won.id, 1)
+
+    incremental = await _rollups(session)
+    await analytics.rebuild()
+    assert await _rollups(session) == incremental
+
+
+@pytest.mark.asyncio
+async def test_churn_is_removed_from_the_tariff_it_was_recorded_under(session):
+    crm = CRMService(session)
+    area = Area(name="Club", title="Club")
+    user = WebUser(username="switcher", password_hash="", role="single")
+    session.add_all([area, user])
+    await session.flush()
+    product = await crm.upsert_crm_product(slug="gym", title="Gym", area_id=area.id, project_id=None)
+    basic, pro = [
+        await crm.add_product_tariff(
+            product_id=product.id,
+            slug=slug,
+            title=slug,
+            billing_type=CRMBillingType.subscription,
+            amount=amount,
+        )
+        for slug, amount in (("basic", 10), ("pro", 30))
+    ]
+    subscription = await crm.ensure_subscription(
+        web_user_id=user.id,
+        product_id=product.id,
+        version_id=None,
+        tariff_id=basic.id,
+        area_id=area.id,
+        project_id=None,
+    )
+    subscription.tariff_id = pro.id
+    await session.flush()
+
+    await crm.close_subscription(subscription, status=CRMSubscriptionStatus.cancelled)
+    _, revenue = await _rollups(session)
+    assert revenue == {(product.id, basic.id): (0, 0.0)}
+
+    await CRMAnalyticsService(session).rebuild()
+    assert (await _rollups(session))[1] == revenue
@@ -0,0 +1,77 @@
+import io
+
+import pytest
+import sqlalchemy as sa
+
+from backend.models import Area, CRMAccount, WebUser
+from backend.services.crm_import import (
+    CRMImportService,
+    merge_contacts,
+    normalize_record,
+    read_csv,
+    read_jsonl,
+)
+
+
+def test_rows_are_normalized_and_merged():
+    records = list(
+        read_csv(
+            io.StringIO(
+                "Email,Phone,Full_Name,Tags\n"
+                "Ann@Example.com,+7 (900) 000-00-01,Ann,vip;beta\n"
+                ",+7 900 000 00 01,,\n"
+                "bad-email,,,\n"
+            )
+        )
+    )
+    first = normalize_record(records[0])
+    assert (first.email_key, first.phone, first.tags) == ("ann@example.com", "+79000000001", ["vip", "beta"])
+    with pytest.raises(ValueError):
+        normalize_record(records[2])
+    (contact,) = merge_contacts([first, normalize_record(records[1])])
+    assert contact.lines == [2, 3] and contact.full_name == "Ann"
+
+    parsed = list(read_jsonl(io.StringIO('{"email": "a@b.io"}\n\nnot json\n')))
+    assert [(r.line, r.error is None) for r in parsed] == [(1, True), (3, False)]
+
+
+@pytest.mark.asyncio
+async def test_import_resolves_existing_contacts_in_batches(session):
+    area = Area(name="Sales", title="Sales")
+    existing = WebUser(username="old", email="Old@Example.com", password_hash="")
+    session.add_all([area, existing])
+    await session.flush()
+
+    payload = io.StringIO(
+        "email,phone,full_name,account_type\n"
+        "old@example.com,+79000000002,Old Timer,company\n"
+        "new@example.com,,New,\n"
+        ",+79000000003,,\n"
+        "new@example.com,+79000000004,,\n"
+        "broken,,,\n"
+    )
+    importer = CRMImportService(session, batch_size=2)
+    report = await importer.import_stream(payload, "csv", area_id=area.id, project_id=None)
+    assert report.processed == 5
+    assert [(e.line, e.message) for e in report.errors] == [(6, "Некорректный email")]
+    assert (report.contacts_created, report.accounts_created) == (2, 3)
+
+    await session.refresh(existing)
+    assert (existing.phone, existing.full_name) == ("+79000000002", "Old Timer")
+    users = {
+        u.email: u.phone for u in (await session.execute(sa.select(WebUser))).scalars()
+    }
+    assert users["new@example.com"] == "+79000000004"
+    accounts = (
+        await session.execute(sa.select(CRMAccount.web_user_id, CRMAccount.account_type))
+    ).all()
+    assert len(accounts) == 3
+    assert {row.account_type.value for row in accounts if row.web_user_id == existing.id} == {"company"}
+
+    again = await importer.import_stream(
+        io.StringIO('{"email": "NEW@example.com", "source": "fair"}\n'),
+        "jsonl",
+        area_id=area.id,
+        project_id=None,
+    )
+    assert (again.contacts_created, again.accounts_created, again.accounts_updated) == (0, 0, 1)
@@ -0,0 +1,20 @@
+from datetime import UTC, datetime
+
+import pytest
+
+from backend.utils.cursor import decode_cursor, encode_cursor
+
+
+def test_cursor_roundtrip_is_url_safe():
+    stamp = datetime(2026, 1, 2, 3, 4, 5, tzinfo=UTC)
+    token = encode_cursor({"s": "joined", "k": [stamp, 42]})
+    assert all(ch.isalnum() or ch in "-_" for ch in token)
+    payload = decode_cursor(token)
+    assert datetime.fromisoformat(payload["k"][0]) == stamp
+    assert payload["k"][1] == 42
+
+
+@pytest.mark.parametrize("token", ["bogus", "!!!", encode_cursor([1])[:-2] + "@@"])
+def test_cursor_rejects_garbage(token):
+    with pytest.raises(ValueError):
+        decode_cursor(token)
@@ -0,0 +1,57 @@
+import io
+import json
+import zipfile
+from datetime import timedelta
+
+import pytest
+
+from backend.models import Area, Note, TgUser
+from backend.services.data_export import DATASETS, DataExportService, ExportOwner
+from backend.utils import utcnow
+
+
+async def _archive(exporter, owner, since=None):
+    data = b"".join([chunk async for chunk in exporter.iter_archive(owner, since)])
+    return data, zipfile.ZipFile(io.BytesIO(data))
+
+
+def _rows(archive, name):
+    return [json.loads(line) for line in archive.read(f"{name}.ndjson").splitlines()]
+
+
+def test_changed_columns_exist():
+    for dataset in DATASETS:
+        assert dataset.changed is None or dataset.changed in dataset.table.c, dataset.name
+
+
+@pytest.mark.asyncio
+async def test_export_archive_is_deterministic_and_incremental(session):
+    session.add_all([TgUser(telegram_id=501, first_name="A"), TgUser(telegram_id=502, first_name="B")])
+    await session.flush()
+    old = utcnow() - timedelta(days=2)
+    area = Area(owner_id=501, name="Home", title="Home", created_at=old, updated_at=old)
+    session.add_all([area, Area(owner_id=502, name="Other", title="Other")])
+    await session.flush()
+    session.add(Note(owner_id=501, area_id=area.id, title="n", content="hello"))
+    await session.flush()
+
+    owner = ExportOwner(owner_id=501, web_user_id=1)
+    exporter = DataExportService(session)
+    etag = await exporter.fingerprint(owner)
+    data, archive = await _archive(exporter, owner)
+    again, _ = await _archive(exporter, owner)
+    assert data == again and await exporter.fingerprint(owner) == etag
+
+    manifest = json.loads(archive.read("manifest.json"))
+    assert manifest["datasets"]["areas"] == {"rows": 1, "mode": "full"}
+    assert [row["name"] for row in _rows(archive, "areas")] == ["Home"]
+    assert _rows(archive, "notes")[0]["content"] == "hello"
+
+    since = utcnow() - timedelta(days=1)
+    _, partial = await _archive(exporter, owner, since)
+    assert _rows(partial, "areas") == [] and len(_rows(partial, "notes")) == 1
+    assert json.loads(partial.read("manifest.json"))["datasets"]["areas"]["mode"] == "incremental"
+
+    session.add(Note(owner_id=501, area_id=area.id, title="m", content="more"))
+    await session.flush()
+    assert await exporter.fingerprint(owner) != etag
@@ -193,3 +193,45 @@ async def test_diagnostics_workflow(session):
     assert stored is not None
     assert stored.results and stored.results[0].diagnostic_id == 2
     assert stored.results[0].open_answer == "Ready"
+
+
+@pytest.mark.asyncio
+async def test_client_page_summaries(session):
+    service = DiagnosticsService(session)
+
+    async with session.begin():
+        specialist = await service.create_specialist(
+            login="pager@example.com",
+            password="secret123",
+            name="Pager",
+            surname="Coach",
+            available_diagnostics=[0, 2],
+        )
+    base = int(time.time() * 1000)
+    for idx, diagnostics in enumerate(([0], [0, 2], [2])):
+        for offset, diagnostic_id in enumerate(diagnostics):
+            async with session.begin():
+                await service.record_result(
+                    {
+                        "manager_id": specialist.id,
+                        "name": f"Client {idx}",
+                        "email": f"client{idx}@example.com",
+                        "date": base + offset,
+                        "result": {"diagnostic-id": diagnostic_id, "data": {"n": offset}},
+                    }
+                )
+
+    async with session.begin():
+        first, cursor = await service.client_page(specialist, limit=2)
+        assert cursor is not None
+        second, tail = await service.client_page(specialist, limit=2, cursor=cursor)
+    assert tail is None
+    rows = first + second
+    assert [row.full_name for row in rows] == ["Client 2", "Client 1", "Client 0"]
+    middle = rows[1]
+    assert middle.results_count == 2
+    assert middle.latest_diagnostic_id == 2
+    assert middle.latest_title == "Diagnostic 2"
+
+    with pytest.raises(ValueError):
+        await service.client_page(specialist, cursor="garbage")
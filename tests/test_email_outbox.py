@@ -0,0 +1,76 @@
+import logging
+from datetime import timedelta
+
+import pytest
+import sqlalchemy as sa
+
+from backend.models import EmailOutbox
+from backend.services.email_outbox import (
+    EmailOutboxService,
+    OutgoingEmail,
+    SmtpSender,
+    retry_delay,
+)
+from tests.utils.smtp import local_smtp_server
+
+
+def test_sender_delivers_batch_over_one_connection():
+    with local_smtp_server() as server:
+        sender = SmtpSender("127.0.0.1", server.port, sender="noreply@example.com")
+        results = sender.send_batch(
+            [
+                OutgoingEmail(1, "a@example.com", "Magic login link", "link-a"),
+                OutgoingEmail(2, "b@example.com", "Magic login link", "link-b"),
+            ]
+        )
+    assert results == {1: None, 2: None}
+    assert [m["To"] for m in server.messages] == ["a@example.com", "b@example.com"]
+    assert len(server.connections) == 1
+
+
+def test_sender_reports_per_message_errors():
+    with local_smtp_server() as server:
+        server.reject.add("bad@example.com")
+        sender = SmtpSender("127.0.0.1", server.port, sender="noreply@example.com")
+        results = sender.send_batch(
+            [
+                OutgoingEmail(1, "bad@example.com", "s", "b"),
+                OutgoingEmail(2, "ok@example.com", "s", "b"),
+            ]
+        )
+    assert results[1] and results[2] is None
+
+
+def test_retry_backoff_and_failure():
+    assert retry_delay(1) == timedelta(seconds=30)
+    assert retry_delay(3) == timedelta(seconds=120)
+    assert retry_delay(20) == timedelta(hours=1)
+
+    row = EmailOutbox(to_address="a@example.com", subject="s", body="b", attempts=0)
+    EmailOutboxService.apply_result(row, "timeout", max_attempts=2)
+    assert row.attempts == 1 and row.status != "failed"
+    EmailOutboxService.apply_result(row, "timeout", max_attempts=2)
+    assert row.status == "failed"
+
+
+@pytest.mark.asyncio
+async def test_enqueue_dedupes_within_window(session):
+    outbox = EmailOutboxService(session)
+    assert await outbox.enqueue("A@example.com", "s", "one", kind="magic")
+    assert not await outbox.enqueue("a@example.com", "s", "two", kind="magic")
+    assert await outbox.enqueue("a@example.com", "s", "three", kind="restore")
+    rows = (await session.execute(sa.select(EmailOutbox))).scalars().all()
+    assert sorted(r.body for r in rows) == ["one", "three"]
+    claimed = await outbox.claim_due(10)
+    assert len(claimed) == 2
+    # Claimed rows are leased out of the due set until the worker reports back.
+    assert await outbox.claim_due(10) == []
+
+
+def test_unconfigured_sender_logs_redacted_links_at_debug(caplog):
+    sender = SmtpSender(None)
+    body = "Click the link to sign in: https://intdata.pro/auth/magic?token=abc.def"
+    with caplog.at_level(logging.DEBUG, logger="backend.services.email_outbox"):
+        assert sender.send_batch([OutgoingEmail(1, "a@example.com", "s", body)]) == {1: None}
+    assert "abc.def" not in caplog.text and "token=<redacted>" in caplog.text
+    assert all(record.levelno == logging.DEBUG for record in caplog.records)
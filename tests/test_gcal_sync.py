@@ -0,0 +1,118 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import sqlalchemy as sa
+
+from backend.models import CalendarItem, CalendarItemStatus, GCalLink
+from backend.services.sync_gcal import GCalSyncService, SyncTokenExpired, event_row
+from backend.utils import utcnow
+from tests.utils.fake_gcal import BASE_URL, FakeGoogleCalendar
+
+
+def _at(days: int) -> dict:
+    return {"dateTime": (utcnow() + timedelta(days=days)).replace(microsecond=0).isoformat()}
+
+
+def test_event_row_parses_timed_all_day_and_tombstones():
+    row = event_row({"id": "a", "summary": "Meet", "start": {"dateTime": "2026-10-20T09:30:00Z"}})
+    assert row["start_at"] == datetime(2026, 10, 20, 9, 30, tzinfo=timezone.utc)
+    assert row["end_at"] is None
+    day = event_row({"id": "b", "start": {"date": "2026-10-21"}, "end": {"date": "2026-10-22"}})
+    assert day["title"] == "(без названия)"
+    assert day["end_at"] - day["start_at"] == timedelta(days=1)
+    assert event_row({"id": "c", "status": "cancelled"}) is None
+
+
+@pytest.mark.asyncio
+async def test_iter_pages_follows_page_tokens_and_raises_on_410():
+    fake = FakeGoogleCalendar()
+    for i in range(5):
+        fake.put(f"e{i}", f"Event {i}", _at(i))
+    link = GCalLink(id=1, calendar_id="primary", access_token="t")
+    async with fake.client() as client:
+        sync = GCalSyncService(client, api_base=BASE_URL)
+        pages = [page async for page in sync.iter_pages(link, {"maxResults": 2})]
+        assert [len(p["items"]) for p in pages] == [2, 2, 1]
+        assert pages[-1]["nextSyncToken"] == "v5"
+
+        fake.expired.add("v5")
+        with pytest.raises(SyncTokenExpired):
+            async for _ in sync.iter_pages(link, {"syncToken": "v5"}):
+                pass
+
+
+@pytest.mark.asyncio
+async def test_sync_link_upserts_pages_and_handles_tombstones_and_resync(postgres_db, monkeypatch):
+    _, session_factory = postgres_db
+    monkeypatch.setattr("backend.services.sync_gcal.PAGE_SIZE", 2)
+    fake = FakeGoogleCalendar()
+    for i in range(5):
+        fake.put(f"e{i}", f"Event {i}", _at(i))
+    async with session_factory() as session:
+        link = GCalLink(owner_id=7, user_id="1", calendar_id="primary", access_token="t")
+        session.add(link)
+        await session.commit()
+        link_id = link.id
+
+    async def items():
+        async with session_factory() as session:
+            rows = await session.execute(
+                sa.select(CalendarItem.gcal_event_id, CalendarItem.title, CalendarItem.status)
+                .where(CalendarItem.gcal_link_id == link_id)
+                .order_by(CalendarItem.gcal_event_id)
+            )
+            return {row.gcal_event_id: (row.title, row.status) for row in rows}
+
+    async with fake.client() as client:
+        sync = GCalSyncService(client, api_base=BASE_URL, batch_size=1)
+        first = await sync.sync_link(link_id)
+        assert (first.mode, first.pages, first.upserted) == ("full", 3, 5)
+        assert len(await items()) == 5
+
+        fake.put("e1", "Renamed", _at(1))
+        fake.delete("e2")
+        second = await sync.sync_link(link_id)
+        assert (second.mode, second.upserted, second.cancelled) == ("incremental", 1, 1)
+        assert fake.requests[-1]["syncToken"] == "v5"
+        current = await items()
+        assert current["e1"] == ("Renamed", CalendarItemStatus.planned)
+        assert current["e2"][1] == CalendarItemStatus.cancelled
+
+        fake.expired.add("v7")
+        fake.events.pop("e3")
+        third = await sync.sync_link(link_id)
+        assert third.resynced and third.mode == "full"
+        current = await items()
+        assert current["e3"][1] == CalendarItemStatus.cancelled
+        assert current["e4"][1] == CalendarItemStatus.planned
+        assert len(current) == 5
+
+    async with session_factory() as session:
+        stored = await session.get(GCalLink, link_id)
+        assert stored.sync_token == "v7" and stored.last_synced_at is not None
+
+
+@pytest.mark.asyncio
+async def test_resync_after_410_keeps_counts_of_committed_pages(postgres_db, monkeypatch):
+    _, session_factory = postgres_db
+    monkeypatch.setattr("backend.services.sync_gcal.PAGE_SIZE", 2)
+    fake = FakeGoogleCalendar()
+    for i in range(3):
+        fake.put(f"e{i}", f"Event {i}", _at(i))
+    async with session_factory() as session:
+        link = GCalLink(owner_id=8, user_id="2", calendar_id="primary", access_token="t")
+        session.add(link)
+        await session.commit()
+        link_id = link.id
+
+    async with fake.client() as client:
+        sync = GCalSyncService(client, api_base=BASE_URL)
+        await sync.sync_link(link_id)
+        for i in range(3, 6):
+            fake.put(f"e{i}", f"Event {i}", _at(i))
+        fake.expires_midway.add("v3")
+        result = await sync.sync_link(link_id)
+
+    # One incremental page (e3, e4) before the 410, then three full pages.
+    assert (result.mode, result.resynced) == ("full", True)
+    assert (result.pages, result.upserted) == (4, 8)
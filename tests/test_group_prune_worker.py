@@ -0,0 +1,149 @@
+import asyncio
+
+import pytest
+import sqlalchemy as sa
+
+import backend.db as db
+from backend.models import (
+    GroupPruneJob,
+    GroupRemovalLog,
+    GroupType,
+    ProductStatus,
+    UserGroup,
+)
+from backend.services.crm_service import CRMService
+from backend.services.group_prune_jobs import GroupPruneJobService
+from backend.services.group_prune_worker import GroupPruneWorker
+from backend.services.telegram_user_service import TelegramUserService
+
+
+class RetryAfter(Exception):
+    def __init__(self, seconds: float) -> None:
+        super().__init__(f"retry after {seconds}")
+        self.retry_after = seconds
+
+
+class FakeBot:
+    def __init__(self, *, flood_once: set[int] = frozenset(), reject: set[int] = frozenset()):
+        self.flood_once = set(flood_once)
+        self.reject = set(reject)
+        self.banned: list[int] = []
+
+    async def ban_chat_member(self, chat_id, user_id):
+        if user_id in self.flood_once:
+            self.flood_once.discard(user_id)
+            raise RetryAfter(0.01)
+        if user_id in self.reject:
+            raise RuntimeError("can't remove chat owner")
+        self.banned.append(user_id)
+
+    async def unban_chat_member(self, chat_id, user_id):
+        return True
+
+
+def test_kick_retries_flood_control_and_reports_errors():
+    bot = FakeBot(flood_once={2}, reject={3})
+    worker = GroupPruneWorker(bot=bot, rate=1000)
+
+    async def run():
+        return await asyncio.gather(*(worker.kick(-1, uid) for uid in (1, 2, 3)))
+
+    results = asyncio.run(run())
+    assert [r.error for r in results[:2]] == [None, None]
+    assert "owner" in results[2].error
+    assert sorted(bot.banned) == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_prune_job_runs_in_batches(postgres_db):
+    async with db.async_session() as session:  # type: ignore
+        async with session.begin():
+            tsvc = TelegramUserService(session)
+            crm = CRMService(session)
+            group, _ = await tsvc.get_or_create_group(
+                telegram_id=-901, title="Prune", type=GroupType.supergroup
+            )
+            for uid in range(1, 8):
+                await tsvc.add_user_to_group(uid, group.telegram_id)
+            product = await crm.ensure_product(slug="course", title="Курс")
+            await crm.assign_product(user_id=1, product_id=product.id, status=ProductStatus.paid)
+            job, created = await GroupPruneJobService(session).enqueue(
+                group_id=group.telegram_id, product_id=product.id, reason="trial over"
+            )
+            again, created_again = await GroupPruneJobService(session).enqueue(
+                group_id=group.telegram_id, product_id=product.id
+            )
+    assert created and not created_again and again.id == job.id
+    assert job.total == 6
+
+    worker = GroupPruneWorker(bot=FakeBot(reject={4}), batch_size=2, rate=1000)
+    batches = 0
+    while await worker.run_once():
+        batches += 1
+    assert batches == 3
+
+    async with db.async_session() as session:  # type: ignore
+        job = await GroupPruneJobService(session).get(job.id)
+        assert (job.status, job.processed, job.removed, job.failed) == ("done", 6, 5, 1)
+        members = (
+            await session.execute(
+                sa.select(UserGroup.user_id).where(UserGroup.group_id == -901)
+            )
+        ).scalars().all()
+        assert sorted(members) == [1, 4]
+        logs = (
+            await session.execute(
+                sa.select(GroupRemovalLog.result).where(GroupRemovalLog.group_id == -901)
+            )
+        ).scalars().all()
+        assert sorted(logs) == ["failed"] + ["removed"] * 5
+
+
+@pytest.mark.asyncio
+async def test_failing_batches_back_off_then_fail_the_job(postgres_db, monkeypatch):
+    async with db.async_session() as session:  # type: ignore
+        async with session.begin():
+            tsvc = TelegramUserService(session)
+            group, _ = await tsvc.get_or_create_group(
+                telegram_id=-902, title="Broken", type=GroupType.supergroup
+            )
+            await tsvc.add_user_to_group(1, group.telegram_id)
+            product = await CRMService(session).ensure_product(slug="club", title="Клуб")
+            job, _ = await GroupPruneJobService(session).enqueue(
+                group_id=group.telegram_id, product_id=product.id
+            )
+            job_id = job.id
+        session.add(
+            GroupPruneJob(group_id=group.telegram_id, product_id=product.id, status="running")
+        )
+        with pytest.raises(sa.exc.IntegrityError):
+            await session.commit()
+
+    async def broken(self, job, results):
+        raise RuntimeError("db went away")
+
+    monkeypatch.setattr(GroupPruneJobService, "apply_batch", broken)
+    worker = GroupPruneWorker(bot=FakeBot(), rate=1000, max_attempts=2)
+
+    with pytest.raises(RuntimeError):
+        await worker.run_once()
+    async with db.async_session() as session:  # type: ignore
+        stored = await GroupPruneJobService(session).get(job_id)
+        assert (stored.status, stored.attempts) == ("running", 1)
+        assert stored.next_attempt_at is not None and stored.error == "db went away"
+    assert await worker.run_once() == 0  # backing off
+
+    async with db.async_session() as session:  # type: ignore
+        await session.execute(
+            sa.update(GroupPruneJob)
+            .where(GroupPruneJob.id == job_id)
+            .values(next_attempt_at=None)
+        )
+        await session.commit()
+    with pytest.raises(RuntimeError):
+        await worker.run_once()
+    async with db.async_session() as session:  # type: ignore
+        stored = await GroupPruneJobService(session).get(job_id)
+        assert (stored.status, stored.attempts) == ("failed", 2)
+        assert stored.finished_at is not None
+    assert await worker.run_once() == 0
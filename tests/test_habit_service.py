@@ -5,6 +5,7 @@ from datetime import date
 
 from backend.services.habits import (
     DailiesService,
+    DailyScheduleService,
     HabitsCronService,
     HabitsService,
     dailies,
@@ -194,6 +195,24 @@ async def test_cron_idempotence(session_factory):
         assert ran2 is False
 
 
+@pytest.mark.asyncio
+async def test_cron_extends_horizon_once_per_day(session_factory, monkeypatch):
+    extended = []
+
+    async def fake_extend(self, today=None):
+        extended.append(today)
+        return 0
+
+    monkeypatch.setattr(DailyScheduleService, "extend", fake_extend)
+    async with HabitsCronService() as cron:
+        owner_web = await ensure_web_user(cron.session, user_id=4, username="cron-all", role="single", password_hash="x")
+        await cron.stats.get_or_create(owner_web.id)
+        assert await cron.run_all(today=date(2025, 1, 1)) >= 1
+        assert await cron.run_all(today=date(2025, 1, 1)) == 0
+        assert await cron.run_all(today=date(2025, 1, 2)) >= 1
+    assert extended == [date(2025, 1, 1), date(2025, 1, 2)]
+
+
 @pytest.mark.asyncio
 async def test_list_habits_preloads_area_project(postgres_db):
     engine, async_session = postgres_db
@@ -0,0 +1,90 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from backend import health
+from backend.health import HealthMonitor, LoopLagProbe
+
+
+@pytest.mark.asyncio
+async def test_snapshot_is_cached_between_probe_runs():
+    calls = []
+
+    async def db_probe():
+        calls.append(1)
+        return {"ok": True}
+
+    monitor = HealthMonitor()
+    monitor.register("db", db_probe, interval=60)
+    await monitor.refresh()
+    ok, body = monitor.snapshot()
+    assert ok
+    assert monitor.snapshot()[1] is body
+    data = json.loads(body)
+    assert data["db"]["ok"] and data["version"]
+    assert calls == [1]
+
+
+@pytest.mark.asyncio
+async def test_critical_failure_and_timeout_fail_readiness():
+    async def broken():
+        raise RuntimeError("down")
+
+    async def slow():
+        await asyncio.sleep(1)
+        return {}
+
+    async def fine():
+        return {"ok": False}
+
+    monitor = HealthMonitor()
+    monitor.register("queue", fine, interval=60, critical=False)
+    await monitor.refresh()
+    assert monitor.snapshot()[0]  # non-critical probes only report
+
+    monitor.register("db", broken, interval=60)
+    monitor.register("loop", slow, interval=60, timeout=0.05)
+    await monitor.refresh()
+    ok, body = monitor.snapshot()
+    data = json.loads(body)
+    assert not ok
+    assert data["db"]["error"] == "RuntimeError"
+    assert data["loop"]["error"] == "timeout"
+
+
+@pytest.mark.asyncio
+async def test_stale_probe_marks_snapshot_unready(monkeypatch):
+    async def probe():
+        return {}
+
+    monitor = HealthMonitor()
+    monitor.register("db", probe, interval=1, timeout=1)
+    await monitor.refresh()
+    assert monitor.snapshot()[0]
+    now = health.time.monotonic()
+    monkeypatch.setattr(health.time, "monotonic", lambda: now + 10)
+    ok, body = monitor.snapshot()
+    assert not ok and json.loads(body)["db"]["stale"]
+
+
+def _block_loop(seconds: float) -> None:
+    time.sleep(seconds)
+
+
+@pytest.mark.asyncio
+async def test_loop_lag_probe_detects_blocking():
+    probe = LoopLagProbe(sample=0.01, max_lag=0.05)
+    task = asyncio.create_task(probe())
+    await asyncio.sleep(0)
+    _block_loop(0.1)  # a synchronous call that holds the loop
+    result = await task
+    assert not result["ok"] and result["lag"] >= 0.05
+
+
+@pytest.mark.asyncio
+async def test_workers_probe_reads_heartbeats(postgres_db):
+    await health.Heartbeat("probe_test", 60.0).beat()
+    result = await health.probe_workers()
+    assert result["ok"] and result["workers"]["probe_test"]["age"] < 60
@@ -0,0 +1,29 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+APPS = Path(__file__).resolve().parents[1] / "apps"
+
+HEAVY = ("aiogram", "opentelemetry", "google")
+
+
+def test_web_import_skips_bot_and_tracing_packages():
+    code = (
+        "import json, sys; import web; "
+        f"print(json.dumps(sorted({{m.split('.')[0] for m in sys.modules}} & set({HEAVY!r}))))"
+    )
+    env = {**os.environ, "OTEL_ENABLED": "0", "PYTHONPATH": str(APPS)}
+    proc = subprocess.run(
+        [sys.executable, "-c", code], cwd=APPS, env=env, capture_output=True, text=True
+    )
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    assert json.loads(proc.stdout.strip().splitlines()[-1]) == []
+
+
+def test_logger_middleware_is_still_exported():
+    from backend import logger
+    from backend.logger_middleware import LoggerMiddleware
+
+    assert logger.LoggerMiddleware is LoggerMiddleware
@@ -0,0 +1,77 @@
+import pytest
+import sqlalchemy as sa
+
+from backend.models import Area, Link, LinkType, Project, TgUser
+from backend.services.link_graph import LinkGraphService, parse_wikilinks
+from backend.services.note_service import NoteService
+
+
+def test_parse_wikilinks_splits_titles_and_typed_refs():
+    refs, titles = parse_wikilinks("see [[Plan]], [[project:12|launch]] and [[ Ideas ]] [[]]")
+    assert refs == [("project", 12)]
+    assert titles == ["Plan", "Ideas"]
+
+
+@pytest.mark.asyncio
+async def test_wikilinks_sync_and_neighbourhood(session):
+    session.add_all([TgUser(telegram_id=601, first_name="A"), TgUser(telegram_id=602, first_name="B")])
+    await session.flush()
+    mine, theirs = Area(owner_id=601, name="Mine"), Area(owner_id=602, name="Theirs")
+    session.add_all([mine, theirs])
+    await session.flush()
+    project, foreign_project = Project(owner_id=601, area_id=mine.id, name="Launch"), Project(
+        owner_id=602, area_id=theirs.id, name="Secret"
+    )
+    session.add_all([project, foreign_project])
+    await session.flush()
+    LinkGraphService.invalidate_cache()
+    notes = NoteService(session)
+    leaf = await notes.create_note(601, "leaf", area_id=mine.id, title="Leaf")
+    foreign = await notes.create_note(602, "theirs", area_id=theirs.id, title="Hub")
+    hub = await notes.create_note(601, "to [[Leaf]]", area_id=mine.id, title="Hub")
+    root = await notes.create_note(
+        601,
+        f"to [[hub]], [[project:{project.id}]], [[project:{foreign_project.id}]], "
+        "[[project:999999]] and [[deal:1]]",
+        area_id=mine.id,
+        title="Root",
+    )
+    await session.commit()
+
+    graph = LinkGraphService(session)
+    nodes = await graph.neighbourhood("note", root.id, owner_id=601, depth=2)
+    assert [(n.node_type, n.node_id, n.depth) for n in nodes] == [
+        ("note", hub.id, 1),
+        ("project", project.id, 1),
+        ("note", leaf.id, 2),
+    ]
+    assert nodes[0].title == "Hub"
+    assert all(n.node_id != foreign.id for n in nodes)
+    assert [n.node_id for n in await graph.neighbourhood("note", root.id, owner_id=601, depth=1)] == [
+        hub.id,
+        project.id,
+    ]
+
+    await notes.update_note(root.id, content="only [[Leaf]] and [[Leaf]]")
+    edges = (
+        await session.execute(
+            sa.select(Link.target_id).where(
+                Link.source_type == "note",
+                Link.source_id == root.id,
+                Link.link_type == LinkType.reference,
+            )
+        )
+    ).scalars().all()
+    assert edges == [leaf.id]
+    # Uncommitted edits are neither served from nor written to the cache.
+    nodes = await graph.neighbourhood("note", root.id, owner_id=601, depth=2)
+    assert {(n.node_id, n.depth) for n in nodes} == {(leaf.id, 1), (hub.id, 2)}
+    root_id, hub_id, leaf_id, project_id = root.id, hub.id, leaf.id, project.id
+    await session.rollback()
+    nodes = await graph.neighbourhood("note", root_id, owner_id=601, depth=1)
+    assert [n.node_id for n in nodes] == [hub_id, project_id]
+
+    await notes.update_note(root_id, content="only [[Leaf]]")
+    await session.commit()
+    nodes = await graph.neighbourhood("note", root_id, owner_id=601, depth=1)
+    assert [n.node_id for n in nodes] == [leaf_id]
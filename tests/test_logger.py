@@ -4,7 +4,8 @@ from unittest.mock import AsyncMock, MagicMock
 import pytest
 from aiogram.types import CallbackQuery, Chat, Message, Update
 
-from backend.logger import LoggerMiddleware, LogLevel, escape_markdown_v2
+from backend.logger import LoggerMiddleware, escape_markdown_v2
+from backend.models import LogLevel
 
 
 def test_escape_markdown_v2():
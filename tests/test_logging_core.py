@@ -0,0 +1,64 @@
+import json
+import logging
+import queue
+
+from backend.logging import (
+    ContextQueueHandler,
+    JsonFormatter,
+    SamplingFilter,
+    request_id_var,
+    scrub,
+)
+
+
+def _record(name="web", level=logging.INFO, msg="request", args=(), extra=None):
+    record = logging.LogRecord(name, level, __file__, 1, msg, args, None)
+    if extra is not None:
+        record.extra = extra
+    return record
+
+
+def test_scrub_masks_pii_and_keeps_plain_text():
+    assert scrub("mail alice@example.com now") == "mail [scrubbed] now"
+    assert scrub("call +7 999 123-45-67") == "call [scrubbed]"
+    plain = "nothing to hide"
+    assert scrub(plain) is plain
+
+
+def test_formatter_evaluates_lazy_extras():
+    calls = []
+
+    def expensive():
+        calls.append(1)
+        return "bob@example.com"
+
+    record = _record(extra={"who": expensive, "status": 200})
+    data = json.loads(JsonFormatter().format(record))
+    assert data["who"] == "[scrubbed]"
+    assert data["status"] == 200
+    assert calls == [1]
+
+
+def test_queue_handler_merges_args_in_caller_and_captures_context():
+    q: queue.Queue = queue.Queue()
+    handler = ContextQueueHandler(q)
+    state = ["alice@example.com"]
+    token = request_id_var.set("req-1")
+    try:
+        handler.handle(_record(msg="user %s", args=(state,)))
+    finally:
+        request_id_var.reset(token)
+    state[0] = "changed later"
+    queued = q.get_nowait()
+    # Arguments are merged in the calling thread; scrubbing waits for the listener.
+    assert queued.args is None and queued.msg == "user ['alice@example.com']"
+    data = json.loads(JsonFormatter().format(queued))
+    assert data["request_id"] == "req-1"
+    assert data["message"] == "user ['[scrubbed]']"
+
+
+def test_sampling_filter_never_drops_warnings():
+    sampler = SamplingFilter.parse("web=0")
+    assert not sampler.filter(_record())
+    assert sampler.filter(_record(level=logging.WARNING))
+    assert sampler.filter(_record(name="other"))
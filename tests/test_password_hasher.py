@@ -0,0 +1,45 @@
+import asyncio
+import threading
+
+import pytest
+
+from backend.db.passwords import BcryptHasher, PasswordHasherBusy, hash_rounds
+
+
+@pytest.mark.asyncio
+async def test_pooled_hash_and_verify():
+    hasher = BcryptHasher(rounds=4, workers=2)
+    try:
+        hashed = await hasher.hash("secret")
+        assert hash_rounds(hashed) == 4
+        assert await hasher.verify(hashed, "secret")
+        assert not await hasher.verify(hashed, "wrong")
+        assert hasher.pending == 0
+    finally:
+        hasher.shutdown()
+
+
+def test_needs_rehash_when_cost_changes():
+    old = BcryptHasher(rounds=4).generate_password_hash("secret")
+    assert not BcryptHasher(rounds=4).needs_rehash(old)
+    assert BcryptHasher(rounds=5).needs_rehash(old)
+    assert not BcryptHasher(rounds=5).needs_rehash(None)
+
+
+@pytest.mark.asyncio
+async def test_pool_rejects_when_saturated_and_times_out_queue():
+    hasher = BcryptHasher(rounds=4, workers=1, max_queue=1, queue_timeout=0.05)
+    gate = threading.Event()
+    try:
+        running = asyncio.ensure_future(hasher.run_in_pool("hash", gate.wait, 5))
+        queued = asyncio.ensure_future(hasher.run_in_pool("hash", lambda: "late"))
+        await asyncio.sleep(0.1)
+        with pytest.raises(PasswordHasherBusy):
+            await hasher.run_in_pool("hash", lambda: "overflow")
+        gate.set()
+        assert await running is True
+        with pytest.raises(PasswordHasherBusy):
+            await queued
+    finally:
+        gate.set()
+        hasher.shutdown()
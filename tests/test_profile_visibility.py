@@ -1,7 +1,9 @@
 import pytest
-from sqlalchemy import select
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
 
-from backend.models import WebUser, EntityProfile, EntityProfileGrant
+from backend import models
+from backend.models import WebUser, EntityProfile, EntityProfileGrant, EntityProfileVisibility
 from backend.services.profile_service import ProfileService
 
 
@@ -86,3 +88,24 @@ async def test_owner_profile_bootstrap(session):
             slug=access.profile.slug,
             viewer=stranger_ref,
         )
+
+
+@pytest.mark.asyncio
+async def test_plain_orm_writes_refresh_visibility(session):
+    assert event.contains(Session, "after_flush", models._refresh_profile_visibility)
+
+    owner = WebUser(username="plain", password_hash="x", role="single")
+    session.add(owner)
+    await session.flush()
+    profile = EntityProfile(entity_type="user", entity_id=owner.id, slug="plain", display_name="Plain")
+    session.add(profile)
+    await session.flush()
+    session.add(EntityProfileGrant(profile_id=profile.id, audience_type="public"))
+    await session.commit()
+
+    rows = await session.execute(
+        select(EntityProfileVisibility.audience_type, EntityProfileVisibility.subject_id).where(
+            EntityProfileVisibility.profile_id == profile.id
+        )
+    )
+    assert rows.all() == [("public", 0)]
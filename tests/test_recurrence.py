@@ -0,0 +1,87 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from dateutil.rrule import rrulestr
+
+from backend.models import Area
+from backend.services.habits import DailiesService, DailyScheduleService
+from backend.services.recurrence import compile_rule, expand_many
+from tests.utils.seeds import ensure_tg_user, ensure_web_user
+
+
+def test_compile_rule_is_cached_and_validates():
+    assert compile_rule("RRULE:FREQ=WEEKLY;BYDAY=MO,FR") is compile_rule("RRULE:FREQ=WEEKLY;BYDAY=MO,FR")
+    for bad in ("", "FREQ=HOURLY", "FREQ=DAILY;BYSETPOS=1", "FREQ=WEEKLY;BYDAY=1MO", "FREQ=DAILY;INTERVAL=0"):
+        with pytest.raises(ValueError):
+            compile_rule(bad)
+
+
+def test_occurrences_follow_rfc5545_date_rules():
+    start = date(2025, 1, 1)
+    assert compile_rule("FREQ=DAILY;INTERVAL=3;COUNT=3").occurrences(start, start, date(2025, 2, 1)) == [
+        date(2025, 1, 1),
+        date(2025, 1, 4),
+        date(2025, 1, 7),
+    ]
+    assert compile_rule("FREQ=MONTHLY;BYDAY=-1FR").occurrences(start, start, date(2025, 3, 31)) == [
+        date(2025, 1, 31),
+        date(2025, 2, 28),
+        date(2025, 3, 28),
+    ]
+    assert compile_rule("FREQ=MONTHLY").occurrences(date(2025, 1, 31), start, date(2025, 4, 30)) == [
+        date(2025, 1, 31),
+        date(2025, 3, 31),
+    ]
+    weekly = compile_rule("FREQ=WEEKLY;INTERVAL=2;UNTIL=20250201")
+    assert weekly.occurrences(date(2025, 1, 6), date(2025, 1, 10), date(2025, 12, 31)) == [
+        date(2025, 1, 20)
+    ]
+
+
+@pytest.mark.parametrize(
+    "rule",
+    [
+        "FREQ=MONTHLY;BYDAY=1FR,2TH,1TU;BYMONTHDAY=15,-1",
+        "FREQ=YEARLY;BYMONTH=3,9;BYDAY=-1MO,2WE;BYMONTHDAY=1,8,9,10,31",
+        "FREQ=WEEKLY;INTERVAL=2;BYMONTHDAY=1,15",
+        "FREQ=DAILY;BYMONTH=2;BYMONTHDAY=30",
+    ],
+)
+def test_occurrences_agree_with_dateutil(rule):
+    reference = rrulestr(f"{rule};UNTIL=20271231", dtstart=datetime(2025, 11, 5))
+    expected = [d.date() for d in reference if d >= datetime(2026, 1, 1)]
+    assert compile_rule(rule).occurrences(date(2025, 11, 5), date(2026, 1, 1), date(2027, 12, 31)) == expected
+
+
+def test_expand_many_matches_per_item_expansion():
+    rules = ["FREQ=DAILY;INTERVAL=2", "FREQ=WEEKLY", "FREQ=MONTHLY;BYMONTHDAY=-1", "FREQ=DAILY;COUNT=5"]
+    items = [(i, rules[i % 4], date(2025, 1, 1) + timedelta(days=i)) for i in range(40)]
+    window = (date(2025, 1, 20), date(2025, 3, 31))
+    expanded = expand_many(items, *window)
+    for key, rule, dtstart in items:
+        assert expanded[key] == compile_rule(rule).occurrences(dtstart, *window)
+
+
+@pytest.mark.asyncio
+async def test_daily_occurrences_follow_rule_edits(session):
+    await ensure_tg_user(session, 701, first_name="D")
+    await ensure_web_user(session, user_id=701, username="dailies", password_hash="x", role="single")
+    area = Area(owner_id=701, name="Habits", title="Habits")
+    session.add(area)
+    await session.flush()
+
+    svc = DailiesService(session)
+    did = await svc.create_daily(
+        owner_id=701, title="Run", rrule="FREQ=DAILY;INTERVAL=2", difficulty="easy", area_id=area.id
+    )
+    schedule = DailyScheduleService(session)
+    today = date.today()
+    assert await schedule.due_on(701, today) == [did]
+    assert await schedule.due_on(701, today + timedelta(days=1)) == []
+    window = await schedule.window(701, today, today + timedelta(days=6))
+    assert sorted(window) == [today + timedelta(days=d) for d in (0, 2, 4, 6)]
+
+    assert await svc.update_daily(did, owner_id=701, rrule="FREQ=DAILY") is True
+    assert await schedule.due_on(701, today + timedelta(days=1)) == [did]
+    with pytest.raises(ValueError):
+        await svc.update_daily(did, owner_id=701, rrule="FREQ=SOMETIMES")
@@ -1,4 +1,5 @@
 import sqlalchemy as sa
+
 from backend.db import repair
 
 
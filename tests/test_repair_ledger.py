@@ -0,0 +1,51 @@
+import sqlalchemy as sa
+
+from backend.db import repair
+
+
+def _schema(conn):
+    conn.execute(sa.text("CREATE TABLE areas (id INTEGER PRIMARY KEY, owner_id INTEGER, title TEXT)"))
+    conn.execute(sa.text("CREATE TABLE projects (id INTEGER PRIMARY KEY, owner_id INTEGER, area_id INTEGER)"))
+    conn.execute(sa.text("CREATE TABLE tasks (id INTEGER PRIMARY KEY, owner_id INTEGER, project_id INTEGER, area_id INTEGER)"))
+    conn.execute(
+        sa.text(
+            "CREATE TABLE time_entries (id INTEGER PRIMARY KEY, owner_id INTEGER, task_id INTEGER, "
+            "project_id INTEGER, area_id INTEGER)"
+        )
+    )
+    conn.execute(sa.text("INSERT INTO areas VALUES (1, 1, 'A'), (2, 1, :t)"), {"t": repair.DEFAULT_AREA_TITLE})
+    conn.execute(sa.text("INSERT INTO projects VALUES (1, 1, 1)"))
+    conn.execute(sa.text("INSERT INTO tasks VALUES (1, 1, 1, 1)"))
+    conn.execute(
+        sa.text(
+            "INSERT INTO time_entries (id, owner_id, task_id) "
+            "SELECT gs, 1, CASE WHEN gs % 2 = 0 THEN 1 END FROM generate_series(1, 25) AS gs"
+        )
+    )
+
+
+def test_time_entries_backfill_is_chunked(postgres_sync_engine):
+    progress = []
+    with postgres_sync_engine.begin() as conn:
+        _schema(conn)
+        ctx = repair.RepairContext(chunk_size=10, progress=lambda *a: progress.append(a))
+        stats = repair.backfill_time_entries(conn, ctx)
+        assert stats == {"updated": 12, "default_area": 13}
+        assert progress == [("time_entries", 10, 25), ("time_entries", 20, 25), ("time_entries", 25, 25)]
+        rows = conn.execute(
+            sa.text("SELECT DISTINCT task_id, project_id, area_id FROM time_entries ORDER BY 1")
+        ).fetchall()
+        assert rows == [(1, 1, 1), (None, None, 2)]
+
+
+def test_completed_steps_are_skipped(postgres_sync_engine):
+    with postgres_sync_engine.connect() as conn:
+        _schema(conn)
+        conn.commit()
+        first = repair.run_repair(conn)
+        assert first["time_entries_updated"] == 12
+        state = repair.ledger_state(conn)
+        assert state["time_entries"]["status"] == "done"
+        assert repair.run_repair(conn) == {}
+        forced = repair.run_repair(conn, steps=["time_entries"], force=True)
+        assert forced == {"time_entries_updated": 0, "time_entries_default_area": 0}
@@ -8,7 +8,7 @@ from aiogram.types import (
 )
 
 from backend.base import Base
-from backend.services.telegram_user_service import TelegramUserService
+from backend.services.telegram_user_service import RosterMember, TelegramUserService
 from backend.services.web_user_service import WebUserService
 from backend.services.profile_service import ProfileService
 from backend.services.crm_service import CRMService
@@ -118,6 +118,46 @@ async def test_profile_service_user_default_visibility(session):
         await service.get_profile(entity_type="user", slug="alice", viewer=None)
 
 
+@pytest.mark.asyncio
+async def test_profile_catalog_paginates_visible_profiles(session):
+    viewer = WebUser(username="reader", password_hash="x", role="single")
+    session.add(viewer)
+    await session.flush()
+    service = ProfileService(session)
+    # Private profiles sort first: filtering after OFFSET/LIMIT left pages empty.
+    for idx in range(4):
+        await service.ensure_profile(
+            entity_type="user", entity_id=1000 + idx, slug=f"a-private-{idx}",
+            display_name=f"A private {idx}",
+        )
+    visible = []
+    for idx in range(3):
+        profile = await service.ensure_profile(
+            entity_type="user", entity_id=2000 + idx, slug=f"b-open-{idx}",
+            display_name=f"B open {idx}", defaults={"summary": "Trigram needle"},
+        )
+        await service.apply_visibility(profile, "authenticated")
+        visible.append(profile.slug)
+    restricted = await service.ensure_profile(
+        entity_type="user", entity_id=3000, slug="c-restricted", display_name="C restricted",
+    )
+    await service.replace_grants(
+        restricted,
+        [{"audience_type": "user", "subject_id": viewer.id, "sections": ["missing"]}],
+    )
+
+    first = await service.list_catalog(entity_type="user", viewer=viewer, limit=2)
+    second = await service.list_catalog(entity_type="user", viewer=viewer, limit=2, offset=2)
+    assert [item.profile.slug for item in first + second] == visible
+    found = await service.list_catalog(entity_type="user", viewer=viewer, search="NEEDLE")
+    assert len(found) == 3
+    assert await service.list_catalog(entity_type="user", viewer=None) == []
+
+    await service.apply_visibility(restricted, "public")
+    anonymous = await service.list_catalog(entity_type="user", viewer=None)
+    assert [item.profile.slug for item in anonymous] == ["c-restricted"]
+
+
 @pytest.mark.asyncio
 async def test_update_profile_and_lookup(session):
     wsvc = WebUserService(session)
@@ -273,3 +313,39 @@ async def test_sync_group_members_from_bot(session):
     assert links[42].is_owner is True
     assert links[52].is_moderator is True and links[52].is_owner is False
     assert links[99].is_moderator is False
+
+
+@pytest.mark.asyncio
+async def test_upsert_roster_counts_inserts_and_updates(session):
+    tsvc = TelegramUserService(session)
+    group, _ = await tsvc.get_or_create_group(
+        telegram_id=-7002, title="Bulk", type=GroupType.supergroup
+    )
+    roster = [RosterMember(telegram_id=1000 + i, first_name=f"U{i}") for i in range(5)]
+
+    first = await tsvc.upsert_roster(group.telegram_id, roster)
+    assert (first.users_inserted, first.users_updated) == (5, 0)
+    assert (first.links_inserted, first.links_updated) == (5, 0)
+    assert group.participants_count == 5
+
+    again = await tsvc.upsert_roster(group.telegram_id, roster)
+    assert (again.users_inserted, again.users_updated) == (0, 0)
+    assert (again.links_inserted, again.links_updated) == (0, 0)
+
+    changed = [
+        RosterMember(telegram_id=1000, first_name=None, is_owner=True),
+        RosterMember(telegram_id=1001, first_name="Renamed"),
+        RosterMember(telegram_id=1005, first_name="New"),
+    ]
+    result = await tsvc.upsert_roster(group.telegram_id, changed)
+    assert (result.users_inserted, result.users_updated) == (1, 1)
+    assert (result.links_inserted, result.links_updated) == (1, 1)
+    assert group.participants_count == 6
+
+    data = await tsvc.list_groups_with_members()
+    entry = next(item for item in data if item["group"].telegram_id == -7002)
+    names = {m.telegram_id: m.first_name for m in entry["members"]}
+    assert names[1000] == "U0" and names[1001] == "Renamed" and len(names) == 6
+    link = await session.get(UserGroup, (1000, -7002))
+    await session.refresh(link)
+    assert link.is_owner is True and link.is_moderator is True
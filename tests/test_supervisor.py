@@ -0,0 +1,43 @@
+import os
+import time
+
+from orchestrator.supervisor import (
+    ChildSpec,
+    Supervisor,
+    SupervisorSettings,
+    backoff_delay,
+    make_listen_socket,
+)
+
+
+def test_backoff_grows_and_is_capped():
+    assert backoff_delay(0, 1.0, 30.0) == 0.0
+    assert [backoff_delay(n, 1.0, 30.0) for n in (1, 2, 3)] == [1.0, 2.0, 4.0]
+    assert backoff_delay(10, 1.0, 30.0) == 30.0
+
+
+def test_crashing_child_is_restarted_with_backoff():
+    settings = SupervisorSettings(backoff_base=0.05, backoff_max=0.2, graceful_timeout=5)
+    sup = Supervisor(settings, specs=[ChildSpec("crash", os._exit, (3,))])
+    sup.start()
+    try:
+        deadline = time.monotonic() + 20
+        child = sup.children[0]
+        while child.restarts < 2 and time.monotonic() < deadline:
+            sup.poll()
+            time.sleep(0.02)
+    finally:
+        sup.stop()
+    assert child.restarts >= 2
+    assert child.failures >= 2
+    assert not child.process.is_alive()
+
+
+def test_reuseport_sockets_share_a_port():
+    first = make_listen_socket("127.0.0.1", 0, reuse_port=True)
+    try:
+        port = first.getsockname()[1]
+        second = make_listen_socket("127.0.0.1", port, reuse_port=True)
+        second.close()
+    finally:
+        first.close()
@@ -0,0 +1,83 @@
+"""In-process stand-in for the Google Calendar ``events.list`` and token APIs.
+
+Mount it with ``httpx.ASGITransport`` and point ``GCalSyncService`` at
+``http://gcal.test``.  Sync tokens are ``v<version>``; a token listed in
+``expired`` is answered with 410 like Google does, one listed in
+``expires_midway`` only once its first page has been served.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+import httpx
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+BASE_URL = "http://gcal.test"
+
+
+class FakeGoogleCalendar:
+    def __init__(self) -> None:
+        self.version = 0
+        self.events: Dict[str, Dict[str, Any]] = {}
+        self.changed: Dict[str, int] = {}
+        self.expired: set[str] = set()
+        self.expires_midway: set[str] = set()
+        self.requests: List[Dict[str, str]] = []
+        self.app = Starlette(
+            routes=[
+                Route("/calendars/{calendar_id}/events", self.list_events),
+                Route("/token", self.token, methods=["POST"]),
+            ]
+        )
+
+    def client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=httpx.ASGITransport(app=self.app), base_url=BASE_URL)
+
+    def put(self, event_id: str, summary: str, start: Dict[str, str], **extra: Any) -> None:
+        self.version += 1
+        self.events[event_id] = {
+            "id": event_id,
+            "status": "confirmed",
+            "summary": summary,
+            "start": start,
+            "end": start,
+            **extra,
+        }
+        self.changed[event_id] = self.version
+
+    def delete(self, event_id: str) -> None:
+        self.version += 1
+        self.events[event_id] = {"id": event_id, "status": "cancelled"}
+        self.changed[event_id] = self.version
+
+    async def token(self, request: Request) -> JSONResponse:
+        return JSONResponse({"access_token": "fresh", "expires_in": 3600})
+
+    async def list_events(self, request: Request) -> JSONResponse:
+        params = dict(request.query_params)
+        self.requests.append(params)
+        sync_token = params.get("syncToken")
+        if sync_token:
+            if sync_token in self.expired or (
+                sync_token in self.expires_midway and params.get("pageToken")
+            ):
+                return JSONResponse({"error": {"code": 410}}, status_code=410)
+            since = int(sync_token[1:])
+            ids = [i for i, v in self.changed.items() if v > since]
+        else:
+            ids = list(self.events)
+            if params.get("showDeleted") != "true":
+                ids = [i for i in ids if self.events[i]["status"] != "cancelled"]
+        ids.sort(key=self.changed.__getitem__)
+        offset = int(params.get("pageToken") or 0)
+        size = int(params.get("maxResults") or 250)
+        body: Dict[str, Any] = {"items": [self.events[i] for i in ids[offset : offset + size]]}
+        if offset + size < len(ids):
+            body["nextPageToken"] = str(offset + size)
+        else:
+            body["nextSyncToken"] = f"v{self.version}"
+        return JSONResponse(body)
@@ -0,0 +1,85 @@
+"""Minimal in-process SMTP server used as a stand-in for tests."""
+
+from __future__ import annotations
+
+import socketserver
+import threading
+from contextlib import contextmanager
+from email import message_from_bytes
+from email.message import Message
+from typing import Iterator
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def _reply(self, line: str) -> None:
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self) -> None:
+        server: "LocalSMTPServer" = self.server  # type: ignore[assignment]
+        self._reply("220 localhost test SMTP")
+        rcpt: list[str] = []
+        while True:
+            raw = self.rfile.readline()
+            if not raw:
+                return
+            cmd = raw.decode(errors="replace").strip()
+            verb = cmd.split(" ", 1)[0].upper()
+            if verb in {"EHLO", "HELO"}:
+                self._reply("250 localhost")
+            elif verb == "MAIL":
+                rcpt = []
+                self._reply("250 OK")
+            elif verb == "RCPT":
+                address = cmd.split(":", 1)[1].strip().strip("<>")
+                if address in server.reject:
+                    self._reply("550 mailbox unavailable")
+                else:
+                    rcpt.append(address)
+                    self._reply("250 OK")
+            elif verb == "DATA":
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                lines: list[bytes] = []
+                while True:
+                    line = self.rfile.readline()
+                    if line in {b".\r\n", b".\n", b""}:
+                        break
+                    if line.startswith(b".."):
+                        line = line[1:]
+                    lines.append(line)
+                server.messages.append(message_from_bytes(b"".join(lines)))
+                server.connections.add(self.client_address)
+                self._reply("250 queued")
+            elif verb in {"RSET", "NOOP"}:
+                self._reply("250 OK")
+            elif verb == "QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("502 not implemented")
+
+
+class LocalSMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.messages: list[Message] = []
+        self.connections: set[tuple[str, int]] = set()
+        self.reject: set[str] = set()
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+
+@contextmanager
+def local_smtp_server() -> Iterator[LocalSMTPServer]:
+    server = LocalSMTPServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -19,6 +19,7 @@ def test_authlog_uses_utcnow(tmp_path, monkeypatch):
     )
     user = SimpleNamespace(id=1, username="alice")
     authlog.log_event(request, "test", user=user)
+    assert authlog.sink.flush()
 
     data = json.loads(log_file.read_text().strip())
 
@@ -28,3 +29,27 @@ def test_authlog_uses_utcnow(tmp_path, monkeypatch):
     ts = datetime.fromisoformat(data["ts"].rstrip("Z"))
     assert ts.tzinfo is None
     assert abs((utcnow() - ts).total_seconds()) < 5
+
+
+def test_auth_sink_drops_when_full_and_rotates(tmp_path):
+    from web.security.authlog import AuthEventSink
+
+    log_file = tmp_path / "auth.log"
+    sink = AuthEventSink(log_file, max_queue=2, max_bytes=200, backups=2)
+    # writer thread is not started yet: third record overflows the queue
+    sink._ensure_started = lambda: None
+    assert sink.emit({"event": "a"})
+    assert sink.emit({"event": "b"})
+    assert not sink.emit({"event": "c"})
+    assert sink.dropped == 1
+
+    sink = AuthEventSink(log_file, batch_size=1, max_bytes=200, backups=2)
+    for i in range(40):
+        sink.emit({"event": "login_fail", "identifier": f"user{i}"})
+    assert sink.flush()
+    sink.close()
+    assert sink.written == 40
+    rotated = sorted(tmp_path.glob("auth.log.*.gz"))
+    assert 0 < len(rotated) <= 2
+    # rotation happens before a batch is written, so one batch may overshoot
+    assert log_file.stat().st_size < 200 + 60
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import gzip
+import json
+import zlib
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from web.middleware_compression import CompressionMiddleware
+
+ROWS = [{"id": i, "title": f"task {i}"} for i in range(200)]
+
+
+def make_client() -> TestClient:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=500)
+
+    @app.get("/big")
+    async def big():
+        return JSONResponse(ROWS, headers={"ETag": '"abc"'})
+
+    @app.get("/small")
+    async def small():
+        return {"ok": True}
+
+    @app.get("/text-stream")
+    async def text_stream():
+        async def chunks():
+            for i in range(50):
+                yield f"line {i}\n" * 10
+
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    @app.get("/events")
+    async def events():
+        return Response("data: x\n\n" * 200, media_type="text/event-stream")
+
+    @app.get("/encoded")
+    async def encoded():
+        body = gzip.compress(b"x" * 2000)
+        return Response(body, media_type="text/plain", headers={"Content-Encoding": "gzip"})
+
+    return TestClient(app)
+
+
+def test_large_json_is_gzipped_and_small_is_not():
+    client = make_client()
+    raw = client.get("/big", headers={"Accept-Encoding": "gzip"})
+    assert raw.headers["content-encoding"] == "gzip"
+    assert "accept-encoding" in raw.headers["vary"].lower()
+    assert raw.headers["etag"] == 'W/"abc"'
+    assert int(raw.headers["content-length"]) < len(json.dumps(ROWS))
+    assert raw.json() == ROWS
+
+    small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+
+    identity = client.get("/big", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in identity.headers
+
+
+def test_streaming_body_is_compressed_incrementally():
+    client = make_client()
+    with client.stream("GET", "/text-stream", headers={"Accept-Encoding": "gzip"}) as response:
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        raw = b"".join(response.iter_raw())
+    text = zlib.decompress(raw, 16 + zlib.MAX_WBITS).decode()
+    assert text == "".join(f"line {i}\n" * 10 for i in range(50))
+
+
+def test_excluded_and_preencoded_responses_pass_through():
+    client = make_client()
+    events = client.get("/events", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in events.headers
+
+    encoded = client.get("/encoded", headers={"Accept-Encoding": "gzip"})
+    assert encoded.headers["content-encoding"] == "gzip"
+    assert encoded.text == "x" * 2000  # compressed once, not twice
+
+
+def test_openapi_document_is_cached_minified_and_conditional():
+    import web
+
+    client = TestClient(web.app)
+    first = client.get("/api/v1/openapi.json", headers={"Accept-Encoding": "identity"})
+    assert first.status_code == 200
+    assert b"\n" not in first.content
+    assert first.json()["openapi"]
+    etag = first.headers["etag"]
+    assert client.get("/backend/api/openapi.json").headers["content-encoding"] == "gzip"
+    cached = client.get("/api/v1/openapi.json", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
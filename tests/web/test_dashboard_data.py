@@ -34,7 +34,7 @@ class FakeAlarmService:
     async def __aexit__(self, exc_type, exc, tb):
         pass
 
-    async def list_upcoming(self, owner_id=None, limit=None):
+    async def list_upcoming(self, owner_id=None, limit=None, until=None):
         now = utcnow()
         item = CalendarItem(id=1, owner_id=owner_id, title="Drink water", start_at=now)
         alarm = Alarm(id=1, item_id=1, trigger_at=now + timedelta(minutes=30))
@@ -49,7 +49,7 @@ class FakeCalendarService:
     async def __aexit__(self, exc_type, exc, tb):
         pass
 
-    async def list_events(self, owner_id=None):
+    async def list_events(self, owner_id=None, start_at=None, end_at=None, limit=None):
         now = utcnow()
         return [
             CalendarEvent(id=1, owner_id=owner_id, title="Team meeting", start_at=now + timedelta(hours=2))
@@ -10,6 +10,7 @@ from backend.services.web_user_service import WebUserService
 from backend.services.crm_service import CRMService
 from backend.services.group_moderation_service import GroupModerationService
 from backend.models import GroupType, ProductStatus
+from backend.utils.cursor import encode_cursor
 
 try:
     from orchestrator.main import app  # type: ignore
@@ -142,3 +143,77 @@ async def test_groups_api_endpoints(client: AsyncClient):
     members = detail_after.json()["members"]
     trial_entry = next(m for m in members if m["telegram_id"] == trial_id)
     assert any(prod["status"] == "paid" for prod in trial_entry["products"])
+
+
+@pytest.mark.asyncio
+async def test_group_members_pages_and_filters(client: AsyncClient):
+    owner_id, trial_id, web_user_id = await _bootstrap_group()
+    cookies = {"web_user_id": str(web_user_id), "telegram_id": str(owner_id)}
+    async with db.async_session() as session:  # type: ignore
+        async with session.begin():
+            tsvc = TelegramUserService(session)
+            moderation = GroupModerationService(session)
+            for tg_id in range(20, 25):
+                await tsvc.get_or_create_user(telegram_id=tg_id, first_name=f"M{tg_id}")
+                await tsvc.add_user_to_group(tg_id, -900)
+            await moderation.update_member_profile(
+                group_id=-900, user_id=22, tags=["vip", "wave1"]
+            )
+            await moderation.record_activity(group_id=-900, user_id=23, messages=9)
+
+    seen: list[int] = []
+    cursor = None
+    while True:
+        params = {"limit": 3}
+        if cursor:
+            params["cursor"] = cursor
+        resp = await client.get("/api/v1/groups/-900/members", params=params, cookies=cookies)
+        assert resp.status_code == 200
+        page = resp.json()
+        seen.extend(m["telegram_id"] for m in page["items"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    assert sorted(seen) == sorted([owner_id, trial_id, 20, 21, 22, 23, 24])
+
+    resp = await client.get(
+        "/api/v1/groups/-900/members", params={"sort": "activity", "limit": 2}, cookies=cookies
+    )
+    assert [m["telegram_id"] for m in resp.json()["items"]] == [23, owner_id]
+
+    resp = await client.get(
+        "/api/v1/groups/-900/members", params={"tag": ["vip"]}, cookies=cookies
+    )
+    assert [m["telegram_id"] for m in resp.json()["items"]] == [22]
+
+    resp = await client.get(
+        "/api/v1/groups/-900/members",
+        params={"unpaid_product": "course", "quiet": "false"},
+        cookies=cookies,
+    )
+    assert [m["telegram_id"] for m in resp.json()["items"]] == [23]
+
+    resp = await client.get(
+        "/api/v1/groups/-900/members", params={"cursor": "bogus"}, cookies=cookies
+    )
+    assert resp.status_code == 400
+    for tampered in (
+        {"s": "joined", "k": [None, 21]},
+        {"s": "activity", "k": [[], 21]},
+        {"s": "joined", "k": ["2026-01-01", "x"]},
+    ):
+        resp = await client.get(
+            "/api/v1/groups/-900/members",
+            params={"cursor": encode_cursor(tampered), "sort": tampered["s"]},
+            cookies=cookies,
+        )
+        assert resp.status_code == 400
+
+    resp = await client.get("/api/v1/groups/-900/products", cookies=cookies)
+    course = next(p for p in resp.json() if p["slug"] == "course")
+    assert course["buyers"] == 1 and course["total_members"] == 7
+
+    resp = await client.get("/api/v1/groups/-900", params={"members_limit": 2}, cookies=cookies)
+    detail = resp.json()
+    assert len(detail["members"]) == 2
+    assert detail["members_total"] == 7 and detail["members_next_cursor"]
@@ -192,6 +192,12 @@ async def test_daily_and_cron(client: AsyncClient):
     assert resp.status_code == 201
     daily_id = resp.json()["id"]
 
+    resp = await client.patch(
+        f"/api/v1/dailies/{daily_id}", json={"rrule": "FREQ=HOURLY"}, cookies=cookies
+    )
+    assert resp.status_code == 400
+    assert resp.json()["detail"] == {"error": "invalid_rrule"}
+
     resp = await client.post(f"/api/v1/dailies/{daily_id}/done", cookies=cookies)
     assert resp.status_code == 200
 
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from web.next_pages import NextPageRegistry, NextPageResponse
+
+INLINE = "self.__next_f=self.__next_f||[]"
+HTML = f"<html><body><script>{INLINE}</script>{'<p>shell</p>' * 200}</body></html>"
+
+
+def make_client(tmp_path, monkeypatch) -> tuple[TestClient, NextPageRegistry]:
+    monkeypatch.setenv("SECURITY_HEADERS_ENABLED", "1")
+    monkeypatch.setenv("CSP_DEFAULT", "default-src 'self'; script-src 'self'")
+    (tmp_path / "cup").mkdir()
+    (tmp_path / "users.html").write_text(HTML, encoding="utf-8")
+    (tmp_path / "cup" / "admin-embed.html").write_text("<html></html>", encoding="utf-8")
+    registry = NextPageRegistry(tmp_path)
+    assert registry.warm() == 2 and "cup/admin-embed" in registry
+
+    app = FastAPI()
+
+    @app.get("/users")
+    async def users() -> NextPageResponse:
+        return NextPageResponse(registry.get("users"))
+
+    return TestClient(app), registry
+
+
+def test_page_headers_are_prebuilt(tmp_path, monkeypatch):
+    client, registry = make_client(tmp_path, monkeypatch)
+    page = registry.get("users")
+    assert page.script_hashes and page.encoded["gzip"]
+
+    response = client.get("/users", headers={"Accept-Encoding": "identity"})
+    assert response.status_code == 200
+    assert response.text == HTML
+    assert response.headers["etag"] == page.etag
+    assert "content-encoding" not in response.headers
+    csp = response.headers["content-security-policy"]
+    assert csp.startswith("default-src 'self'; script-src 'self' 'sha256-")
+
+
+def test_gzip_variant_and_conditional_request(tmp_path, monkeypatch):
+    client, registry = make_client(tmp_path, monkeypatch)
+    page = registry.get("users")
+
+    response = client.get("/users", headers={"Accept-Encoding": "gzip, br;q=0"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.text == HTML
+    gzip_etag = response.headers["etag"]
+    assert gzip_etag != page.etag
+
+    for etag in (page.etag, gzip_etag, f"W/{page.etag}"):
+        cached = client.get("/users", headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+        assert cached.content == b""
+        assert "content-security-policy" in cached.headers
+
+    assert client.get("/users", headers={"If-None-Match": '"other"'}).status_code == 200
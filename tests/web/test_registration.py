@@ -50,3 +50,18 @@ async def test_register_duplicate_username_case_insensitive(client: AsyncClient)
 
         params = parse_qs(urlparse(resp2.headers["location"]).query)
         assert params.get("flash") == ["Неверный логин или пароль"]
+
+
+@pytest.mark.asyncio
+async def test_hasher_busy_on_magic_signup_is_503(client: AsyncClient, monkeypatch) -> None:
+    from backend.db import PasswordHasherBusy
+    from web.routes import auth
+
+    async def busy(email: str):
+        raise PasswordHasherBusy("password hashing pool is saturated")
+
+    monkeypatch.setattr(auth, "upsert_user_from_email", busy)
+    token = auth.serializer.dumps({"email": "new@example.com", "kind": "magic"})
+    resp = await client.get(f"/auth/magic?token={token}", follow_redirects=False)
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == str(PasswordHasherBusy.retry_after)
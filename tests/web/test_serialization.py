@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import BaseModel, TypeAdapter
+
+from web.serialization import (
+    FastJSONResponse,
+    ModelListSerializer,
+    dumps,
+    rows_response,
+)
+
+
+class Inner(BaseModel):
+    id: int
+    name: str
+
+
+class Item(BaseModel):
+    id: int
+    title: str
+    due: Optional[datetime]
+    tags: dict
+    inner: Optional[Inner] = None
+
+
+ITEM_LIST = ModelListSerializer(Item)
+
+ROWS = [
+    {
+        "id": i,
+        "title": f"Задача {i}",
+        "due": datetime(2026, 1, 1, 12, i, tzinfo=timezone.utc) if i % 2 else None,
+        "tags": {"offsets": [15, 60]},
+        "inner": {"id": 7, "name": "Launch"} if i % 3 == 0 else None,
+    }
+    for i in range(10)
+]
+
+
+def test_list_serializer_matches_pydantic_output():
+    expected = TypeAdapter(List[Item]).dump_json([Item(**row) for row in ROWS])
+    assert ITEM_LIST.dump_json(ROWS) == expected
+    assert ITEM_LIST.dump_json(iter(ROWS)) == expected
+
+
+def test_list_endpoint_keeps_schema_and_body():
+    app = FastAPI(default_response_class=FastJSONResponse)
+
+    @app.get("/fast", response_model=List[Item])
+    async def fast():
+        return ITEM_LIST.response(ROWS)
+
+    @app.get("/plain", response_model=List[Item])
+    async def plain():
+        return [Item(**row) for row in ROWS]
+
+    @app.get("/rows")
+    async def rows():
+        return rows_response([{"id": 1, "title": "a"}])
+
+    client = TestClient(app)
+    fast_resp = client.get("/fast")
+    assert fast_resp.headers["content-type"] == "application/json"
+    assert fast_resp.json() == client.get("/plain").json()
+    assert client.get("/rows").json() == [{"id": 1, "title": "a"}]
+
+    schema = app.openapi()["paths"]["/fast"]["get"]["responses"]["200"]["content"]
+    assert schema["application/json"]["schema"]["items"]["$ref"].endswith("/Item")
+
+
+def test_dumps_handles_models_and_non_ascii():
+    payload = {"item": Item(**ROWS[1]), 1: "один"}
+    assert json.loads(dumps(payload)) == {
+        "item": json.loads(Item(**ROWS[1]).model_dump_json()),
+        "1": "один",
+    }
+    assert "один".encode() in dumps(payload)
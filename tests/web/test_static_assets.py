@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import gzip
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from web.static_assets import (
+    IMMUTABLE_CACHE,
+    REVALIDATE_CACHE,
+    StaticAssets,
+    precompress,
+)
+
+BUNDLE = b"console.log('chunk');" * 100
+
+
+def make_client(tmp_path) -> tuple[TestClient, StaticAssets, StaticAssets]:
+    static = tmp_path / "static"
+    chunks = tmp_path / "next" / "chunks"
+    static.mkdir()
+    chunks.mkdir(parents=True)
+    (static / "app.css").write_text("body{}")
+    (static / "app.3f9a1c2b.js").write_bytes(BUNDLE)
+    (chunks / "main.js").write_bytes(BUNDLE)
+    (chunks / "main.js.gz").write_bytes(gzip.compress(BUNDLE))
+
+    plain = StaticAssets(static)
+    hashed = StaticAssets(tmp_path / "next", immutable=True)
+    assert plain.scan() == 2 and hashed.scan() == 1  # .gz is a variant, not an asset
+    app = FastAPI()
+    app.mount("/static", plain)
+    app.mount("/_next/static", hashed)
+    return TestClient(app), plain, hashed
+
+
+def test_cache_policy_and_conditional_requests(tmp_path):
+    client, plain, _ = make_client(tmp_path)
+
+    css = client.get("/static/app.css")
+    assert css.status_code == 200 and css.text == "body{}"
+    assert css.headers["cache-control"] == REVALIDATE_CACHE
+    assert css.headers["content-type"].startswith("text/css")
+    assert css.headers["etag"] == plain.manifest.assets["app.css"].etag
+    again = client.get("/static/app.css", headers={"If-None-Match": css.headers["etag"]})
+    assert again.status_code == 304 and again.content == b""
+
+    hashed_name = client.get("/static/app.3f9a1c2b.js")
+    assert hashed_name.headers["cache-control"] == IMMUTABLE_CACHE
+    assert client.get("/_next/static/chunks/main.js").headers["cache-control"] == IMMUTABLE_CACHE
+
+    # Files edited in place are re-indexed instead of served with stale metadata.
+    (tmp_path / "static" / "app.css").write_text("body{color:red}")
+    edited = client.get("/static/app.css", headers={"If-None-Match": css.headers["etag"]})
+    assert edited.status_code == 200 and edited.text == "body{color:red}"
+    assert int(edited.headers["content-length"]) == len("body{color:red}")
+    assert edited.headers["etag"] != css.headers["etag"]
+    (tmp_path / "static" / "app.css").unlink()
+    assert client.get("/static/app.css").status_code == 404
+    assert "app.css" not in plain.manifest.assets
+
+    assert client.get("/static/missing.js").status_code == 404
+    assert client.get("/static/%2e%2e/__init__.py").status_code == 404
+    assert client.post("/static/app.css").status_code == 405
+
+
+def test_precompressed_variant_and_ranges(tmp_path):
+    client, _, hashed = make_client(tmp_path)
+
+    encoded = client.get("/_next/static/chunks/main.js", headers={"Accept-Encoding": "gzip"})
+    assert encoded.headers["content-encoding"] == "gzip"
+    assert encoded.headers["vary"] == "Accept-Encoding"
+    assert encoded.content == BUNDLE  # httpx decodes the gzip body
+
+    identity = client.get("/_next/static/chunks/main.js", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in identity.headers
+    assert int(identity.headers["content-length"]) == len(BUNDLE)
+
+    partial = client.get(
+        "/_next/static/chunks/main.js",
+        headers={"Range": "bytes=0-6", "Accept-Encoding": "gzip"},
+    )
+    assert partial.status_code == 206
+    assert partial.content == BUNDLE[:7]
+    assert "content-encoding" not in partial.headers
+
+    # Files written after the startup scan are indexed on first request.
+    (tmp_path / "next" / "late.js").write_bytes(b"late")
+    assert client.get("/_next/static/late.js").content == b"late"
+    assert "late.js" in hashed.manifest.assets
+
+
+def test_precompress_writes_gzip_siblings(tmp_path):
+    (tmp_path / "big.js").write_bytes(BUNDLE)
+    (tmp_path / "tiny.js").write_bytes(b"1")
+    (tmp_path / "logo.png").write_bytes(BUNDLE)
+    assert precompress(tmp_path) >= 1
+    assert gzip.decompress((tmp_path / "big.js.gz").read_bytes()) == BUNDLE
+    assert not (tmp_path / "tiny.js.gz").exists()
+    assert not (tmp_path / "logo.png.gz").exists()
+    assert precompress(tmp_path) == 0
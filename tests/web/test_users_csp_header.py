@@ -5,7 +5,7 @@ from fastapi.testclient import TestClient
 from backend.models import WebUser
 
 import web as web_app
-from web.routes.index import _load_next_html
+from web.next_pages import registry
 from web.security.csp import extract_inline_script_hashes
 
 
@@ -32,8 +32,8 @@ def make_client(monkeypatch) -> TestClient:
 
 
 def _load_expected_hashes() -> tuple[str, ...]:
-    _load_next_html.cache_clear()
-    html = _load_next_html("users")
+    registry.warm()
+    html = registry.get("users").html
     hashes = extract_inline_script_hashes(html)
     if not hashes:
         raise AssertionError("users.html should contain inline scripts from Next.js build")
@@ -51,9 +51,9 @@ def test_users_page_adds_inline_script_hashes(monkeypatch):
 
 
 def test_users_page_extends_custom_csp(monkeypatch):
-    expected_hashes = _load_expected_hashes()
     monkeypatch.setenv("CSP_DEFAULT", "default-src 'self'; script-src 'self'")
     monkeypatch.setenv("SECURITY_HEADERS_ENABLED", "1")
+    expected_hashes = _load_expected_hashes()  # re-warms with the new policy
     client = make_client(monkeypatch)
     response = client.get("/users")
     header = response.headers["content-security-policy"]
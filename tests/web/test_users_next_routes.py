@@ -7,7 +7,7 @@ from fastapi.testclient import TestClient
 from backend.models import WebUser
 
 import web as web_app
-from web.routes.index import _load_next_html
+from web.next_pages import registry
 
 
 class DummyWebUserService:
@@ -33,8 +33,8 @@ def make_client(monkeypatch) -> TestClient:
 
 
 def _get_next_asset_path() -> str:
-    _load_next_html.cache_clear()
-    html = _load_next_html("users")
+    registry.warm()
+    html = registry.get("users").html
     match = re.search(r'src=\"(/_next/static/[^\"?]+)"', html)
     if not match:
         raise AssertionError("users.html must include at least one Next static asset")